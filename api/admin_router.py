@@ -0,0 +1,198 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+
+from api.loan_router import repo as loan_repo
+from auth.auth_router import REFRESH_TOKENS
+from auth.deps import require_role
+from auth.token_cache import token_cache
+from infrastructure.audit_trail import AUDIT_TRAIL
+from infrastructure.execution_lanes import lane_stats
+
+# profiler, heap report, slow request log dan usage diimpor di dalam endpoint:
+# alat diagnosa on-demand tidak ikut dibayar saat cold start
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+# ================================================================
+# EXECUTION LANES — PENGGUNA
+# ================================================================
+@router.get("/lanes")
+def get_lanes(current_user=Depends(require_role("pengguna"))):
+    return lane_stats()
+
+
+# ================================================================
+# SAMPLING PROFILER — PENGGUNA
+# ================================================================
+@router.get("/profile")
+async def get_profile(
+    seconds: float = Query(5.0, gt=0),
+    interval_ms: float = Query(5.0, ge=1, le=100),
+    limit: int = Query(20, ge=1, le=200),
+    include_idle: bool = False,
+    format: str = Query("json", pattern="^(json|collapsed)$"),
+    current_user=Depends(require_role("pengguna")),
+):
+    from infrastructure.sampling_profiler import ProfilerBusy, profiler
+    if seconds > profiler.max_seconds:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"seconds must be <= {profiler.max_seconds:g}",
+        )
+    # sampler jalan di worker thread supaya event loop tetap melayani request (dan ikut tersampel)
+    try:
+        result = await run_in_threadpool(profiler.run, seconds, interval_ms / 1000)
+    except ProfilerBusy:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A profile is already running",
+        )
+    if format == "collapsed":
+        return PlainTextResponse(result.collapsed(include_idle))
+    return result.to_dict(limit, include_idle)
+
+
+# ================================================================
+# SLOW REQUESTS — PENGGUNA
+# ================================================================
+@router.get("/slow-requests")
+def get_slow_requests(
+    limit: int = Query(50, ge=1, le=1000),
+    current_user=Depends(require_role("pengguna")),
+):
+    from infrastructure.slow_requests import SLOW_REQUESTS
+    return SLOW_REQUESTS.snapshot(limit)
+
+
+@router.delete("/slow-requests")
+def clear_slow_requests(current_user=Depends(require_role("pengguna"))):
+    from infrastructure.slow_requests import SLOW_REQUESTS
+    SLOW_REQUESTS.clear()
+    return {"message": "Slow request log cleared"}
+
+
+# ================================================================
+# CPU / ALLOCATION PER ROUTE & ROLE — PENGGUNA
+# ================================================================
+@router.get("/usage")
+def get_usage(
+    sort: str = Query("cpu", pattern="^(cpu|alloc|requests)$"),
+    limit: int = Query(50, ge=1, le=1000),
+    current_user=Depends(require_role("pengguna")),
+):
+    from infrastructure.request_accounting import USAGE
+    return USAGE.report(sort, limit)
+
+
+@router.delete("/usage")
+def clear_usage(current_user=Depends(require_role("pengguna"))):
+    from infrastructure.request_accounting import USAGE
+    USAGE.clear()
+    return {"message": "Usage statistics cleared"}
+
+
+# ================================================================
+# HEAP / TRACEMALLOC — PENGGUNA
+# ================================================================
+def _heap_roots():
+    return {
+        "loan_repository": loan_repo.data,
+        "refresh_tokens": REFRESH_TOKENS,
+        "token_cache": token_cache,
+    }
+
+
+@router.get("/heap")
+def get_heap(
+    types: int = Query(15, ge=1, le=200),
+    current_user=Depends(require_role("pengguna")),
+):
+    from infrastructure.heap_report import HEAP, footprint_summary
+    footprints = {}
+    for name, root in _heap_roots().items():
+        summary = footprint_summary(root)
+        summary["types"] = dict(list(summary["types"].items())[:types])
+        footprints[name] = summary
+    return {"tracemalloc": HEAP.status(), "footprint": footprints}
+
+
+@router.post("/heap/tracing")
+def start_heap_tracing(
+    frames: int = Query(1, ge=1),
+    current_user=Depends(require_role("pengguna")),
+):
+    from infrastructure.heap_report import HEAP, TracingInUse
+    try:
+        return HEAP.start(frames)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except TracingInUse as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+
+@router.delete("/heap/tracing")
+def stop_heap_tracing(current_user=Depends(require_role("pengguna"))):
+    from infrastructure.heap_report import HEAP, TracingInUse
+    try:
+        return HEAP.stop()
+    except TracingInUse as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+
+@router.post("/heap/snapshots")
+def take_heap_snapshot(
+    name: str = Query(..., min_length=1, max_length=64),
+    limit: int = Query(20, ge=1, le=200),
+    current_user=Depends(require_role("pengguna")),
+):
+    from infrastructure.heap_report import HEAP
+    try:
+        snapshot = HEAP.take(name)
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return {"name": name, **HEAP.top(snapshot, limit)}
+
+
+@router.get("/heap/diff")
+def diff_heap_snapshots(
+    base: str,
+    target: str,
+    limit: int = Query(20, ge=1, le=200),
+    current_user=Depends(require_role("pengguna")),
+):
+    from infrastructure.heap_report import HEAP
+    try:
+        return HEAP.diff(base, target, limit)
+    except KeyError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Snapshot not found: {e.args[0]}")
+
+
+# ================================================================
+# AUDIT TRAIL — PENGGUNA
+# ================================================================
+@router.get("/audit")
+def get_audit_stats(current_user=Depends(require_role("pengguna"))):
+    return AUDIT_TRAIL.stats()
+
+
+@router.get("/audit/loans/{loan_id}")
+def get_loan_audit(
+    loan_id: UUID,
+    limit: int = Query(100, ge=1, le=1000),
+    after: int = Query(0, ge=0),  # seq terakhir yang sudah dibaca (halaman berikutnya)
+    current_user=Depends(require_role("pengguna")),
+):
+    return [entry.to_dict() for entry in AUDIT_TRAIL.by_loan(str(loan_id), limit, after)]
+
+
+@router.get("/audit/actors/{actor}")
+def get_actor_audit(
+    actor: UUID,
+    limit: int = Query(100, ge=1, le=1000),
+    after: int = Query(0, ge=0),  # seq terakhir yang sudah dibaca (halaman berikutnya)
+    current_user=Depends(require_role("pengguna")),
+):
+    return [entry.to_dict() for entry in AUDIT_TRAIL.by_actor(str(actor), limit, after)]
@@ -1,3 +1,6 @@
+import logging
+from datetime import datetime, timezone
+
 from fastapi import APIRouter, Depends, HTTPException
 from uuid import UUID
 from typing import List
@@ -10,11 +13,27 @@ from domain.loan_policy_service import LoanPolicyService
 from infrastructure.in_memory_loan_repository import InMemoryLoanRepository
 from schemas.loan_schema import LoanCreateRequest, LoanResponse
 from auth.deps import require_role, allow_roles
+from api.timed_route import TimedRoute
+from domain.audit_log import AuditEntry
+from infrastructure.audit_trail import AUDIT_TRAIL
+from infrastructure.phase_timing import phase
+from infrastructure.structured_logging import log_event
 
-router = APIRouter(prefix="", tags=["Loans"])
+router = APIRouter(prefix="", tags=["Loans"], route_class=TimedRoute)
 
 repo = InMemoryLoanRepository()
 policy = LoanPolicyService()
+events = logging.getLogger("bookwise.events")
+
+# ----------------------------
+# Helper: catat transisi ke audit trail + event log
+# ----------------------------
+def record_transition(loan: Loan, action: str, before, current_user, detail=None):
+    actor, after = str(current_user.user_id), loan.stage
+    AUDIT_TRAIL.record(AuditEntry(str(loan.loanId), action, actor, current_user.role,
+                                  before, after, datetime.now(timezone.utc), detail))
+    log_event(events, f"loan.{action}", loan_id=str(loan.loanId), actor=actor,
+              role=current_user.role, from_stage=before, to_stage=after, detail=detail)
 
 # ----------------------------
 # Helper convert Loan → dict
@@ -36,50 +55,58 @@ def to_response(loan: Loan) -> dict:
 # 1. CREATE LOAN — PEMINJAM
 # ================================================================
 @router.post("/loans", response_model=LoanResponse, status_code=201)
-def create_loan(req: LoanCreateRequest, current_user=Depends(require_role("peminjam"))):
+def create_loan(req: LoanCreateRequest, current_user=Depends(require_role("peminjam", lane="interactive"))):
     loan = Loan(BookId(req.bookId), UserId(req.userId))
     repo.save(loan)
-    return to_response(loan)
+    record_transition(loan, "created", None, current_user)
+    with phase("serialize"):
+        return to_response(loan)
 
 # ================================================================
 # 2. LIST MY LOANS — PEMINJAM
 # ================================================================
 @router.get("/loans/my", response_model=List[LoanResponse])
-def list_my_loans(current_user=Depends(require_role("peminjam"))):
+def list_my_loans(current_user=Depends(require_role("peminjam", lane="interactive"))):
     loans = repo.findByUser(current_user.user_id)
-    return [to_response(l) for l in loans]
+    with phase("serialize"):
+        return [to_response(l) for l in loans]
 
 # ================================================================
 # 3. LIST ALL LOANS — PENGGUNA
 # ================================================================
+# lane "bulk": export besar tidak memakan thread milik request peminjam
 @router.get("/loans/all", response_model=List[LoanResponse])
-def list_all_loans(current_user=Depends(require_role("pengguna"))):
+def list_all_loans(current_user=Depends(require_role("pengguna", lane="bulk"))):
     loans = repo.list_all()
-    return [to_response(l) for l in loans]
+    with phase("serialize"):
+        return [to_response(l) for l in loans]
 
 # ================================================================
 # 4. GET LOAN BY ID — PEMINJAM / PENGGUNA
 # ================================================================
 @router.get("/loans/{loan_id}", response_model=LoanResponse)
-def get_loan(loan_id: UUID, current_user=Depends(allow_roles("peminjam", "pengguna"))):
+def get_loan(loan_id: UUID, current_user=Depends(allow_roles("peminjam", "pengguna", lane="interactive"))):
     loan = repo.findById(loan_id)
     if not loan:
         raise HTTPException(status_code=404, detail="Loan not found")
     if current_user.role == "peminjam" and str(loan.userId.value) != str(current_user.user_id):
         raise HTTPException(status_code=403, detail="Forbidden")
-    return to_response(loan)
+    with phase("serialize"):
+        return to_response(loan)
 
 # ================================================================
 # 5. VERIFY LOAN — PENGGUNA
 # ================================================================
 @router.post("/loans/{loan_id}/verify")
-def verify_loan(loan_id: UUID, current_user=Depends(require_role("pengguna"))):
+def verify_loan(loan_id: UUID, current_user=Depends(require_role("pengguna", lane="interactive"))):
     loan = repo.findById(loan_id)
     if not loan:
         raise HTTPException(status_code=404, detail="Loan not found")
+    before = loan.stage
     try:
         loan.verify()
         repo.save(loan)
+        record_transition(loan, "verified", before, current_user)
         return {"detail": "Loan verified"}
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -88,14 +115,16 @@ def verify_loan(loan_id: UUID, current_user=Depends(require_role("pengguna"))):
 # 6. APPROVE LOAN — PENGGUNA
 # ================================================================
 @router.post("/loans/{loan_id}/approve")
-def approve_loan(loan_id: UUID, current_user=Depends(require_role("pengguna"))):
+def approve_loan(loan_id: UUID, current_user=Depends(require_role("pengguna", lane="interactive"))):
     loan = repo.findById(loan_id)
     if not loan:
         raise HTTPException(status_code=404, detail="Loan not found")
+    before = loan.stage
     try:
         due = policy.calculate_due_date()
         loan.approve(due)
         repo.save(loan)
+        record_transition(loan, "approved", before, current_user, detail=f"due {due.value.isoformat()}")
         return {"detail": "Loan approved", "dueDate": due.value}
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -104,15 +133,17 @@ def approve_loan(loan_id: UUID, current_user=Depends(require_role("pengguna"))):
 # 7. INITIATE RETURN — PEMINJAM
 # ================================================================
 @router.post("/loans/{loan_id}/return")
-def initiate_return(loan_id: UUID, current_user=Depends(require_role("peminjam"))):
+def initiate_return(loan_id: UUID, current_user=Depends(require_role("peminjam", lane="interactive"))):
     loan = repo.findById(loan_id)
     if not loan:
         raise HTTPException(status_code=404, detail="Loan not found")
     if str(loan.userId.value) != str(current_user.user_id):
         raise HTTPException(status_code=403, detail="Forbidden")
+    before = loan.stage
     try:
         loan.initiate_return()
         repo.save(loan)
+        record_transition(loan, "return_initiated", before, current_user)
         return {"detail": "Return initiated"}
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -121,13 +152,15 @@ def initiate_return(loan_id: UUID, current_user=Depends(require_role("peminjam")
 # 8. FINALIZE RETURN — PENGGUNA
 # ================================================================
 @router.post("/loans/{loan_id}/finalize-return")
-def finalize_return(loan_id: UUID, current_user=Depends(require_role("pengguna"))):
+def finalize_return(loan_id: UUID, current_user=Depends(require_role("pengguna", lane="interactive"))):
     loan = repo.findById(loan_id)
     if not loan:
         raise HTTPException(status_code=404, detail="Loan not found")
+    before = loan.stage
     try:
         loan.finalize_return()
         repo.save(loan)
+        record_transition(loan, "returned", before, current_user)
         return {"detail": "Return finalized"}
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -139,15 +172,17 @@ class ExtendRequest(BaseModel):
     extra_days: int
 
 @router.post("/loans/{loan_id}/extend")
-def extend_loan(loan_id: UUID, req: ExtendRequest, current_user=Depends(require_role("peminjam"))):
+def extend_loan(loan_id: UUID, req: ExtendRequest, current_user=Depends(require_role("peminjam", lane="interactive"))):
     loan = repo.findById(loan_id)
     if not loan:
         raise HTTPException(status_code=404, detail="Loan not found")
     if str(loan.userId.value) != str(current_user.user_id):
         raise HTTPException(status_code=403, detail="Forbidden")
+    before = loan.stage
     try:
         new_due = loan.extend_loan(req.extra_days)
         repo.save(loan)
+        record_transition(loan, "extended", before, current_user, detail=f"due {new_due.value.isoformat()}")
         return {"detail": "Extension applied", "newDueDate": new_due.value}
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
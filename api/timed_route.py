@@ -0,0 +1,39 @@
+import asyncio
+from functools import wraps
+from typing import Callable
+
+from fastapi.routing import APIRoute
+
+from infrastructure.phase_timing import phase
+
+
+def _timed_endpoint(endpoint: Callable) -> Callable:
+    # sync tetap sync supaya FastAPI tetap menjalankannya di threadpool
+    if asyncio.iscoroutinefunction(endpoint):
+        @wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            with phase("handler"):
+                return await endpoint(*args, **kwargs)
+        return async_wrapper
+
+    @wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        with phase("handler"):
+            return endpoint(*args, **kwargs)
+    return wrapper
+
+
+class TimedRoute(APIRoute):
+    """
+    Route class that splits a request into `handler` (endpoint body) and
+    `validate` (dependency solving, response_model validation, encoding).
+    """
+
+    def get_route_handler(self) -> Callable:
+        self.dependant.call = _timed_endpoint(self.dependant.call)
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            with phase("validate"):
+                return await handler(request)
+        return timed_handler
@@ -0,0 +1,149 @@
+# application.py
+"""
+The BookWise FastAPI application. Served through main.py, which imports
+this module lazily (see middleware/lazy_app); main.py also puts the
+project root on sys.path.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+from fastapi.openapi.utils import get_openapi
+from fastapi.security import HTTPBearer
+
+from api.admin_router import router as admin_router
+from api.loan_router import router as loan_router
+from auth.auth_router import router as auth_router, REFRESH_TOKENS
+from auth.password_pool import password_pool
+from infrastructure.audit_trail import AUDIT_TRAIL
+from infrastructure.in_memory_refresh_token_store import run_expiry
+from middleware.access_log import (
+    ACCESS_LOG_ENABLED,
+    LOG_LEVEL,
+    LOG_WRITER,
+    STRUCTURED_LOGGING_ENABLED,
+    AccessLogMiddleware,
+)
+from middleware.admission import ADMISSION_ENABLED, AdmissionControlMiddleware
+from infrastructure.metrics import enable_multiprocess
+from infrastructure.structured_logging import configure_logging, register_logging_metrics
+from infrastructure.runtime_monitor import RUNTIME_MONITOR, RUNTIME_MONITOR_ENABLED, register_runtime_metrics
+from middleware.metrics import METRICS_ENABLED, METRICS_MULTIPROC_DIR, MetricsMiddleware, register_app_metrics
+from middleware.server_timing import SERVER_TIMING_ENABLED, ServerTimingMiddleware
+from middleware.slow_requests import SLOW_REQUEST_ENABLED, SlowRequestMiddleware
+from middleware.tracing import TRACE_PROCESSOR, TRACING_ENABLED, TracingMiddleware
+from middleware.rate_limit import RATE_LIMIT_ENABLED, RateLimitMiddleware
+from middleware.request_accounting import REQUEST_ACCOUNTING_ENABLED, RequestAccountingMiddleware
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    expiry_task = asyncio.create_task(run_expiry(REFRESH_TOKENS))
+    monitor_task = asyncio.create_task(RUNTIME_MONITOR.run()) if RUNTIME_MONITOR_ENABLED else None
+    yield
+    expiry_task.cancel()
+    if monitor_task is not None:
+        monitor_task.cancel()
+    password_pool.shutdown()
+    AUDIT_TRAIL.shutdown()
+    if TRACING_ENABLED:
+        TRACE_PROCESSOR.shutdown()
+    if STRUCTURED_LOGGING_ENABLED:
+        LOG_WRITER.shutdown()
+
+
+app = FastAPI(
+    title="BookWise - Lending BC (with Auth)",
+    description="API for BookWise digital book lending platform",
+    version="1.0.0",
+    lifespan=lifespan
+)
+
+bearer_scheme = HTTPBearer()
+
+# semua logger (termasuk runtime monitor) lewat antrean + thread writer, bukan I/O di request
+if STRUCTURED_LOGGING_ENABLED:
+    configure_logging(LOG_WRITER, LOG_LEVEL)
+
+# middleware terakhir ditambahkan = paling luar: rate limit per client dulu, lalu admission global
+if ADMISSION_ENABLED:
+    app.add_middleware(AdmissionControlMiddleware)
+if RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
+if REQUEST_ACCOUNTING_ENABLED:
+    app.add_middleware(RequestAccountingMiddleware)
+# di luar admission supaya waktu antre ikut terukur; di dalam Server-Timing supaya timer-nya dipakai ulang
+if SLOW_REQUEST_ENABLED:
+    app.add_middleware(SlowRequestMiddleware)
+if TRACING_ENABLED:
+    app.add_middleware(TracingMiddleware)
+if SERVER_TIMING_ENABLED:
+    app.add_middleware(ServerTimingMiddleware)
+if STRUCTURED_LOGGING_ENABLED and ACCESS_LOG_ENABLED:
+    app.add_middleware(AccessLogMiddleware)
+# metrics paling luar supaya 429/503 dari middleware lain ikut tercatat
+if METRICS_ENABLED:
+    if METRICS_MULTIPROC_DIR:
+        enable_multiprocess(METRICS_MULTIPROC_DIR)
+    register_app_metrics()
+    register_runtime_metrics()
+    if STRUCTURED_LOGGING_ENABLED:
+        register_logging_metrics(LOG_WRITER)
+    app.add_middleware(MetricsMiddleware)
+
+@app.get("/")
+def root():
+    return {
+        "message": "BookWise API is running",
+        "status": "healthy",
+        "endpoints": {
+            "docs": "/docs",
+            "redoc": "/redoc",
+            "auth": "/auth/*",
+            "loans": "/loans/*"
+        }
+    }
+
+@app.get("/health")
+def health_check():
+    return {"status": "ok"}
+
+# Routers
+app.include_router(auth_router)
+app.include_router(loan_router)
+app.include_router(admin_router)
+
+
+def custom_openapi():
+    if app.openapi_schema:
+        return app.openapi_schema
+
+    openapi_schema = get_openapi(
+        title="BookWise - Lending BC (with Auth)",
+        version="1.0.0",
+        description="Digital book lending platform with JWT authentication",
+        routes=app.routes,
+    )
+
+    openapi_schema.setdefault("components", {})
+    openapi_schema["components"].setdefault("securitySchemes", {})
+
+    openapi_schema["components"]["securitySchemes"]["BearerAuth"] = {
+        "type": "http",
+        "scheme": "bearer",
+        "bearerFormat": "JWT",
+        "description": "Enter your JWT token"
+    }
+
+    for path, path_item in openapi_schema["paths"].items():
+        for method, details in path_item.items():
+            if method in ["get", "post", "put", "patch", "delete"]:
+                # Skip auth/login
+                if "/auth/login" not in path:
+                    details.setdefault("security", [{"BearerAuth": []}])
+
+    app.openapi_schema = openapi_schema
+    return openapi_schema
+
+
+app.openapi = custom_openapi
@@ -0,0 +1,206 @@
+# auth/api_keys.py
+"""
+API keys for service-to-service clients (integration jobs).
+
+Key format: `bw_<key_id>.<secret>`. Only sha256(secret) is kept; lookup is
+a dict probe on key_id followed by a constant-time digest compare, so no
+bcrypt and no JWT on the request path.
+
+Optional request signing (per key): the client sends
+    X-Timestamp: <unix seconds>
+    X-Nonce:     <random, unique per request>
+    X-Signature: hex(HMAC-SHA256(sha256(secret),
+                     "METHOD\\nPATH\\nQUERY\\nTIMESTAMP\\nNONCE\\nsha256(body)"))
+QUERY is the raw query string as sent (without "?"). Timestamps more
+than API_KEY_SIGNATURE_WINDOW_SECONDS away from the server clock are
+rejected, and so is a nonce already seen for the key within that window.
+The nonce cache is per process: across workers a replay is only bounded
+by the window.
+
+Issue a key (prints the client key and the env entry to register it):
+    python -m auth.api_keys <name> <role> [--signed]
+"""
+import hashlib
+import hmac
+import os
+import secrets
+import sys
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional, Tuple
+from uuid import NAMESPACE_URL, UUID, uuid5
+
+KEY_PREFIX = "bw_"
+SIGNATURE_MAX_SKEW_SECONDS = int(os.getenv("API_KEY_SIGNATURE_WINDOW_SECONDS", "60"))
+NONCE_CACHE_SIZE = int(os.getenv("API_KEY_NONCE_CACHE_SIZE", "100000"))
+NONCE_MAX_LENGTH = 128
+
+
+class ApiKey:
+    __slots__ = ("key_id", "secret_digest", "role", "principal_id", "require_signature", "name")
+
+    def __init__(self, key_id: str, secret_digest: bytes, role: str,
+                 principal_id: Optional[UUID] = None, require_signature: bool = False,
+                 name: str = ""):
+        self.key_id = key_id
+        self.secret_digest = secret_digest
+        self.role = role
+        # deterministik dari key_id supaya sama di semua worker
+        self.principal_id = principal_id or uuid5(NAMESPACE_URL, f"bookwise-api-key:{key_id}")
+        self.require_signature = require_signature
+        self.name = name
+
+
+def _digest(secret: str) -> bytes:
+    return hashlib.sha256(secret.encode("utf-8")).digest()
+
+
+def split_key(api_key: str) -> Optional[Tuple[str, str]]:
+    if not api_key.startswith(KEY_PREFIX) or "." not in api_key:
+        return None
+    key_id, secret = api_key[len(KEY_PREFIX):].split(".", 1)
+    if not key_id or not secret:
+        return None
+    return key_id, secret
+
+
+def signing_message(method: str, path: str, query: str, timestamp: str, nonce: str,
+                    body: bytes) -> bytes:
+    body_hash = hashlib.sha256(body).hexdigest()
+    return f"{method.upper()}\n{path}\n{query}\n{timestamp}\n{nonce}\n{body_hash}".encode("utf-8")
+
+
+def new_nonce() -> str:
+    return secrets.token_hex(16)
+
+
+def sign_request(api_key: str, method: str, path: str, timestamp: str, nonce: str,
+                 body: bytes = b"", query: str = "") -> str:
+    """
+    Client-side helper: compute X-Signature for a request.
+    """
+    _, secret = split_key(api_key)
+    return hmac.new(_digest(secret), signing_message(method, path, query, timestamp, nonce, body),
+                    hashlib.sha256).hexdigest()
+
+
+class NonceCache:
+    """
+    Nonces seen in the last `window` seconds, per key. A full cache rejects
+    new nonces rather than forgetting ones that could still be replayed.
+    """
+
+    def __init__(self, window: float = SIGNATURE_MAX_SKEW_SECONDS, maxsize: int = NONCE_CACHE_SIZE):
+        self.window = window
+        self.maxsize = maxsize
+        self.seen: Dict[Tuple[str, str], float] = {}
+        # (kedaluwarsa, key) urut waktu masuk, untuk membuang yang lewat window
+        self._expiry: deque = deque()
+        self._lock = threading.Lock()
+
+    def add(self, key_id: str, nonce: str, now: float) -> bool:
+        """
+        Record a nonce; False if it was already used (or the cache is full).
+        """
+        entry = (key_id, nonce)
+        with self._lock:
+            while self._expiry and self._expiry[0][0] <= now:
+                _, old = self._expiry.popleft()
+                self.seen.pop(old, None)
+            if entry in self.seen or len(self.seen) >= self.maxsize:
+                return False
+            # timestamp bisa sampai `window` ke depan, jadi simpan 2x window
+            expires = now + 2 * self.window
+            self.seen[entry] = expires
+            self._expiry.append((expires, entry))
+            return True
+
+
+class ApiKeyTable:
+    def __init__(self):
+        self.keys: Dict[str, ApiKey] = {}
+        self.nonces = NonceCache()
+        self._lock = threading.Lock()
+
+    def register(self, key: ApiKey) -> ApiKey:
+        with self._lock:
+            self.keys[key.key_id] = key
+        return key
+
+    def issue(self, name: str, role: str, require_signature: bool = False) -> Tuple[str, ApiKey]:
+        """
+        Create and register a new key. The plain key is returned once and never stored.
+        """
+        key_id = secrets.token_hex(8)
+        secret = secrets.token_urlsafe(32)
+        key = self.register(ApiKey(key_id, _digest(secret), role,
+                                   require_signature=require_signature, name=name))
+        return f"{KEY_PREFIX}{key_id}.{secret}", key
+
+    def revoke(self, key_id: str) -> bool:
+        with self._lock:
+            return self.keys.pop(key_id, None) is not None
+
+    def authenticate(self, api_key: str) -> Optional[ApiKey]:
+        parts = split_key(api_key)
+        if parts is None:
+            return None
+        key = self.keys.get(parts[0])
+        if key is None or not hmac.compare_digest(key.secret_digest, _digest(parts[1])):
+            return None
+        return key
+
+    def verify_signature(self, key: ApiKey, method: str, path: str, query: str,
+                         timestamp: Optional[str], nonce: Optional[str], signature: Optional[str],
+                         body: bytes, now: Optional[float] = None) -> bool:
+        if not timestamp or not nonce or not signature or len(nonce) > NONCE_MAX_LENGTH:
+            return False
+        try:
+            ts = int(timestamp)
+        except ValueError:
+            return False
+        current = time.time() if now is None else now
+        if abs(current - ts) > self.nonces.window:
+            return False
+        message = signing_message(method, path, query, timestamp, nonce, body)
+        expected = hmac.new(key.secret_digest, message, hashlib.sha256).hexdigest()
+        if not hmac.compare_digest(expected, signature):
+            return False
+        # nonce dicatat hanya setelah signature valid, jadi tidak bisa diisi orang lain
+        return self.nonces.add(key.key_id, nonce, current)
+
+    def load_from_env(self, value: str) -> int:
+        """
+        Register keys from `key_id:sha256hex:role[:signed],...` (BOOKWISE_API_KEYS).
+        """
+        count = 0
+        for entry in filter(None, (e.strip() for e in value.split(","))):
+            parts = entry.split(":")
+            key_id, digest_hex, role = parts[:3]
+            signed = len(parts) > 3 and parts[3] == "signed"
+            self.register(ApiKey(key_id, bytes.fromhex(digest_hex), role,
+                                 require_signature=signed, name=key_id))
+            count += 1
+        return count
+
+
+API_KEYS = ApiKeyTable()
+API_KEYS.load_from_env(os.getenv("BOOKWISE_API_KEYS", ""))
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) < 2:
+        print("usage: python -m auth.api_keys <name> <role> [--signed]")
+        return 1
+    signed = "--signed" in argv
+    plain, key = ApiKeyTable().issue(argv[0], argv[1], require_signature=signed)
+    entry = f"{key.key_id}:{key.secret_digest.hex()}:{key.role}" + (":signed" if signed else "")
+    print(f"client key        : {plain}")
+    print(f"BOOKWISE_API_KEYS : {entry}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,15 +2,49 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from pydantic import BaseModel
 from datetime import timedelta
-from typing import Dict
+import os
 
-from auth.users import get_user_by_username, verify_password
+from auth.users import get_user_by_username, save_user, user_repo
+from auth.password_pool import password_pool, PasswordPoolSaturated
 from auth.jwt_handler import create_access_token, create_refresh_token
 from auth.deps import get_current_active_user  # ← WAJIB DITAMBAHKAN
+from auth.refresh_token_store import RefreshTokenStore
+from auth.stateless_refresh import RefreshGenerations
+from infrastructure.in_memory_refresh_token_store import InMemoryRefreshTokenStore
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
-REFRESH_TOKENS: Dict[str, str] = {}
+# "store": token opaque di REFRESH_TOKENS (per proses)
+# "stateless": token JWT bertanda tangan, generation/counter disimpan di record user
+REFRESH_TOKEN_MODE = os.getenv("REFRESH_TOKEN_MODE", "store")
+
+REFRESH_TOKENS: RefreshTokenStore = InMemoryRefreshTokenStore()
+refresh_generations = RefreshGenerations(user_repo)
+
+def issue_refresh_token(username: str) -> str:
+    if REFRESH_TOKEN_MODE == "stateless":
+        return refresh_generations.issue(username)
+    token = create_refresh_token()
+    REFRESH_TOKENS.add(token, username)
+    return token
+
+def rotate_refresh_token(token: str):
+    """
+    Consume a refresh token. Returns (username, new refresh token) or None.
+    """
+    if REFRESH_TOKEN_MODE == "stateless":
+        return refresh_generations.rotate(token)
+    username = REFRESH_TOKENS.get(token)
+    # revoke gagal = token sudah dipakai request lain secara bersamaan
+    if not username or not REFRESH_TOKENS.revoke(token):
+        return None
+    return username, issue_refresh_token(username)
+
+def revoke_refresh_token(token: str) -> None:
+    if REFRESH_TOKEN_MODE == "stateless":
+        refresh_generations.revoke(token)
+        return
+    REFRESH_TOKENS.revoke(token)
 
 class TokenResponse(BaseModel):
     access_token: str
@@ -21,34 +55,52 @@ class RefreshRequest(BaseModel):
     refresh_token: str
 
 @router.post("/login", response_model=TokenResponse)
-def login(form_data: OAuth2PasswordRequestForm = Depends()):
+async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     user = get_user_by_username(form_data.username)
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    # bcrypt jalan di process pool, bukan di threadpool endpoint lain
+    try:
+        valid, new_hash = await password_pool.verify_and_rehash(form_data.password, user.hashed_password)
+    except PasswordPoolSaturated as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Login temporarily unavailable, try again later",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    if not valid:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    if user.disabled:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User disabled")
+    if new_hash:
+        # cost bcrypt berubah: simpan hash baru tanpa memaksa reset password
+        user.hashed_password = new_hash
+        save_user(user)
 
     access_token = create_access_token(
         subject=str(user.user_id),
         role=user.role,
         expires_delta=timedelta(minutes=60)
     )
-    refresh_token = create_refresh_token()
-
-    REFRESH_TOKENS[refresh_token] = user.username
+    refresh_token = issue_refresh_token(user.username)
 
     return TokenResponse(access_token=access_token, refresh_token=refresh_token)
 
 
 @router.post("/refresh", response_model=TokenResponse)
 def refresh_token(req: RefreshRequest):
-    rt = req.refresh_token
-    username = REFRESH_TOKENS.get(rt)
-
-    if not username:
+    rotated = rotate_refresh_token(req.refresh_token)
+    if not rotated:
         raise HTTPException(status_code=401, detail="Invalid refresh token")
+    username, new_rt = rotated
 
     user = get_user_by_username(username)
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
+    if user.disabled:
+        # token pengganti sudah terbit (mode store): cabut lagi
+        revoke_refresh_token(new_rt)
+        raise HTTPException(status_code=401, detail="User disabled")
 
     access_token = create_access_token(
         subject=str(user.user_id),
@@ -56,17 +108,11 @@ def refresh_token(req: RefreshRequest):
         expires_delta=timedelta(minutes=60)
     )
 
-    new_rt = create_refresh_token()
-    del REFRESH_TOKENS[rt]
-    REFRESH_TOKENS[new_rt] = user.username
-
     return TokenResponse(access_token=access_token, refresh_token=new_rt)
 
 @router.post("/logout")
 def logout(req: RefreshRequest):
-    rt = req.refresh_token
-    if rt in REFRESH_TOKENS:
-        del REFRESH_TOKENS[rt]
+    revoke_refresh_token(req.refresh_token)
     return {"message": "Refresh token revoked"}
 
 @router.get("/me")
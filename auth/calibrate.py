@@ -0,0 +1,64 @@
+# auth/calibrate.py
+"""
+Calibrate bcrypt cost for this host.
+
+    python -m auth.calibrate [target_ms]
+
+Prints the largest cost whose hash time stays under the target; set it as
+BCRYPT_ROUNDS. Existing hashes are upgraded on the next successful login.
+"""
+import sys
+import time
+from typing import Callable, Dict
+
+from passlib.hash import bcrypt
+
+MIN_ROUNDS = 4
+MAX_ROUNDS = 16
+DEFAULT_TARGET_MS = 250.0
+
+
+def measure_bcrypt(rounds: int, samples: int = 3) -> float:
+    """
+    Best-of-N wall time (ms) of one bcrypt hash at the given cost.
+    """
+    handler = bcrypt.using(rounds=rounds)
+    best = float("inf")
+    for _ in range(samples):
+        start = time.perf_counter()
+        handler.hash("calibration-password")
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def calibrate_rounds(target_ms: float = DEFAULT_TARGET_MS,
+                     measure: Callable[[int], float] = measure_bcrypt) -> Dict[int, float]:
+    """
+    Measure costs from MIN_ROUNDS upward until one exceeds target_ms.
+    Returns {rounds: ms} for every cost measured; each step doubles the
+    work, so this stops one cost past the budget.
+    """
+    timings: Dict[int, float] = {}
+    for rounds in range(MIN_ROUNDS, MAX_ROUNDS + 1):
+        timings[rounds] = measure(rounds)
+        if timings[rounds] > target_ms:
+            break
+    return timings
+
+
+def pick_rounds(timings: Dict[int, float], target_ms: float) -> int:
+    under = [r for r, ms in timings.items() if ms <= target_ms]
+    return max(under) if under else MIN_ROUNDS
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    target_ms = float(argv[0]) if argv else DEFAULT_TARGET_MS
+    timings = calibrate_rounds(target_ms)
+    for rounds, ms in timings.items():
+        print(f"  cost {rounds:2d}: {ms:8.1f} ms")
+    print(f"BCRYPT_ROUNDS={pick_rounds(timings, target_ms)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,51 @@
-from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
-from typing import Callable
+import os
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import APIKeyHeader, OAuth2PasswordBearer
+from typing import Callable, Optional
+from uuid import UUID
 from auth.jwt_handler import decode_access_token
 from auth.users import get_user_by_id
+from auth.token_cache import token_cache
+from auth.revocation import revocation_epochs
+from auth.api_keys import API_KEYS
+from infrastructure.execution_lanes import LaneFull, get_lane
+from infrastructure.phase_timing import phase
+
+# True: require_role/allow_roles percaya klaim sub/role di token (tanpa lookup user)
+AUTH_TRUST_CLAIMS = os.getenv("AUTH_TRUST_CLAIMS", "false").lower() == "true"
+# lane default per role, mis. "peminjam:interactive,pengguna:bulk"; lane di route menang
+ROLE_LANES = dict(item.split(":", 1) for item in os.getenv("ROLE_LANES", "").split(",") if item)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+# varian tanpa auto_error, supaya request dengan X-API-Key tidak butuh bearer token
+oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
+api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
+
+def decode_token_cached(token: str):
+    """
+    Decode JWT, skipping signature verification for tokens already seen.
+    Only valid payloads are cached; they expire at the token's `exp`.
+    """
+    with phase("jwt"):
+        payload = token_cache.get(token)
+        if payload is None:
+            payload = decode_access_token(token)
+            if payload:
+                token_cache.put(token, payload)
+    return payload
 
 def get_current_active_user(token: str = Depends(oauth2_scheme)):
     """
     Return user object if token valid. Otherwise raise 401.
     """
-    payload = decode_access_token(token)
+    payload = decode_token_cached(token)
     if not payload:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
     user_id = payload.get("sub")
     if not user_id:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
-    user = get_user_by_id(user_id)
+    with phase("user"):
+        user = get_user_by_id(user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
     if user.disabled:
@@ -24,22 +53,124 @@ def get_current_active_user(token: str = Depends(oauth2_scheme)):
     # attach role available in payload too if needed
     return user
 
-def require_role(role: str) -> Callable:
+class TokenUser:
+    """
+    Principal built from verified token claims only (no user record).
+    """
+    __slots__ = ("user_id", "role")
+
+    def __init__(self, user_id: UUID, role: str):
+        self.user_id = user_id
+        self.role = role
+
+def get_current_principal(token: str = Depends(oauth2_scheme)):
+    """
+    Return the caller for role checks. With AUTH_TRUST_CLAIMS the signed
+    claims are trusted and disabled/demoted users are caught by the
+    revocation epoch table; otherwise this is get_current_active_user.
+    """
+    if not AUTH_TRUST_CLAIMS:
+        return get_current_active_user(token)
+    payload = decode_token_cached(token)
+    if not payload:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
+    sub = payload.get("sub")
+    role = payload.get("role")
+    if not sub or not role:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
+    if revocation_epochs.is_revoked(sub, payload.get("iat")):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
+    try:
+        return TokenUser(UUID(sub), role)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
+
+async def get_api_key_user(request: Request, api_key: Optional[str] = Depends(api_key_header)):
+    """
+    Return a TokenUser for a valid X-API-Key, None if the header is absent.
+    Keys flagged require_signature also need a valid X-Timestamp, X-Nonce
+    and X-Signature.
+    """
+    if not api_key:
+        return None
+    key = API_KEYS.authenticate(api_key)
+    if key is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key")
+    if key.require_signature:
+        body = await request.body()
+        if not API_KEYS.verify_signature(key, request.method, request.url.path,
+                                         request.scope["query_string"].decode("latin-1"),
+                                         request.headers.get("X-Timestamp"),
+                                         request.headers.get("X-Nonce"),
+                                         request.headers.get("X-Signature"), body):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid request signature")
+    return TokenUser(key.principal_id, key.role)
+
+def get_request_principal(token: Optional[str] = Depends(oauth2_scheme_optional),
+                          api_user = Depends(get_api_key_user)):
+    """
+    Caller for role checks: API key if present, otherwise the bearer token.
+    """
+    if api_user is not None:
+        return api_user
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return get_current_principal(token)
+
+def _in_lane(checker: Callable, lane: Optional[str]) -> Callable:
+    """
+    Wrap a role checker so the rest of the request runs holding a slot in
+    `lane` (or the caller's ROLE_LANES lane). Full lane queue -> 503.
+    """
+    if lane is not None:
+        get_lane(lane)  # nama lane salah ketahuan saat route didefinisikan
+
+    async def lane_checker(user = Depends(checker)):
+        name = lane or ROLE_LANES.get(user.role)
+        if name is None:
+            yield user
+            return
+        selected = get_lane(name)
+        try:
+            await selected.acquire()
+        except LaneFull as e:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server busy, try again later",
+                headers={"Retry-After": str(e.retry_after)},
+            )
+        try:
+            yield user
+        finally:
+            selected.completed += 1
+            selected.release()
+    return lane_checker
+
+def require_role(role: str, lane: Optional[str] = None) -> Callable:
     """
     Dependency generator: require_role('peminjam') -> use as Depends(require_role('peminjam'))
+    Optional `lane` runs the handler in that execution lane.
     """
-    def role_checker(user = Depends(get_current_active_user)):
+    def role_checker(user = Depends(get_request_principal)):
         if user.role != role:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden: insufficient role")
         return user
-    return role_checker
+    if lane is None and not ROLE_LANES:
+        return role_checker
+    return _in_lane(role_checker, lane)
 
-def allow_roles(*roles: str):
+def allow_roles(*roles: str, lane: Optional[str] = None):
     """
     Dependency generator that allows any of listed roles
     """
-    def checker(user = Depends(get_current_active_user)):
+    def checker(user = Depends(get_request_principal)):
         if user.role not in roles:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden: insufficient role")
         return user
-    return checker
+    if lane is None and not ROLE_LANES:
+        return checker
+    return _in_lane(checker, lane)
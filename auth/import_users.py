@@ -0,0 +1,137 @@
+# auth/import_users.py
+"""
+Bulk import users from CSV into the SQLite user store.
+
+    python -m auth.import_users users.csv [--db bookwise_users.db] [--workers N]
+                                          [--rounds R] [--batch 5000]
+
+CSV columns: username,password,role[,user_id] (header row optional).
+Rows with missing columns or an invalid user_id are skipped and reported.
+
+bcrypt is hashed in parallel on a process pool. --rounds lets a large
+import use a cheaper cost; each hash is upgraded to BCRYPT_ROUNDS on the
+user's first successful login (verify_and_rehash), so nobody has to reset.
+Cost dominates the run time: a million users take minutes only at
+--rounds 4; at the default cost 12 (~256x more work per hash) expect hours
+even with every core busy.
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple
+from uuid import UUID, uuid4
+
+from passlib.hash import bcrypt
+
+from auth.user_repository import User, UserRepository
+from auth.users import BCRYPT_ROUNDS
+
+Row = Tuple[str, str, str, Optional[str]]
+
+
+def read_rows(path: str, skipped: Optional[List[int]] = None) -> Iterator[Row]:
+    """
+    Yield rows from the CSV. Malformed rows (too few columns, empty
+    password/role, invalid user_id) are skipped; their line numbers are
+    appended to `skipped` when given.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        for record in reader:
+            if not record or record[0].strip() in ("", "username"):
+                continue
+            if len(record) < 3 or not record[1] or not record[2].strip():
+                if skipped is not None:
+                    skipped.append(reader.line_num)
+                continue
+            username, password, role = (record[0].strip(), record[1], record[2].strip())
+            user_id = record[3].strip() if len(record) > 3 and record[3].strip() else None
+            if user_id is not None:
+                try:
+                    UUID(user_id)
+                except ValueError:
+                    if skipped is not None:
+                        skipped.append(reader.line_num)
+                    continue
+            yield username, password, role, user_id
+
+
+def _hash_row(args: Tuple[Row, int]) -> User:
+    # dijalankan di worker process
+    (username, password, role, user_id), rounds = args
+    hashed = bcrypt.using(rounds=rounds).hash(password[:72])
+    return User(UUID(user_id) if user_id else uuid4(), username, hashed, role)
+
+
+def _batches(items: Iterable, size: int) -> Iterator[List]:
+    it = iter(items)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+def import_users(rows: Iterable[Row], repo: UserRepository, workers: int = 0,
+                 rounds: int = BCRYPT_ROUNDS, batch_size: int = 5000,
+                 progress=None) -> int:
+    """
+    Hash rows on a process pool (workers=0: inline) and insert them in batches.
+    """
+    total = 0
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
+    try:
+        for batch in _batches(((row, rounds) for row in rows), batch_size):
+            if executor is None:
+                users = [_hash_row(item) for item in batch]
+            else:
+                chunksize = max(1, len(batch) // (workers * 4))
+                users = list(executor.map(_hash_row, batch, chunksize=chunksize))
+            total += repo.add_many(users)
+            if progress:
+                progress(total)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return total
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk import users into the SQLite user store")
+    parser.add_argument("csv_path")
+    parser.add_argument("--db", default=os.getenv("USER_DB_PATH", "bookwise_users.db"))
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--rounds", type=int, default=BCRYPT_ROUNDS,
+                        help=f"bcrypt cost for the import (default {BCRYPT_ROUNDS}); 1M users take "
+                             "minutes only at 4, hours at 12. Hashes are upgraded on first login")
+    parser.add_argument("--batch", type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    from infrastructure.sqlite_user_repository import SqliteUserRepository
+    repo = SqliteUserRepository(args.db)
+    start = time.perf_counter()
+
+    def progress(n):
+        elapsed = time.perf_counter() - start
+        print(f"  {n:>9,} users  {elapsed:7.1f}s  {n / elapsed:8.0f} users/s", file=sys.stderr)
+
+    skipped: List[int] = []
+    total = import_users(read_rows(args.csv_path, skipped), repo, workers=args.workers,
+                         rounds=args.rounds, batch_size=args.batch, progress=progress)
+    elapsed = time.perf_counter() - start
+    print(f"imported {total} users into {args.db} in {elapsed:.1f}s "
+          f"(cost {args.rounds}, {args.workers} workers)")
+    if skipped:
+        shown = ", ".join(str(n) for n in skipped[:20])
+        more = f" (+{len(skipped) - 20} more)" if len(skipped) > 20 else ""
+        print(f"skipped {len(skipped)} malformed rows at lines {shown}{more}", file=sys.stderr)
+    repo.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,75 @@
 # auth/jwt_handler.py
 from datetime import datetime, timedelta
 from typing import Optional, Dict
-from jose import jwt, JWTError
+from jose.exceptions import JWTError
+import os
 import uuid
 
+from auth.keyring import Keyring, parse_keys
+from auth.token_cache import token_cache
+
 # NOTE: untuk tugas, hardcode boleh. Di produksi pindahkan ke env var.
 SECRET_KEY = "CHANGE_THIS_SECRET_KEY_BOOKWISE_2025"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60  # 1 jam
+REFRESH_TOKEN_EXPIRE_DAYS = 7
+REFRESH_TOKEN_TYPE = "refresh"
+DEFAULT_KID = "k0"
+
+# JWT_KEYS="kid1:secret1,kid2:secret2" + JWT_ACTIVE_KID; default: SECRET_KEY sebagai kid k0
+# grace default = umur refresh token, supaya token lama habis sendiri sebelum key-nya dibuang
+# Catatan: rotate_signing_key/revoke_signing_key hanya mengubah keyring proses ini (worker
+# lain dan restart tetap memakai env). Key dari JWT_KEYS tidak pernah pensiun otomatis;
+# rotasi lintas worker = ubah JWT_ACTIVE_KID, lalu hapus kid lama dari JWT_KEYS setelah
+# grace lewat, dan restart semua worker setiap kali.
+_keys = parse_keys(os.getenv("JWT_KEYS", "")) or {DEFAULT_KID: SECRET_KEY}
+KEYRING = Keyring(
+    _keys,
+    active_kid=os.getenv("JWT_ACTIVE_KID", next(iter(_keys))),
+    grace_seconds=int(os.getenv("JWT_KEY_GRACE_SECONDS", str(REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600))),
+)
+
+def _jwt():
+    # jose.jwt menarik cryptography (~50 ms); diimpor saat token pertama dibuat/diverifikasi
+    from jose import jwt
+    return jwt
+
+def _encode(payload: Dict[str, object]) -> str:
+    return _jwt().encode(payload, KEYRING.active_secret, algorithm=ALGORITHM,
+                      headers={"kid": KEYRING.active_kid})
+
+def _decode(token: str) -> Optional[Dict]:
+    """
+    Verify with the key named by the token's `kid` header. Tokens without
+    a kid (issued before the keyring) are checked against DEFAULT_KID.
+    """
+    if not isinstance(token, (str, bytes)):
+        raise TypeError(f"token must be str, got {type(token).__name__}")
+    jwt = _jwt()
+    try:
+        header = jwt.get_unverified_header(token)
+        kid = header.get("kid", DEFAULT_KID) if isinstance(header, dict) else None
+        # kid dari token belum terverifikasi: bisa list/dict (tidak hashable)
+        if not isinstance(kid, str):
+            return None
+        secret = KEYRING.get(kid)
+        if secret is None:
+            return None
+        return jwt.decode(token, secret, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+
+def rotate_signing_key(new_kid: Optional[str] = None, new_secret: Optional[str] = None) -> str:
+    return KEYRING.rotate(new_kid, new_secret)
+
+def revoke_signing_key(kid: str) -> bool:
+    """
+    Drop a key immediately; cached payloads are flushed since some may be signed by it.
+    """
+    removed = KEYRING.remove(kid)
+    if removed:
+        token_cache.clear()
+    return removed
 
 def create_access_token(subject: str, role: str, expires_delta: Optional[timedelta] = None) -> str:
     now = datetime.utcnow()
@@ -18,17 +80,43 @@ def create_access_token(subject: str, role: str, expires_delta: Optional[timedel
         "iat": now,
         "exp": expire
     }
-    token = jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+    token = _encode(payload)
     return token
 
 def decode_access_token(token: str) -> Optional[Dict]:
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
-    except JWTError:
+    payload = _decode(token)
+    if payload is None:
         return None
+    # refresh token bertanda tangan tidak boleh dipakai sebagai access token
+    if payload.get("typ") == REFRESH_TOKEN_TYPE:
+        return None
+    return payload
 
 # simple refresh token utils (in-memory store handled in auth_router)
 def create_refresh_token() -> str:
     # just a unique string (UUID)
     return str(uuid.uuid4())
+
+
+# signed (stateless) refresh token: username, generation user, dan rotation counter
+def create_signed_refresh_token(username: str, generation: int, counter: int = 0,
+                                expires_delta: Optional[timedelta] = None) -> str:
+    now = datetime.utcnow()
+    expire = now + (expires_delta or timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS))
+    payload: Dict[str, object] = {
+        "sub": username,
+        "typ": REFRESH_TOKEN_TYPE,
+        "gen": generation,
+        "ctr": counter,
+        "iat": now,
+        "exp": expire
+    }
+    return _encode(payload)
+
+def decode_signed_refresh_token(token: str) -> Optional[Dict]:
+    payload = _decode(token)
+    if payload is None:
+        return None
+    if payload.get("typ") != REFRESH_TOKEN_TYPE:
+        return None
+    return payload
@@ -0,0 +1,87 @@
+# auth/keyring.py
+import secrets
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+
+class Keyring:
+    """
+    JWT signing keys indexed by `kid`. New tokens are signed with the
+    active key; verification looks the key up by the token's `kid` header
+    (one dict probe, no trial decoding). A rotated-out key stays valid for
+    `grace_seconds` so tokens it signed expire naturally instead of forcing
+    every user to log in again at once.
+    """
+
+    def __init__(self, keys: Dict[str, str], active_kid: str, grace_seconds: float,
+                 clock: Callable[[], float] = time.time):
+        if active_kid not in keys:
+            raise ValueError(f"Active kid {active_kid!r} not in keyring")
+        self.grace_seconds = grace_seconds
+        self.clock = clock
+        # kid -> (secret, retired_at); retired_at None = masih aktif/valid penuh
+        self._keys: Dict[str, Tuple[str, Optional[float]]] = {
+            kid: (secret, None) for kid, secret in keys.items()
+        }
+        self.active_kid = active_kid
+        self._lock = threading.Lock()
+
+    @property
+    def active_secret(self) -> str:
+        return self._keys[self.active_kid][0]
+
+    def get(self, kid: str) -> Optional[str]:
+        entry = self._keys.get(kid)
+        if entry is None:
+            return None
+        secret, retired_at = entry
+        if retired_at is not None and self.clock() - retired_at > self.grace_seconds:
+            return None
+        return secret
+
+    def rotate(self, new_kid: Optional[str] = None, new_secret: Optional[str] = None) -> str:
+        """
+        Make a new key active and start the grace window for the old one.
+        """
+        new_kid = new_kid or secrets.token_hex(4)
+        new_secret = new_secret or secrets.token_urlsafe(32)
+        with self._lock:
+            if new_kid in self._keys:
+                raise ValueError(f"kid {new_kid!r} already in keyring")
+            now = self.clock()
+            old_secret, _ = self._keys[self.active_kid]
+            self._keys[self.active_kid] = (old_secret, now)
+            self._keys[new_kid] = (new_secret, None)
+            self.active_kid = new_kid
+            self._prune(now)
+        return new_kid
+
+    def remove(self, kid: str) -> bool:
+        """
+        Drop a key immediately (compromised key). The active key can't be removed.
+        """
+        with self._lock:
+            if kid == self.active_kid:
+                raise ValueError("Cannot remove the active key; rotate first")
+            return self._keys.pop(kid, None) is not None
+
+    def _prune(self, now: float) -> None:
+        expired = [kid for kid, (_, retired_at) in self._keys.items()
+                   if retired_at is not None and now - retired_at > self.grace_seconds]
+        for kid in expired:
+            del self._keys[kid]
+
+    def kids(self):
+        return list(self._keys)
+
+
+def parse_keys(value: str) -> Dict[str, str]:
+    """
+    Parse `kid1:secret1,kid2:secret2` (JWT_KEYS).
+    """
+    keys: Dict[str, str] = {}
+    for entry in filter(None, (e.strip() for e in value.split(","))):
+        kid, secret = entry.split(":", 1)
+        keys[kid] = secret
+    return keys
@@ -0,0 +1,137 @@
+# auth/password_pool.py
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Executor
+from typing import Dict, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from auth.users import hash_password, verify_password, verify_and_rehash
+from infrastructure.phase_timing import charge_cpu
+
+
+def _serverless() -> bool:
+    # Vercel / AWS Lambda: tidak ada semaphore multiprocessing, dan proses hidup singkat
+    return bool(os.getenv("VERCEL") or os.getenv("AWS_LAMBDA_FUNCTION_NAME"))
+
+
+# 0 worker = bcrypt di threadpool biasa seperti sebelumnya; default 0 di serverless
+PASSWORD_POOL_WORKERS = int(os.getenv("PASSWORD_POOL_WORKERS") or (0 if _serverless() else os.cpu_count() or 1))
+# batas total job (berjalan + antri) sebelum login ditolak dengan 503
+PASSWORD_POOL_MAX_PENDING = int(os.getenv("PASSWORD_POOL_MAX_PENDING") or 4 * (os.cpu_count() or 1))
+PASSWORD_POOL_RETRY_AFTER = int(os.getenv("PASSWORD_POOL_RETRY_AFTER", "1"))
+
+
+class PasswordPoolSaturated(Exception):
+    """Raised when the pool already holds max_pending jobs."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Password pool saturated")
+        self.retry_after = retry_after
+
+
+def _timed_call(fn, *args):
+    # dijalankan di worker process; monotonic clock dipakai bersama antar proses di Linux
+    started = time.monotonic()
+    cpu = time.thread_time()
+    result = fn(*args)
+    return started, time.thread_time() - cpu, result
+
+
+class PasswordPool:
+    """
+    Runs bcrypt hash/verify on a dedicated process pool so a login burst
+    can't starve the threadpool that serves the loan endpoints.
+    """
+
+    def __init__(self, workers: int = PASSWORD_POOL_WORKERS,
+                 max_pending: int = PASSWORD_POOL_MAX_PENDING,
+                 retry_after: int = PASSWORD_POOL_RETRY_AFTER):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.queue_time_total = 0.0
+        self.queue_time_max = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # multiprocessing baru diimpor saat login pertama
+                    import multiprocessing
+                    from concurrent.futures import ProcessPoolExecutor
+                    # bukan fork: proses ini sudah punya thread (log/audit/trace writer, watchdog,
+                    # runtime monitor); fork bisa mewarisi lock yang sedang dipegang -> worker deadlock
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=multiprocessing.get_context("forkserver"))
+        return self._executor
+
+    def _acquire(self) -> None:
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordPoolSaturated(self.retry_after)
+            self.pending += 1
+            self.submitted += 1
+
+    def _release(self, queued: float) -> None:
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+            self.queue_time_total += queued
+            if queued > self.queue_time_max:
+                self.queue_time_max = queued
+
+    async def run(self, fn, *args):
+        self._acquire()
+        submitted_at = time.monotonic()
+        started = submitted_at
+        try:
+            if self.workers <= 0:
+                started, cpu, result = await run_in_threadpool(_timed_call, fn, *args)
+            else:
+                future = self._get_executor().submit(_timed_call, fn, *args)
+                started, cpu, result = await asyncio.wrap_future(future)
+            charge_cpu(cpu)
+            return result
+        finally:
+            self._release(max(0.0, started - submitted_at))
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self.run(verify_password, plain_password, hashed_password)
+
+    async def verify_and_rehash(self, plain_password: str, hashed_password: str):
+        return await self.run(verify_and_rehash, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self.run(hash_password, password)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self.pending,
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+                "completed": self.completed,
+                "queue_time_avg": self.queue_time_total / self.completed if self.completed else 0.0,
+                "queue_time_max": self.queue_time_max,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+password_pool = PasswordPool()
@@ -0,0 +1,21 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class RefreshTokenStore(ABC):
+
+    @abstractmethod
+    def add(self, token: str, username: str):
+        pass
+
+    @abstractmethod
+    def get(self, token: str) -> Optional[str]:
+        pass
+
+    @abstractmethod
+    def revoke(self, token: str) -> bool:
+        pass
+
+    @abstractmethod
+    def purge_expired(self, limit: int) -> int:
+        pass
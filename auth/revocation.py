@@ -0,0 +1,68 @@
+# auth/revocation.py
+import threading
+import time
+from typing import Dict, Optional, Set
+
+from auth.jwt_handler import ACCESS_TOKEN_EXPIRE_MINUTES
+
+
+class RevocationEpochs:
+    """
+    user_id -> minimum acceptable `iat`. Used by the claims-only auth path:
+    when a user is disabled or their role changes, every access token issued
+    up to that second is rejected without fetching the user record.
+
+    Entry bisa dibuang setelah umur access token terlewati, karena token
+    yang lebih tua dari itu sudah ditolak oleh pengecekan exp. Disabled
+    users are kept in a separate set instead, so every token of theirs
+    (including ones issued later) is rejected until they are enabled again.
+    """
+
+    def __init__(self, max_token_age: int = ACCESS_TOKEN_EXPIRE_MINUTES * 60):
+        self.max_token_age = max_token_age
+        self.epochs: Dict[str, int] = {}
+        self.disabled: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def revoke(self, user_id, at: Optional[float] = None) -> int:
+        now = time.time() if at is None else at
+        # iat beresolusi detik: token yang terbit di detik yang sama ikut ditolak
+        min_iat = int(now) + 1
+        with self._lock:
+            self._purge(now)
+            self.epochs[str(user_id)] = min_iat
+        return min_iat
+
+    def disable(self, user_id, at: Optional[float] = None) -> int:
+        with self._lock:
+            self.disabled.add(str(user_id))
+        return self.revoke(user_id, at)
+
+    def enable(self, user_id) -> None:
+        # epoch tetap ada: token yang terbit sebelum disable tetap ditolak sampai purge
+        with self._lock:
+            self.disabled.discard(str(user_id))
+
+    def is_revoked(self, user_id: str, iat) -> bool:
+        if user_id in self.disabled:
+            return True
+        min_iat = self.epochs.get(user_id)
+        if min_iat is None:
+            return False
+        return not isinstance(iat, (int, float)) or iat < min_iat
+
+    def purge(self, now: Optional[float] = None) -> None:
+        with self._lock:
+            self._purge(time.time() if now is None else now)
+
+    def _purge(self, now: float) -> None:
+        cutoff = now - self.max_token_age
+        stale = [uid for uid, min_iat in self.epochs.items() if min_iat < cutoff]
+        for uid in stale:
+            del self.epochs[uid]
+
+    def __len__(self) -> int:
+        return len(self.epochs)
+
+
+revocation_epochs = RevocationEpochs()
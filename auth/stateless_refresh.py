@@ -0,0 +1,73 @@
+# auth/stateless_refresh.py
+from typing import Optional, Tuple
+
+from auth.jwt_handler import create_signed_refresh_token, decode_signed_refresh_token
+from auth.user_repository import UserRepository
+
+
+class RefreshGenerations:
+    """
+    Stateless refresh tokens: the token is a signed JWT carrying the user's
+    refresh generation and rotation counter, so refresh needs no stored
+    token. The server state is two ints kept with the user record (the
+    user repository, e.g. SQLite shared by every worker/instance).
+
+    Only the token with the user's current (generation, counter) is
+    accepted. Login and every rotation advance the counter, so a token that
+    was already rotated, or issued before a newer login, is rejected
+    (replay). Revoke (logout) = naikkan generation; semua refresh token
+    user itu langsung tidak berlaku di semua instance. Both changes are a
+    compare-and-set in the repository, so two concurrent rotations of the
+    same token cannot both succeed. Trade-off: one refresh chain per user;
+    use REFRESH_TOKEN_MODE=store for several concurrent sessions.
+    """
+
+    def __init__(self, repository: UserRepository):
+        self.repository = repository
+
+    def issue(self, username: str) -> Optional[str]:
+        """
+        Start a new chain for `username` (login); earlier tokens stop working.
+        """
+        state = self.repository.advance_refresh_counter(username)
+        if state is None:
+            return None
+        return create_signed_refresh_token(username, *state)
+
+    def resolve(self, token: str) -> Optional[Tuple[str, int, int]]:
+        """
+        Return (username, generation, counter) of a validly signed token.
+        Whether they are still current is checked by rotate/revoke.
+        """
+        payload = decode_signed_refresh_token(token)
+        if not payload:
+            return None
+        username, generation, counter = payload.get("sub"), payload.get("gen"), payload.get("ctr")
+        if not isinstance(username, str) or not isinstance(generation, int) or not isinstance(counter, int):
+            return None
+        return username, generation, counter
+
+    def rotate(self, token: str) -> Optional[Tuple[str, str]]:
+        resolved = self.resolve(token)
+        if resolved is None:
+            return None
+        username, generation, counter = resolved
+        user = self.repository.get_by_username(username)
+        if user is None or user.disabled:
+            return None
+        state = self.repository.advance_refresh_counter(username, generation, counter)
+        if state is None:
+            return None
+        return username, create_signed_refresh_token(username, *state)
+
+    def revoke(self, token: str) -> Optional[int]:
+        """
+        Logout: bump the generation if `token` is the user's current token.
+        """
+        resolved = self.resolve(token)
+        if resolved is None:
+            return None
+        return self.repository.bump_refresh_generation(*resolved)
+
+    def revoke_user(self, username: str) -> Optional[int]:
+        return self.repository.bump_refresh_generation(username)
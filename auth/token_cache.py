@@ -0,0 +1,102 @@
+# auth/token_cache.py
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "4096"))  # 0 = cache mati
+
+
+class TokenCache:
+    """
+    Bounded LRU cache of decoded JWT payloads.
+
+    Key adalah digest SHA-256 dari token (token mentah tidak disimpan),
+    entry kadaluarsa tepat di klaim `exp` milik token tersebut.
+    """
+
+    def __init__(self, maxsize: int = JWT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> Optional[Dict]:
+        if self.maxsize <= 0:
+            return None
+        key = self._key(token)
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, payload = entry
+            if expires_at <= now:
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    def peek(self, token: str) -> Optional[Dict]:
+        """
+        Payload of a cached, unexpired token without counting a hit/miss or
+        touching the LRU order; for middlewares that only label requests.
+        """
+        if self.maxsize <= 0:
+            return None
+        key = self._key(token)
+        with self._lock:
+            entry = self._data.get(key)
+        if entry is None or entry[0] <= time.time():
+            return None
+        return entry[1]
+
+    def put(self, token: str, payload: Dict) -> None:
+        if self.maxsize <= 0:
+            return
+        exp = payload.get("exp")
+        if not isinstance(exp, (int, float)) or exp <= time.time():
+            return
+        key = self._key(token)
+        with self._lock:
+            self._data[key] = (exp, payload)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+token_cache = TokenCache()
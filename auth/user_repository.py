@@ -0,0 +1,63 @@
+from abc import ABC, abstractmethod
+from typing import Iterable, Optional, Tuple
+from uuid import UUID
+
+
+class User:
+    def __init__(self, user_id: UUID, username: str, hashed_password: str, role: str, disabled: bool=False,
+                 refresh_generation: int = 0, refresh_counter: int = 0):
+        self.user_id = user_id
+        self.username = username
+        self.hashed_password = hashed_password
+        self.role = role
+        self.disabled = disabled
+        # refresh token stateless: hanya token dengan (generation, counter) terbaru yang berlaku
+        self.refresh_generation = refresh_generation
+        self.refresh_counter = refresh_counter
+
+
+class UserRepository(ABC):
+
+    @abstractmethod
+    def add(self, user: User) -> User:
+        pass
+
+    @abstractmethod
+    def add_many(self, users: Iterable[User]) -> int:
+        pass
+
+    @abstractmethod
+    def update(self, user: User) -> None:
+        pass
+
+    @abstractmethod
+    def get_by_username(self, username: str) -> Optional[User]:
+        pass
+
+    @abstractmethod
+    def get_by_id(self, user_id: UUID) -> Optional[User]:
+        pass
+
+    @abstractmethod
+    def count(self) -> int:
+        pass
+
+    @abstractmethod
+    def advance_refresh_counter(self, username: str, generation: Optional[int] = None,
+                                counter: Optional[int] = None) -> Optional[Tuple[int, int]]:
+        """
+        Increment the user's refresh counter and return (generation, counter).
+        With generation/counter given this is a compare-and-set that only
+        succeeds while they are still the user's current values. None if the
+        user is missing or the values are stale.
+        """
+        pass
+
+    @abstractmethod
+    def bump_refresh_generation(self, username: str, generation: Optional[int] = None,
+                                counter: Optional[int] = None) -> Optional[int]:
+        """
+        Increment the user's refresh generation (revoking every refresh token
+        issued so far) and return it; same compare-and-set rules.
+        """
+        pass
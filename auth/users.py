@@ -1,22 +1,49 @@
-from passlib.context import CryptContext
+import os
+from functools import lru_cache
 from uuid import UUID, uuid4
-from typing import Optional, Dict
+from typing import Optional, Dict, Tuple
+from auth.revocation import revocation_epochs
+from auth.user_repository import User, UserRepository
+from infrastructure.in_memory_user_repository import InMemoryUserRepository
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# cost bcrypt; pilih nilainya dengan `python -m auth.calibrate`
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
 
-class User:
-    def __init__(self, user_id: UUID, username: str, hashed_password: str, role: str, disabled: bool=False):
-        self.user_id = user_id
-        self.username = username
-        self.hashed_password = hashed_password
-        self.role = role
-        self.disabled = disabled
+# passlib + bcrypt baru diimpor saat password pertama di-hash/diverifikasi (login), bukan saat startup
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    from passlib.context import CryptContext
+    # min = max = default, jadi hash dengan cost lain ditandai needs_update
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=BCRYPT_ROUNDS,
+        bcrypt__min_rounds=BCRYPT_ROUNDS,
+        bcrypt__max_rounds=BCRYPT_ROUNDS,
+    )
+
+# "memory" (default) atau "sqlite" (USER_DB_PATH)
+USER_STORE = os.getenv("USER_STORE", "memory")
+USER_DB_PATH = os.getenv("USER_DB_PATH", "bookwise_users.db")
+# umur cache user per proses (detik): disable/ganti role dari worker lain terlihat setelah ini
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS") or 5)
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password[:72])
+    return get_pwd_context().hash(password[:72])
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password[:72], hashed_password)
+    return get_pwd_context().verify(plain_password[:72], hashed_password)
+
+def verify_and_rehash(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and, if it matches but the stored hash uses a different
+    cost than BCRYPT_ROUNDS, return a fresh hash to store in its place.
+    """
+    if not verify_password(plain_password, hashed_password):
+        return False, None
+    if get_pwd_context().needs_update(hashed_password):
+        return True, hash_password(plain_password)
+    return True, None
 
 # ✅ PRE-HASHED PASSWORDS (tidak hash lagi pas import)
 _user1 = User(
@@ -33,16 +60,75 @@ _user2 = User(
     role="peminjam"
 )
 
-USERS_DB: Dict[str, User] = {
-    _user1.username: _user1,
-    _user2.username: _user2,
-}
+def _build_repository() -> UserRepository:
+    if USER_STORE == "sqlite":
+        from infrastructure.sqlite_user_repository import SqliteUserRepository
+        return SqliteUserRepository(USER_DB_PATH, cache_ttl=USER_CACHE_TTL_SECONDS)
+    return InMemoryUserRepository()
+
+user_repo: UserRepository = _build_repository()
+
+# index in-memory (username -> User, user_id UUID -> User); kosong kalau USER_STORE=sqlite
+USERS_DB: Dict[str, User] = getattr(user_repo, "by_username", {})
+USERS_BY_ID: Dict[UUID, User] = getattr(user_repo, "by_id", {})
+
+def add_user(user: User) -> User:
+    """
+    Insert or replace a user, keeping both indexes consistent.
+    """
+    return user_repo.add(user)
+
+def save_user(user: User) -> None:
+    """
+    Persist changes made to a user object (password hash, role, disabled).
+    """
+    user_repo.update(user)
+
+def disable_user(username: str) -> Optional[User]:
+    """
+    Mark a user as disabled and revoke their outstanding access tokens.
+    """
+    user = user_repo.get_by_username(username)
+    if user is not None:
+        user.disabled = True
+        user_repo.update(user)
+        revocation_epochs.disable(user.user_id)
+    return user
+
+def enable_user(username: str) -> Optional[User]:
+    """
+    Re-enable a disabled user; tokens issued before the disable stay revoked.
+    """
+    user = user_repo.get_by_username(username)
+    if user is not None:
+        user.disabled = False
+        user_repo.update(user)
+        revocation_epochs.enable(user.user_id)
+    return user
+
+def change_role(username: str, role: str) -> Optional[User]:
+    """
+    Change a user's role and revoke access tokens carrying the old one.
+    """
+    user = user_repo.get_by_username(username)
+    if user is not None and user.role != role:
+        user.role = role
+        user_repo.update(user)
+        revocation_epochs.revoke(user.user_id)
+    return user
+
+# seed user default (sekali saja untuk store persisten)
+for _user in (_user1, _user2):
+    if user_repo.get_by_username(_user.username) is None:
+        add_user(_user)
 
 def get_user_by_username(username: str) -> Optional[User]:
-    return USERS_DB.get(username)
+    return user_repo.get_by_username(username)
 
-def get_user_by_id(user_id: str) -> Optional[User]:
-    for u in USERS_DB.values():
-        if str(u.user_id) == str(user_id):
-            return u
-    return None
\ No newline at end of file
+def get_user_by_id(user_id) -> Optional[User]:
+    if not isinstance(user_id, UUID):
+        try:
+            user_id = UUID(str(user_id))
+        except ValueError:
+            return None
+    return user_repo.get_by_id(user_id)
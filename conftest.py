@@ -1,3 +1,4 @@
+import os
 import sys
 from pathlib import Path
 
@@ -5,6 +6,9 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+# audit trail test di memori (default aplikasi: file bookwise_audit.db)
+os.environ.setdefault("AUDIT_DB_PATH", ":memory:")
+
 import pytest
 from fastapi.testclient import TestClient
 from uuid import uuid4
@@ -0,0 +1,62 @@
+# domain/audit_log.py
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+
+class AuditEntry:
+    """
+    One loan transition: who did it (actor + role), when, and the loan's
+    stage before and after (see Loan.stage). `seq` and `recorded_at` are
+    set by the store when the entry is persisted.
+    """
+    __slots__ = ("loan_id", "action", "actor", "role", "from_stage", "to_stage",
+                 "occurred_at", "detail", "seq", "recorded_at")
+
+    def __init__(self, loan_id: str, action: str, actor: str, role: str,
+                 from_stage: Optional[str], to_stage: str, occurred_at: datetime,
+                 detail: Optional[str] = None, seq: Optional[int] = None,
+                 recorded_at: Optional[datetime] = None):
+        self.loan_id = loan_id
+        self.action = action
+        self.actor = actor
+        self.role = role
+        self.from_stage = from_stage
+        self.to_stage = to_stage
+        self.occurred_at = occurred_at
+        self.detail = detail
+        self.seq = seq
+        self.recorded_at = recorded_at
+
+    def to_dict(self) -> dict:
+        return {
+            "seq": self.seq,
+            "loanId": self.loan_id,
+            "action": self.action,
+            "actor": self.actor,
+            "role": self.role,
+            "from": self.from_stage,
+            "to": self.to_stage,
+            "occurredAt": self.occurred_at.isoformat(),
+            "recordedAt": self.recorded_at.isoformat() if self.recorded_at else None,
+            "detail": self.detail,
+        }
+
+
+class AuditLog(ABC):
+    """
+    Append-only: entries are never updated or deleted. Queries return
+    entries oldest first; `after` is the last seq already seen (paging).
+    """
+
+    @abstractmethod
+    def append_many(self, entries: Iterable[AuditEntry]) -> int:
+        pass
+
+    @abstractmethod
+    def by_loan(self, loan_id: str, limit: int = 100, after: int = 0) -> List[AuditEntry]:
+        pass
+
+    @abstractmethod
+    def by_actor(self, actor: str, limit: int = 100, after: int = 0) -> List[AuditEntry]:
+        pass
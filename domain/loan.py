@@ -19,6 +19,15 @@ class Loan:
         self.return_initiated = False #menandai peminjaman sudah mulai proses pengembalian
         self.return_verified = False #menandai bahwa admin udh ngecek & verify kondisi buku 
 
+    # status + flag proses (verified, return_initiated) dalam satu nilai, dipakai audit trail
+    @property
+    def stage(self) -> str:
+        if self.loanStatus == LoanStatus.REQUESTED:
+            return "verified" if self.verified else "requested"
+        if self.loanStatus == LoanStatus.BORROWED and self.return_initiated:
+            return "return_initiated"
+        return self.loanStatus.value
+
     # borrower action: kondisi buku bener2 dipinjem
     def borrow(self, due_date: DueDate):
         self.loanStatus = LoanStatus.BORROWED #status berubah jadi dipinjem
@@ -1,6 +1,6 @@
-from passlib.context import CryptContext
+from auth.users import BCRYPT_ROUNDS, hash_password
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-print("pengguna123:", pwd_context.hash("pengguna123"))
-print("pinjam123:", pwd_context.hash("pinjam123"))
\ No newline at end of file
+# cost mengikuti BCRYPT_ROUNDS (lihat `python -m auth.calibrate`)
+print("cost:", BCRYPT_ROUNDS)
+print("pengguna123:", hash_password("pengguna123"))
+print("pinjam123:", hash_password("pinjam123"))
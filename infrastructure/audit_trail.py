@@ -0,0 +1,143 @@
+"""
+Batched writer in front of the loan audit log.
+
+Handlers call record(), an O(1) append. A background thread writes the
+pending entries in one transaction when AUDIT_BATCH_SIZE are waiting or
+AUDIT_MAX_DELAY_MS after the oldest one was queued, so an entry reaches
+the store within about that delay (plus one insert). Audit entries are
+never dropped: if AUDIT_QUEUE_SIZE entries are already pending (store
+stalled), record() writes the backlog on the caller's thread instead, so
+requests slow down rather than the queue growing. A batch the store
+rejects stays queued and is retried.
+Queries flush first, so a transition is visible as soon as its request
+returns.
+"""
+import os
+import threading
+import time
+from collections import deque
+from typing import List, Optional
+
+from domain.audit_log import AuditEntry, AuditLog
+
+# file (dipakai bersama semua worker, tetap ada setelah restart); ":memory:" hanya untuk test
+AUDIT_DB_PATH = os.getenv("AUDIT_DB_PATH", "bookwise_audit.db")
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "256"))
+AUDIT_MAX_DELAY_MS = float(os.getenv("AUDIT_MAX_DELAY_MS", "200"))
+AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", "10000"))
+
+
+class BatchAuditWriter:
+    def __init__(self, store: AuditLog, batch_size: int = AUDIT_BATCH_SIZE,
+                 max_delay: float = AUDIT_MAX_DELAY_MS / 1000, max_queue: int = AUDIT_QUEUE_SIZE):
+        self.store = store
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.max_queue = max_queue
+        # (perf_counter saat masuk antrean, entry)
+        self.queue: deque = deque()
+        self.written = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.sync_flushes = 0
+        self.max_latency = 0.0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread.start()
+
+    def record(self, entry: AuditEntry) -> None:
+        if self._thread is None:
+            self.start()
+        if len(self.queue) >= self.max_queue:
+            # jangan buang entry audit: tulis backlog di thread pemanggil (backpressure)
+            self.sync_flushes += 1
+            self.flush()
+        self.queue.append((time.perf_counter(), entry))
+        if len(self.queue) == 1 or len(self.queue) >= self.batch_size:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """
+        Write everything queued so far in batches; returns entries written.
+        A failed batch is put back at the front of the queue and retried later.
+        """
+        total = 0
+        with self._write_lock:
+            while self.queue:
+                batch: List[tuple] = []
+                while self.queue and len(batch) < self.batch_size:
+                    batch.append(self.queue.popleft())
+                try:
+                    self.store.append_many([entry for _, entry in batch])
+                except Exception:
+                    self.failed_batches += 1
+                    self.queue.extendleft(reversed(batch))
+                    break
+                done = time.perf_counter()
+                self.max_latency = max(self.max_latency, done - batch[0][0])
+                self.written += len(batch)
+                self.batches += 1
+                total += len(batch)
+        return total
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            if not self.queue:
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            # tunggu sampai entry tertua berumur max_delay, kecuali batch sudah penuh
+            due = self.queue[0][0] + self.max_delay - time.perf_counter()
+            if due > 0 and len(self.queue) < self.batch_size:
+                self._wake.wait(due)
+                self._wake.clear()
+                continue
+            if not self.flush() and self.queue:
+                # store gagal: coba lagi setelah max_delay, jangan spin
+                self._stop.wait(self.max_delay)
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        with self._start_lock:
+            if self._thread is not None:
+                self._thread.join()
+                self._thread = None
+        self.flush()
+
+    def by_loan(self, loan_id: str, limit: int = 100, after: int = 0) -> List[AuditEntry]:
+        self.flush()
+        return self.store.by_loan(loan_id, limit, after)
+
+    def by_actor(self, actor: str, limit: int = 100, after: int = 0) -> List[AuditEntry]:
+        self.flush()
+        return self.store.by_actor(actor, limit, after)
+
+    def stats(self) -> dict:
+        return {
+            "queued": len(self.queue),
+            "written": self.written,
+            "batches": self.batches,
+            "failed_batches": self.failed_batches,
+            "sync_flushes": self.sync_flushes,
+            "max_latency_ms": round(self.max_latency * 1000, 3),
+        }
+
+
+def _build_store() -> AuditLog:
+    from infrastructure.sqlite_audit_log import SqliteAuditLog
+    return SqliteAuditLog(AUDIT_DB_PATH)
+
+
+# thread writer jalan saat entry pertama dicatat; main.py memanggil shutdown() di lifespan
+AUDIT_TRAIL = BatchAuditWriter(_build_store())
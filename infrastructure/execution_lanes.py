@@ -0,0 +1,122 @@
+import asyncio
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, List
+
+# nama:konkurensi:maks_antrian. Total konkurensi sebaiknya <= threadpool anyio (40)
+# supaya tiap lane dijamin dapat thread.
+EXECUTION_LANES = os.getenv("EXECUTION_LANES", "interactive:30:256,bulk:2:16")
+EXECUTION_LANE_RETRY_AFTER = int(os.getenv("EXECUTION_LANE_RETRY_AFTER", "1"))
+
+
+class LaneFull(Exception):
+    """Raised when a lane's wait queue is full."""
+
+    def __init__(self, lane: str, retry_after: int):
+        super().__init__(f"Lane {lane} is full")
+        self.lane = lane
+        self.retry_after = retry_after
+
+
+class ExecutionLane:
+    """
+    Bounded slot pool for one class of requests. A request holds a slot while
+    its sync handler occupies a threadpool thread; requests waiting for a slot
+    queue on the event loop, so a flood of bulk work can hold at most
+    `concurrency` threads and never starves the other lanes.
+    """
+
+    def __init__(self, name: str, concurrency: int, max_queue: int,
+                 retry_after: int = EXECUTION_LANE_RETRY_AFTER):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self.active = 0
+        self._waiters: deque = deque()
+        self.completed = 0
+        self.rejected = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    async def acquire(self) -> None:
+        if self.active < self.concurrency and not self._waiters:
+            self.active += 1
+            self._record_wait(0.0)
+            return
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            raise LaneFull(self.name, self.retry_after)
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        started = time.monotonic()
+        try:
+            # slot diserahkan langsung oleh release (active sudah dinaikkan)
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                self._waiters.remove(waiter)
+            raise
+        self._record_wait(time.monotonic() - started)
+
+    def release(self) -> None:
+        self.active -= 1
+        while self._waiters and self.active < self.concurrency:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.active += 1
+                waiter.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        try:
+            yield self
+        finally:
+            self.completed += 1
+            self.release()
+
+    def _record_wait(self, waited: float) -> None:
+        self.wait_total += waited
+        if waited > self.wait_max:
+            self.wait_max = waited
+
+    def stats(self) -> Dict[str, float]:
+        started = self.completed + self.active
+        return {
+            "concurrency": self.concurrency,
+            "active": self.active,
+            "queued": len(self._waiters),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "wait_avg": self.wait_total / started if started else 0.0,
+            "wait_max": self.wait_max,
+        }
+
+
+def parse_lanes(spec: str) -> List[ExecutionLane]:
+    lanes = []
+    for item in (s.strip() for s in spec.split(",")):
+        if not item:
+            continue
+        name, concurrency, max_queue = item.split(":")
+        lanes.append(ExecutionLane(name, int(concurrency), int(max_queue)))
+    return lanes
+
+
+LANES: Dict[str, ExecutionLane] = {lane.name: lane for lane in parse_lanes(EXECUTION_LANES)}
+
+
+def get_lane(name: str) -> ExecutionLane:
+    lane = LANES.get(name)
+    if lane is None:
+        raise KeyError(f"Unknown execution lane: {name}")
+    return lane
+
+
+def lane_stats() -> Dict[str, Dict[str, float]]:
+    return {name: lane.stats() for name, lane in LANES.items()}
@@ -0,0 +1,308 @@
+# infrastructure/heap_report.py
+"""
+Heap and object-footprint reports.
+
+Two complementary views:
+  * footprint(): deep size of an object graph (e.g. the loan repository's
+    `data`) grouped by type. An instance's __dict__ is charged to the
+    instance, so `Loan` includes its attribute dict and `BookId` its own.
+    Exact, needs no tracing, cost proportional to the graph walked.
+  * HeapTracer: tracemalloc control plus named snapshots, top allocation
+    sites and snapshot diffs (e.g. to see REFRESH_TOKENS growing).
+    tracemalloc is off until started; its overhead grows with the number
+    of frames kept per allocation (`frames`), so start with 1 and raise it
+    only to see call chains. tracemalloc is process-wide and is shared
+    with request accounting (REQUEST_ACCOUNTING_ALLOC): users acquire it
+    as named owners, it is stopped only when the last owner releases it,
+    and never if it was already running when first acquired.
+
+CLI (in-process footprint, or against a running server's admin API):
+    python -m infrastructure.heap_report footprint [loans]
+    python -m infrastructure.heap_report remote <base_url> <token> status|start [frames]|stop
+    python -m infrastructure.heap_report remote <base_url> <token> snapshot <name>
+    python -m infrastructure.heap_report remote <base_url> <token> diff <base> <target>
+"""
+import gc
+import json
+import os
+import sys
+import threading
+import tracemalloc
+import types
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+HEAP_MAX_SNAPSHOTS = int(os.getenv("HEAP_MAX_SNAPSHOTS", "4"))
+HEAP_MAX_FRAMES = int(os.getenv("HEAP_MAX_FRAMES", "25"))
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+
+# objek bersama (kelas, modul, fungsi) bukan milik data yang diukur
+_SHARED = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType,
+           types.MethodType, types.CodeType, types.FrameType)
+
+
+def footprint(root, max_objects: int = 5_000_000) -> Dict[str, Dict[str, int]]:
+    """
+    {type name: {"count", "bytes"}} for everything reachable from `root`,
+    largest first. Objects are counted once even if shared.
+    """
+    seen = set()
+    totals: Dict[str, List[int]] = {}
+    stack = [root]
+    while stack and len(seen) < max_objects:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, _SHARED):
+            continue
+        seen.add(id(obj))
+        size = sys.getsizeof(obj)
+        name = type(obj).__name__
+        attrs = getattr(obj, "__dict__", None)
+        if isinstance(attrs, dict) and not isinstance(obj, type) and id(attrs) not in seen:
+            seen.add(id(attrs))
+            size += sys.getsizeof(attrs)
+            stack.extend(gc.get_referents(attrs))
+        entry = totals.setdefault(name, [0, 0])
+        entry[0] += 1
+        entry[1] += size
+        if isinstance(obj, dict):
+            # dict dengan key str saja tidak melaporkan key-nya ke gc
+            stack.extend(obj.keys())
+        stack.extend(gc.get_referents(obj))
+    ordered = sorted(totals.items(), key=lambda item: item[1][1], reverse=True)
+    return {name: {"count": count, "bytes": size} for name, (count, size) in ordered}
+
+
+def footprint_summary(root) -> dict:
+    types_ = footprint(root)
+    return {"total_bytes": sum(t["bytes"] for t in types_.values()), "types": types_}
+
+
+def _site(frame: tracemalloc.Frame) -> str:
+    filename = frame.filename
+    if filename.startswith(PROJECT_ROOT):
+        filename = filename[len(PROJECT_ROOT):]
+    return f"{filename}:{frame.lineno}"
+
+
+def _project_frame(traceback: tracemalloc.Traceback) -> Optional[tracemalloc.Frame]:
+    # frame terdalam yang ada di kode project (bukan stdlib/site-packages)
+    for frame in reversed(traceback):
+        if frame.filename.startswith(PROJECT_ROOT) and "site-packages" not in frame.filename:
+            return frame
+    return None
+
+
+class TracingInUse(Exception):
+    """
+    tracemalloc is needed by another owner and cannot be stopped/restarted.
+    """
+
+
+HEAP_OWNER = "heap_report"
+
+
+class HeapTracer:
+    """
+    tracemalloc start/stop (ref-counted by owner) and a small LRU of named
+    snapshots.
+    """
+
+    def __init__(self, max_snapshots: int = HEAP_MAX_SNAPSHOTS, max_frames: int = HEAP_MAX_FRAMES):
+        self.max_snapshots = max_snapshots
+        self.max_frames = max_frames
+        self.snapshots: "OrderedDict[str, tracemalloc.Snapshot]" = OrderedDict()
+        self.owners: set = set()
+        self._started = False  # True: tracemalloc dinyalakan lewat acquire(), boleh dimatikan
+        self._lock = threading.Lock()
+
+    def acquire(self, owner: str, frames: Optional[int] = None) -> None:
+        """
+        Keep tracemalloc running for `owner`. frames=None accepts whatever
+        is running; a different frame count needs a restart, which is only
+        allowed when no other owner depends on tracing.
+        """
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames or 1)
+                self._started = True
+            elif frames is not None and tracemalloc.get_traceback_limit() != frames:
+                others = self.owners - {owner}
+                if others or not self._started:
+                    holder = ", ".join(sorted(others)) or "another component"
+                    raise TracingInUse(f"tracemalloc is in use by {holder}; cannot change frames")
+                # jumlah frame hanya bisa diubah dengan restart
+                tracemalloc.stop()
+                tracemalloc.start(frames)
+            self.owners.add(owner)
+
+    def release(self, owner: str) -> None:
+        with self._lock:
+            self.owners.discard(owner)
+            if not self.owners and self._started:
+                if tracemalloc.is_tracing():
+                    tracemalloc.stop()
+                self._started = False
+
+    def start(self, frames: int = 1) -> dict:
+        if not 1 <= frames <= self.max_frames:
+            raise ValueError(f"frames must be between 1 and {self.max_frames}")
+        self.acquire(HEAP_OWNER, frames)
+        return self.status()
+
+    def stop(self) -> dict:
+        """
+        Release the heap report's hold on tracemalloc; tracing stays on
+        while other owners need it.
+        """
+        if HEAP_OWNER not in self.owners and tracemalloc.is_tracing():
+            raise TracingInUse("tracemalloc was not started by the heap report")
+        self.release(HEAP_OWNER)
+        return self.status()
+
+    def status(self) -> dict:
+        tracing = tracemalloc.is_tracing()
+        current, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+        return {
+            "tracing": tracing,
+            "frames": tracemalloc.get_traceback_limit() if tracing else 0,
+            "traced_bytes": current,
+            "traced_peak_bytes": peak,
+            "tracemalloc_overhead_bytes": tracemalloc.get_tracemalloc_memory() if tracing else 0,
+            "owners": sorted(self.owners),
+            "snapshots": list(self.snapshots),
+        }
+
+    def take(self, name: str) -> tracemalloc.Snapshot:
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not tracing; start it first")
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+        with self._lock:
+            self.snapshots.pop(name, None)
+            self.snapshots[name] = snapshot
+            while len(self.snapshots) > self.max_snapshots:
+                self.snapshots.popitem(last=False)
+        return snapshot
+
+    def get(self, name: str) -> tracemalloc.Snapshot:
+        with self._lock:
+            snapshot = self.snapshots.get(name)
+        if snapshot is None:
+            raise KeyError(name)
+        return snapshot
+
+    @staticmethod
+    def top(snapshot: tracemalloc.Snapshot, limit: int = 20) -> dict:
+        """
+        Largest allocation sites, plus totals per project source file
+        (innermost project frame of each traceback).
+        """
+        by_site = snapshot.statistics("lineno")
+        by_project: Dict[str, List[int]] = {}
+        for stat in snapshot.statistics("traceback"):
+            frame = _project_frame(stat.traceback)
+            key = frame.filename[len(PROJECT_ROOT):] if frame is not None else "<other>"
+            entry = by_project.setdefault(key, [0, 0])
+            entry[0] += stat.size
+            entry[1] += stat.count
+        return {
+            "total_bytes": sum(stat.size for stat in by_site),
+            "sites": [{"site": _site(stat.traceback[0]), "bytes": stat.size, "count": stat.count}
+                      for stat in by_site[:limit]],
+            "by_project_file": {key: {"bytes": size, "count": count} for key, (size, count)
+                                in sorted(by_project.items(), key=lambda item: item[1][0], reverse=True)},
+        }
+
+    def diff(self, base: str, target: str, limit: int = 20) -> dict:
+        old, new = self.get(base), self.get(target)
+        stats = new.compare_to(old, "lineno")
+        return {
+            "base": base,
+            "target": target,
+            "size_diff_bytes": sum(stat.size_diff for stat in stats),
+            "sites": [{
+                "site": _site(stat.traceback[0]),
+                "size_diff_bytes": stat.size_diff,
+                "count_diff": stat.count_diff,
+                "bytes": stat.size,
+                "count": stat.count,
+            } for stat in stats[:limit]],
+        }
+
+
+HEAP = HeapTracer()
+
+
+# ================================================================
+# CLI
+# ================================================================
+def _print_types(summary: dict, per: Optional[int] = None) -> None:
+    for name, entry in summary["types"].items():
+        extra = f"  {entry['bytes'] / per:8.1f} B/loan" if per else ""
+        print(f"  {name:16s} {entry['count']:9d} objects {entry['bytes']:12d} B{extra}")
+    print(f"  {'total':16s} {'':17s} {summary['total_bytes']:12d} B")
+
+
+def _footprint_cli(loans: int) -> int:
+    from datetime import date, timedelta
+    from uuid import uuid4
+
+    from domain.book_id import BookId
+    from domain.due_date import DueDate
+    from domain.loan import Loan
+    from domain.user_id import UserId
+    from infrastructure.in_memory_loan_repository import InMemoryLoanRepository
+
+    repo = InMemoryLoanRepository()
+    due = date.today() + timedelta(days=14)
+    for i in range(loans):
+        loan = Loan(BookId(uuid4()), UserId(uuid4()))
+        if i % 2:
+            loan.verify()
+            loan.approve(DueDate(due))
+        repo.save(loan)
+    print(f"InMemoryLoanRepository.data with {loans} loans (half approved):")
+    _print_types(footprint_summary(repo.data), per=loans or None)
+    return 0
+
+
+def _remote_cli(base_url: str, token: str, command: str, args: List[str]) -> int:
+    import urllib.request
+
+    routes = {
+        "status": ("GET", "/admin/heap"),
+        "start": ("POST", f"/admin/heap/tracing?frames={args[0] if args else 1}"),
+        "stop": ("DELETE", "/admin/heap/tracing"),
+        "snapshot": ("POST", f"/admin/heap/snapshots?name={args[0] if args else 'latest'}"),
+        "diff": ("GET", f"/admin/heap/diff?base={args[0] if args else ''}&target={args[1] if len(args) > 1 else ''}"),
+    }
+    if command not in routes:
+        print(f"unknown command: {command}")
+        return 1
+    method, path = routes[command]
+    request = urllib.request.Request(base_url.rstrip("/") + path, method=method,
+                                     headers={"Authorization": f"Bearer {token}"})
+    with urllib.request.urlopen(request) as response:
+        print(json.dumps(json.loads(response.read()), indent=2))
+    return 0
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "footprint":
+        return _footprint_cli(int(argv[1]) if len(argv) > 1 else 10_000)
+    if len(argv) >= 4 and argv[0] == "remote":
+        return _remote_cli(argv[1], argv[2], argv[3], argv[4:])
+    print("usage: python -m infrastructure.heap_report footprint [loans]\n"
+          "       python -m infrastructure.heap_report remote <base_url> <token> "
+          "status|start [frames]|stop|snapshot <name>|diff <base> <target>")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,18 +1,50 @@
+import threading
+from collections import Counter
+
 from domain.loan_repository import LoanRepository
 from uuid import UUID
 
+from infrastructure.metrics import timed
+
 class InMemoryLoanRepository(LoanRepository):
     def __init__(self): # database palsu
         self.data = {}
+        # jumlah loan per status, diperbarui di save (metrics tidak perlu scan semua loan);
+        # loan dimutasi in-place, jadi status terakhir yang disimpan dicatat per id
+        self.saved_status = {}
+        self.status_counts = Counter()
+        self._lock = threading.Lock()
 
+    @timed("loan", "save")
     def save(self, loan): # jika udah ada updet 
-        self.data[str(loan.loanId)] = loan
+        key = str(loan.loanId)
+        with self._lock:
+            self.data[key] = loan
+            previous = self.saved_status.get(key)
+            if previous != loan.loanStatus:
+                if previous is not None:
+                    self.status_counts[previous] -= 1
+                self.status_counts[loan.loanStatus] += 1
+                self.saved_status[key] = loan.loanStatus
+
+    def count_by_status(self):
+        # O(jumlah status), bukan O(jumlah loan)
+        with self._lock:
+            return dict(self.status_counts)
+
+    def clear(self):
+        with self._lock:
+            self.data.clear()
+            self.saved_status.clear()
+            self.status_counts.clear()
 
+    @timed("loan", "findById")
     def findById(self, id): # ambil pinjaman berdasarkan id
         # accept either uuid object or string
         key = str(id)
         return self.data.get(key)
 
+    @timed("loan", "findByUser")
     def findByUser(self, user_id):
         uid = str(user_id) if not hasattr(user_id, "value") else str(user_id.value)
         return [
@@ -20,5 +52,6 @@ class InMemoryLoanRepository(LoanRepository):
             if str(loan.userId.value) == uid
         ]
     
+    @timed("loan", "list_all")
     def list_all(self): #mau kembaliin loan dlm bentuk list
         return list(self.data.values())
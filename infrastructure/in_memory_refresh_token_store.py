@@ -0,0 +1,122 @@
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from auth.refresh_token_store import RefreshTokenStore
+
+REFRESH_TOKEN_TTL_SECONDS = int(os.getenv("REFRESH_TOKEN_TTL_SECONDS", str(7 * 24 * 3600)))
+REFRESH_TOKEN_CAPACITY = int(os.getenv("REFRESH_TOKEN_CAPACITY", "100000"))
+REFRESH_TOKENS_PER_USER = int(os.getenv("REFRESH_TOKENS_PER_USER", "10"))
+
+
+class InMemoryRefreshTokenStore(RefreshTokenStore):
+    """
+    Refresh token -> username, bounded three ways: per-entry TTL, a hard
+    capacity (oldest evicted first) and a cap on live tokens per user.
+
+    Semua token punya TTL yang sama, jadi urutan insert = urutan kadaluarsa;
+    purge cukup memeriksa dari depan dan berhenti di token pertama yang masih hidup.
+    """
+
+    def __init__(self, ttl_seconds: float = REFRESH_TOKEN_TTL_SECONDS,
+                 capacity: int = REFRESH_TOKEN_CAPACITY,
+                 per_user: int = REFRESH_TOKENS_PER_USER,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.capacity = capacity
+        self.per_user = per_user
+        self.clock = clock
+        self.data: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self.by_user: Dict[str, "OrderedDict[str, None]"] = {}
+        self._lock = threading.Lock()
+        self.evicted = 0
+        self.expired = 0
+
+    def _remove(self, token: str) -> Optional[str]:
+        entry = self.data.pop(token, None)
+        if entry is None:
+            return None
+        username = entry[0]
+        tokens = self.by_user.get(username)
+        if tokens is not None:
+            tokens.pop(token, None)
+            if not tokens:
+                del self.by_user[username]
+        return username
+
+    def add(self, token: str, username: str):
+        with self._lock:
+            self._remove(token)
+            self.data[token] = (username, self.clock() + self.ttl_seconds)
+            tokens = self.by_user.setdefault(username, OrderedDict())
+            tokens[token] = None
+            while len(tokens) > self.per_user:
+                oldest = next(iter(tokens))
+                self._remove(oldest)
+                self.evicted += 1
+            while len(self.data) > self.capacity:
+                oldest = next(iter(self.data))
+                self._remove(oldest)
+                self.evicted += 1
+
+    def get(self, token: str) -> Optional[str]:
+        with self._lock:
+            entry = self.data.get(token)
+            if entry is None:
+                return None
+            username, expires_at = entry
+            if expires_at <= self.clock():
+                self._remove(token)
+                self.expired += 1
+                return None
+            return username
+
+    def revoke(self, token: str) -> bool:
+        with self._lock:
+            return self._remove(token) is not None
+
+    def purge_expired(self, limit: int = 1000) -> int:
+        """
+        Remove up to `limit` expired tokens from the front. Returns the
+        number removed; equal to `limit` means more may be waiting.
+        """
+        removed = 0
+        with self._lock:
+            now = self.clock()
+            while removed < limit and self.data:
+                token, (_, expires_at) = next(iter(self.data.items()))
+                if expires_at > now:
+                    break
+                self._remove(token)
+                removed += 1
+            self.expired += removed
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self.data),
+                "users": len(self.by_user),
+                "capacity": self.capacity,
+                "evicted": self.evicted,
+                "expired": self.expired,
+            }
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __contains__(self, token: str) -> bool:
+        return self.get(token) is not None
+
+
+async def run_expiry(store: RefreshTokenStore, interval: float = 1.0, batch: int = 1000):
+    """
+    Background task: purge expired tokens in small batches, yielding to the
+    event loop between batches so a large backlog never blocks requests.
+    """
+    while True:
+        removed = store.purge_expired(batch)
+        await asyncio.sleep(0 if removed >= batch else interval)
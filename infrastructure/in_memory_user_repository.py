@@ -0,0 +1,71 @@
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+from uuid import UUID
+
+from auth.user_repository import User, UserRepository
+from infrastructure.metrics import timed
+
+
+class InMemoryUserRepository(UserRepository):
+    def __init__(self): # dua index: username -> User dan user_id (UUID) -> User
+        self.by_username: Dict[str, User] = {}
+        self.by_id: Dict[UUID, User] = {}
+        self._refresh_lock = threading.Lock()
+
+    @timed("user_memory", "add")
+    def add(self, user: User) -> User:
+        # username sama = replace, buang entry id lama supaya index tetap konsisten
+        old = self.by_username.get(user.username)
+        if old is not None:
+            self.by_id.pop(old.user_id, None)
+        self.by_username[user.username] = user
+        self.by_id[user.user_id] = user
+        return user
+
+    def add_many(self, users: Iterable[User]) -> int:
+        count = 0
+        for user in users:
+            self.add(user)
+            count += 1
+        return count
+
+    def update(self, user: User) -> None:
+        # objek yang sama dipakai kedua index, perubahan atribut langsung terlihat
+        self.add(user)
+
+    @timed("user_memory", "get_by_username")
+    def get_by_username(self, username: str) -> Optional[User]:
+        return self.by_username.get(username)
+
+    @timed("user_memory", "get_by_id")
+    def get_by_id(self, user_id: UUID) -> Optional[User]:
+        return self.by_id.get(user_id)
+
+    def count(self) -> int:
+        return len(self.by_username)
+
+    def _current_refresh(self, username: str, generation: Optional[int],
+                         counter: Optional[int]) -> Optional[User]:
+        user = self.by_username.get(username)
+        if user is None or (generation is not None and (
+                user.refresh_generation != generation or user.refresh_counter != counter)):
+            return None
+        return user
+
+    def advance_refresh_counter(self, username: str, generation: Optional[int] = None,
+                                counter: Optional[int] = None) -> Optional[Tuple[int, int]]:
+        with self._refresh_lock:
+            user = self._current_refresh(username, generation, counter)
+            if user is None:
+                return None
+            user.refresh_counter += 1
+            return user.refresh_generation, user.refresh_counter
+
+    def bump_refresh_generation(self, username: str, generation: Optional[int] = None,
+                                counter: Optional[int] = None) -> Optional[int]:
+        with self._refresh_lock:
+            user = self._current_refresh(username, generation, counter)
+            if user is None:
+                return None
+            user.refresh_generation += 1
+            return user.refresh_generation
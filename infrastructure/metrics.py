@@ -0,0 +1,346 @@
+import heapq
+import itertools
+import json
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from infrastructure.phase_timing import count, phase
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[str, ...]
+
+# mode multi-proses (enable_multiprocess): nilai juga ditulis ke file mmap worker ini
+_STORE = None
+_COLLECTOR = None
+_TIDS = itertools.count()
+_FREE_TIDS: List[int] = []
+_TIDS_LOCK = threading.Lock()
+_THREAD = threading.local()
+
+
+class _TidLease:
+    """
+    A writer id held by one live thread. It lives in that thread's
+    threading.local, which is cleared when the thread exits; the id then
+    goes back to the pool and the next new thread takes over its shards and
+    mmap slots (values are cumulative, so nothing is lost). Shards and slots
+    are therefore bounded by the peak number of concurrent threads, not by
+    how many threads (AnyIO retires idle workers) ever existed.
+    """
+    __slots__ = ("tid",)
+
+    def __init__(self):
+        with _TIDS_LOCK:
+            self.tid = heapq.heappop(_FREE_TIDS) if _FREE_TIDS else next(_TIDS)
+
+    def __del__(self):
+        with _TIDS_LOCK:
+            heapq.heappush(_FREE_TIDS, self.tid)
+
+
+def _thread_id() -> int:
+    # bukan threading.get_ident(): ident OS bisa dipakai ulang sebelum shard lama dilepas
+    try:
+        return _THREAD.lease.tid
+    except AttributeError:
+        _THREAD.lease = _TidLease()
+        return _THREAD.lease.tid
+
+
+class _Sharded:
+    """
+    One dict per writer id (one live thread, see _TidLease): the hot path
+    only touches the caller's own shard (no lock); collect() sums every
+    shard. The lock is taken once per thread, when it picks up its shard.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        # writer id -> shard; shard thread yang sudah mati dipakai lagi oleh pemilik id berikutnya
+        self._shards: Dict[int, dict] = {}
+        self._lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        try:
+            return self._local.shard
+        except AttributeError:
+            tid = _thread_id()
+            with self._lock:
+                shard = self._shards.setdefault(tid, {})
+            self._local.shard = shard
+            return shard
+
+    def _offset(self, labels: Labels, values: Tuple[float, ...]):
+        """
+        (offset, created) of this thread's mmap slot for `labels`.
+        """
+        local = self._local
+        try:
+            if local.store is _STORE:
+                offset = local.offsets.get(labels)
+                if offset is not None:
+                    return offset, False
+            else:
+                local.store, local.offsets = _STORE, {}
+        except AttributeError:
+            local.store, local.offsets = _STORE, {}
+        key = json.dumps([self.kind, self.name, list(labels), _thread_id()])
+        # slot milik id yang dipakai ulang sudah ada: nilainya tetap harus ditulis
+        created = key not in _STORE
+        offset = local.offsets[labels] = _STORE.slot(key, values)
+        return offset, created
+
+    def _snapshots(self) -> List[list]:
+        with self._lock:
+            shards = list(self._shards.values())
+        # list(dict.items()) jalan di C tanpa melepas GIL -> snapshot konsisten
+        return [list(shard.items()) for shard in shards]
+
+    def clear(self) -> None:
+        with self._lock:
+            for shard in self._shards.values():
+                shard.clear()
+
+    def sample_labelnames(self, sample_name: str) -> Tuple[str, ...]:
+        return self.labelnames
+
+
+class Counter(_Sharded):
+    kind = "counter"
+
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        shard = self._shard()
+        value = shard[labels] = shard.get(labels, 0) + amount
+        if _STORE is not None:
+            offset, created = self._offset(labels, (value,))
+            if not created:
+                _STORE.write(offset, value)
+
+    def collect(self) -> Dict[Labels, float]:
+        totals: Dict[Labels, float] = {}
+        for items in self._snapshots():
+            for labels, value in items:
+                totals[labels] = totals.get(labels, 0) + value
+        return totals
+
+    def samples(self, totals=None):
+        if totals is None:
+            totals = self.collect()
+        else:
+            totals = {labels: values[0] for labels, values in totals.items()}
+        for labels, value in totals.items():
+            yield self.name, labels, value
+
+
+class Gauge(Counter):
+    """
+    Up/down gauge (e.g. in-flight requests); each thread's +/- are summed.
+    """
+    kind = "gauge"
+
+    def dec(self, labels: Labels = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+
+class Histogram(_Sharded):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        shard = self._shard()
+        entry = shard.get(labels)
+        if entry is None:
+            # hitungan per bucket (non-kumulatif) + overflow, lalu sum
+            entry = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        # bucket pertama dengan batas >= value (le), overflow = indeks terakhir
+        i = bisect_left(self.buckets, value)
+        entry[i] += 1
+        entry[-1] += value
+        if _STORE is not None:
+            offset, created = self._offset(labels, tuple(entry))
+            if not created:
+                _STORE.write(offset + 8 * i, entry[i])
+                _STORE.write(offset + 8 * (len(entry) - 1), entry[-1])
+
+    def time(self, labels: Labels = ()):
+        return _Timer(self, labels)
+
+    def collect(self) -> Dict[Labels, list]:
+        totals: Dict[Labels, list] = {}
+        for items in self._snapshots():
+            for labels, entry in items:
+                entry = list(entry)
+                total = totals.get(labels)
+                if total is None:
+                    totals[labels] = entry
+                else:
+                    for i, value in enumerate(entry):
+                        total[i] += value
+        return totals
+
+    def samples(self, totals=None):
+        for labels, entry in (self.collect() if totals is None else totals).items():
+            cumulative = 0
+            for bound, hits in zip(self.buckets, entry):
+                cumulative += hits
+                yield self.name + "_bucket", labels + (repr(float(bound)),), cumulative
+            cumulative += entry[len(self.buckets)]
+            yield self.name + "_bucket", labels + ("+Inf",), cumulative
+            yield self.name + "_count", labels, cumulative
+            yield self.name + "_sum", labels, entry[-1]
+
+    def sample_labelnames(self, sample_name: str) -> Tuple[str, ...]:
+        return self.labelnames + ("le",) if sample_name.endswith("_bucket") else self.labelnames
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram: Histogram, labels: Labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, self.labels)
+
+
+class CallbackMetric:
+    """
+    Value read at scrape time, e.g. cache stats or loan counts by status.
+    `fn` returns an iterable of (labels, value).
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str],
+                 fn: Callable[[], Iterable[Tuple[Labels, float]]], kind: str = "gauge"):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.fn = fn
+        self.kind = kind
+
+    def samples(self):
+        for labels, value in self.fn():
+            yield self.name, tuple(labels), value
+
+    def sample_labelnames(self, sample_name: str) -> Tuple[str, ...]:
+        return self.labelnames
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Duplicate metric: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def unregister(self, name: str) -> None:
+        with self._lock:
+            self._metrics.pop(name, None)
+
+    def get(self, name: str):
+        return self._metrics.get(name)
+
+    def expose(self) -> str:
+        """
+        Prometheus text exposition format 0.0.4.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        # multi-proses: counter/histogram dari semua worker; callback tetap lokal
+        totals = _COLLECTOR.collect() if _COLLECTOR is not None else None
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            if totals is not None and isinstance(metric, _Sharded):
+                samples = metric.samples(totals.get(metric.name, {}))
+            else:
+                samples = metric.samples()
+            for sample_name, labels, value in samples:
+                if labels:
+                    names = metric.sample_labelnames(sample_name)
+                    pairs = ",".join(f'{n}="{_escape(str(v))}"' for n, v in zip(names, labels))
+                    lines.append(f"{sample_name}{{{pairs}}} {_format_sample(value)}")
+                else:
+                    lines.append(f"{sample_name} {_format_sample(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_sample(value: float) -> str:
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+REGISTRY = Registry()
+
+REPOSITORY_SECONDS = REGISTRY.register(Histogram(
+    "bookwise_repository_operation_duration_seconds",
+    "Repository operation latency",
+    ("repository", "operation"),
+    buckets=(0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0),
+))
+
+
+def timed(repository: str, operation: str):
+    """
+    Decorator: record a repository method's latency in REPOSITORY_SECONDS
+    (and as the "repo" Server-Timing phase plus a per-request call count).
+    """
+    labels = (repository, operation)
+    call = f"{repository}.{operation}"
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            count(call)
+            start = time.perf_counter()
+            try:
+                with phase("repo", call):
+                    return fn(*args, **kwargs)
+            finally:
+                REPOSITORY_SECONDS.observe(time.perf_counter() - start, labels)
+        return wrapper
+    return decorator
+
+
+def enable_multiprocess(directory: str) -> None:
+    """
+    Record into a per-worker mmap file under `directory` and aggregate every
+    live worker on scrape. Call once per worker before serving requests.
+    """
+    global _STORE, _COLLECTOR
+    from infrastructure.metrics_mmap import MultiProcessCollector, open_worker_store
+    _STORE = open_worker_store(directory)
+    _COLLECTOR = MultiProcessCollector(directory)
+
+
+def disable_multiprocess() -> None:
+    global _STORE, _COLLECTOR
+    if _STORE is not None:
+        _STORE.close()
+    _STORE = _COLLECTOR = None
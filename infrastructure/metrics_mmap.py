@@ -0,0 +1,248 @@
+"""
+Multi-process metrics: one mmap'd file per worker, aggregated at scrape time.
+
+Each worker appends (key, float64 values) slots to its own
+`metrics_<pid>.db`; a slot is owned by one thread of one process, so the
+request path only does struct.pack_into on its own memory (no lock across
+processes). Slot keys carry a writer id that a new thread reuses once its
+previous owner has exited (see metrics._TidLease), so a file grows with
+label sets x peak concurrent threads, not with thread churn. Any worker answering /metrics reads every file in the
+directory. Files of dead workers are folded into `archive.json`
+(counters and histograms only, gauges die with the process) and removed;
+that cleanup, and nothing on the request path, takes an flock.
+
+File layout: 8-byte header `used`, then entries of
+    uint32 key_len | uint32 n | key (utf-8, padded to 8) | n x float64
+`used` is bumped only after an entry is fully written, so readers never
+see a half-written entry.
+"""
+import fcntl
+import glob
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+HEADER = struct.Struct("<Q")
+ENTRY = struct.Struct("<II")
+DOUBLE = struct.Struct("<d")
+FILE_RE = re.compile(r"metrics_(\d+)\.db$")
+ARCHIVE = "archive.json"
+LOCK_FILE = ".lock"
+
+
+def _pad(n: int) -> int:
+    return (n + 7) & ~7
+
+
+class MmapValues:
+    """
+    Append-only key -> float64[n] store in one file; one writer process.
+    """
+
+    def __init__(self, path: str, initial_size: int = 1 << 20):
+        self.path = path
+        self._lock = threading.Lock()  # hanya untuk alokasi slot baru, bukan tulis nilai
+        self._offsets: Dict[str, int] = {}
+        self._file = open(path, "a+b")
+        size = max(os.fstat(self._file.fileno()).st_size, initial_size)
+        self._file.truncate(size)
+        self._maps: List[mmap.mmap] = []
+        self._map(size)
+        self.used = HEADER.unpack_from(self._mm, 0)[0] or HEADER.size
+        for key, offset, _ in self._entries():
+            self._offsets[key] = offset
+
+    def _map(self, size: int) -> None:
+        # map lama tidak ditutup: thread lain mungkin masih menulis lewat map itu
+        self._mm = mmap.mmap(self._file.fileno(), size)
+        self._maps.append(self._mm)
+        self.size = size
+
+    def _entries(self):
+        pos = HEADER.size
+        while pos < self.used:
+            key_len, n = ENTRY.unpack_from(self._mm, pos)
+            key_at = pos + ENTRY.size
+            values_at = key_at + _pad(key_len)
+            yield self._mm[key_at:key_at + key_len].decode("utf-8"), values_at, n
+            pos = values_at + 8 * n
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._offsets
+
+    def slot(self, key: str, values: Tuple[float, ...]) -> int:
+        """
+        Offset of the values for `key`, allocated (and filled with `values`) on first use.
+        """
+        offset = self._offsets.get(key)
+        if offset is not None:
+            return offset
+        with self._lock:
+            offset = self._offsets.get(key)
+            if offset is not None:
+                return offset
+            encoded = key.encode("utf-8")
+            n = len(values)
+            needed = ENTRY.size + _pad(len(encoded)) + 8 * n
+            if self.used + needed > self.size:
+                new_size = self.size
+                while self.used + needed > new_size:
+                    new_size *= 2
+                self._file.truncate(new_size)
+                self._map(new_size)
+            mm = self._mm
+            ENTRY.pack_into(mm, self.used, len(encoded), n)
+            mm[self.used + ENTRY.size:self.used + ENTRY.size + len(encoded)] = encoded
+            offset = self.used + ENTRY.size + _pad(len(encoded))
+            struct.pack_into(f"<{n}d", mm, offset, *values)
+            self.used += needed
+            HEADER.pack_into(mm, 0, self.used)
+            self._offsets[key] = offset
+            return offset
+
+    def write(self, offset: int, value: float) -> None:
+        DOUBLE.pack_into(self._mm, offset, value)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def read_file(path: str) -> Iterator[Tuple[str, Tuple[float, ...]]]:
+    """
+    (key, values) for every complete entry, read without mmap/locks.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < HEADER.size:
+        return
+    used = min(HEADER.unpack_from(data, 0)[0], len(data))
+    pos = HEADER.size
+    while pos + ENTRY.size <= used:
+        key_len, n = ENTRY.unpack_from(data, pos)
+        key_at = pos + ENTRY.size
+        values_at = key_at + _pad(key_len)
+        end = values_at + 8 * n
+        if end > used:
+            break
+        yield data[key_at:key_at + key_len].decode("utf-8"), struct.unpack_from(f"<{n}d", data, values_at)
+        pos = end
+
+
+def pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+Totals = Dict[str, Dict[tuple, list]]
+
+
+def _add(totals: Totals, name: str, labels: tuple, values) -> None:
+    by_labels = totals.setdefault(name, {})
+    current = by_labels.get(labels)
+    if current is None:
+        by_labels[labels] = list(values)
+    else:
+        for i, value in enumerate(values):
+            current[i] += value
+
+
+class MultiProcessCollector:
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    @contextmanager
+    def _flock(self, mode: int):
+        with open(os.path.join(self.directory, LOCK_FILE), "a") as f:
+            fcntl.flock(f, mode)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _files(self) -> List[Tuple[int, str]]:
+        found = []
+        for path in glob.glob(os.path.join(self.directory, "metrics_*.db")):
+            match = FILE_RE.search(path)
+            if match:
+                found.append((int(match.group(1)), path))
+        return found
+
+    def _read_archive(self) -> Totals:
+        path = os.path.join(self.directory, ARCHIVE)
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return {name: {tuple(json.loads(labels)): values for labels, values in by_labels.items()}
+                    for name, by_labels in json.load(f).items()}
+
+    def _write_archive(self, totals: Totals) -> None:
+        path = os.path.join(self.directory, ARCHIVE)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({name: {json.dumps(list(labels)): values for labels, values in by_labels.items()}
+                       for name, by_labels in totals.items()}, f)
+        os.replace(tmp, path)
+
+    def archive(self, path: str) -> None:
+        """
+        Fold a worker file into the archive and delete it. Caller holds LOCK_EX.
+        """
+        totals = self._read_archive()
+        for key, values in read_file(path):
+            kind, name, labels, _ = json.loads(key)
+            if kind != "gauge":
+                _add(totals, name, tuple(labels), values)
+        self._write_archive(totals)
+        os.remove(path)
+
+    def cleanup(self, own_pid: Optional[int] = None) -> int:
+        """
+        Archive files of dead workers (and a stale file reusing `own_pid`).
+        """
+        stale = [path for pid, path in self._files()
+                 if pid == own_pid or not pid_alive(pid)]
+        if not stale:
+            return 0
+        with self._flock(fcntl.LOCK_EX):
+            for path in stale:
+                if os.path.exists(path):
+                    self.archive(path)
+        return len(stale)
+
+    def collect(self) -> Totals:
+        """
+        {metric name: {labels: values}} summed over live workers + archive.
+        """
+        self.cleanup()
+        with self._flock(fcntl.LOCK_SH):
+            totals = self._read_archive()
+            for _, path in self._files():
+                try:
+                    entries = list(read_file(path))
+                except FileNotFoundError:
+                    continue
+                for key, values in entries:
+                    _, name, labels, _ = json.loads(key)
+                    _add(totals, name, tuple(labels), values)
+        return totals
+
+
+def open_worker_store(directory: str) -> MmapValues:
+    """
+    Create this process's file, archiving a stale one left by an earlier
+    process with the same pid.
+    """
+    os.makedirs(directory, exist_ok=True)
+    pid = os.getpid()
+    MultiProcessCollector(directory).cleanup(own_pid=pid)
+    return MmapValues(os.path.join(directory, f"metrics_{pid}.db"))
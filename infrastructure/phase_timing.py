@@ -0,0 +1,141 @@
+"""
+Per-request phase timers (Server-Timing).
+
+The Server-Timing middleware puts a PhaseTimer in a ContextVar; code
+marks work with `with phase("repo"):`. Outside a timed request phase()
+returns a shared no-op object, so the disabled cost is one ContextVar
+lookup. Durations are exclusive: time spent in a nested phase (e.g. a
+repository call inside the user lookup) is counted only for the inner one.
+anyio copies the context into threadpool workers, so sync dependencies
+and handlers see the same timer. Each open phase remembers the thread it
+runs on, so a watchdog can find where a slow request currently is.
+When tracing sets `timer.spans` to a list, every closed phase is also
+appended there as (phase, parent phase, start, end, failed). When
+request accounting sets `timer.usage`, a phase that starts the request's
+work on a worker thread (its parent ran on another thread) charges that
+thread's CPU time to the request.
+"""
+from contextvars import ContextVar
+from threading import get_ident
+from time import perf_counter
+from typing import Dict, List, Optional
+
+
+class PhaseTimer:
+    __slots__ = ("durations", "stack", "calls", "spans", "usage")
+
+    def __init__(self):
+        self.durations: Dict[str, float] = {}
+        self.stack: List["_Phase"] = []
+        self.calls: Dict[str, int] = {}
+        self.spans: Optional[list] = None
+        self.usage = None
+
+    def current_thread(self) -> Optional[int]:
+        """
+        Thread ident of the innermost open phase (safe to call from another thread).
+        """
+        try:
+            return self.stack[-1].thread
+        except IndexError:
+            return None
+
+
+class _Phase:
+    __slots__ = ("timer", "name", "label", "start", "nested", "thread", "segment")
+
+    def __init__(self, timer: PhaseTimer, name: str, label: Optional[str]):
+        self.timer = timer
+        self.name = name
+        self.label = label
+
+    def __enter__(self):
+        self.nested = 0.0
+        self.thread = thread = get_ident()
+        timer = self.timer
+        stack = timer.stack
+        usage = timer.usage
+        if usage is not None and thread != usage.loop_thread and (not stack or stack[-1].thread != thread):
+            self.segment = usage.begin()
+        else:
+            self.segment = None
+        stack.append(self)
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = perf_counter()
+        elapsed = end - self.start
+        timer = self.timer
+        stack = timer.stack
+        stack.pop()
+        durations = timer.durations
+        durations[self.name] = durations.get(self.name, 0.0) + elapsed - self.nested
+        parent = None
+        if stack:
+            parent = stack[-1]
+            parent.nested += elapsed
+        if timer.spans is not None:
+            timer.spans.append((self, parent, self.start, end, exc_type is not None))
+        if self.segment is not None:
+            timer.usage.end(self.segment)
+        return False
+
+
+class _NoopPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopPhase()
+_CURRENT: ContextVar[Optional[PhaseTimer]] = ContextVar("bookwise_phase_timer", default=None)
+
+
+def phase(name: str, label: Optional[str] = None):
+    """
+    Time a block as `name`; `label` (e.g. "loan.save") only names the trace span.
+    """
+    timer = _CURRENT.get()
+    if timer is None:
+        return _NOOP
+    return _Phase(timer, name, label)
+
+
+def count(key: str) -> None:
+    """
+    Count one call (e.g. "loan.save") on the current request's timer.
+    """
+    timer = _CURRENT.get()
+    if timer is not None:
+        timer.calls[key] = timer.calls.get(key, 0) + 1
+
+
+def current_timer() -> Optional[PhaseTimer]:
+    return _CURRENT.get()
+
+
+def charge_cpu(seconds: float) -> None:
+    """
+    Add CPU used on the request's behalf elsewhere (e.g. a process pool)
+    to the request's accounting, if request accounting is on.
+    """
+    timer = current_timer()
+    if timer is not None and timer.usage is not None:
+        timer.usage.cpu += seconds
+
+
+def start_timer():
+    """
+    Begin timing the current request; returns (timer, token for reset_timer).
+    """
+    timer = PhaseTimer()
+    return timer, _CURRENT.set(timer)
+
+
+def reset_timer(token) -> None:
+    _CURRENT.reset(token)
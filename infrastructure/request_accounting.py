@@ -0,0 +1,160 @@
+"""
+Per-request CPU time and allocation accounting.
+
+A request's work is split over threads, so its usage is summed from
+segments that run only that request's code:
+  * event loop: each step of the request coroutine (between two awaits)
+    is metered by `metered()`;
+  * worker threads: phases that start work on a thread other than their
+    parent's (the sync handler, sync auth dependencies) are metered by
+    phase_timing through `timer.usage`;
+  * password pool: bcrypt reports the CPU it used in its worker process
+    and is charged with `phase_timing.charge_cpu()`.
+CPU is time.thread_time() of the thread running the segment, so it is
+exact per request. Allocation is the change of tracemalloc's traced
+memory over the same segments (net bytes, may be negative); tracemalloc
+is process-wide, so allocations of threads running concurrently with a
+segment are included and the numbers are approximate under load.
+"""
+import threading
+import tracemalloc
+from time import thread_time
+from typing import Dict, List, Optional, Tuple
+
+from infrastructure.metrics import REGISTRY, Counter, Gauge
+
+REQUEST_CPU_SECONDS = REGISTRY.register(Counter(
+    "bookwise_request_cpu_seconds_total", "Thread CPU time used by requests", ("route", "role")))
+# gauge: net alokasi bisa negatif (request yang membebaskan memori)
+REQUEST_NET_ALLOCATED_BYTES = REGISTRY.register(Gauge(
+    "bookwise_request_net_allocated_bytes", "Sum of net bytes allocated by requests (tracemalloc)",
+    ("route", "role")))
+
+
+class RequestUsage:
+    __slots__ = ("cpu", "alloc", "loop_thread", "track_alloc")
+
+    def __init__(self, loop_thread: int, track_alloc: bool = False):
+        self.cpu = 0.0
+        self.alloc = 0
+        self.loop_thread = loop_thread
+        self.track_alloc = track_alloc
+
+    def begin(self) -> Tuple[float, int]:
+        return thread_time(), tracemalloc.get_traced_memory()[0] if self.track_alloc else 0
+
+    def end(self, segment: Tuple[float, int]) -> None:
+        self.cpu += thread_time() - segment[0]
+        if self.track_alloc:
+            self.alloc += tracemalloc.get_traced_memory()[0] - segment[1]
+
+
+class _Metered:
+    """
+    Await a coroutine, metering each step it runs on this thread.
+    """
+    __slots__ = ("coro", "usage")
+
+    def __init__(self, coro, usage: RequestUsage):
+        self.coro = coro
+        self.usage = usage
+
+    def __await__(self):
+        coro, usage = self.coro, self.usage
+        value, error = None, None
+        while True:
+            segment = usage.begin()
+            try:
+                if error is None:
+                    yielded = coro.send(value)
+                else:
+                    yielded = coro.throw(error)
+            except StopIteration as stop:
+                usage.end(segment)
+                return stop.value
+            except BaseException:
+                usage.end(segment)
+                raise
+            usage.end(segment)
+            try:
+                value, error = (yield yielded), None
+            except GeneratorExit:
+                coro.close()
+                raise
+            except BaseException as exc:
+                value, error = None, exc
+
+
+async def metered(coro, usage: RequestUsage):
+    return await _Metered(coro, usage)
+
+
+class UsageStats:
+    """
+    Totals per (route template, role).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (route, role) -> [requests, cpu_total, cpu_max, alloc_total, alloc_max]
+        self._rows: Dict[Tuple[str, str], list] = {}
+
+    def record(self, route: str, role: str, cpu: float, alloc: int) -> None:
+        labels = (route, role)
+        with self._lock:
+            row = self._rows.get(labels)
+            if row is None:
+                row = self._rows[labels] = [0, 0.0, 0.0, 0, 0]
+            row[0] += 1
+            row[1] += cpu
+            row[2] = max(row[2], cpu)
+            row[3] += alloc
+            row[4] = max(row[4], alloc)
+        REQUEST_CPU_SECONDS.inc(labels, cpu)
+        if alloc:
+            REQUEST_NET_ALLOCATED_BYTES.inc(labels, alloc)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._rows.clear()
+
+    @staticmethod
+    def _summary(requests: int, cpu: float, alloc: int, total_cpu: float) -> dict:
+        return {
+            "requests": requests,
+            "cpu_total_ms": round(cpu * 1000, 3),
+            "cpu_avg_ms": round(cpu * 1000 / requests, 3) if requests else 0.0,
+            "cpu_share_pct": round(100 * cpu / total_cpu, 2) if total_cpu else 0.0,
+            "alloc_total_bytes": alloc,
+            "alloc_avg_bytes": round(alloc / requests) if requests else 0,
+        }
+
+    def report(self, sort: str = "cpu", limit: Optional[int] = None) -> dict:
+        with self._lock:
+            rows = {labels: list(row) for labels, row in self._rows.items()}
+        total_cpu = sum(row[1] for row in rows.values())
+        by_route: Dict[str, list] = {}
+        by_role: Dict[str, list] = {}
+        callers: List[dict] = []
+        for (route, role), (requests, cpu, cpu_max, alloc, alloc_max) in rows.items():
+            for key, group in ((route, by_route), (role, by_role)):
+                acc = group.setdefault(key, [0, 0.0, 0])
+                acc[0] += requests
+                acc[1] += cpu
+                acc[2] += alloc
+            entry = {"route": route, "role": role, **self._summary(requests, cpu, alloc, total_cpu)}
+            entry["cpu_max_ms"] = round(cpu_max * 1000, 3)
+            entry["alloc_max_bytes"] = alloc_max
+            callers.append(entry)
+        key = {"cpu": "cpu_total_ms", "alloc": "alloc_total_bytes", "requests": "requests"}[sort]
+        callers.sort(key=lambda entry: entry[key], reverse=True)
+        return {
+            "cpu_total_ms": round(total_cpu * 1000, 3),
+            "alloc_tracked": tracemalloc.is_tracing(),
+            "by_route_role": callers[:limit] if limit is not None else callers,
+            "by_route": {route: self._summary(*acc, total_cpu) for route, acc in by_route.items()},
+            "by_role": {role: self._summary(*acc, total_cpu) for role, acc in by_role.items()},
+        }
+
+
+USAGE = UsageStats()
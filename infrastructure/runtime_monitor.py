@@ -0,0 +1,151 @@
+"""
+Event-loop lag and threadpool saturation monitor.
+
+Every `interval` seconds a task on the event loop:
+  * measures scheduling lag: how late asyncio.sleep(interval) woke up
+    (a blocked or overloaded loop delays every coroutine by this much);
+  * reads the AnyIO default thread limiter (the pool every sync endpoint
+    and dependency runs on): tokens borrowed (active), capacity, tasks
+    waiting for a token (queued);
+  * submits a no-op probe to that pool and measures how long it waited
+    before a worker thread picked it up.
+Lag and probe wait go to histograms, pool and lane occupancy are gauges
+read at scrape time, and crossing LOOP_LAG_WARN_MS / THREADPOOL_WAIT_WARN_MS
+logs a warning (at most once per RUNTIME_MONITOR_WARN_EVERY seconds per kind).
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Callable, Dict
+
+import anyio.to_thread
+
+from infrastructure.execution_lanes import lane_stats
+from infrastructure.metrics import REGISTRY, CallbackMetric, Histogram
+
+RUNTIME_MONITOR_ENABLED = os.getenv("RUNTIME_MONITOR_ENABLED", "true").lower() == "true"
+RUNTIME_MONITOR_INTERVAL = float(os.getenv("RUNTIME_MONITOR_INTERVAL", "0.5"))
+LOOP_LAG_WARN_MS = float(os.getenv("LOOP_LAG_WARN_MS", "100"))
+THREADPOOL_WAIT_WARN_MS = float(os.getenv("THREADPOOL_WAIT_WARN_MS", "100"))
+RUNTIME_MONITOR_WARN_EVERY = float(os.getenv("RUNTIME_MONITOR_WARN_EVERY", "30"))
+
+logger = logging.getLogger(__name__)
+
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+LOOP_LAG_SECONDS = REGISTRY.register(Histogram(
+    "bookwise_event_loop_lag_seconds", "Event loop scheduling lag", buckets=LAG_BUCKETS))
+THREADPOOL_WAIT_SECONDS = REGISTRY.register(Histogram(
+    "bookwise_threadpool_wait_seconds", "Time a probe task waited for a threadpool worker",
+    buckets=LAG_BUCKETS))
+
+
+class RuntimeMonitor:
+    def __init__(self, interval: float = RUNTIME_MONITOR_INTERVAL,
+                 lag_warn: float = LOOP_LAG_WARN_MS / 1000,
+                 wait_warn: float = THREADPOOL_WAIT_WARN_MS / 1000,
+                 warn_every: float = RUNTIME_MONITOR_WARN_EVERY,
+                 clock: Callable[[], float] = time.perf_counter):
+        self.interval = interval
+        self.lag_warn = lag_warn
+        self.wait_warn = wait_warn
+        self.warn_every = warn_every
+        self.clock = clock
+        self.limiter = None
+        self.samples = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.last_wait = 0.0
+        self.max_wait = 0.0
+        self.warnings: Dict[str, int] = {"loop_lag": 0, "threadpool_wait": 0}
+        self._last_warned: Dict[str, float] = {}
+
+    def pool(self) -> Dict[str, int]:
+        limiter = self.limiter
+        if limiter is None:
+            return {"active": 0, "queued": 0, "capacity": 0}
+        return {
+            "active": int(limiter.borrowed_tokens),
+            "queued": limiter.statistics().tasks_waiting,
+            "capacity": int(limiter.total_tokens),
+        }
+
+    def _warn(self, kind: str, message: str, *args) -> None:
+        self.warnings[kind] += 1
+        now = self.clock()
+        last = self._last_warned.get(kind)
+        if last is None or now - last >= self.warn_every:
+            self._last_warned[kind] = now
+            logger.warning(message, *args)
+
+    async def sample(self) -> dict:
+        """
+        One measurement: sleep `interval`, then probe the threadpool.
+        """
+        # limiter milik event loop yang sedang jalan (baru tiap loop/lifespan)
+        self.limiter = anyio.to_thread.current_default_thread_limiter()
+        expected = self.clock() + self.interval
+        await asyncio.sleep(self.interval)
+        lag = max(0.0, self.clock() - expected)
+        pool = self.pool()
+        submitted = self.clock()
+        started = await anyio.to_thread.run_sync(self.clock)
+        wait = max(0.0, started - submitted)
+
+        self.samples += 1
+        self.last_lag, self.max_lag = lag, max(self.max_lag, lag)
+        self.last_wait, self.max_wait = wait, max(self.max_wait, wait)
+        LOOP_LAG_SECONDS.observe(lag)
+        THREADPOOL_WAIT_SECONDS.observe(wait)
+        if lag >= self.lag_warn:
+            self._warn("loop_lag", "Event loop lag %.1f ms (threshold %.1f ms)",
+                       lag * 1000, self.lag_warn * 1000)
+        if wait >= self.wait_warn:
+            self._warn("threadpool_wait",
+                       "Threadpool wait %.1f ms (threshold %.1f ms), active %d/%d, queued %d",
+                       wait * 1000, self.wait_warn * 1000, pool["active"], pool["capacity"], pool["queued"])
+        return {"lag": lag, "wait": wait, **pool}
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.sample()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # monitor tidak boleh mati karena satu sampel gagal
+                logger.exception("Runtime monitor sample failed")
+                await asyncio.sleep(self.interval)
+
+    def snapshot(self) -> dict:
+        return {
+            "samples": self.samples,
+            "loop_lag_ms": round(self.last_lag * 1000, 3),
+            "loop_lag_max_ms": round(self.max_lag * 1000, 3),
+            "threadpool_wait_ms": round(self.last_wait * 1000, 3),
+            "threadpool_wait_max_ms": round(self.max_wait * 1000, 3),
+            "threadpool": self.pool(),
+            "warnings": dict(self.warnings),
+        }
+
+
+RUNTIME_MONITOR = RuntimeMonitor()
+
+
+def _threadpool_samples(monitor: RuntimeMonitor = RUNTIME_MONITOR):
+    for state, value in monitor.pool().items():
+        yield (state,), value
+
+
+def _lane_samples():
+    for lane, stats in lane_stats().items():
+        yield (lane, "active"), stats["active"]
+        yield (lane, "queued"), stats["queued"]
+
+
+def register_runtime_metrics(registry=REGISTRY) -> None:
+    registry.register(CallbackMetric(
+        "bookwise_threadpool_tasks", "AnyIO threadpool tokens by state", ("state",), _threadpool_samples))
+    registry.register(CallbackMetric(
+        "bookwise_lane_tasks", "Execution lane tasks by state", ("lane", "state"), _lane_samples))
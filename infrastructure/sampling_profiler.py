@@ -0,0 +1,170 @@
+"""
+On-demand wall-clock sampling profiler.
+
+run() polls sys._current_frames() every `interval` seconds from the
+calling thread and counts (thread, stack) pairs. Nothing is installed
+between runs (no sys.setprofile / settrace hooks, no background thread),
+so the cost while the profiler is inactive is zero. Output is the
+collapsed-stack format read by flamegraph.pl / speedscope plus a
+top-functions table with self and total sample counts.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Tuple
+
+PROFILER_MAX_SECONDS = float(os.getenv("PROFILER_MAX_SECONDS", "60"))
+
+# leaf frame yang berarti thread sedang menunggu, bukan bekerja
+IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+}
+
+_STDLIB = os.path.dirname(os.__file__) + os.sep
+
+Frame = Tuple[str, str, int]  # (file, function, first line)
+
+
+class ProfilerBusy(Exception):
+    """Raised when a profile is already running."""
+
+
+def short_path(filename: str) -> str:
+    # path relatif ke site-packages / stdlib / project supaya stack tetap terbaca
+    marker = "site-packages" + os.sep
+    index = filename.rfind(marker)
+    if index != -1:
+        return filename[index + len(marker):]
+    for root in (_STDLIB, os.getcwd() + os.sep):
+        if filename.startswith(root):
+            return filename[len(root):]
+    return filename
+
+
+def _label(frame: Frame) -> str:
+    filename, function, line = frame
+    return f"{function} ({filename}:{line})"
+
+
+class SamplingProfiler:
+    """
+    One profile at a time; a second run() while one is active raises ProfilerBusy.
+    """
+
+    def __init__(self, max_seconds: float = PROFILER_MAX_SECONDS):
+        self.max_seconds = max_seconds
+        self._lock = threading.Lock()
+        self._code_cache: Dict[object, Frame] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def _frame(self, code) -> Frame:
+        frame = self._code_cache.get(code)
+        if frame is None:
+            frame = (short_path(code.co_filename), code.co_name, code.co_firstlineno)
+            self._code_cache[code] = frame
+        return frame
+
+    def _sample(self, own_ident: int, names: Dict[int, str], stacks: Counter) -> None:
+        for ident, top in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            frames = []
+            frame = top
+            while frame is not None:
+                frames.append(self._frame(frame.f_code))
+                frame = frame.f_back
+            frames.reverse()
+            stacks[(names.get(ident, str(ident)),) + tuple(frames)] += 1
+
+    def run(self, seconds: float, interval: float = 0.005) -> "Profile":
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("A profile is already running")
+        try:
+            seconds = min(seconds, self.max_seconds)
+            own_ident = threading.get_ident()
+            stacks: Counter = Counter()
+            samples = 0
+            started = time.perf_counter()
+            deadline = started + seconds
+            while True:
+                now = time.perf_counter()
+                if now >= deadline:
+                    break
+                names = {t.ident: t.name for t in threading.enumerate()}
+                self._sample(own_ident, names, stacks)
+                samples += 1
+                time.sleep(max(0.0, interval - (time.perf_counter() - now)))
+            return Profile(stacks, samples, time.perf_counter() - started, interval)
+        finally:
+            self._code_cache.clear()
+            self._lock.release()
+
+
+class Profile:
+    def __init__(self, stacks: Counter, samples: int, duration: float, interval: float):
+        self.stacks = stacks
+        self.samples = samples
+        self.duration = duration
+        self.interval = interval
+
+    def _busy(self, include_idle: bool):
+        for stack, count in self.stacks.items():
+            if not include_idle and len(stack) > 1:
+                filename, function, _ = stack[-1]
+                if (os.path.basename(filename), function) in IDLE_LEAVES:
+                    continue
+            yield stack, count
+
+    def collapsed(self, include_idle: bool = False) -> str:
+        """
+        Brendan Gregg's collapsed format: `thread;frame;frame count` per line.
+        """
+        lines = []
+        for stack, count in self._busy(include_idle):
+            thread, frames = stack[0], stack[1:]
+            lines.append(";".join([f"thread:{thread}"] + [_label(f) for f in frames]) + f" {count}")
+        lines.sort()
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def top(self, limit: int = 20, include_idle: bool = False) -> List[dict]:
+        own: Counter = Counter()
+        total: Counter = Counter()
+        busy = 0
+        for stack, count in self._busy(include_idle):
+            frames = stack[1:]
+            if not frames:
+                continue
+            busy += count
+            own[frames[-1]] += count
+            for frame in set(frames):
+                total[frame] += count
+        rows = []
+        for frame, count in total.most_common(limit):
+            rows.append({
+                "function": _label(frame),
+                "self": own.get(frame, 0),
+                "total": count,
+                "self_pct": round(100 * own.get(frame, 0) / busy, 2) if busy else 0.0,
+                "total_pct": round(100 * count / busy, 2) if busy else 0.0,
+            })
+        rows.sort(key=lambda row: (-row["self"], -row["total"]))
+        return rows
+
+    def to_dict(self, limit: int = 20, include_idle: bool = False) -> dict:
+        return {
+            "duration": round(self.duration, 3),
+            "interval_ms": self.interval * 1000,
+            "samples": self.samples,
+            "top": self.top(limit, include_idle),
+            "collapsed": self.collapsed(include_idle),
+        }
+
+
+profiler = SamplingProfiler()
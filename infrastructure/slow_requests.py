@@ -0,0 +1,139 @@
+"""
+Slow-request capture: in-flight registry, stack watchdog and ring buffer.
+
+The middleware registers each request as `inflight[timer] = start`
+(its phase timer is the key). A watchdog thread wakes every `poll`
+seconds and, for requests already over the threshold, grabs the stack of
+the thread they are running on (innermost open phase, else the event
+loop thread) while they are still slow. Finished requests under the
+threshold are just removed; only slow ones are turned into a record in
+the bounded buffer.
+"""
+import os
+import sys
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from infrastructure.phase_timing import PhaseTimer
+from infrastructure.sampling_profiler import short_path
+
+SLOW_REQUEST_THRESHOLD_MS = float(os.getenv("SLOW_REQUEST_THRESHOLD_MS", "500"))
+SLOW_REQUEST_BUFFER = int(os.getenv("SLOW_REQUEST_BUFFER", "100"))
+SLOW_REQUEST_SAMPLE_STACK = os.getenv("SLOW_REQUEST_SAMPLE_STACK", "true").lower() == "true"
+
+
+def format_stack(frame, limit: int = 64) -> List[str]:
+    """
+    `file:line function` from outermost to innermost frame.
+    """
+    lines = []
+    while frame is not None and len(lines) < limit:
+        code = frame.f_code
+        lines.append(f"{short_path(code.co_filename)}:{frame.f_lineno} {code.co_name}")
+        frame = frame.f_back
+    lines.reverse()
+    return lines
+
+
+class SlowRequestLog:
+    def __init__(self, threshold: float = SLOW_REQUEST_THRESHOLD_MS / 1000,
+                 capacity: int = SLOW_REQUEST_BUFFER,
+                 sample_stack: bool = SLOW_REQUEST_SAMPLE_STACK,
+                 poll: Optional[float] = None):
+        self.threshold = threshold
+        self.sample_stack = sample_stack
+        # polling 4x per threshold: stack diambil paling lambat 1.25x threshold
+        self.poll = poll if poll is not None else min(max(threshold / 4, 0.005), 0.25)
+        self.records = deque(maxlen=capacity)
+        self.inflight: Dict[PhaseTimer, float] = {}
+        # timer -> (stack, detik sejak mulai saat diambil)
+        self.stacks: Dict[PhaseTimer, Tuple[List[str], float]] = {}
+        self.loop_thread: Optional[int] = None
+        self.captured = 0
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+
+    # ------------------------------------------------------------
+    # request path
+    # ------------------------------------------------------------
+    def begin(self, timer: PhaseTimer, start: float) -> None:
+        self.inflight[timer] = start
+
+    def end(self, timer: PhaseTimer, slow: bool) -> Optional[Tuple[List[str], float]]:
+        """
+        Unregister a request; returns the watchdog's (stack, at) for a slow one.
+        """
+        # stack diambil sebelum hapus dari inflight supaya scan() tidak membuangnya
+        sampled = self.stacks.pop(timer, None) if slow else None
+        del self.inflight[timer]
+        return sampled
+
+    def add(self, record: dict) -> None:
+        self.records.append(record)
+        self.captured += 1
+
+    # ------------------------------------------------------------
+    # watchdog
+    # ------------------------------------------------------------
+    def start_watchdog(self) -> None:
+        if not self.sample_stack:
+            return
+        with self._start_lock:
+            if self._watchdog is not None and self._watchdog.is_alive():
+                return
+            self._stop.clear()
+            self._watchdog = threading.Thread(target=self._watch, name="slow-request-watchdog", daemon=True)
+            self._watchdog.start()
+
+    def stop_watchdog(self) -> None:
+        self._stop.set()
+        if self._watchdog is not None:
+            self._watchdog.join()
+            self._watchdog = None
+
+    def scan(self, now: Optional[float] = None) -> int:
+        """
+        Take a stack for every in-flight request over the threshold that has none yet.
+        """
+        now = time.perf_counter() if now is None else now
+        inflight, stacks = self.inflight, self.stacks
+        for timer in [t for t in list(stacks) if t not in inflight]:
+            stacks.pop(timer, None)  # request selesai sebelum sempat diambil
+        late = [(timer, start) for timer, start in list(inflight.items())
+                if timer not in stacks and now - start >= self.threshold]
+        if not late:
+            return 0
+        frames = sys._current_frames()
+        for timer, start in late:
+            frame = frames.get(timer.current_thread() or self.loop_thread)
+            stacks[timer] = (format_stack(frame) if frame is not None else [], now - start)
+        return len(late)
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.poll):
+            self.scan()
+
+    # ------------------------------------------------------------
+    # admin
+    # ------------------------------------------------------------
+    def snapshot(self, limit: Optional[int] = None) -> dict:
+        records = list(self.records)
+        records.reverse()
+        if limit is not None:
+            records = records[:limit]
+        return {
+            "threshold_ms": self.threshold * 1000,
+            "captured": self.captured,
+            "in_flight": len(self.inflight),
+            "records": records,
+        }
+
+    def clear(self) -> None:
+        self.records.clear()
+        self.captured = 0
+
+
+SLOW_REQUESTS = SlowRequestLog()
@@ -0,0 +1,111 @@
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Iterable, List
+
+from domain.audit_log import AuditEntry, AuditLog
+from infrastructure.metrics import timed
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS loan_audit (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    loan_id TEXT NOT NULL,
+    action TEXT NOT NULL,
+    actor TEXT NOT NULL,
+    role TEXT NOT NULL,
+    from_stage TEXT,
+    to_stage TEXT NOT NULL,
+    occurred_at TEXT NOT NULL,
+    recorded_at TEXT NOT NULL,
+    detail TEXT
+);
+CREATE INDEX IF NOT EXISTS loan_audit_by_loan ON loan_audit (loan_id, seq);
+CREATE INDEX IF NOT EXISTS loan_audit_by_actor ON loan_audit (actor, seq);
+CREATE TRIGGER IF NOT EXISTS loan_audit_no_update BEFORE UPDATE ON loan_audit
+BEGIN SELECT RAISE(ABORT, 'loan_audit is append-only'); END;
+CREATE TRIGGER IF NOT EXISTS loan_audit_no_delete BEFORE DELETE ON loan_audit
+BEGIN SELECT RAISE(ABORT, 'loan_audit is append-only'); END;
+"""
+
+COLUMNS = "seq, loan_id, action, actor, role, from_stage, to_stage, occurred_at, recorded_at, detail"
+
+
+class SqliteAuditLog(AuditLog):
+    """
+    Loan audit trail in SQLite. (loan_id, seq) and (actor, seq) indexes
+    make both queries index range scans already in order; triggers reject
+    UPDATE/DELETE so the table stays append-only.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _entry(row) -> AuditEntry:
+        return AuditEntry(
+            loan_id=row[1], action=row[2], actor=row[3], role=row[4], from_stage=row[5],
+            to_stage=row[6], occurred_at=datetime.fromisoformat(row[7]),
+            recorded_at=datetime.fromisoformat(row[8]), detail=row[9], seq=row[0],
+        )
+
+    @timed("audit", "append_many")
+    def append_many(self, entries: Iterable[AuditEntry]) -> int:
+        """
+        Insert a batch in one transaction; sets seq and recorded_at on each entry.
+        """
+        entries = list(entries)
+        if not entries:
+            return 0
+        recorded_at = datetime.now(timezone.utc)
+        recorded = recorded_at.isoformat()
+        with self._lock:
+            with self._conn:
+                cursor = self._conn.cursor()
+                for entry in entries:
+                    cursor.execute(
+                        "INSERT INTO loan_audit (loan_id, action, actor, role, from_stage, to_stage,"
+                        " occurred_at, recorded_at, detail) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (entry.loan_id, entry.action, entry.actor, entry.role, entry.from_stage,
+                         entry.to_stage, entry.occurred_at.isoformat(), recorded, entry.detail))
+                    entry.seq = cursor.lastrowid
+                    entry.recorded_at = recorded_at
+        return len(entries)
+
+    def _query(self, column: str, value: str, limit: int, after: int) -> List[AuditEntry]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {COLUMNS} FROM loan_audit WHERE {column} = ? AND seq > ? ORDER BY seq LIMIT ?",
+                (value, after, limit)).fetchall()
+        return [self._entry(row) for row in rows]
+
+    @timed("audit", "by_loan")
+    def by_loan(self, loan_id: str, limit: int = 100, after: int = 0) -> List[AuditEntry]:
+        return self._query("loan_id", loan_id, limit, after)
+
+    @timed("audit", "by_actor")
+    def by_actor(self, actor: str, limit: int = 100, after: int = 0) -> List[AuditEntry]:
+        return self._query("actor", actor, limit, after)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM loan_audit").fetchone()[0]
+
+    def explain(self, column: str) -> str:
+        """
+        Query plan of a lookup (to check the index is used).
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                f"EXPLAIN QUERY PLAN SELECT {COLUMNS} FROM loan_audit WHERE {column} = ? AND seq > ?"
+                " ORDER BY seq LIMIT ?", ("x", 0, 1)).fetchall()
+        return " | ".join(row[-1] for row in rows)
@@ -0,0 +1,192 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional, Tuple
+from uuid import UUID
+
+from auth.user_repository import User, UserRepository
+from infrastructure.metrics import timed
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id TEXT PRIMARY KEY,
+    username TEXT NOT NULL UNIQUE,
+    hashed_password TEXT NOT NULL,
+    role TEXT NOT NULL,
+    disabled INTEGER NOT NULL DEFAULT 0,
+    refresh_generation INTEGER NOT NULL DEFAULT 0,
+    refresh_counter INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+# kolom yang ditambahkan setelah versi pertama tabel (file database lama)
+MIGRATIONS = (
+    ("refresh_generation", "ALTER TABLE users ADD COLUMN refresh_generation INTEGER NOT NULL DEFAULT 0"),
+    ("refresh_counter", "ALTER TABLE users ADD COLUMN refresh_counter INTEGER NOT NULL DEFAULT 0"),
+)
+
+COLUMNS = "user_id, username, hashed_password, role, disabled, refresh_generation, refresh_counter"
+INSERT = f"INSERT OR REPLACE INTO users ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)"
+
+
+class SqliteUserRepository(UserRepository):
+    """
+    Users in SQLite. user_id is the primary key and username has a UNIQUE
+    index, so both lookups are index probes. Reads go through a small LRU
+    cache that is refreshed on add/update from this process. Entries are
+    re-read after `cache_ttl` seconds, so a disable or role change made by
+    another worker is seen within that window.
+
+    The refresh generation/counter are changed with a conditional UPDATE in
+    the database itself, so every process sharing the file sees a logout or
+    rotation at once (the cached copies are only updated for this process).
+    """
+
+    def __init__(self, path: str = ":memory:", cache_size: int = 10000, cache_ttl: float = 5.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.path = path
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.clock = clock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(SCHEMA)
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(users)")}
+        for column, ddl in MIGRATIONS:
+            if column not in existing:
+                self._conn.execute(ddl)
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._by_username: "OrderedDict[str, User]" = OrderedDict()
+        self._by_id: "OrderedDict[UUID, User]" = OrderedDict()
+        # username -> waktu (clock) entry cache harus dibaca ulang dari database
+        self._expires: Dict[str, float] = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @staticmethod
+    def _row(user: User) -> tuple:
+        return (str(user.user_id), user.username, user.hashed_password, user.role, int(user.disabled),
+                user.refresh_generation, user.refresh_counter)
+
+    @staticmethod
+    def _user(row) -> User:
+        return User(UUID(row[0]), row[1], row[2], row[3], bool(row[4]), row[5], row[6])
+
+    def _cache(self, user: User) -> None:
+        self._evict(user.username)
+        stale = self._by_id.pop(user.user_id, None)
+        if stale is not None:
+            self._evict(stale.username)
+        self._by_username[user.username] = user
+        self._by_id[user.user_id] = user
+        self._expires[user.username] = self.clock() + self.cache_ttl
+        while len(self._by_username) > self.cache_size:
+            name, evicted = self._by_username.popitem(last=False)
+            self._by_id.pop(evicted.user_id, None)
+            self._expires.pop(name, None)
+
+    def _evict(self, username: str) -> None:
+        old = self._by_username.pop(username, None)
+        if old is not None:
+            self._by_id.pop(old.user_id, None)
+        self._expires.pop(username, None)
+
+    @timed("user_sqlite", "add")
+    def add(self, user: User) -> User:
+        # REPLACE juga menghapus baris lain dengan username yang sama (UNIQUE)
+        with self._lock:
+            self._conn.execute(INSERT, self._row(user))
+            self._conn.commit()
+            self._cache(user)
+        return user
+
+    @timed("user_sqlite", "add_many")
+    def add_many(self, users: Iterable[User]) -> int:
+        """
+        Bulk insert in one transaction (no cache warm-up).
+        """
+        rows = [self._row(u) for u in users]
+        with self._lock:
+            self._conn.executemany(INSERT, rows)
+            self._conn.commit()
+            self._by_username.clear()
+            self._by_id.clear()
+            self._expires.clear()
+        return len(rows)
+
+    @timed("user_sqlite", "update")
+    def update(self, user: User) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE users SET username = ?, hashed_password = ?, role = ?, disabled = ? WHERE user_id = ?",
+                (user.username, user.hashed_password, user.role, int(user.disabled), str(user.user_id)),
+            )
+            self._conn.commit()
+            self._cache(user)
+
+    def _fetch(self, cache: OrderedDict, key, sql: str, param) -> Optional[User]:
+        with self._lock:
+            user = cache.get(key)
+            if user is not None:
+                if self.clock() < self._expires.get(user.username, 0.0):
+                    self._by_username.move_to_end(user.username)
+                    self._by_id.move_to_end(user.user_id)
+                    self.cache_hits += 1
+                    return user
+                # kedaluwarsa: worker lain mungkin sudah mengubah user ini
+                self._evict(user.username)
+            self.cache_misses += 1
+            row = self._conn.execute(sql, (param,)).fetchone()
+            if row is None:
+                return None
+            user = self._user(row)
+            self._cache(user)
+            return user
+
+    @timed("user_sqlite", "get_by_username")
+    def get_by_username(self, username: str) -> Optional[User]:
+        return self._fetch(self._by_username, username,
+                           f"SELECT {COLUMNS} FROM users WHERE username = ?", username)
+
+    @timed("user_sqlite", "get_by_id")
+    def get_by_id(self, user_id: UUID) -> Optional[User]:
+        return self._fetch(self._by_id, user_id,
+                           f"SELECT {COLUMNS} FROM users WHERE user_id = ?", str(user_id))
+
+    def _refresh_update(self, assignment: str, username: str, generation: Optional[int],
+                        counter: Optional[int]):
+        sql = f"UPDATE users SET {assignment} WHERE username = ?"
+        params: tuple = (username,)
+        if generation is not None:
+            sql += " AND refresh_generation = ? AND refresh_counter = ?"
+            params += (generation, counter)
+        with self._lock:
+            row = self._conn.execute(sql + " RETURNING refresh_generation, refresh_counter", params).fetchone()
+            self._conn.commit()
+            cached = self._by_username.get(username)
+            if row is not None and cached is not None:
+                cached.refresh_generation, cached.refresh_counter = row
+        return row
+
+    @timed("user_sqlite", "advance_refresh_counter")
+    def advance_refresh_counter(self, username: str, generation: Optional[int] = None,
+                                counter: Optional[int] = None) -> Optional[Tuple[int, int]]:
+        row = self._refresh_update("refresh_counter = refresh_counter + 1", username, generation, counter)
+        return None if row is None else (row[0], row[1])
+
+    @timed("user_sqlite", "bump_refresh_generation")
+    def bump_refresh_generation(self, username: str, generation: Optional[int] = None,
+                                counter: Optional[int] = None) -> Optional[int]:
+        row = self._refresh_update("refresh_generation = refresh_generation + 1", username, generation, counter)
+        return None if row is None else row[0]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
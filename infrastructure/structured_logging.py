@@ -0,0 +1,210 @@
+"""
+Structured (JSON lines) logging that never blocks the request path.
+
+QueueLogHandler puts records on a bounded in-memory queue (an O(1) append,
+no handler lock, no I/O); BatchLogWriter drains it on a background thread,
+formats the records with JsonFormatter and writes each batch with one
+write() + flush(). When the queue is full records are dropped and counted
+per level instead of waiting for the disk or the terminal.
+
+Structured fields travel in `extra={"fields": {...}}`; `log_event()` does
+that and skips building the record when the level is disabled. Message
+arguments and exception tracebacks are rendered on the caller's thread
+(cheap, and later mutation of the arguments cannot change the line); the
+JSON encoding and the I/O happen on the writer thread.
+"""
+import json
+import logging
+import sys
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, TextIO
+
+from infrastructure.metrics import REGISTRY, CallbackMetric
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, separators=(",", ":"), default=str)
+
+
+class BatchLogWriter:
+    """
+    Bounded queue + writer thread. enqueue() is O(1) and never blocks.
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None, path: Optional[str] = None,
+                 formatter: Optional[logging.Formatter] = None, max_queue: int = 10000,
+                 batch_size: int = 256, interval: float = 0.5):
+        self.stream = stream
+        self.path = path
+        self.formatter = formatter or JsonFormatter()
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.interval = interval
+        self.queue: deque = deque()
+        self.written = 0
+        self.failed = 0
+        self.dropped: Dict[str, int] = {}
+        self._file: Optional[TextIO] = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+            self._thread.start()
+
+    def enqueue(self, record: logging.LogRecord) -> bool:
+        # len() + append tanpa lock: paling buruk antrean lewat sedikit dari max_queue
+        if len(self.queue) >= self.max_queue:
+            level = record.levelname
+            self.dropped[level] = self.dropped.get(level, 0) + 1
+            return False
+        self.queue.append(record)
+        if len(self.queue) >= self.batch_size:
+            self._wake.set()
+        return True
+
+    def _output(self) -> TextIO:
+        if self.stream is not None:
+            return self.stream
+        if self.path:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            return self._file
+        return sys.stdout
+
+    def flush(self) -> int:
+        """
+        Write everything queued so far (in batches); returns records written.
+        """
+        total = 0
+        with self._write_lock:
+            while self.queue:
+                lines: List[str] = []
+                while self.queue and len(lines) < self.batch_size:
+                    record = self.queue.popleft()
+                    try:
+                        lines.append(self.formatter.format(record))
+                    except Exception:
+                        self.failed += 1
+                if not lines:
+                    continue
+                try:
+                    out = self._output()
+                    out.write("\n".join(lines) + "\n")
+                    out.flush()
+                    self.written += len(lines)
+                    total += len(lines)
+                except Exception:
+                    # disk penuh/stdout tertutup tidak boleh menghentikan thread writer
+                    self.failed += len(lines)
+        return total
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def stats(self) -> dict:
+        return {
+            "queued": len(self.queue),
+            "written": self.written,
+            "dropped": sum(self.dropped.values()),
+            "dropped_by_level": dict(self.dropped),
+            "failed": self.failed,
+        }
+
+
+class QueueLogHandler(logging.Handler):
+    """
+    Hands records to a BatchLogWriter; never formats to JSON or does I/O.
+    """
+
+    def __init__(self, writer: BatchLogWriter, level: int = logging.NOTSET):
+        super().__init__(level)
+        self.writer = writer
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        # tanpa self.lock: enqueue sudah aman dipanggil dari banyak thread
+        if not self.filter(record):
+            return False
+        self.emit(record)
+        return True
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if record.args:
+            record.msg, record.args = record.getMessage(), None
+        if record.exc_info:
+            # traceback menahan frame (dan semua local-nya) sampai record ditulis
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        self.writer.enqueue(record)
+
+
+def configure_logging(writer: BatchLogWriter, level: str = "INFO",
+                      logger: Optional[logging.Logger] = None) -> QueueLogHandler:
+    """
+    Route `logger` (root by default) through `writer`; idempotent.
+    """
+    logger = logger or logging.getLogger()
+    for handler in logger.handlers:
+        if isinstance(handler, QueueLogHandler) and handler.writer is writer:
+            return handler
+    handler = QueueLogHandler(writer)
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    writer.start()
+    return handler
+
+
+def log_event(logger: logging.Logger, event: str, level: int = logging.INFO, **fields) -> None:
+    """
+    Structured record `event` with `fields`; free when `level` is disabled.
+    """
+    if logger.isEnabledFor(level):
+        logger.log(level, event, extra={"fields": fields})
+
+
+def register_logging_metrics(writer: BatchLogWriter, registry=REGISTRY) -> None:
+    registry.register(CallbackMetric(
+        "bookwise_log_records_total", "Structured log records by outcome", ("outcome",),
+        lambda: [(("written",), writer.written), (("failed",), writer.failed)], kind="counter"))
+    registry.register(CallbackMetric(
+        "bookwise_log_records_dropped_total", "Log records dropped because the queue was full",
+        ("level",), lambda: [((level,), count) for level, count in list(writer.dropped.items())],
+        kind="counter"))
+    registry.register(CallbackMetric(
+        "bookwise_log_queue_depth", "Log records waiting for the writer thread", (),
+        lambda: [((), len(writer.queue))]))
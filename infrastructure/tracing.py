@@ -0,0 +1,302 @@
+"""
+OpenTelemetry-style request traces without the OpenTelemetry SDK.
+
+A trace is one server span per request plus one child span per closed
+phase (jwt, user, repo, serialize, handler, validate; see phase_timing),
+nested the same way the phases were. Finished traces are queued on a
+BatchSpanProcessor; a background thread converts them to OTLP/JSON
+(ExportTraceServiceRequest) and hands batches to an exporter:
+
+    FileSpanExporter      one OTLP/JSON document per line
+    OtlpHttpSpanExporter  POST to an OTLP/HTTP JSON receiver, e.g. an
+                          OpenTelemetry Collector on :4318 or
+                          scripts/trace_collector.py
+
+Sampling is head (TRACE_SAMPLE_RATIO) plus tail-on-slow: unsampled
+requests still collect phase tuples, and are exported if they took
+longer than TRACE_SLOW_MS or failed with a 5xx. The sampled flag of an
+incoming W3C traceparent is client input: it can only add head-sampled
+requests up to TRACE_PARENT_SAMPLED_PER_SEC (-1 = follow it fully, for
+traceparents set by a trusted gateway), so a client cannot force every
+request to be traced and exported. The request path never does I/O; when the queue is
+full traces are dropped and counted.
+"""
+import json
+import random
+import threading
+import time
+import urllib.request
+from collections import deque
+from typing import List, Optional, Tuple
+
+SERVER = 2    # SpanKind
+INTERNAL = 1
+STATUS_UNSET = 0
+STATUS_ERROR = 2
+
+
+def new_trace_id() -> str:
+    return "%032x" % random.getrandbits(128)
+
+
+def new_span_id() -> str:
+    return "%016x" % random.getrandbits(64)
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """
+    (trace_id, parent span id, sampled) from a W3C traceparent header.
+    """
+    if not value:
+        return None
+    parts = value.strip().split("-")
+    if len(parts) < 4 or len(parts[0]) != 2 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    version, trace_id, span_id, flags = parts[:4]
+    try:
+        int(trace_id, 16), int(span_id, 16)
+        sampled = bool(int(flags, 16) & 1)
+    except ValueError:
+        return None
+    if version == "ff" or trace_id == "0" * 32 or span_id == "0" * 16:
+        return None
+    return trace_id.lower(), span_id.lower(), sampled
+
+
+class Sampler:
+    def __init__(self, ratio: float, slow_seconds: float, parent_per_second: float = 0):
+        self.ratio = ratio
+        self.slow_seconds = slow_seconds
+        # token bucket untuk flag sampled dari klien; < 0 = percaya penuh
+        self.parent_per_second = parent_per_second
+        self._parent_tokens = max(parent_per_second, 0.0)
+        self._parent_refilled = time.monotonic()
+
+    @property
+    def tail(self) -> bool:
+        return self.slow_seconds > 0
+
+    def head(self, parent_sampled: Optional[bool] = None) -> bool:
+        if parent_sampled is not None and self.parent_per_second < 0:
+            return parent_sampled
+        if self.ratio >= 1.0 or (self.ratio > 0 and random.random() < self.ratio):
+            return True
+        return bool(parent_sampled) and self._take_parent_token()
+
+    def _take_parent_token(self) -> bool:
+        now = time.monotonic()
+        self._parent_tokens = min(self.parent_per_second,
+                                  self._parent_tokens + (now - self._parent_refilled) * self.parent_per_second)
+        self._parent_refilled = now
+        if self._parent_tokens >= 1:
+            self._parent_tokens -= 1
+            return True
+        return False
+
+    def keep(self, head_sampled: bool, duration: float, status: int) -> bool:
+        if head_sampled:
+            return True
+        return self.tail and (duration >= self.slow_seconds or status >= 500)
+
+
+class FinishedTrace:
+    """
+    Raw request data; converted to OTLP spans on the export thread.
+    """
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "epoch_ns", "start",
+                 "end", "attributes", "status", "phases", "reason")
+
+    def __init__(self, trace_id, span_id, parent_id, name, epoch_ns, start, end,
+                 attributes, status, phases, reason):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.epoch_ns = epoch_ns      # time.time_ns() pada `start`
+        self.start = start            # perf_counter()
+        self.end = end
+        self.attributes = attributes
+        self.status = status
+        self.phases = phases
+        self.reason = reason
+
+    def _ns(self, t: float) -> str:
+        return str(self.epoch_ns + int((t - self.start) * 1e9))
+
+    def to_spans(self) -> List[dict]:
+        attributes = dict(self.attributes, **{"bookwise.sampled_by": self.reason})
+        root = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": SERVER,
+            "startTimeUnixNano": self._ns(self.start),
+            "endTimeUnixNano": self._ns(self.end),
+            "attributes": _attributes(attributes),
+            "status": {"code": STATUS_ERROR if self.status >= 500 else STATUS_UNSET},
+        }
+        if self.parent_id:
+            root["parentSpanId"] = self.parent_id
+        spans = [root]
+        ids = {}
+        for phase, _, _, _, _ in self.phases:
+            ids[id(phase)] = new_span_id()
+        for phase, parent, start, end, failed in self.phases:
+            span = {
+                "traceId": self.trace_id,
+                "spanId": ids[id(phase)],
+                "parentSpanId": ids.get(id(parent), self.span_id) if parent is not None else self.span_id,
+                "name": f"{phase.name} {phase.label}" if phase.label else phase.name,
+                "kind": INTERNAL,
+                "startTimeUnixNano": self._ns(start),
+                "endTimeUnixNano": self._ns(end),
+                "attributes": _attributes({"bookwise.phase": phase.name, "thread.id": phase.thread}),
+                "status": {"code": STATUS_ERROR if failed else STATUS_UNSET},
+            }
+            spans.append(span)
+        return spans
+
+
+def _attributes(values: dict) -> List[dict]:
+    result = []
+    for key, value in values.items():
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            typed = {"boolValue": value}
+        elif isinstance(value, int):
+            typed = {"intValue": str(value)}
+        elif isinstance(value, float):
+            typed = {"doubleValue": value}
+        else:
+            typed = {"stringValue": str(value)}
+        result.append({"key": key, "value": typed})
+    return result
+
+
+def to_otlp(traces: List[FinishedTrace], service_name: str) -> dict:
+    spans = []
+    for trace in traces:
+        spans.extend(trace.to_spans())
+    return {"resourceSpans": [{
+        "resource": {"attributes": _attributes({"service.name": service_name})},
+        "scopeSpans": [{"scope": {"name": "bookwise.tracing"}, "spans": spans}],
+    }]}
+
+
+# ================================================================
+# EXPORTERS
+# ================================================================
+class FileSpanExporter:
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, payload: dict) -> None:
+        line = json.dumps(payload, separators=(",", ":"))
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+class OtlpHttpSpanExporter:
+    def __init__(self, endpoint: str, timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.timeout = timeout
+
+    def export(self, payload: dict) -> None:
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(payload, separators=(",", ":")).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class BatchSpanProcessor:
+    """
+    Bounded queue + export thread. enqueue() is O(1) and never blocks.
+    """
+
+    def __init__(self, exporter, service_name: str = "bookwise", max_queue: int = 2048,
+                 batch_size: int = 512, interval: float = 2.0):
+        self.exporter = exporter
+        self.service_name = service_name
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.interval = interval
+        self.queue: deque = deque()
+        self.exported = 0
+        self.dropped = 0
+        self.failed = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._export_lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+            self._thread.start()
+
+    def enqueue(self, trace: FinishedTrace) -> bool:
+        # len() + append tanpa lock: paling buruk antrean lewat sedikit dari max_queue
+        if len(self.queue) >= self.max_queue:
+            self.dropped += 1
+            return False
+        self.queue.append(trace)
+        if len(self.queue) >= self.batch_size:
+            self._wake.set()
+        return True
+
+    def flush(self) -> int:
+        """
+        Export everything queued so far (in batches); returns traces exported.
+        """
+        total = 0
+        with self._export_lock:
+            while self.queue:
+                batch = []
+                while self.queue and len(batch) < self.batch_size:
+                    batch.append(self.queue.popleft())
+                try:
+                    self.exporter.export(to_otlp(batch, self.service_name))
+                    self.exported += len(batch)
+                    total += len(batch)
+                except Exception:
+                    # collector mati/lambat tidak boleh menghentikan thread export
+                    self.failed += len(batch)
+        return total
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "queued": len(self.queue),
+            "exported": self.exported,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+
+def epoch_ns_at(perf: float) -> int:
+    """
+    Wall-clock ns corresponding to a perf_counter() reading.
+    """
+    return time.time_ns() - int((time.perf_counter() - perf) * 1e9)
@@ -1,79 +1,27 @@
+import os
 import sys
 from pathlib import Path
 
-# Add project root to import path
-sys.path.insert(0, str(Path(__file__).resolve().parent))
+# Add project root to import path (di dalam if supaya tetap di "blok import", tanpa E402)
+if str(Path(__file__).resolve().parent) not in sys.path:
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
 
-from fastapi import FastAPI
-from fastapi.openapi.utils import get_openapi
-from fastapi.security import HTTPBearer
+from middleware.lazy_app import LazyApp, json_response
 
-from api.loan_router import router as loan_router
-from auth.auth_router import router as auth_router
+# aplikasi FastAPI ada di application.py dan baru diimpor saat dibutuhkan (cold start)
+LAZY_APP_PRELOAD = os.getenv("LAZY_APP_PRELOAD", "true").lower() == "true"
 
-app = FastAPI(
-    title="BookWise - Lending BC (with Auth)",
-    description="API for BookWise digital book lending platform",
-    version="1.0.0"
+app = LazyApp(
+    "application:app",
+    instant={"/health": json_response({"status": "ok"})},
+    preload=LAZY_APP_PRELOAD,
 )
 
-bearer_scheme = HTTPBearer()
-
-@app.get("/")
-def root():
-    return {
-        "message": "BookWise API is running",
-        "status": "healthy",
-        "endpoints": {
-            "docs": "/docs",
-            "redoc": "/redoc",
-            "auth": "/auth/*",
-            "loans": "/loans/*"
-        }
-    }
-
-@app.get("/health")
-def health_check():
-    return {"status": "ok"}
-
-# Routers
-app.include_router(auth_router)
-app.include_router(loan_router)
-
 
 def custom_openapi():
-    if app.openapi_schema:
-        return app.openapi_schema
-
-    openapi_schema = get_openapi(
-        title="BookWise - Lending BC (with Auth)",
-        version="1.0.0",
-        description="Digital book lending platform with JWT authentication",
-        routes=app.routes,
-    )
-
-    openapi_schema.setdefault("components", {})
-    openapi_schema["components"].setdefault("securitySchemes", {})
-
-    openapi_schema["components"]["securitySchemes"]["BearerAuth"] = {
-        "type": "http",
-        "scheme": "bearer",
-        "bearerFormat": "JWT",
-        "description": "Enter your JWT token"
-    }
-
-    for path, path_item in openapi_schema["paths"].items():
-        for method, details in path_item.items():
-            if method in ["get", "post", "put", "patch", "delete"]:
-                # Skip auth/login
-                if "/auth/login" not in path:
-                    details.setdefault("security", [{"BearerAuth": []}])
-
-    app.openapi_schema = openapi_schema
-    return openapi_schema
-
+    # schema OpenAPI app asli (application.custom_openapi); memuat app kalau belum
+    return app.openapi()
 
-app.openapi = custom_openapi
 
 # Vercel handler
 handler = app
@@ -0,0 +1,70 @@
+# middleware/access_log.py
+"""
+Structured access log: one JSON line per request (see
+infrastructure/structured_logging). The request path only builds a small
+dict and appends a record to the writer's queue; encoding and I/O happen
+on the log-writer thread.
+"""
+import logging
+import os
+from time import perf_counter
+
+from infrastructure.structured_logging import BatchLogWriter
+from middleware.slow_requests import request_principal
+
+STRUCTURED_LOGGING_ENABLED = os.getenv("STRUCTURED_LOGGING_ENABLED", "false").lower() == "true"
+ACCESS_LOG_ENABLED = os.getenv("ACCESS_LOG_ENABLED", "true").lower() == "true"
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FILE = os.getenv("LOG_FILE", "")  # kosong = stdout
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", "256"))
+LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", "0.5"))
+
+# thread writer baru jalan saat configure_logging(); main.py memanggil shutdown() di lifespan
+LOG_WRITER = BatchLogWriter(
+    path=LOG_FILE or None,
+    max_queue=LOG_QUEUE_SIZE,
+    batch_size=LOG_BATCH_SIZE,
+    interval=LOG_FLUSH_INTERVAL,
+)
+
+access_logger = logging.getLogger("bookwise.access")
+
+
+class AccessLogMiddleware:
+    def __init__(self, app, logger: logging.Logger = access_logger):
+        self.app = app
+        self.logger = logger
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.logger.isEnabledFor(logging.INFO):
+            return await self.app(scope, receive, send)
+        start = perf_counter()
+        status = [500]
+        size = [0]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            elif message["type"] == "http.response.body":
+                size[0] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = perf_counter() - start
+            route = scope.get("route")
+            role, principal = request_principal(scope)
+            client = scope.get("client")
+            self.logger.info("access", extra={"fields": {
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": route.path if route is not None else None,
+                "status": status[0],
+                "duration_ms": round(duration * 1000, 3),
+                "bytes": size[0],
+                "role": role,
+                "principal": principal,
+                "client": client[0] if client else None,
+            }})
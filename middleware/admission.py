@@ -0,0 +1,210 @@
+# middleware/admission.py
+"""
+Admission control: cap in-flight requests with an AIMD concurrency limit.
+
+Requests over the limit wait in a short bounded queue; when the queue is
+full or the wait exceeds max_queue_wait they get 503 + Retry-After right
+away instead of piling up behind slow requests on the threadpool. The
+limit grows by ~1 per `limit` fast completions and is multiplied by
+`backoff` (at most once per latency_target) when a request is slower than
+latency_target or a queued request times out.
+
+Routes that are slow by design (bcrypt-bound POST /auth/login) get their
+own latency class (ADMISSION_LATENCY_CLASSES, `path=ms`): their samples
+are compared against that target instead, so a burst of logins alone
+does not shrink the limit for every other route.
+"""
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, Optional
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "false").lower() == "true"
+ADMISSION_INITIAL_LIMIT = int(os.getenv("ADMISSION_INITIAL_LIMIT", "20"))
+ADMISSION_MIN_LIMIT = int(os.getenv("ADMISSION_MIN_LIMIT", "2"))
+ADMISSION_MAX_LIMIT = int(os.getenv("ADMISSION_MAX_LIMIT", "200"))
+ADMISSION_LATENCY_TARGET_MS = float(os.getenv("ADMISSION_LATENCY_TARGET_MS", "250"))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "50"))
+ADMISSION_MAX_QUEUE_WAIT_MS = float(os.getenv("ADMISSION_MAX_QUEUE_WAIT_MS", "100"))
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "1"))
+# path persis, atau prefix jika diakhiri "*"
+ADMISSION_EXEMPT = os.getenv("ADMISSION_EXEMPT", "/health,/metrics,/admin/*")
+# target latensi sendiri untuk route yang memang lambat: path=ms (prefix jika diakhiri "*")
+ADMISSION_LATENCY_CLASSES = os.getenv("ADMISSION_LATENCY_CLASSES", "/auth/login=2000")
+
+
+class AimdLimit:
+    def __init__(self, initial: int = ADMISSION_INITIAL_LIMIT, min_limit: int = ADMISSION_MIN_LIMIT,
+                 max_limit: int = ADMISSION_MAX_LIMIT,
+                 latency_target: float = ADMISSION_LATENCY_TARGET_MS / 1000,
+                 backoff: float = 0.9, clock: Callable[[], float] = time.monotonic):
+        self.value = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.clock = clock
+        self._last_decrease = float("-inf")
+
+    def __int__(self) -> int:
+        return int(self.value)
+
+    def on_sample(self, latency: float, overloaded: bool = False,
+                  target: Optional[float] = None) -> None:
+        if overloaded or latency > (self.latency_target if target is None else target):
+            now = self.clock()
+            # satu kali turun per "RTT" supaya burst sampel lambat tidak membuat limit kolaps
+            if now - self._last_decrease >= self.latency_target:
+                self.value = max(self.min_limit, self.value * self.backoff)
+                self._last_decrease = now
+        else:
+            self.value = min(self.max_limit, self.value + 1 / self.value)
+
+
+def parse_exempt(spec: str) -> tuple:
+    exact, prefixes = set(), []
+    for item in (s.strip() for s in spec.split(",")):
+        if item.endswith("*"):
+            prefixes.append(item[:-1])
+        elif item:
+            exact.add(item)
+    return frozenset(exact), tuple(prefixes)
+
+
+def parse_latency_classes(spec: str) -> tuple:
+    """
+    "/auth/login=2000,/reports/*=5000" -> ({path: seconds}, ((prefix, seconds), ...)).
+    """
+    exact, prefixes = {}, []
+    for item in (s.strip() for s in spec.split(",")):
+        if not item:
+            continue
+        path, _, target_ms = item.rpartition("=")
+        target = float(target_ms) / 1000
+        if path.endswith("*"):
+            prefixes.append((path[:-1], target))
+        else:
+            exact[path] = target
+    return exact, tuple(prefixes)
+
+
+class AdmissionControlMiddleware:
+    def __init__(self, app, limit: AimdLimit = None, max_queue: int = ADMISSION_MAX_QUEUE,
+                 max_queue_wait: float = ADMISSION_MAX_QUEUE_WAIT_MS / 1000,
+                 retry_after: int = ADMISSION_RETRY_AFTER, exempt: Iterable[str] = None,
+                 latency_classes: Optional[Dict[str, float]] = None):
+        self.app = app
+        self.limit = limit if limit is not None else AimdLimit()
+        self.max_queue = max_queue
+        self.max_queue_wait = max_queue_wait
+        self.retry_after = retry_after
+        self.exempt, self.exempt_prefixes = parse_exempt(
+            ADMISSION_EXEMPT if exempt is None else ",".join(exempt))
+        self.latency_classes, self.latency_class_prefixes = parse_latency_classes(
+            ADMISSION_LATENCY_CLASSES if latency_classes is None
+            else ",".join(f"{path}={target * 1000}" for path, target in latency_classes.items()))
+        self.in_flight = 0
+        self._waiters: deque = deque()
+        self.admitted = 0
+        self.rejected = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+
+    def _is_exempt(self, path: str) -> bool:
+        return path in self.exempt or path.startswith(self.exempt_prefixes)
+
+    def _latency_target(self, path: str) -> Optional[float]:
+        target = self.latency_classes.get(path)
+        if target is None:
+            for prefix, prefix_target in self.latency_class_prefixes:
+                if path.startswith(prefix):
+                    return prefix_target
+        return target
+
+    async def _admit(self) -> bool:
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return True
+        if len(self._waiters) >= self.max_queue:
+            return False
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        started = time.monotonic()
+        try:
+            # slot diserahkan langsung oleh _release (in_flight sudah dinaikkan)
+            await asyncio.wait_for(asyncio.shield(waiter), self.max_queue_wait)
+        except asyncio.TimeoutError:
+            if not waiter.done():
+                self._drop_waiter(waiter)
+                self.limit.on_sample(self.max_queue_wait, overloaded=True)
+                return False
+            # slot sempat diserahkan tepat saat timeout
+        except asyncio.CancelledError:
+            # client putus saat antri: kembalikan slot jika sudah diserahkan
+            if waiter.done():
+                self._handoff(-1)
+            else:
+                self._drop_waiter(waiter)
+            raise
+        self._record_wait(time.monotonic() - started)
+        return True
+
+    def _drop_waiter(self, waiter) -> None:
+        waiter.cancel()
+        self._waiters.remove(waiter)
+
+    def _record_wait(self, waited: float) -> None:
+        self.queue_wait_total += waited
+        if waited > self.queue_wait_max:
+            self.queue_wait_max = waited
+
+    def _release(self, latency: float, target: Optional[float] = None) -> None:
+        self.limit.on_sample(latency, target=target)
+        self._handoff(-1)
+
+    def _handoff(self, delta: int) -> None:
+        self.in_flight += delta
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self._is_exempt(scope["path"]):
+            return await self.app(scope, receive, send)
+        if not await self._admit():
+            self.rejected += 1
+            return await self._reject(send)
+        self.admitted += 1
+        started = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self._release(time.monotonic() - started, self._latency_target(scope["path"]))
+
+    async def _reject(self, send):
+        body = json.dumps({"detail": "Server overloaded, retry later"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(self.retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "queue_wait_avg": self.queue_wait_total / self.admitted if self.admitted else 0.0,
+            "queue_wait_max": self.queue_wait_max,
+        }
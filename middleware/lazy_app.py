@@ -0,0 +1,153 @@
+# middleware/lazy_app.py
+"""
+ASGI entry point that imports the real application on first use.
+
+Importing the FastAPI app (FastAPI + pydantic model building, routers,
+python-jose, ...) takes most of a cold start. LazyApp only needs the
+standard library: it answers a few fixed `instant` responses (GET
+/health) itself until the real app is loaded, and loads it
+  * on the first other request (serverless: the request that needs it
+    pays for the import, a /health probe does not), or
+  * in a worker thread during lifespan startup when `preload` is set
+    (long-running server). Startup completes only after the real app
+    has been imported and started, so an import error or a failed
+    startup is reported as lifespan.startup.failed and stops the server.
+Once loaded every request, /health included, goes to the real app. If
+the server runs a lifespan, the real app's lifespan is started once it
+is loaded (before it serves anything) and stopped from LazyApp's. If
+loading or starting the real app fails, the instant responses turn into
+503 and every other request fails, instead of reporting healthy.
+Attribute access (app.routes, app.openapi, ...) loads it too.
+"""
+import asyncio
+import importlib
+import json
+import threading
+from typing import Dict, Optional, Tuple
+
+
+def json_response(payload, status: int = 200) -> Tuple[int, bytes]:
+    return status, json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+UNAVAILABLE = json_response({"status": "unavailable"}, 503)
+
+
+class LazyApp:
+    def __init__(self, target: str, instant: Optional[Dict[str, Tuple[int, bytes]]] = None,
+                 preload: bool = True):
+        self.target = target  # "module:attribute"
+        self.instant = instant or {}
+        self.preload = preload
+        self._app = None
+        self._lock = threading.Lock()
+        # exception saat import/startup app asli; setelah itu app dianggap mati
+        self.failed: Optional[BaseException] = None
+        # diisi selama lifespan server berjalan
+        self._lifespan_scope = None
+        self._starting: Optional[asyncio.Future] = None
+        self._inner_task: Optional[asyncio.Future] = None
+        self._inner_events: Optional[asyncio.Queue] = None
+        self._inner_replies: Optional[asyncio.Queue] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._app is not None
+
+    def load(self):
+        if self._app is None:
+            with self._lock:
+                if self._app is None:
+                    module, _, attribute = self.target.partition(":")
+                    self._app = getattr(importlib.import_module(module), attribute)
+        return self._app
+
+    def __getattr__(self, name):
+        # hanya dipanggil untuk atribut yang tidak ada di LazyApp sendiri
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+    async def _load_async(self):
+        if self._app is None:
+            # import di thread lain supaya event loop tetap melayani /health
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, self.load)
+            except Exception as exc:
+                self.failed = exc
+                raise
+        return self._app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self._lifespan(scope, receive, send)
+        if (self._app is None or self.failed is not None) and scope["type"] == "http" \
+                and scope["method"] in ("GET", "HEAD"):
+            instant = self.instant.get(scope["path"])
+            if instant is not None:
+                return await self._respond(scope, send, *(UNAVAILABLE if self.failed is not None else instant))
+        if self.failed is not None:
+            raise RuntimeError("Application failed to start") from self.failed
+        if self._lifespan_scope is not None:
+            # server dengan lifespan: app asli dipakai setelah startup-nya selesai
+            await self._start_inner()
+        app = await self._load_async()
+        await app(scope, receive, send)
+
+    @staticmethod
+    async def _respond(scope, send, status: int, body: bytes) -> None:
+        await send({"type": "http.response.start", "status": status, "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("latin-1")),
+        ]})
+        await send({"type": "http.response.body", "body": b"" if scope["method"] == "HEAD" else body})
+
+    def _start_inner(self) -> "asyncio.Future":
+        if self._starting is None:
+            self._starting = asyncio.ensure_future(self._run_inner_startup())
+        return self._starting
+
+    async def _run_inner_startup(self):
+        app = await self._load_async()
+        await self._inner_events.put({"type": "lifespan.startup"})
+        self._inner_task = asyncio.ensure_future(
+            app(dict(self._lifespan_scope), self._inner_events.get, self._inner_replies.put))
+        reply = await self._inner_replies.get()
+        if reply["type"] != "lifespan.startup.complete":
+            self.failed = RuntimeError(f"Application startup failed: {reply.get('message', '')}")
+            # lifespan app asli raise setelah startup.failed; diambil supaya tidak jadi warning
+            await asyncio.gather(self._inner_task, return_exceptions=True)
+            raise self.failed
+
+    async def _lifespan(self, scope, receive, send):
+        message = await receive()
+        if message["type"] != "lifespan.startup":
+            return
+        # lifespan app asli dijalankan lewat antrean sendiri, saat app itu dimuat
+        self._lifespan_scope = scope
+        self._inner_events = asyncio.Queue()
+        self._inner_replies = asyncio.Queue()
+        if self.preload:
+            try:
+                await self._start_inner()
+            except Exception as exc:
+                # server berhenti, bukan jalan terus dengan /health palsu
+                await send({"type": "lifespan.startup.failed", "message": f"{type(exc).__name__}: {exc}"})
+                raise
+        await send({"type": "lifespan.startup.complete"})
+
+        await receive()  # lifespan.shutdown
+        try:
+            if self._starting is not None:
+                try:
+                    await self._starting
+                except Exception:
+                    # startup gagal (sudah dilaporkan ke request): tidak ada yang perlu dihentikan
+                    pass
+                else:
+                    await self._inner_events.put({"type": "lifespan.shutdown"})
+                    await self._inner_replies.get()
+                    await self._inner_task
+        finally:
+            self._lifespan_scope = self._starting = self._inner_task = None
+        await send({"type": "lifespan.shutdown.complete"})
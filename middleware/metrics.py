@@ -0,0 +1,117 @@
+# middleware/metrics.py
+"""
+Pure ASGI request metrics plus the Prometheus `/metrics` endpoint.
+
+Requests are labelled by route template (`/loans/{loan_id}`), read from
+the route FastAPI stores in the scope, so label cardinality stays bounded;
+unmatched paths share one `<unmatched>` label.
+"""
+import os
+from time import perf_counter
+
+from infrastructure.metrics import REGISTRY, CallbackMetric, Counter, Gauge, Histogram, Registry
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+METRICS_PATH = os.getenv("METRICS_PATH", "/metrics")
+# diisi saat jalan dengan beberapa worker uvicorn: tiap worker menulis file mmap di sini
+METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR", "")
+
+CONTENT_TYPE = b"text/plain; version=0.0.4; charset=utf-8"
+UNMATCHED = "<unmatched>"
+_STATUS = {code: str(code) for code in range(100, 600)}
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "bookwise_http_requests_total", "HTTP requests", ("method", "route", "status")))
+HTTP_SECONDS = REGISTRY.register(Histogram(
+    "bookwise_http_request_duration_seconds", "HTTP request latency", ("method", "route")))
+HTTP_IN_FLIGHT = REGISTRY.register(Gauge(
+    "bookwise_http_requests_in_flight", "HTTP requests currently being served"))
+
+
+def route_template(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED
+
+
+class MetricsMiddleware:
+    def __init__(self, app, registry: Registry = REGISTRY, path: str = METRICS_PATH):
+        self.app = app
+        self.registry = registry
+        self.path = path
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        if scope["path"] == self.path:
+            return await self._serve(send)
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = perf_counter() - start
+            HTTP_IN_FLIGHT.dec()
+            route = scope.get("route")
+            labels = (scope["method"], route.path if route is not None else UNMATCHED)
+            HTTP_REQUESTS.inc(labels + (_STATUS.get(status_code) or str(status_code),))
+            HTTP_SECONDS.observe(elapsed, labels)
+
+    async def _serve(self, send):
+        body = self.registry.expose().encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", CONTENT_TYPE), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+def _token_cache_samples():
+    from auth.token_cache import token_cache
+    stats = token_cache.stats()
+    return [(("hits",), stats["hits"]), (("misses",), stats["misses"])]
+
+
+def _token_cache_ratio():
+    from auth.token_cache import token_cache
+    return [((), token_cache.stats()["hit_rate"])]
+
+
+def _user_cache_samples():
+    from auth.users import user_repo
+    # hanya SqliteUserRepository punya cache baca
+    if not hasattr(user_repo, "cache_hits"):
+        return []
+    return [(("hits",), user_repo.cache_hits), (("misses",), user_repo.cache_misses)]
+
+
+def _loan_status_samples():
+    from api.loan_router import repo
+    from domain.loan_status import LoanStatus
+    counts = repo.count_by_status()
+    return [((status.value,), counts.get(status, 0)) for status in LoanStatus]
+
+
+def register_app_metrics(registry: Registry = REGISTRY) -> None:
+    """
+    Scrape-time metrics read from the auth caches and the loan repository.
+    """
+    registry.register(CallbackMetric(
+        "bookwise_auth_token_cache_total", "JWT payload cache lookups", ("result",),
+        _token_cache_samples, kind="counter"))
+    registry.register(CallbackMetric(
+        "bookwise_auth_token_cache_hit_ratio", "JWT payload cache hit ratio", (), _token_cache_ratio))
+    registry.register(CallbackMetric(
+        "bookwise_user_cache_total", "User repository read cache lookups", ("result",),
+        _user_cache_samples, kind="counter"))
+    registry.register(CallbackMetric(
+        "bookwise_loans", "Loans by status", ("status",), _loan_status_samples))
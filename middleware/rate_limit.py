@@ -0,0 +1,199 @@
+# middleware/rate_limit.py
+"""
+Pure ASGI rate limiting keyed by JWT `sub`, API key id or client IP.
+
+Each rule owns one limiter; state is O(1) per active key (two floats for
+token bucket, three numbers for the sliding-window counter) and idle keys
+are evicted in LRU order, so memory is bounded by max_keys.
+"""
+import json
+import math
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from auth.api_keys import split_key
+from auth.token_cache import token_cache
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "false").lower() == "true"
+RATE_LIMIT_RATE = float(os.getenv("RATE_LIMIT_RATE", "20"))  # request/detik per key
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "40"))
+RATE_LIMIT_LOGIN_PER_MINUTE = int(os.getenv("RATE_LIMIT_LOGIN_PER_MINUTE", "10"))
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+RATE_LIMIT_IDLE_SECONDS = float(os.getenv("RATE_LIMIT_IDLE_SECONDS", "600"))
+
+
+class _KeyedLimiter(ABC):
+    def __init__(self, max_keys: int, idle_seconds: float, clock: Callable[[], float]):
+        self.max_keys = max_keys
+        self.idle_seconds = idle_seconds
+        self.clock = clock
+        # key -> state list; urutan = terakhir diakses (LRU)
+        self.state: "OrderedDict[str, list]" = OrderedDict()
+
+    def _evict(self, now: float) -> None:
+        state = self.state
+        while state:
+            key, value = next(iter(state.items()))
+            if len(state) <= self.max_keys and now - value[-1] < self.idle_seconds:
+                break
+            del state[key]
+
+    def _get(self, key: str, now: float, initial: list) -> list:
+        entry = self.state.get(key)
+        if entry is None:
+            entry = initial
+            self.state[key] = entry
+            self._evict(now)
+        else:
+            self.state.move_to_end(key)
+        return entry
+
+    @abstractmethod
+    def hit(self, key: str) -> Tuple[bool, float]:
+        """
+        Count one request for `key`; returns (allowed, retry_after seconds).
+        """
+        pass
+
+    def __len__(self) -> int:
+        return len(self.state)
+
+
+class TokenBucketLimiter(_KeyedLimiter):
+    """
+    `rate` tokens/second refill up to `burst`. State: [tokens, last_seen].
+    """
+
+    def __init__(self, rate: float, burst: float, max_keys: int = RATE_LIMIT_MAX_KEYS,
+                 idle_seconds: float = RATE_LIMIT_IDLE_SECONDS, clock: Callable[[], float] = time.monotonic):
+        super().__init__(max_keys, idle_seconds, clock)
+        self.rate = rate
+        self.burst = burst
+
+    def hit(self, key: str) -> Tuple[bool, float]:
+        now = self.clock()
+        entry = self._get(key, now, [self.burst, now])
+        tokens = min(self.burst, entry[0] + (now - entry[1]) * self.rate)
+        entry[1] = now
+        if tokens >= 1:
+            entry[0] = tokens - 1
+            return True, 0.0
+        entry[0] = tokens
+        return False, (1 - tokens) / self.rate
+
+
+class SlidingWindowLimiter(_KeyedLimiter):
+    """
+    Sliding-window counter: current and previous fixed-window counts, the
+    previous one weighted by how much of it still overlaps the window.
+    State: [window_start, prev_count, count, last_seen].
+    """
+
+    def __init__(self, limit: int, window: float, max_keys: int = RATE_LIMIT_MAX_KEYS,
+                 idle_seconds: float = RATE_LIMIT_IDLE_SECONDS, clock: Callable[[], float] = time.monotonic):
+        super().__init__(max_keys, max(idle_seconds, 2 * window), clock)
+        self.limit = limit
+        self.window = window
+
+    def hit(self, key: str) -> Tuple[bool, float]:
+        now = self.clock()
+        start = now - (now % self.window)
+        entry = self._get(key, now, [start, 0, 0, now])
+        elapsed_windows = (start - entry[0]) / self.window
+        if elapsed_windows >= 2:
+            entry[0], entry[1], entry[2] = start, 0, 0
+        elif elapsed_windows >= 1:
+            entry[0], entry[1], entry[2] = start, entry[2], 0
+        entry[3] = now
+        overlap = 1 - (now - start) / self.window
+        estimated = entry[1] * overlap + entry[2]
+        if estimated < self.limit:
+            entry[2] += 1
+            return True, 0.0
+        return False, start + self.window - now
+
+
+class RateLimitRule:
+    """
+    `path` is exact, or a prefix when it ends with "*". `methods=None` = all.
+    """
+
+    def __init__(self, path: str, limiter: _KeyedLimiter, methods: Optional[Sequence[str]] = None):
+        self.prefix = path.endswith("*")
+        self.path = path[:-1] if self.prefix else path
+        self.methods = {m.upper() for m in methods} if methods else None
+        self.limiter = limiter
+
+    def matches(self, method: str, path: str) -> bool:
+        if self.methods is not None and method not in self.methods:
+            return False
+        return path.startswith(self.path) if self.prefix else path == self.path
+
+
+def default_key(scope) -> str:
+    """
+    JWT sub, else API key id, else client IP. The JWT is only looked up in
+    the auth token cache (tokens the auth dependency already verified), never
+    decoded here: a new or invalid token is keyed by client IP, so garbage
+    tokens cost a hash probe instead of a signature check on the event loop.
+    peek() also leaves the cache hit/miss statistics to the auth path.
+    """
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer" and token:
+                payload = token_cache.peek(token)
+                if payload and payload.get("sub"):
+                    return "user:" + payload["sub"]
+        elif name == b"x-api-key":
+            parts = split_key(value.decode("latin-1"))
+            if parts:
+                return "key:" + parts[0]
+    client = scope.get("client")
+    return "ip:" + (client[0] if client else "unknown")
+
+
+def build_default_rules() -> List[RateLimitRule]:
+    return [
+        RateLimitRule("/auth/login", SlidingWindowLimiter(RATE_LIMIT_LOGIN_PER_MINUTE, 60), methods=["POST"]),
+        RateLimitRule("*", TokenBucketLimiter(RATE_LIMIT_RATE, RATE_LIMIT_BURST)),
+    ]
+
+
+class RateLimitMiddleware:
+    def __init__(self, app, rules: Optional[List[RateLimitRule]] = None,
+                 key_func: Callable = default_key):
+        self.app = app
+        self.rules = build_default_rules() if rules is None else rules
+        self.key_func = key_func
+        self.rejected = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        method, path = scope["method"], scope["path"]
+        for rule in self.rules:
+            if rule.matches(method, path):
+                allowed, retry_after = rule.limiter.hit(self.key_func(scope))
+                if not allowed:
+                    self.rejected += 1
+                    return await _reject(send, retry_after)
+                break
+        return await self.app(scope, receive, send)
+
+
+async def _reject(send, retry_after: float):
+    body = json.dumps({"detail": "Too many requests"}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": 429,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
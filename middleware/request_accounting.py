@@ -0,0 +1,49 @@
+# middleware/request_accounting.py
+"""
+Optional per-request CPU time / allocation accounting (see
+infrastructure/request_accounting), aggregated per route template and
+role and read through GET /admin/usage and /metrics.
+"""
+import os
+import threading
+
+from infrastructure.phase_timing import current_timer, reset_timer, start_timer
+from middleware.slow_requests import request_principal
+
+REQUEST_ACCOUNTING_ENABLED = os.getenv("REQUEST_ACCOUNTING_ENABLED", "false").lower() == "true"
+# alokasi butuh tracemalloc (overhead besar); CPU saja jika false
+REQUEST_ACCOUNTING_ALLOC = os.getenv("REQUEST_ACCOUNTING_ALLOC", "false").lower() == "true"
+
+
+class RequestAccountingMiddleware:
+    def __init__(self, app, stats=None, track_alloc: bool = REQUEST_ACCOUNTING_ALLOC):
+        # metrik per route (dan tracemalloc) baru diimpor saat middleware dipasang, bukan saat startup
+        from infrastructure.request_accounting import USAGE, RequestUsage, metered
+        self.app = app
+        self.stats = USAGE if stats is None else stats
+        self._usage = RequestUsage
+        self._metered = metered
+        self.track_alloc = track_alloc
+        if track_alloc:
+            # lewat HeapTracer: DELETE /admin/heap/tracing tidak mematikan tracing milik accounting
+            from infrastructure.heap_report import HEAP
+            HEAP.acquire("request_accounting")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        timer, token = current_timer(), None
+        if timer is None:
+            timer, token = start_timer()
+        usage = self._usage(threading.get_ident(), self.track_alloc)
+        timer.usage = usage
+        try:
+            await self._metered(self.app(scope, receive, send), usage)
+        finally:
+            timer.usage = None
+            if token is not None:
+                reset_timer(token)
+            route = scope.get("route")
+            role, _ = request_principal(scope)
+            self.stats.record(route.path if route is not None else "<unmatched>",
+                              role or "anonymous", usage.cpu, usage.alloc)
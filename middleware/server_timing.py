@@ -0,0 +1,64 @@
+# middleware/server_timing.py
+"""
+Server-Timing header and per-phase histograms.
+
+Phases recorded by the app (exclusive times, see infrastructure/phase_timing):
+    jwt       decode_token_cached (cache lookup + signature check on a miss)
+    user      get_user_by_id around the repository call
+    repo      repository methods (@timed)
+    handler   endpoint body outside the phases above
+    serialize to_response
+    validate  FastAPI route handling outside the endpoint: dependency
+              solving, response_model validation and JSON encoding
+    app       everything else (middleware, routing, threadpool hops)
+"""
+import os
+from time import perf_counter
+
+from infrastructure.metrics import REGISTRY, Histogram
+from infrastructure.phase_timing import reset_timer, start_timer
+
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "false").lower() == "true"
+
+PHASE_SECONDS = REGISTRY.register(Histogram(
+    "bookwise_request_phase_duration_seconds", "Request time by phase", ("route", "phase"),
+    buckets=(0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0),
+))
+
+
+def format_server_timing(durations, total: float) -> bytes:
+    parts = [f"{name};dur={seconds * 1000:.3f}" for name, seconds in durations.items()]
+    parts.append(f"total;dur={total * 1000:.3f}")
+    return ", ".join(parts).encode("latin-1")
+
+
+class ServerTimingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        timer, token = start_timer()
+        start = perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                total = perf_counter() - start
+                durations = dict(timer.durations)
+                durations["app"] = max(0.0, total - sum(durations.values()))
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"server-timing", format_server_timing(durations, total))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            reset_timer(token)
+            total = perf_counter() - start
+            route = scope.get("route")
+            template = route.path if route is not None else "<unmatched>"
+            phases = timer.durations
+            for name, seconds in phases.items():
+                PHASE_SECONDS.observe(seconds, (template, name))
+            PHASE_SECONDS.observe(max(0.0, total - sum(phases.values())), (template, "app"))
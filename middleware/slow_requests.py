@@ -0,0 +1,113 @@
+# middleware/slow_requests.py
+"""
+Capture requests slower than SLOW_REQUEST_THRESHOLD_MS.
+
+A fast request costs two perf_counter() calls, an in-flight dict
+insert/delete, a send wrapper for the status code and (without the
+Server-Timing middleware in front) a phase timer. Everything else (role lookup, formatting, the stack from the
+watchdog) is only done for slow requests. Records are read through
+GET /admin/slow-requests.
+"""
+import os
+import threading
+from datetime import datetime, timezone
+from time import perf_counter
+
+from auth.api_keys import API_KEYS
+from auth.token_cache import token_cache
+from infrastructure.phase_timing import current_timer, reset_timer, start_timer
+
+SLOW_REQUEST_ENABLED = os.getenv("SLOW_REQUEST_ENABLED", "false").lower() == "true"
+
+
+PRINCIPAL_SCOPE_KEY = "bookwise.principal"
+
+
+def request_principal(scope):
+    """
+    (role, principal) from an API key or a bearer token the auth dependency
+    already verified; (None, None) otherwise. Call it after the app has
+    handled the request. The token is only looked up in the token cache
+    (peek: no signature check, no hit/miss counted) and the result is kept
+    in the scope, so every middleware that labels the request shares one
+    lookup.
+    """
+    cached = scope.get(PRINCIPAL_SCOPE_KEY)
+    if cached is not None:
+        return cached
+    result = None, None
+    for name, value in scope.get("headers", ()):
+        if name == b"x-api-key":
+            key = API_KEYS.authenticate(value.decode("latin-1"))
+            if key is not None:
+                result = key.role, "key:" + key.key_id
+                break
+        elif name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            payload = token_cache.peek(token) if scheme.lower() == "bearer" and token else None
+            if payload:
+                result = payload.get("role"), "user:" + str(payload.get("sub"))
+                break
+    scope[PRINCIPAL_SCOPE_KEY] = result
+    return result
+
+
+class SlowRequestMiddleware:
+    def __init__(self, app, log=None):
+        if log is None:
+            # log global (dan sampling profiler) baru diimpor saat middleware dipasang
+            from infrastructure.slow_requests import SLOW_REQUESTS
+            log = SLOW_REQUESTS
+        self.app = app
+        self.log = log
+        self.threshold = log.threshold
+        # Starlette membangun middleware stack di dalam event loop, jadi ini thread loop
+        log.loop_thread = threading.get_ident()
+        log.start_watchdog()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        start = perf_counter()
+        # pakai timer Server-Timing bila ada di luar, supaya fase tidak diukur dua kali
+        timer, token = current_timer(), None
+        if timer is None:
+            timer, token = start_timer()
+        self.log.begin(timer, start)
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = perf_counter() - start
+            slow = duration >= self.threshold
+            sampled = self.log.end(timer, slow)
+            if token is not None:
+                reset_timer(token)
+            if slow:
+                self.log.add(self._record(scope, status[0], duration, timer, sampled))
+
+    def _record(self, scope, status: int, duration: float, timer, sampled) -> dict:
+        role, principal = request_principal(scope)
+        route = scope.get("route")
+        phases = {name: round(seconds * 1000, 3) for name, seconds in timer.durations.items()}
+        phases["app"] = round(max(0.0, duration * 1000 - sum(phases.values())), 3)
+        return {
+            "time": datetime.now(timezone.utc).isoformat(),
+            "method": scope["method"],
+            "path": scope["path"],
+            "route": route.path if route is not None else None,
+            "status": status,
+            "duration_ms": round(duration * 1000, 3),
+            "role": role,
+            "principal": principal,
+            "phases_ms": phases,
+            "calls": dict(timer.calls),
+            "stack_at_ms": round(sampled[1] * 1000, 3) if sampled else None,
+            "stack": sampled[0] if sampled else None,
+        }
@@ -0,0 +1,127 @@
+# middleware/tracing.py
+"""
+Per-request traces (see infrastructure/tracing).
+
+Requests that are neither head-sampled nor eligible for tail sampling
+(TRACE_SLOW_MS=0) skip everything but the sampling decision. Otherwise
+the phase timer collects span tuples and the trace is queued for export
+if it was head-sampled, slower than TRACE_SLOW_MS or a 5xx.
+"""
+import os
+from time import perf_counter
+
+from infrastructure.phase_timing import current_timer, reset_timer, start_timer
+from infrastructure.tracing import (
+    BatchSpanProcessor,
+    FileSpanExporter,
+    FinishedTrace,
+    OtlpHttpSpanExporter,
+    Sampler,
+    epoch_ns_at,
+    new_span_id,
+    new_trace_id,
+    parse_traceparent,
+)
+from middleware.slow_requests import request_principal
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+TRACE_SAMPLE_RATIO = float(os.getenv("TRACE_SAMPLE_RATIO", "0.01"))
+TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", "500"))  # 0 = tanpa tail sampling
+# traceparent sampled dari klien: maks. sekian trace tambahan per detik; -1 = selalu diikuti
+TRACE_PARENT_SAMPLED_PER_SEC = float(os.getenv("TRACE_PARENT_SAMPLED_PER_SEC", "1"))
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "file")  # file | otlp
+TRACE_FILE = os.getenv("TRACE_FILE", "traces.jsonl")
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", "http://127.0.0.1:4318/v1/traces")
+TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "bookwise-lending")
+TRACE_QUEUE_SIZE = int(os.getenv("TRACE_QUEUE_SIZE", "2048"))
+TRACE_BATCH_SIZE = int(os.getenv("TRACE_BATCH_SIZE", "512"))
+TRACE_EXPORT_INTERVAL = float(os.getenv("TRACE_EXPORT_INTERVAL", "2"))
+
+
+def build_exporter():
+    if TRACE_EXPORTER == "otlp":
+        return OtlpHttpSpanExporter(TRACE_OTLP_ENDPOINT)
+    if TRACE_EXPORTER == "file":
+        return FileSpanExporter(TRACE_FILE)
+    raise ValueError(f"Unknown TRACE_EXPORTER: {TRACE_EXPORTER!r}")
+
+
+# thread export baru jalan saat middleware dibuat; main.py memanggil shutdown() di lifespan
+TRACE_PROCESSOR = BatchSpanProcessor(
+    build_exporter(),
+    service_name=TRACE_SERVICE_NAME,
+    max_queue=TRACE_QUEUE_SIZE,
+    batch_size=TRACE_BATCH_SIZE,
+    interval=TRACE_EXPORT_INTERVAL,
+)
+TRACE_SAMPLER = Sampler(TRACE_SAMPLE_RATIO, TRACE_SLOW_MS / 1000, TRACE_PARENT_SAMPLED_PER_SEC)
+
+
+class TracingMiddleware:
+    def __init__(self, app, processor: BatchSpanProcessor = TRACE_PROCESSOR,
+                 sampler: Sampler = TRACE_SAMPLER):
+        self.app = app
+        self.processor = processor
+        self.sampler = sampler
+        processor.start()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        parent = None
+        for name, value in scope.get("headers", ()):
+            if name == b"traceparent":
+                parent = parse_traceparent(value.decode("latin-1"))
+                break
+        head = self.sampler.head(parent[2] if parent else None)
+        if not head and not self.sampler.tail:
+            return await self.app(scope, receive, send)
+
+        start = perf_counter()
+        timer, token = current_timer(), None
+        if timer is None:
+            timer, token = start_timer()
+        timer.spans = []
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            end = perf_counter()
+            spans, timer.spans = timer.spans, None
+            if token is not None:
+                reset_timer(token)
+            if self.sampler.keep(head, end - start, status[0]):
+                reason = "head" if head else ("error" if status[0] >= 500 else "slow")
+                self.processor.enqueue(self._trace(scope, parent, start, end, status[0], spans, reason))
+
+    def _trace(self, scope, parent, start, end, status, spans, reason) -> FinishedTrace:
+        route = scope.get("route")
+        template = route.path if route is not None else None
+        role, principal = request_principal(scope)
+        attributes = {
+            "http.request.method": scope["method"],
+            "url.path": scope["path"],
+            "http.route": template,
+            "http.response.status_code": status,
+            "enduser.role": role,
+            "enduser.id": principal,
+        }
+        return FinishedTrace(
+            trace_id=parent[0] if parent else new_trace_id(),
+            span_id=new_span_id(),
+            parent_id=parent[1] if parent else None,
+            name=f"{scope['method']} {template or scope['path']}",
+            epoch_ns=epoch_ns_at(start),
+            start=start,
+            end=end,
+            attributes=attributes,
+            status=status,
+            phases=spans,
+            reason=reason,
+        )
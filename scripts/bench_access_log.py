@@ -0,0 +1,132 @@
+# scripts/bench_access_log.py
+"""
+Benchmark structured logging: throughput /loans/{id} tanpa access log,
+dengan QueueLogHandler (antrean + thread writer) dan dengan handler biasa
+(I/O sinkron di request), ke file lokal dan ke output lambat (2 ms per
+write, mis. disk/pipe penuh); lalu biaya satu logger.info() dan jumlah
+record yang dibuang saat output macet.
+
+    python scripts/bench_access_log.py [requests] [log_file]
+"""
+import io
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from uuid import uuid4
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi.testclient import TestClient
+
+from api.loan_router import repo
+from auth.jwt_handler import create_access_token
+from auth.users import get_user_by_username
+from domain.book_id import BookId
+from domain.loan import Loan
+from domain.user_id import UserId
+from infrastructure.structured_logging import BatchLogWriter, JsonFormatter, QueueLogHandler
+from main import app
+from middleware.access_log import AccessLogMiddleware
+
+
+def make_logger(name: str, handler) -> logging.Logger:
+    logger = logging.getLogger(name)
+    logger.handlers = [handler]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logger
+
+
+def throughput(client, path, headers, requests: int) -> float:
+    for _ in range(20):
+        client.get(path, headers=headers)
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.get(path, headers=headers)
+    return requests / (time.perf_counter() - start)
+
+
+def per_call_us(logger, calls: int = 20000) -> float:
+    start = time.perf_counter()
+    for i in range(calls):
+        logger.info("access", extra={"fields": {"status": 200, "route": "/loans/{loan_id}", "n": i}})
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+class SlowStream(io.StringIO):
+    def write(self, text):
+        time.sleep(0.002)
+        return len(text)
+
+
+class StalledStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def write(self, text):
+        self.release.wait()
+        return super().write(text)
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    log_file = sys.argv[2] if len(sys.argv) > 2 else os.path.join(tempfile.mkdtemp(), "access.jsonl")
+
+    loan = Loan(BookId(uuid4()), UserId(uuid4()))
+    repo.save(loan)
+    user = get_user_by_username("pengguna1")
+    headers = {"Authorization": f"Bearer {create_access_token(str(user.user_id), user.role)}"}
+    path = f"/loans/{loan.loanId}"
+
+    off = throughput(TestClient(app), path, headers, requests)
+    print(f"/loans/{{id}} off          : {off:8.1f} req/s")
+
+    writer = BatchLogWriter(path=log_file)
+    writer.start()
+    queued = make_logger("bench.queue", QueueLogHandler(writer))
+    rate = throughput(TestClient(AccessLogMiddleware(app, queued)), path, headers, requests)
+    print(f"/loans/{{id}} queue        : {rate:8.1f} req/s ({100 * (rate / off - 1):+.1f}%)")
+
+    sync_handler = logging.FileHandler(log_file + ".sync")
+    sync_handler.setFormatter(JsonFormatter())
+    sync = make_logger("bench.sync", sync_handler)
+    rate = throughput(TestClient(AccessLogMiddleware(app, sync)), path, headers, requests)
+    print(f"/loans/{{id}} FileHandler  : {rate:8.1f} req/s ({100 * (rate / off - 1):+.1f}%)")
+
+    slow_writer = BatchLogWriter(stream=SlowStream())
+    slow_writer.start()
+    slow_queue = make_logger("bench.slow_queue", QueueLogHandler(slow_writer))
+    rate = throughput(TestClient(AccessLogMiddleware(app, slow_queue)), path, headers, requests)
+    print(f"/loans/{{id}} queue, slow  : {rate:8.1f} req/s ({100 * (rate / off - 1):+.1f}%)")
+    slow_writer.shutdown()
+
+    slow_handler = logging.StreamHandler(SlowStream())
+    slow_handler.setFormatter(JsonFormatter())
+    slow_sync = make_logger("bench.slow_sync", slow_handler)
+    rate = throughput(TestClient(AccessLogMiddleware(app, slow_sync)), path, headers, requests // 4)
+    print(f"/loans/{{id}} sync, slow   : {rate:8.1f} req/s ({100 * (rate / off - 1):+.1f}%)")
+
+    print(f"logger.info queue       : {per_call_us(queued):6.2f} us/call")
+    print(f"logger.info FileHandler : {per_call_us(sync):6.2f} us/call")
+    writer.shutdown()
+    sync_handler.close()
+    print(f"written {writer.written}, dropped {writer.stats()['dropped']} -> {log_file}")
+
+    # output macet (disk/terminal lambat): logging tetap cepat, kelebihan dibuang
+    stalled = StalledStream()
+    stuck = BatchLogWriter(stream=stalled, max_queue=1000, batch_size=100, interval=0.01)
+    stuck.start()
+    stuck_logger = make_logger("bench.stalled", QueueLogHandler(stuck))
+    cost = per_call_us(stuck_logger, 5000)
+    stats = stuck.stats()
+    print(f"stalled output          : {cost:6.2f} us/call, queued {stats['queued']}, dropped {stats['dropped']}")
+    stalled.release.set()
+    stuck.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# scripts/bench_api_key_auth.py
+"""
+Overhead auth per request: JWT (tanpa/dengan cache) vs API key vs API key bertanda tangan.
+
+    python scripts/bench_api_key_auth.py [iterations]
+"""
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from auth.api_keys import API_KEYS, new_nonce, sign_request
+from auth.deps import get_current_active_user
+from auth.jwt_handler import create_access_token
+from auth.token_cache import token_cache
+from auth.users import get_user_by_username, verify_password
+
+
+def per_call(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    user = get_user_by_username("pengguna1")
+    token = create_access_token(str(user.user_id), user.role)
+    plain, key = API_KEYS.issue("bench", "pengguna", require_signature=True)
+    body = b'{"bookId": "x"}'
+    ts = str(int(time.time()))
+    # nonce sekali pakai: tanda tangan disiapkan di luar pengukuran
+    signed_requests = iter([(nonce, sign_request(plain, "POST", "/loans", ts, nonce, body))
+                            for nonce in (new_nonce() for _ in range(iterations))])
+
+    maxsize = token_cache.maxsize
+    token_cache.maxsize = 0
+    jwt_cold = per_call(lambda: get_current_active_user(token), iterations)
+    token_cache.maxsize = maxsize
+    jwt_cached = per_call(lambda: get_current_active_user(token), iterations)
+    api_key = per_call(lambda: API_KEYS.authenticate(plain), iterations)
+    signed = per_call(lambda: API_KEYS.verify_signature(
+        API_KEYS.authenticate(plain), "POST", "/loans", "", ts, *next(signed_requests), body), iterations)
+    login = per_call(lambda: verify_password("pengguna123", user.hashed_password), 3)
+
+    print(f"bcrypt login (once per hour) : {login:12.1f} us")
+    print(f"JWT decode + user lookup     : {jwt_cold:12.2f} us/req")
+    print(f"JWT cached + user lookup     : {jwt_cached:12.2f} us/req")
+    print(f"API key                      : {api_key:12.2f} us/req")
+    print(f"API key + HMAC signature     : {signed:12.2f} us/req")
+
+
+if __name__ == "__main__":
+    main()
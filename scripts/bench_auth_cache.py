@@ -0,0 +1,46 @@
+# scripts/bench_auth_cache.py
+"""
+Benchmark overhead get_current_active_user dengan dan tanpa JWT cache.
+
+    python scripts/bench_auth_cache.py [iterations]
+"""
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from auth.deps import get_current_active_user
+from auth.jwt_handler import create_access_token
+from auth.token_cache import token_cache
+from auth.users import get_user_by_username
+
+
+def run(token: str, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        get_current_active_user(token)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    user = get_user_by_username("peminjam1")
+    token = create_access_token(str(user.user_id), user.role)
+
+    maxsize = token_cache.maxsize
+    token_cache.maxsize = 0
+    before = run(token, iterations)
+
+    token_cache.maxsize = maxsize
+    token_cache.clear()
+    after = run(token, iterations)
+
+    print(f"iterations        : {iterations}")
+    print(f"no cache  (us/req): {before:.2f}")
+    print(f"cache     (us/req): {after:.2f}")
+    print(f"speedup           : {before / after:.1f}x")
+    print(f"cache stats       : {token_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# scripts/bench_claims_auth.py
+"""
+Benchmark auth per request di endpoint loan: lookup user vs claims-only.
+
+    python scripts/bench_claims_auth.py [iterations]
+"""
+import sys
+import time
+from pathlib import Path
+from uuid import uuid4
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi.testclient import TestClient
+
+import auth.deps as deps
+from api.loan_router import repo
+from auth.jwt_handler import create_access_token
+from auth.users import User, add_user, get_user_by_username
+from domain.book_id import BookId
+from domain.loan import Loan
+from domain.user_id import UserId
+from main import app
+
+FAKE_HASH = "$2b$12$TmJP5appjRpYp0bYUlkzNeT8tDMl5h/Tv39P9dl3hyDruNBqlscUm"
+
+
+def per_call(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    for i in range(10_000):
+        add_user(User(uuid4(), f"patron{i}", FAKE_HASH, "peminjam"))
+
+    user = get_user_by_username("peminjam1")
+    for _ in range(5):
+        repo.save(Loan(BookId(uuid4()), UserId(user.user_id)))
+    token = create_access_token(str(user.user_id), user.role)
+    headers = {"Authorization": f"Bearer {token}"}
+    client = TestClient(app)
+    loan_id = next(iter(repo.data))
+
+    results = {}
+    for trust in (False, True):
+        deps.AUTH_TRUST_CLAIMS = trust
+        results[trust] = (
+            per_call(lambda: deps.get_current_principal(token), iterations),
+            per_call(lambda: client.get("/loans/my", headers=headers), iterations // 10),
+            per_call(lambda: client.get(f"/loans/{loan_id}", headers=headers), iterations // 10),
+        )
+
+    print(f"{'':24}{'user lookup':>14}{'claims-only':>14}")
+    for i, label in enumerate(["dependency (us)", "GET /loans/my (us)", "GET /loans/{id} (us)"]):
+        print(f"{label:24}{results[False][i]:>14.1f}{results[True][i]:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
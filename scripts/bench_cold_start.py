@@ -0,0 +1,114 @@
+# scripts/bench_cold_start.py
+"""
+Benchmark cold start: time-to-first-response of a fresh interpreter for
+GET /health and POST /auth/login, through main:app (lazy, application
+imported on first use) vs. application:app (everything imported upfront,
+as main.py used to do). The app is called directly over ASGI, so no
+server or HTTP client import is counted; the time includes interpreter
+startup.
+
+    python scripts/bench_cold_start.py [runs]
+    python scripts/bench_cold_start.py --importtime [target] [path]
+
+--importtime runs one cold request under `python -X importtime` and
+lists the modules with the largest self time.
+"""
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+DRIVER = r"""
+import asyncio, importlib, os, sys, time
+spawned = float(sys.argv[1]); target, method, path = sys.argv[2:5]
+sys.path.insert(0, os.getcwd())
+module, _, attribute = target.partition(":")
+app = getattr(importlib.import_module(module), attribute)
+imported = time.time()
+body = b"username=peminjam1&password=pinjam123" if method == "POST" else b""
+
+async def main():
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+             "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+             "root_path": "", "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 8000),
+             "headers": [(b"host", b"127.0.0.1"), (b"content-length", str(len(body)).encode()),
+                         (b"content-type", b"application/x-www-form-urlencoded")]}
+    status = []
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+    await app(scope, receive, send)
+    return status[0]
+
+status = asyncio.run(main())
+done = time.time()
+print(status, round((imported - spawned) * 1000, 3), round((done - spawned) * 1000, 3), flush=True)
+pool = sys.modules.get("auth.password_pool")
+if pool is not None:
+    pool.password_pool.shutdown()  # worker bcrypt ikut memegang pipe stdout
+os._exit(0)
+"""
+
+TARGETS = (("lazy  main:app", "main:app"), ("eager application:app", "application:app"))
+SCENARIOS = (("GET", "/health"), ("POST", "/auth/login"))
+
+
+def cold_request(target: str, method: str, path: str, flags=()) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *flags, "-c", DRIVER, repr(time.time()), target, method, path],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+
+
+def measure(target: str, method: str, path: str, runs: int):
+    entry, first = [], []
+    for _ in range(runs):
+        result = cold_request(target, method, path)
+        status, imported, done = result.stdout.split()
+        entry.append(float(imported))
+        first.append(float(done))
+    return int(status), statistics.median(entry), statistics.median(first)
+
+
+def importtime(target: str, path: str, top: int = 20) -> None:
+    method = "POST" if path == "/auth/login" else "GET"
+    result = cold_request(target, method, path, flags=("-X", "importtime"))
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+    print(f"{target} {method} {path}: {len(rows)} modules, "
+          f"{sum(r[0] for r in rows) / 1000:.1f} ms importing")
+    for self_us, cumulative_us, name in sorted(rows, reverse=True)[:top]:
+        print(f"  self {self_us / 1000:7.1f} ms  cumulative {cumulative_us / 1000:7.1f} ms  {name.strip()}")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--importtime":
+        target = sys.argv[2] if len(sys.argv) > 2 else "main:app"
+        return importtime(target, sys.argv[3] if len(sys.argv) > 3 else "/health")
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 7
+
+    for _, target in TARGETS:
+        cold_request(target, "GET", "/health")  # .pyc sudah ada sebelum diukur
+    results = {}
+    for method, path in SCENARIOS:
+        for label, target in TARGETS:
+            status, entry, first = measure(target, method, path, runs)
+            results[(label, path)] = first
+            print(f"{method:4s} {path:12s} {label:22s} status {status}  "
+                  f"entry point {entry:7.1f} ms  first response {first:7.1f} ms (median of {runs})")
+    for method, path in SCENARIOS:
+        lazy, eager = results[(TARGETS[0][0], path)], results[(TARGETS[1][0], path)]
+        print(f"{method} {path}: time-to-first-response {100 * (lazy / eager - 1):+.1f}% lazy vs eager")
+
+
+if __name__ == "__main__":
+    main()
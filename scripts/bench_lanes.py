@@ -0,0 +1,86 @@
+# scripts/bench_lanes.py
+"""
+Benchmark p99 /loans/my (peminjam) saat export /loans/all berjalan,
+dengan lane bulk dibatasi vs. tanpa batas (semua berbagi threadpool).
+
+    python scripts/bench_lanes.py [exports] [export_seconds]
+
+Export disimulasikan sebagai scan lambat (time.sleep di repo.list_all)
+yang memegang thread threadpool seperti query besar ke database.
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx
+
+from api.loan_router import repo
+from auth.jwt_handler import create_access_token
+from auth.users import get_user_by_username
+from infrastructure.execution_lanes import get_lane
+from main import app
+
+
+def _headers(username: str) -> dict:
+    user = get_user_by_username(username)
+    return {"Authorization": f"Bearer {create_access_token(str(user.user_id), user.role)}"}
+
+
+def pct(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] * 1000
+
+
+async def run(exports: int, borrower_requests: int):
+    transport = httpx.ASGITransport(app=app)
+    borrower, admin = _headers("peminjam1"), _headers("pengguna1")
+    latencies, export_codes = [], []
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        async def export():
+            export_codes.append((await client.get("/loans/all", headers=admin)).status_code)
+
+        async def borrow():
+            started = time.perf_counter()
+            await client.get("/loans/my", headers=borrower)
+            latencies.append(time.perf_counter() - started)
+
+        await borrow()  # warm-up (token cache, threadpool)
+        latencies.clear()
+        bulk = [asyncio.create_task(export()) for _ in range(exports)]
+        await asyncio.sleep(0.05)
+        for _ in range(borrower_requests):
+            await borrow()
+            await asyncio.sleep(0.005)
+        await asyncio.gather(*bulk)
+    return latencies, export_codes
+
+
+def main():
+    exports = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    export_seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    list_all = repo.list_all
+
+    def slow_list_all():
+        time.sleep(export_seconds)
+        return list_all()
+
+    repo.list_all = slow_list_all
+    lane = get_lane("bulk")
+    configured = (lane.concurrency, lane.max_queue)
+    print(f"{exports} concurrent exports x {export_seconds}s, bulk lane {configured[0]} slots / queue {configured[1]}")
+
+    runs = (("no export", configured, 0), ("shared pool", (10 ** 6, 10 ** 6), exports),
+            ("bulk lane", configured, exports))
+    for label, limits, n in runs:
+        lane.concurrency, lane.max_queue = limits
+        latencies, codes = asyncio.run(run(n, 100))
+        print(f"{label:12s}: borrower p50={pct(latencies, 0.5):7.1f}ms p99={pct(latencies, 0.99):7.1f}ms "
+              f"exports 200={codes.count(200)} 503={codes.count(503)}")
+    lane.concurrency, lane.max_queue = configured
+    print("lane stats:", get_lane("bulk").stats())
+
+
+if __name__ == "__main__":
+    main()
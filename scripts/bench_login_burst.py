@@ -0,0 +1,82 @@
+# scripts/bench_login_burst.py
+"""
+Latency /loans/my selama burst 200 login, bcrypt di threadpool vs process pool.
+
+    python scripts/bench_login_burst.py [logins] [workers]
+"""
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx
+
+from auth.jwt_handler import create_access_token
+from auth.password_pool import password_pool
+from auth.users import get_user_by_username
+from main import app
+
+
+def pct(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(q * len(samples)))] * 1000
+
+
+async def burst(logins: int):
+    user = get_user_by_username("peminjam1")
+    headers = {"Authorization": f"Bearer {create_access_token(str(user.user_id), user.role)}"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        latencies = []
+        done = asyncio.Event()
+
+        async def poll_loans():
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/loans/my", headers=headers)
+                latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(0.005)
+
+        async def login():
+            r = await client.post("/auth/login", data={"username": "peminjam1", "password": "pinjam123"})
+            return r.status_code
+
+        poller = asyncio.create_task(poll_loans())
+        start = time.perf_counter()
+        codes = await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await poller
+    return latencies, codes, elapsed
+
+
+def report(label, latencies, codes, elapsed):
+    print(f"--- {label}")
+    print(f"  burst duration     : {elapsed:.2f}s")
+    print(f"  login 200 / 503    : {codes.count(200)} / {codes.count(503)}")
+    print(f"  /loans/my samples  : {len(latencies)}")
+    print(f"  /loans/my p50 (ms) : {pct(latencies, 0.50):.1f}")
+    print(f"  /loans/my p99 (ms) : {pct(latencies, 0.99):.1f}")
+    print(f"  /loans/my max (ms) : {max(latencies) * 1000:.1f}")
+    print(f"  /loans/my mean(ms) : {statistics.mean(latencies) * 1000:.1f}")
+
+
+def main():
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else password_pool.workers or 1
+
+    password_pool.workers = 0
+    password_pool.max_pending = logins
+    report("before: bcrypt on shared threadpool", *asyncio.run(burst(logins)))
+
+    password_pool.workers = workers
+    password_pool.max_pending = 4 * workers
+    report(f"after: process pool ({workers} workers, max_pending={4 * workers})",
+           *asyncio.run(burst(logins)))
+    password_pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# scripts/bench_metrics.py
+"""
+Benchmark overhead MetricsMiddleware: throughput /health dengan dan tanpa
+metrics (ASGI langsung, tanpa socket), plus biaya per request di atas app
+ASGI kosong.
+
+    python scripts/bench_metrics.py [iterations]
+"""
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+os.environ["METRICS_ENABLED"] = "false"  # app dasar tanpa metrics; dibungkus manual di bawah
+
+from main import app
+from middleware.metrics import MetricsMiddleware
+
+SCOPE = {
+    "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+    "method": "GET", "scheme": "http", "path": "/health", "raw_path": b"/health",
+    "root_path": "", "query_string": b"", "headers": [],
+    "client": ("127.0.0.1", 1234), "server": ("test", 80),
+}
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message):
+    pass
+
+
+async def empty_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def run(asgi, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await asgi(dict(SCOPE), receive, send)
+    return iterations / (time.perf_counter() - start)
+
+
+def best(a, b, iterations: int, rounds: int = 5):
+    # bergantian supaya noise threadpool/CPU kena kedua varian sama rata
+    results_a, results_b = [], []
+    for _ in range(rounds):
+        results_a.append(asyncio.run(run(a, iterations)))
+        results_b.append(asyncio.run(run(b, iterations)))
+    return max(results_a), max(results_b)
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    asyncio.run(run(app, 500))  # warm-up
+
+    plain, metered = best(app, MetricsMiddleware(app), iterations)
+    print(f"/health without metrics : {plain:8.0f} req/s")
+    print(f"/health with metrics    : {metered:8.0f} req/s  ({(1 - metered / plain) * 100:+.2f}% slower)")
+
+    bare, wrapped = best(empty_app, MetricsMiddleware(empty_app), iterations * 5)
+    print(f"middleware cost         : {(1 / wrapped - 1 / bare) * 1e6:8.2f} us/req")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# scripts/bench_metrics_multiproc.py
+"""
+Benchmark mode metrics multi-proses: biaya Counter.inc / Histogram.observe
+dengan dan tanpa file mmap, dan waktu scrape (collect) untuk N worker.
+
+    python scripts/bench_metrics_multiproc.py [workers] [routes]
+"""
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from infrastructure import metrics
+from infrastructure.metrics import Counter, Histogram
+from infrastructure.metrics_mmap import MultiProcessCollector
+
+# worker tetap hidup (sleep) supaya file-nya dihitung sebagai worker aktif
+WORKER = """
+import sys, time
+sys.path.insert(0, {root!r})
+from infrastructure import metrics
+from infrastructure.metrics import Counter, Histogram
+metrics.enable_multiprocess({directory!r})
+requests = Counter("b_requests_total", "b", ("method", "route", "status"))
+latency = Histogram("b_seconds", "b", ("method", "route"))
+for i in range({routes}):
+    for status in ("200", "401", "404"):
+        requests.inc(("GET", f"/r{{i}}", status))
+    latency.observe(0.003, ("GET", f"/r{{i}}"))
+print("ready", flush=True)
+time.sleep(60)
+"""
+
+
+def per_op(fn, iterations: int = 200000) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e9
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    routes = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    counter = Counter("local_total", "x", ("route",))
+    histogram = Histogram("local_seconds", "x", ("route",))
+    local_inc = per_op(lambda: counter.inc(("/a",)))
+    local_obs = per_op(lambda: histogram.observe(0.004, ("/a",)))
+
+    with tempfile.TemporaryDirectory() as directory:
+        metrics.enable_multiprocess(directory)
+        mmap_inc = per_op(lambda: counter.inc(("/a",)))
+        mmap_obs = per_op(lambda: histogram.observe(0.004, ("/a",)))
+
+        procs = [subprocess.Popen([sys.executable, "-c", WORKER.format(
+            root=str(ROOT), directory=directory, routes=routes)], stdout=subprocess.PIPE, text=True)
+            for _ in range(workers)]
+        for proc in procs:
+            proc.stdout.readline()
+        collector = MultiProcessCollector(directory)
+        start = time.perf_counter()
+        for _ in range(20):
+            totals = collector.collect()
+        scrape_ms = (time.perf_counter() - start) / 20 * 1000
+        series = sum(len(v) for v in totals.values())
+        for proc in procs:
+            proc.kill()
+            proc.wait()
+        metrics.disable_multiprocess()
+
+    print(f"Counter.inc         local {local_inc:6.0f} ns   mmap {mmap_inc:6.0f} ns")
+    print(f"Histogram.observe   local {local_obs:6.0f} ns   mmap {mmap_obs:6.0f} ns")
+    print(f"scrape {workers + 1} workers, {series} series: {scrape_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# scripts/bench_rate_limit.py
+"""
+Benchmark overhead RateLimitMiddleware pada /health (ASGI langsung, tanpa socket).
+
+    python scripts/bench_rate_limit.py [iterations]
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from main import app
+from middleware.rate_limit import RateLimitMiddleware, RateLimitRule, TokenBucketLimiter
+
+
+async def run(asgi, iterations: int, clients: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    scopes = [{
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": "/health", "raw_path": b"/health",
+        "root_path": "", "query_string": b"", "headers": [],
+        "client": (f"10.0.{i // 256}.{i % 256}", 1234), "server": ("test", 80),
+    } for i in range(clients)]
+    start = time.perf_counter()
+    for i in range(iterations):
+        await asgi(scopes[i % clients], receive, send)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    clients = 1000
+    limited = RateLimitMiddleware(app, rules=[RateLimitRule("*", TokenBucketLimiter(1e9, 1e9))])
+
+    asyncio.run(run(app, 1000, clients))  # warm-up
+    plain = asyncio.run(run(app, iterations, clients))
+    wrapped = asyncio.run(run(limited, iterations, clients))
+
+    print(f"iterations           : {iterations} ({clients} client IPs)")
+    print(f"no limiter  (us/req) : {plain:.2f}")
+    print(f"rate limit  (us/req) : {wrapped:.2f}")
+    print(f"overhead    (us/req) : {wrapped - plain:.2f}")
+    print(f"tracked keys         : {len(limited.rules[0].limiter)}")
+
+    limiter = limited.rules[0].limiter
+    keys = [f"ip:10.0.0.{i}" for i in range(clients)]
+    start = time.perf_counter()
+    for i in range(iterations):
+        limiter.hit(keys[i % clients])
+    print(f"limiter.hit (us/op)  : {(time.perf_counter() - start) / iterations * 1e6:.2f}")
+
+
+if __name__ == "__main__":
+    main()
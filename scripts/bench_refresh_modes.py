@@ -0,0 +1,40 @@
+# scripts/bench_refresh_modes.py
+"""
+Throughput /auth/refresh: store (dict per proses) vs stateless (JWT bertanda tangan,
+generation/counter di record user).
+
+    python scripts/bench_refresh_modes.py [iterations]
+"""
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import auth.auth_router as auth_router
+from auth.auth_router import RefreshRequest, issue_refresh_token, refresh_token
+
+
+def run(mode: str, iterations: int) -> float:
+    auth_router.REFRESH_TOKEN_MODE = mode
+    token = issue_refresh_token("peminjam1")
+    start = time.perf_counter()
+    for _ in range(iterations):
+        token = refresh_token(RefreshRequest(refresh_token=token)).refresh_token
+    return iterations / (time.perf_counter() - start)
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    store = run("store", iterations)
+    stateless = run("stateless", iterations)
+    print(f"iterations             : {iterations}")
+    print(f"store     (refresh/s)  : {store:,.0f}")
+    print(f"stateless (refresh/s)  : {stateless:,.0f}")
+    user = auth_router.get_user_by_username("peminjam1")
+    print(f"server-side entries    : store={len(auth_router.REFRESH_TOKENS)} "
+          f"stateless=0 (user record: generation={user.refresh_generation} "
+          f"counter={user.refresh_counter})")
+
+
+if __name__ == "__main__":
+    main()
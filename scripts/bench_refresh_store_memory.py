@@ -0,0 +1,49 @@
+# scripts/bench_refresh_store_memory.py
+"""
+Memory-growth test refresh token store: simulasi 10 juta login.
+
+    python scripts/bench_refresh_store_memory.py [logins] [capacity]
+
+Dict lama tumbuh terus; store baru harus datar setelah capacity tercapai.
+"""
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from infrastructure.in_memory_refresh_token_store import InMemoryRefreshTokenStore
+
+
+class SimClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def main():
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    capacity = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    clock = SimClock()
+    store = InMemoryRefreshTokenStore(ttl_seconds=3600, capacity=capacity, per_user=10, clock=clock)
+    checkpoint = max(1, logins // 10)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    for i in range(logins):
+        clock.now += 0.01  # ~100 login/detik simulasi
+        store.add(f"{i:032x}", f"user{i % 200_000}")
+        if i % 1000 == 0:
+            store.purge_expired(1000)
+        if (i + 1) % checkpoint == 0:
+            current, peak = tracemalloc.get_traced_memory()
+            print(f"{i + 1:>11,} logins  size={len(store):>7,}  "
+                  f"traced={current / 2**20:7.1f} MiB  peak={peak / 2**20:7.1f} MiB")
+    tracemalloc.stop()
+    print(f"elapsed: {time.perf_counter() - start:.1f}s  stats={store.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# scripts/bench_request_accounting.py
+"""
+Benchmark request accounting: latency /loans/all tanpa accounting, CPU
+saja, dan CPU + alokasi (tracemalloc), lalu laporan per route/role.
+
+    python scripts/bench_request_accounting.py [loans] [iterations]
+"""
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from uuid import uuid4
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi.testclient import TestClient
+
+from api.loan_router import repo
+from auth.jwt_handler import create_access_token
+from auth.users import get_user_by_username
+from domain.book_id import BookId
+from domain.loan import Loan
+from domain.user_id import UserId
+from infrastructure.request_accounting import UsageStats
+from main import app
+from middleware.request_accounting import RequestAccountingMiddleware
+
+
+def p50(client, headers, iterations: int) -> float:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        client.get("/loans/all", headers=headers)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return samples[len(samples) // 2] * 1000
+
+
+def main():
+    loans = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    for _ in range(loans):
+        repo.save(Loan(BookId(uuid4()), UserId(uuid4())))
+    user = get_user_by_username("pengguna1")
+    headers = {"Authorization": f"Bearer {create_access_token(str(user.user_id), user.role)}"}
+
+    plain = TestClient(app)
+    p50(plain, headers, 20)
+    print(f"/loans/all ({loans} loans) p50 off       : {p50(plain, headers, iterations):.3f} ms")
+
+    stats = UsageStats()
+    cpu_only = TestClient(RequestAccountingMiddleware(app, stats, track_alloc=False))
+    print(f"/loans/all ({loans} loans) p50 cpu       : {p50(cpu_only, headers, iterations):.3f} ms")
+
+    with_alloc = TestClient(RequestAccountingMiddleware(app, stats, track_alloc=True))
+    print(f"/loans/all ({loans} loans) p50 cpu+alloc : {p50(with_alloc, headers, iterations):.3f} ms")
+    with_alloc.post("/auth/login", data={"username": "peminjam1", "password": "password123"})
+    tracemalloc.stop()
+
+    for row in stats.report()["by_route_role"]:
+        print(f"  {row['route']:14s} {row['role']:10s} n={row['requests']:4d} "
+              f"cpu avg {row['cpu_avg_ms']:8.3f} ms  alloc avg {row['alloc_avg_bytes']:9d} B")
+
+
+if __name__ == "__main__":
+    main()
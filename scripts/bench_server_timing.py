@@ -0,0 +1,67 @@
+# scripts/bench_server_timing.py
+"""
+Benchmark Server-Timing: biaya phase() saat nonaktif/aktif, dan latency
+/loans/all (N loan) dengan dan tanpa ServerTimingMiddleware.
+
+    python scripts/bench_server_timing.py [loans] [iterations]
+"""
+import sys
+import time
+from pathlib import Path
+from uuid import uuid4
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi.testclient import TestClient
+
+from api.loan_router import repo
+from auth.jwt_handler import create_access_token
+from auth.users import get_user_by_username
+from domain.book_id import BookId
+from domain.loan import Loan
+from domain.user_id import UserId
+from infrastructure.phase_timing import phase, reset_timer, start_timer
+from main import app
+from middleware.server_timing import ServerTimingMiddleware
+
+
+def per_call(iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        with phase("repo"):
+            pass
+    return (time.perf_counter() - start) / iterations * 1e9
+
+
+def timed_requests(client, headers, iterations: int):
+    samples = []
+    response = None
+    for _ in range(iterations):
+        start = time.perf_counter()
+        response = client.get("/loans/all", headers=headers)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return samples[len(samples) // 2] * 1000, response
+
+
+def main():
+    loans = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    print(f"phase() disabled : {per_call(1_000_000):6.0f} ns/call")
+    _, token = start_timer()
+    print(f"phase() enabled  : {per_call(1_000_000):6.0f} ns/call")
+    reset_timer(token)
+
+    for _ in range(loans):
+        repo.save(Loan(BookId(uuid4()), UserId(uuid4())))
+    user = get_user_by_username("pengguna1")
+    headers = {"Authorization": f"Bearer {create_access_token(str(user.user_id), user.role)}"}
+
+    plain, _ = timed_requests(TestClient(app), headers, iterations)
+    timed, response = timed_requests(TestClient(ServerTimingMiddleware(app)), headers, iterations)
+    print(f"/loans/all ({loans} loans) p50 without: {plain:.2f} ms, with: {timed:.2f} ms")
+    print(f"Server-Timing: {response.headers['server-timing']}")
+
+
+if __name__ == "__main__":
+    main()
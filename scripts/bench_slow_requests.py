@@ -0,0 +1,61 @@
+# scripts/bench_slow_requests.py
+"""
+Benchmark slow-request capture: biaya per request (di bawah threshold)
+dari SlowRequestMiddleware di sekitar ASGI app kosong, dengan dan tanpa
+ServerTimingMiddleware di luar (timer dipakai ulang).
+
+    python scripts/bench_slow_requests.py [iterations]
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from infrastructure.slow_requests import SlowRequestLog
+from middleware.server_timing import ServerTimingMiddleware
+from middleware.slow_requests import SlowRequestMiddleware
+
+SCOPE = {"type": "http", "method": "GET", "path": "/", "headers": []}
+
+
+async def empty_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def receive():
+    return {"type": "http.request", "body": b""}
+
+
+async def send(message):
+    pass
+
+
+async def per_request(app, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await app(SCOPE, receive, send)
+    return (time.perf_counter() - start) / iterations * 1e9
+
+
+async def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    log = SlowRequestLog(threshold=10.0)
+    wrapped = SlowRequestMiddleware(empty_app, log=log)
+
+    base = await per_request(empty_app, iterations)
+    slow = await per_request(wrapped, iterations)
+    timing = await per_request(ServerTimingMiddleware(empty_app), iterations)
+    both = await per_request(ServerTimingMiddleware(wrapped), iterations)
+    log.stop_watchdog()
+
+    print(f"empty app                        : {base:6.0f} ns/request")
+    print(f"+ SlowRequestMiddleware          : {slow:6.0f} ns/request (+{slow - base:.0f})")
+    print(f"+ ServerTiming                   : {timing:6.0f} ns/request")
+    print(f"+ ServerTiming + SlowRequest     : {both:6.0f} ns/request (+{both - timing:.0f})")
+    print(f"records captured: {log.captured}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
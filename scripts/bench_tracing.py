@@ -0,0 +1,72 @@
+# scripts/bench_tracing.py
+"""
+Benchmark tracing: latency /loans/all tanpa tracing, dengan tail sampling
+saja (ratio 0), dan dengan semua request di-sample (ratio 1), plus jumlah
+trace yang diekspor ke file sementara.
+
+    python scripts/bench_tracing.py [loans] [iterations]
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from uuid import uuid4
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi.testclient import TestClient
+
+from api.loan_router import repo
+from auth.jwt_handler import create_access_token
+from auth.users import get_user_by_username
+from domain.book_id import BookId
+from domain.loan import Loan
+from domain.user_id import UserId
+from infrastructure.tracing import BatchSpanProcessor, FileSpanExporter, Sampler
+from main import app
+from middleware.tracing import TracingMiddleware
+
+
+def p50(client, headers, iterations: int) -> float:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        client.get("/loans/all", headers=headers)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return samples[len(samples) // 2] * 1000
+
+
+def main():
+    loans = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+
+    for _ in range(loans):
+        repo.save(Loan(BookId(uuid4()), UserId(uuid4())))
+    user = get_user_by_username("pengguna1")
+    headers = {"Authorization": f"Bearer {create_access_token(str(user.user_id), user.role)}"}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "traces.jsonl")
+        processor = BatchSpanProcessor(FileSpanExporter(path), interval=0.5)
+        tail = TracingMiddleware(app, processor, Sampler(0.0, 0.5))
+        full = TracingMiddleware(app, processor, Sampler(1.0, 0.5))
+
+        plain = TestClient(app)
+        p50(plain, headers, 20)
+        results = {
+            "off": p50(plain, headers, iterations),
+            "tail only": p50(TestClient(tail), headers, iterations),
+            "ratio 1.0": p50(TestClient(full), headers, iterations),
+        }
+        processor.shutdown()
+        with open(path) as f:
+            batches = f.read().splitlines()
+
+    for name, ms in results.items():
+        print(f"/loans/all ({loans} loans) p50 {name:9s}: {ms:.3f} ms")
+    print(f"exported {processor.exported} traces in {len(batches)} batches, dropped {processor.dropped}")
+
+
+if __name__ == "__main__":
+    main()
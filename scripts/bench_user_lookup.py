@@ -0,0 +1,52 @@
+# scripts/bench_user_lookup.py
+"""
+Benchmark get_user_by_id dengan 100k user: scan linear lama vs index UUID.
+
+    python scripts/bench_user_lookup.py [n_users] [lookups]
+"""
+import random
+import sys
+import time
+from pathlib import Path
+from uuid import uuid4
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from auth.users import User, USERS_DB, add_user, get_user_by_id
+
+FAKE_HASH = "$2b$12$TmJP5appjRpYp0bYUlkzNeT8tDMl5h/Tv39P9dl3hyDruNBqlscUm"
+
+
+def linear_scan(user_id):
+    # implementasi sebelum index
+    for u in USERS_DB.values():
+        if str(u.user_id) == str(user_id):
+            return u
+    return None
+
+
+def timed(fn, ids) -> float:
+    start = time.perf_counter()
+    for uid in ids:
+        fn(uid)
+    return (time.perf_counter() - start) / len(ids) * 1e6
+
+
+def main():
+    n_users = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    for i in range(n_users):
+        add_user(User(uuid4(), f"patron{i}", FAKE_HASH, "peminjam"))
+    ids = [str(u.user_id) for u in random.sample(list(USERS_DB.values()), lookups)]
+
+    scan = timed(linear_scan, ids)
+    indexed = timed(get_user_by_id, ids)
+
+    print(f"users              : {len(USERS_DB)}")
+    print(f"linear scan (us)   : {scan:.2f}")
+    print(f"uuid index  (us)   : {indexed:.2f}")
+    print(f"speedup            : {scan / indexed:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
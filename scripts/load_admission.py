@@ -0,0 +1,162 @@
+# scripts/load_admission.py
+"""
+Load test admission control: beban open-loop 3x kapasitas ke backend
+simulasi (N worker, service time tetap), dengan dan tanpa middleware.
+
+    python scripts/load_admission.py [overload] [seconds]
+    python scripts/load_admission.py login [logins_per_second] [seconds]
+
+Backend disimulasikan dengan semaphore + asyncio.sleep supaya kapasitasnya
+pasti dan generator beban tidak berebut CPU dengan handler.
+
+Mode `login`: POST /auth/login sungguhan (app asli, bcrypt) bersamaan
+dengan trafik route lain ke backend simulasi di bawah kapasitasnya,
+dengan dan tanpa latency class untuk /auth/login. Tanpa class, burst
+login saja sudah menurunkan limit (dan menolak route lain).
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from middleware.admission import AdmissionControlMiddleware, AimdLimit
+
+WORKERS = 4
+SERVICE_TIME = 0.02  # kapasitas = WORKERS / SERVICE_TIME = 200 req/s
+
+
+def make_backend():
+    slots = asyncio.Semaphore(WORKERS)
+
+    async def backend(scope, receive, send):
+        async with slots:
+            await asyncio.sleep(SERVICE_TIME)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    return backend
+
+
+LOGIN_BODY = b"username=peminjam1&password=pinjam123"
+
+
+def login_scope() -> dict:
+    return {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+            "scheme": "http", "path": "/auth/login", "raw_path": b"/auth/login", "query_string": b"",
+            "root_path": "", "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 8000),
+            "headers": [(b"content-type", b"application/x-www-form-urlencoded"),
+                        (b"content-length", str(len(LOGIN_BODY)).encode())]}
+
+
+async def login_receive():
+    return {"type": "http.request", "body": LOGIN_BODY, "more_body": False}
+
+
+async def one(asgi, latencies, rejected, scope=None, receive=None):
+    status = []
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    started = time.perf_counter()
+    scope = scope or {"type": "http", "method": "GET", "path": "/loans/my", "headers": []}
+    await asgi(scope, receive, send)
+    if status[0] == 503:
+        rejected.append(time.perf_counter() - started)
+    else:
+        latencies.append(time.perf_counter() - started)
+
+
+async def run(with_admission: bool, rate: float, seconds: float):
+    asgi = make_backend()
+    if with_admission:
+        asgi = AdmissionControlMiddleware(
+            asgi, limit=AimdLimit(initial=WORKERS, min_limit=WORKERS, latency_target=0.1),
+            max_queue=WORKERS * 4, max_queue_wait=0.05)
+    latencies, rejected, tasks = [], [], []
+    start = time.perf_counter()
+    sent = 0
+    while time.perf_counter() - start < seconds:
+        due = int((time.perf_counter() - start) * rate)
+        for _ in range(due - sent):
+            tasks.append(asyncio.create_task(one(asgi, latencies, rejected)))
+        sent = due
+        await asyncio.sleep(0.001)
+    await asyncio.gather(*tasks)
+    return latencies, rejected, (asgi.stats() if with_admission else None)
+
+
+def pct(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] * 1000 if values else 0.0
+
+
+async def run_with_logins(latency_classes, login_rate: float, seconds: float):
+    from application import app as real_app
+
+    simulated = make_backend()
+
+    async def routed(scope, receive, send):
+        target = real_app if scope["path"] == "/auth/login" else simulated
+        await target(scope, receive, send)
+
+    asgi = AdmissionControlMiddleware(
+        routed, limit=AimdLimit(initial=WORKERS * 2, min_limit=1, latency_target=0.1),
+        max_queue=WORKERS * 4, max_queue_wait=0.05, latency_classes=latency_classes)
+    # route lain di 80% kapasitas backend: tanpa login tidak ada yang perlu ditolak
+    other_rate = WORKERS / SERVICE_TIME * 0.8
+    other_ok, other_shed, logins_ok, logins_shed, tasks = [], [], [], [], []
+    start = time.perf_counter()
+    sent_other = sent_login = 0
+    lowest = int(asgi.limit)
+    while time.perf_counter() - start < seconds:
+        elapsed = time.perf_counter() - start
+        for _ in range(int(elapsed * other_rate) - sent_other):
+            tasks.append(asyncio.create_task(one(asgi, other_ok, other_shed)))
+        for _ in range(int(elapsed * login_rate) - sent_login):
+            tasks.append(asyncio.create_task(
+                one(asgi, logins_ok, logins_shed, login_scope(), login_receive)))
+        sent_other, sent_login = int(elapsed * other_rate), int(elapsed * login_rate)
+        lowest = min(lowest, int(asgi.limit))
+        await asyncio.sleep(0.001)
+    await asyncio.gather(*tasks)
+    return other_ok, other_shed, logins_ok, logins_shed, lowest, asgi.stats()
+
+
+def main_logins(login_rate: float, seconds: float):
+    print(f"real POST /auth/login at {login_rate:.0f}/s + simulated routes at 80% capacity "
+          f"for {seconds:.0f}s")
+    for label, classes in (("no latency class", {}), ("login class 2s", {"/auth/login": 2.0})):
+        ok, shed, logins, logins_shed, lowest, stats = asyncio.run(
+            run_with_logins(classes, login_rate, seconds))
+        print(f"{label:16s}: other ok={len(ok):5d} 503={len(shed):5d} p99={pct(ok, 0.99):7.1f}ms | "
+              f"login ok={len(logins):3d} 503={len(logins_shed):3d} p50={pct(logins, 0.5):7.1f}ms | "
+              f"limit min={lowest} final={stats['limit']}")
+    pool = sys.modules.get("auth.password_pool")
+    if pool is not None:
+        pool.password_pool.shutdown()
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "login":
+        return main_logins(float(sys.argv[2]) if len(sys.argv) > 2 else 4.0,
+                           float(sys.argv[3]) if len(sys.argv) > 3 else 10.0)
+    overload = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    capacity = WORKERS / SERVICE_TIME
+    rate = capacity * overload
+    print(f"capacity {capacity:.0f} req/s, offered {rate:.0f} req/s for {seconds:.0f}s")
+    for label, enabled in (("no admission", False), ("admission", True)):
+        ok, shed, stats = asyncio.run(run(enabled, rate, seconds))
+        print(f"{label:13s}: ok={len(ok):5d} 503={len(shed):5d} "
+              f"p50={pct(ok, 0.5):7.1f}ms p99={pct(ok, 0.99):7.1f}ms "
+              f"503 p99={pct(shed, 0.99):6.1f}ms")
+        if stats:
+            print(f"{'':13s}  final limit={stats['limit']} "
+                  f"queue_wait_avg={stats['queue_wait_avg'] * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
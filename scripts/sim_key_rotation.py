@@ -0,0 +1,67 @@
+# scripts/sim_key_rotation.py
+"""
+Simulasi login rate per menit di sekitar event rotasi signing key.
+
+    python scripts/sim_key_rotation.py [users] [rotate_at_minute]
+
+Setiap user aktif memegang access token 60 menit dan login ulang (bcrypt)
+saat tokennya ditolak. Dibandingkan:
+  - hard swap : key lama langsung dibuang (perilaku SECRET_KEY tunggal)
+  - keyring   : key lama tetap valid selama grace window
+"""
+import random
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from auth.keyring import Keyring
+
+TOKEN_MINUTES = 60
+MINUTES = 180
+
+
+class SimClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def simulate(users: int, rotate_at: int, grace_seconds: float):
+    clock = SimClock()
+    ring = Keyring({"k0": "s0"}, active_kid="k0", grace_seconds=grace_seconds, clock=clock)
+    rng = random.Random(42)
+    # token awal tersebar merata di 60 menit terakhir: (kid, exp_minute)
+    tokens = [("k0", rng.uniform(0, TOKEN_MINUTES)) for _ in range(users)]
+    logins = []
+    for minute in range(MINUTES):
+        clock.now = minute * 60.0
+        if minute == rotate_at:
+            ring.rotate("k1", "s1")
+            if grace_seconds == 0:
+                ring.remove("k0")
+        count = 0
+        for i, (kid, exp) in enumerate(tokens):
+            if exp <= minute or ring.get(kid) is None:
+                tokens[i] = (ring.active_kid, minute + TOKEN_MINUTES)
+                count += 1
+        logins.append(count)
+    return logins
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rotate_at = int(sys.argv[2]) if len(sys.argv) > 2 else 90
+    hard = simulate(users, rotate_at, grace_seconds=0)
+    graceful = simulate(users, rotate_at, grace_seconds=TOKEN_MINUTES * 60)
+
+    print(f"users={users}, rotation at minute {rotate_at}")
+    print(f"{'minute':>8}{'hard swap':>12}{'keyring':>12}")
+    for minute in range(rotate_at - 3, rotate_at + 4):
+        print(f"{minute:>8}{hard[minute]:>12}{graceful[minute]:>12}")
+    print(f"{'peak':>8}{max(hard[60:]):>12}{max(graceful[60:]):>12}   (login/minute, after warm-up)")
+
+
+if __name__ == "__main__":
+    main()
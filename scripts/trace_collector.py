@@ -0,0 +1,67 @@
+# scripts/trace_collector.py
+"""
+Stand-in OTLP/HTTP collector untuk development: menerima POST JSON di
+/v1/traces (format yang sama dengan OpenTelemetry Collector :4318),
+menulis tiap request ke file dan mencetak ringkasan trace.
+
+    python scripts/trace_collector.py [port] [output]
+    TRACING_ENABLED=true TRACE_EXPORTER=otlp uvicorn main:app
+"""
+import json
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def summarize(payload: dict) -> list:
+    lines = []
+    for resource in payload.get("resourceSpans", []):
+        for scope in resource.get("scopeSpans", []):
+            for span in scope.get("spans", []):
+                if "parentSpanId" in span and span.get("kind") != 2:
+                    continue
+                ms = (int(span["endTimeUnixNano"]) - int(span["startTimeUnixNano"])) / 1e6
+                lines.append(f"{span['traceId']} {span['name']} {ms:.2f} ms")
+    return lines
+
+
+def make_handler(output: str):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path != "/v1/traces":
+                self.send_error(404)
+                return
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                self.send_error(400, "invalid JSON")
+                return
+            with open(output, "a", encoding="utf-8") as f:
+                f.write(json.dumps(payload, separators=(",", ":")) + "\n")
+            for line in summarize(payload):
+                print(line, flush=True)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 4318
+    output = sys.argv[2] if len(sys.argv) > 2 else "traces_collected.jsonl"
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(output))
+    print(f"OTLP/HTTP JSON collector on http://127.0.0.1:{port}/v1/traces -> {output}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""
+Tests for admin endpoints
+"""
+import tracemalloc
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+
+from infrastructure.request_accounting import USAGE
+from infrastructure.slow_requests import SLOW_REQUESTS
+from main import app
+
+client = TestClient(app)
+
+
+class TestLanesEndpoint:
+    """Test suite for GET /admin/lanes"""
+
+    def test_pengguna_gets_lane_stats(self, pengguna_token):
+        """Test that pengguna can read per-lane queue metrics"""
+        response = client.get("/admin/lanes", headers={"Authorization": f"Bearer {pengguna_token}"})
+
+        assert response.status_code == 200
+        body = response.json()
+        assert {"interactive", "bulk"} <= set(body)
+        assert {"active", "queued", "wait_avg", "wait_max", "rejected"} <= set(body["bulk"])
+
+    def test_peminjam_forbidden(self, peminjam_token):
+        """Test that borrowers cannot read admin metrics"""
+        response = client.get("/admin/lanes", headers={"Authorization": f"Bearer {peminjam_token}"})
+
+        assert response.status_code == 403
+
+
+class TestProfileEndpoint:
+    """Test suite for GET /admin/profile"""
+
+    def test_pengguna_gets_profile(self, pengguna_token):
+        """Test that pengguna gets a top-functions table and collapsed stacks"""
+        response = client.get(
+            "/admin/profile",
+            params={"seconds": 0.1, "interval_ms": 2, "include_idle": True},
+            headers={"Authorization": f"Bearer {pengguna_token}"},
+        )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["samples"] > 0
+        assert body["top"]
+        assert {"function", "self", "total", "self_pct", "total_pct"} <= set(body["top"][0])
+        assert body["collapsed"].startswith("thread:")
+
+    def test_collapsed_format(self, pengguna_token):
+        """Test that format=collapsed returns plain text for flamegraph tools"""
+        response = client.get(
+            "/admin/profile",
+            params={"seconds": 0.05, "format": "collapsed", "include_idle": True},
+            headers={"Authorization": f"Bearer {pengguna_token}"},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert response.text.splitlines()[0].rsplit(" ", 1)[1].isdigit()
+
+    def test_seconds_above_limit_rejected(self, pengguna_token):
+        """Test that profiles longer than PROFILER_MAX_SECONDS are rejected"""
+        response = client.get(
+            "/admin/profile",
+            params={"seconds": 3600},
+            headers={"Authorization": f"Bearer {pengguna_token}"},
+        )
+
+        assert response.status_code == 400
+
+    def test_peminjam_forbidden(self, peminjam_token):
+        """Test that borrowers cannot run the profiler"""
+        response = client.get(
+            "/admin/profile",
+            params={"seconds": 0.05},
+            headers={"Authorization": f"Bearer {peminjam_token}"},
+        )
+
+        assert response.status_code == 403
+
+
+class TestSlowRequestsEndpoint:
+    """Test suite for /admin/slow-requests"""
+
+    def test_pengguna_reads_newest_first(self, pengguna_token):
+        """Test that captured records are returned newest first, up to limit"""
+        SLOW_REQUESTS.clear()
+        SLOW_REQUESTS.add({"path": "/loans/1/approve", "duration_ms": 900.0})
+        SLOW_REQUESTS.add({"path": "/loans/all", "duration_ms": 700.0})
+
+        response = client.get(
+            "/admin/slow-requests",
+            params={"limit": 1},
+            headers={"Authorization": f"Bearer {pengguna_token}"},
+        )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["captured"] == 2
+        assert [r["path"] for r in body["records"]] == ["/loans/all"]
+        SLOW_REQUESTS.clear()
+
+    def test_pengguna_clears_log(self, pengguna_token):
+        """Test that DELETE empties the ring buffer"""
+        SLOW_REQUESTS.add({"path": "/loans/all"})
+
+        response = client.delete("/admin/slow-requests", headers={"Authorization": f"Bearer {pengguna_token}"})
+
+        assert response.status_code == 200
+        assert SLOW_REQUESTS.snapshot()["records"] == []
+
+    def test_peminjam_forbidden(self, peminjam_token):
+        """Test that borrowers cannot read captured requests"""
+        response = client.get("/admin/slow-requests", headers={"Authorization": f"Bearer {peminjam_token}"})
+
+        assert response.status_code == 403
+
+
+class TestUsageEndpoint:
+    """Test suite for /admin/usage"""
+
+    def test_pengguna_reads_report(self, pengguna_token):
+        """Test that the report lists the most expensive callers first"""
+        USAGE.clear()
+        USAGE.record("/auth/login", "anonymous", 0.2, 0)
+        USAGE.record("/loans/all", "pengguna", 0.05, 0)
+
+        response = client.get("/admin/usage", params={"limit": 1},
+                              headers={"Authorization": f"Bearer {pengguna_token}"})
+
+        assert response.status_code == 200
+        body = response.json()
+        assert [(r["route"], r["role"]) for r in body["by_route_role"]] == [("/auth/login", "anonymous")]
+        assert set(body["by_role"]) == {"anonymous", "pengguna"}
+        USAGE.clear()
+
+    def test_invalid_sort_rejected(self, pengguna_token):
+        """Test that unknown sort keys are a validation error"""
+        response = client.get("/admin/usage", params={"sort": "memory"},
+                              headers={"Authorization": f"Bearer {pengguna_token}"})
+
+        assert response.status_code == 422
+
+    def test_peminjam_forbidden(self, peminjam_token):
+        """Test that borrowers cannot read usage accounting"""
+        response = client.get("/admin/usage", headers={"Authorization": f"Bearer {peminjam_token}"})
+
+        assert response.status_code == 403
+
+
+class TestHeapEndpoints:
+    """Test suite for /admin/heap*"""
+
+    def test_footprint_by_root(self, pengguna_token):
+        """Test that repository and token stores are broken down by type"""
+        response = client.get("/admin/heap", headers={"Authorization": f"Bearer {pengguna_token}"})
+
+        assert response.status_code == 200
+        body = response.json()
+        assert {"loan_repository", "refresh_tokens", "token_cache"} <= set(body["footprint"])
+        assert body["tracemalloc"]["tracing"] is False
+
+    def test_snapshot_and_diff(self, pengguna_token):
+        """Test tracing start, two snapshots, diff and stop"""
+        headers = {"Authorization": f"Bearer {pengguna_token}"}
+        try:
+            assert client.post("/admin/heap/tracing", params={"frames": 2}, headers=headers).json()["frames"] == 2
+            first = client.post("/admin/heap/snapshots", params={"name": "a"}, headers=headers)
+            client.post("/admin/heap/snapshots", params={"name": "b"}, headers=headers)
+            diff = client.get("/admin/heap/diff", params={"base": "a", "target": "b"}, headers=headers)
+        finally:
+            stopped = client.delete("/admin/heap/tracing", headers=headers)
+
+        assert first.status_code == 200
+        assert "sites" in first.json()
+        assert diff.status_code == 200
+        assert diff.json()["base"] == "a"
+        assert stopped.json()["tracing"] is False
+        assert not tracemalloc.is_tracing()
+
+    def test_stop_refused_for_foreign_tracing(self, pengguna_token):
+        """Test that tracing the heap report did not start is not stopped"""
+        headers = {"Authorization": f"Bearer {pengguna_token}"}
+        tracemalloc.start(1)
+        try:
+            stopped = client.delete("/admin/heap/tracing", headers=headers)
+            restarted = client.post("/admin/heap/tracing", params={"frames": 3}, headers=headers)
+            still_tracing = tracemalloc.is_tracing()
+        finally:
+            tracemalloc.stop()
+
+        assert stopped.status_code == 409
+        assert restarted.status_code == 409
+        assert still_tracing
+
+    def test_snapshot_without_tracing(self, pengguna_token):
+        """Test that snapshots need tracemalloc running"""
+        response = client.post("/admin/heap/snapshots", params={"name": "x"},
+                               headers={"Authorization": f"Bearer {pengguna_token}"})
+
+        assert response.status_code == 409
+
+    def test_unknown_snapshot(self, pengguna_token):
+        """Test that diffing a missing snapshot is a 404"""
+        response = client.get("/admin/heap/diff", params={"base": "nope", "target": "nada"},
+                              headers={"Authorization": f"Bearer {pengguna_token}"})
+
+        assert response.status_code == 404
+
+    def test_peminjam_forbidden(self, peminjam_token):
+        """Test that borrowers cannot inspect the heap"""
+        response = client.get("/admin/heap", headers={"Authorization": f"Bearer {peminjam_token}"})
+
+        assert response.status_code == 403
+
+
+class TestAuditEndpoints:
+    """Test suite for /admin/audit*"""
+
+    def test_loan_history(self, pengguna_token, peminjam_token):
+        """Test that every transition is recorded with actor, role and stages"""
+        admin = {"Authorization": f"Bearer {pengguna_token}"}
+        borrower = {"Authorization": f"Bearer {peminjam_token}"}
+        me = client.get("/auth/me", headers=borrower).json()
+        loan = client.post("/loans", json={"bookId": str(uuid4()), "userId": me["user_id"]},
+                           headers=borrower).json()
+        loan_id = loan["loanId"]
+        client.post(f"/loans/{loan_id}/verify", headers=admin)
+        client.post(f"/loans/{loan_id}/approve", headers=admin)
+        client.post(f"/loans/{loan_id}/return", headers=borrower)
+        client.post(f"/loans/{loan_id}/finalize-return", headers=admin)
+
+        response = client.get(f"/admin/audit/loans/{loan_id}", headers=admin)
+
+        assert response.status_code == 200
+        history = response.json()
+        assert [(e["action"], e["from"], e["to"]) for e in history] == [
+            ("created", None, "requested"),
+            ("verified", "requested", "verified"),
+            ("approved", "verified", "borrowed"),
+            ("return_initiated", "borrowed", "return_initiated"),
+            ("returned", "return_initiated", "returned"),
+        ]
+        assert [e["role"] for e in history] == ["peminjam", "pengguna", "pengguna", "peminjam", "pengguna"]
+        assert history[0]["actor"] == me["user_id"]
+        assert history[2]["detail"].startswith("due ")
+        assert all(e["recordedAt"] >= e["occurredAt"] for e in history)
+
+    def test_failed_transition_not_recorded(self, pengguna_token, peminjam_token):
+        """Test that rejected transitions leave no audit entry"""
+        admin = {"Authorization": f"Bearer {pengguna_token}"}
+        loan = client.post("/loans", json={"bookId": str(uuid4()), "userId": str(uuid4())},
+                           headers={"Authorization": f"Bearer {peminjam_token}"}).json()
+
+        assert client.post(f"/loans/{loan['loanId']}/approve", headers=admin).status_code == 400
+
+        actions = [e["action"] for e in client.get(f"/admin/audit/loans/{loan['loanId']}", headers=admin).json()]
+        assert actions == ["created"]
+
+    def test_actor_history_paging(self, pengguna_token, peminjam_token):
+        """Test the by-actor lookup and `after` paging"""
+        admin = {"Authorization": f"Bearer {pengguna_token}"}
+        borrower = {"Authorization": f"Bearer {peminjam_token}"}
+        actor = client.get("/auth/me", headers=admin).json()["user_id"]
+        for _ in range(3):
+            loan = client.post("/loans", json={"bookId": str(uuid4()), "userId": str(uuid4())},
+                               headers=borrower).json()
+            client.post(f"/loans/{loan['loanId']}/verify", headers=admin)
+
+        everything = client.get(f"/admin/audit/actors/{actor}", params={"limit": 1000}, headers=admin).json()
+        page = client.get(f"/admin/audit/actors/{actor}",
+                          params={"after": everything[-3]["seq"], "limit": 1}, headers=admin).json()
+
+        assert all(e["actor"] == actor and e["role"] == "pengguna" for e in everything)
+        assert [e["seq"] for e in page] == [everything[-2]["seq"]]
+        assert client.get("/admin/audit", headers=admin).json()["written"] >= len(everything)
+
+    def test_peminjam_forbidden(self, peminjam_token):
+        """Test that borrowers cannot read the audit trail"""
+        response = client.get(f"/admin/audit/loans/{uuid4()}",
+                              headers={"Authorization": f"Bearer {peminjam_token}"})
+
+        assert response.status_code == 403
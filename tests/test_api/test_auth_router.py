@@ -264,6 +264,19 @@ class TestMe:
         
         assert response.status_code == 401
 
+    def test_me_with_unhashable_kid(self):
+        """Test that a crafted kid header returns 401, not 500"""
+        from jose import jwt
+        from auth.jwt_handler import ALGORITHM, SECRET_KEY
+        token = jwt.encode({"sub": "x", "role": "peminjam"}, SECRET_KEY,
+                           algorithm=ALGORITHM, headers={"kid": ["x"]})
+
+        me = client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
+        loans = client.get("/loans/my", headers={"Authorization": f"Bearer {token}"})
+
+        assert me.status_code == 401
+        assert loans.status_code == 401
+
     def test_me_for_pengguna(self):
         """Test getting user info for pengguna role"""
         # Login as pengguna
@@ -329,4 +342,157 @@ class TestAuthIntegration:
             "/auth/login",
             data={"username": "peminjam1", "password": "pinjam123"}
         )
-        assert "access_token" in login_response.json()
\ No newline at end of file
+        assert "access_token" in login_response.json()
+
+class TestLoginRehash:
+    """Test suite for bcrypt cost upgrade on login"""
+
+    def test_login_upgrades_hash_cost(self):
+        """Test that login replaces a hash stored with a different cost"""
+        from passlib.hash import bcrypt
+        from auth.users import BCRYPT_ROUNDS, get_user_by_username
+
+        user = get_user_by_username("peminjam1")
+        original = user.hashed_password
+        user.hashed_password = bcrypt.using(rounds=4).hash("pinjam123")
+        try:
+            response = client.post(
+                "/auth/login",
+                data={"username": "peminjam1", "password": "pinjam123"}
+            )
+            assert response.status_code == 200
+            assert user.hashed_password.startswith(f"$2b${BCRYPT_ROUNDS:02d}$")
+        finally:
+            user.hashed_password = original
+
+
+class TestStatelessRefreshMode:
+    """Test suite for REFRESH_TOKEN_MODE=stateless"""
+
+    def setup_method(self):
+        import auth.auth_router as auth_router
+        self.auth_router = auth_router
+        self.original_mode = auth_router.REFRESH_TOKEN_MODE
+        auth_router.REFRESH_TOKEN_MODE = "stateless"
+
+    def teardown_method(self):
+        self.auth_router.REFRESH_TOKEN_MODE = self.original_mode
+
+    def _login(self):
+        response = client.post(
+            "/auth/login",
+            data={"username": "peminjam1", "password": "pinjam123"}
+        )
+        assert response.status_code == 200
+        return response.json()["refresh_token"]
+
+    def test_refresh_without_server_side_store(self):
+        """Test that refresh works without touching REFRESH_TOKENS"""
+        size_before = len(self.auth_router.REFRESH_TOKENS)
+        refresh_token = self._login()
+
+        response = client.post("/auth/refresh", json={"refresh_token": refresh_token})
+
+        assert response.status_code == 200
+        assert "access_token" in response.json()
+        assert len(self.auth_router.REFRESH_TOKENS) == size_before
+
+    def test_logout_revokes_user_tokens(self):
+        """Test that logout bumps the generation and blocks refresh"""
+        refresh_token = self._login()
+
+        client.post("/auth/logout", json={"refresh_token": refresh_token})
+        response = client.post("/auth/refresh", json={"refresh_token": refresh_token})
+
+        assert response.status_code == 401
+
+    def test_rotated_token_replay_rejected(self):
+        """Test that a refresh token can be used once"""
+        refresh_token = self._login()
+
+        first = client.post("/auth/refresh", json={"refresh_token": refresh_token})
+        replay = client.post("/auth/refresh", json={"refresh_token": refresh_token})
+
+        assert first.status_code == 200
+        assert replay.status_code == 401
+
+    def test_invalid_refresh_token(self):
+        """Test that a garbage token is rejected"""
+        response = client.post("/auth/refresh", json={"refresh_token": "garbage"})
+
+        assert response.status_code == 401
+
+    def test_logout_with_invalid_token(self):
+        """Test that logout with a garbage token still succeeds"""
+        response = client.post("/auth/logout", json={"refresh_token": "garbage"})
+
+        assert response.status_code == 200
+
+
+class TestDisabledUser:
+    """Test suite for disabled users with AUTH_TRUST_CLAIMS=true"""
+
+    def setup_method(self):
+        from uuid import uuid4
+        import auth.auth_router as auth_router
+        import auth.deps as deps
+        from auth.users import User, add_user, hash_password
+        self.auth_router = auth_router
+        self.deps = deps
+        self.original_trust = deps.AUTH_TRUST_CLAIMS
+        self.original_mode = auth_router.REFRESH_TOKEN_MODE
+        deps.AUTH_TRUST_CLAIMS = True
+        self.user = add_user(User(uuid4(), "disabled_peminjam", hash_password("pinjam123"), "peminjam"))
+
+    def teardown_method(self):
+        from auth.revocation import revocation_epochs
+        from auth.users import USERS_DB, USERS_BY_ID
+        self.deps.AUTH_TRUST_CLAIMS = self.original_trust
+        self.auth_router.REFRESH_TOKEN_MODE = self.original_mode
+        USERS_DB.pop("disabled_peminjam", None)
+        USERS_BY_ID.pop(self.user.user_id, None)
+        revocation_epochs.epochs.pop(str(self.user.user_id), None)
+        revocation_epochs.disabled.discard(str(self.user.user_id))
+
+    def _login(self):
+        return client.post(
+            "/auth/login",
+            data={"username": "disabled_peminjam", "password": "pinjam123"}
+        )
+
+    def test_relogin_rejected_after_disable(self):
+        """Test that a disabled user cannot log in and get a working token"""
+        from auth.users import disable_user
+        old_token = self._login().json()["access_token"]
+        disable_user("disabled_peminjam")
+
+        relogin = self._login()
+        old = client.get("/loans/my", headers={"Authorization": f"Bearer {old_token}"})
+
+        assert relogin.status_code == 401
+        assert old.status_code == 401
+
+    @pytest.mark.parametrize("mode", ["store", "stateless"])
+    def test_refresh_rejected_after_disable(self, mode):
+        """Test that a refresh token issued before disable stops working"""
+        from auth.users import disable_user
+        self.auth_router.REFRESH_TOKEN_MODE = mode
+        refresh_token = self._login().json()["refresh_token"]
+        disable_user("disabled_peminjam")
+
+        response = client.post("/auth/refresh", json={"refresh_token": refresh_token})
+
+        assert response.status_code == 401
+
+    def test_disabled_token_stays_revoked_after_purge(self):
+        """Test that the revocation of a disabled user does not expire"""
+        import time
+        from auth.revocation import revocation_epochs
+        from auth.users import disable_user
+        token = self._login().json()["access_token"]
+        disable_user("disabled_peminjam")
+        revocation_epochs.purge(now=time.time() + revocation_epochs.max_token_age + 1)
+
+        response = client.get("/loans/my", headers={"Authorization": f"Bearer {token}"})
+
+        assert response.status_code == 401
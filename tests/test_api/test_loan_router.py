@@ -12,9 +12,9 @@ client = TestClient(app)
 @pytest.fixture(autouse=True)
 def reset_repo():
     """Reset repository before each test"""
-    repo.data.clear()
+    repo.clear()
     yield
-    repo.data.clear()
+    repo.clear()
 
 
 @pytest.fixture
@@ -0,0 +1,268 @@
+"""
+Unit tests for service-to-service API keys
+"""
+import json
+import time
+
+from fastapi.testclient import TestClient
+
+from auth.api_keys import API_KEYS, ApiKeyTable, NonceCache, new_nonce, sign_request, split_key, main
+from main import app
+
+
+client = TestClient(app)
+
+
+class TestApiKeyTable:
+    """Test suite for ApiKeyTable"""
+
+    def test_issue_and_authenticate(self):
+        """Test that an issued key authenticates to its record"""
+        table = ApiKeyTable()
+        plain, key = table.issue("job", "pengguna")
+
+        assert plain.startswith("bw_")
+        assert table.authenticate(plain) is key
+
+    def test_wrong_secret_rejected(self):
+        """Test that a key with the wrong secret is rejected"""
+        table = ApiKeyTable()
+        plain, _ = table.issue("job", "pengguna")
+
+        assert table.authenticate(plain[:-1] + ("A" if plain[-1] != "A" else "B")) is None
+
+    def test_malformed_keys_rejected(self):
+        """Test that malformed keys are rejected"""
+        table = ApiKeyTable()
+
+        for bad in ("", "nope", "bw_", "bw_abc", "bw_.secret", "bw_abc."):
+            assert table.authenticate(bad) is None
+
+    def test_secret_not_stored(self):
+        """Test that only the digest of the secret is kept"""
+        table = ApiKeyTable()
+        plain, key = table.issue("job", "pengguna")
+        _, secret = split_key(plain)
+
+        assert isinstance(key.secret_digest, bytes)
+        assert secret.encode() not in key.secret_digest
+
+    def test_revoke(self):
+        """Test that a revoked key no longer authenticates"""
+        table = ApiKeyTable()
+        plain, key = table.issue("job", "pengguna")
+
+        assert table.revoke(key.key_id) is True
+        assert table.authenticate(plain) is None
+        assert table.revoke(key.key_id) is False
+
+    def test_principal_id_stable_per_key_id(self):
+        """Test that env-loaded keys get the same principal in every process"""
+        a, b = ApiKeyTable(), ApiKeyTable()
+        a.load_from_env("k1:" + "00" * 32 + ":pengguna")
+        b.load_from_env("k1:" + "00" * 32 + ":pengguna")
+
+        assert a.keys["k1"].principal_id == b.keys["k1"].principal_id
+
+    def test_load_from_env(self):
+        """Test parsing BOOKWISE_API_KEYS entries"""
+        table = ApiKeyTable()
+        count = table.load_from_env("k1:" + "ab" * 32 + ":pengguna, k2:" + "cd" * 32 + ":peminjam:signed,")
+
+        assert count == 2
+        assert table.keys["k1"].require_signature is False
+        assert table.keys["k2"].require_signature is True
+        assert table.keys["k2"].role == "peminjam"
+
+
+class TestRequestSignature:
+    """Test suite for HMAC request signing"""
+
+    def setup_method(self):
+        self.table = ApiKeyTable()
+        self.plain, self.key = self.table.issue("job", "pengguna", require_signature=True)
+
+    def sign(self, method="GET", path="/loans/all", body=b"", query="", ts=None, nonce=None):
+        ts = ts or str(int(time.time()))
+        nonce = nonce or new_nonce()
+        return ts, nonce, sign_request(self.plain, method, path, ts, nonce, body, query)
+
+    def test_valid_signature(self):
+        """Test that a correctly signed request verifies"""
+        ts, nonce, sig = self.sign()
+
+        assert self.table.verify_signature(self.key, "GET", "/loans/all", "", ts, nonce, sig, b"") is True
+
+    def test_tampered_body(self):
+        """Test that changing the body invalidates the signature"""
+        ts, nonce, sig = self.sign("POST", "/loans", b'{"a":1}')
+
+        assert self.table.verify_signature(self.key, "POST", "/loans", "", ts, nonce, sig, b'{"a":2}') is False
+
+    def test_tampered_query(self):
+        """Test that the query string is covered by the signature"""
+        ts, nonce, sig = self.sign(query="limit=10")
+
+        assert self.table.verify_signature(self.key, "GET", "/loans/all", "limit=1000", ts, nonce, sig, b"") is False
+        assert self.table.verify_signature(self.key, "GET", "/loans/all", "limit=10", ts, nonce, sig, b"") is True
+
+    def test_stale_timestamp(self):
+        """Test that timestamps outside the skew window are rejected"""
+        ts, nonce, sig = self.sign(ts="1000")
+
+        assert self.table.verify_signature(self.key, "GET", "/loans/all", "", ts, nonce, sig, b"", now=1000 + 61) is False
+        assert self.table.verify_signature(self.key, "GET", "/loans/all", "", ts, nonce, sig, b"", now=1000 + 59) is True
+
+    def test_replayed_nonce_rejected(self):
+        """Test that the same signed request is accepted only once"""
+        ts, nonce, sig = self.sign()
+
+        assert self.table.verify_signature(self.key, "GET", "/loans/all", "", ts, nonce, sig, b"") is True
+        assert self.table.verify_signature(self.key, "GET", "/loans/all", "", ts, nonce, sig, b"") is False
+
+    def test_invalid_signature_does_not_burn_nonce(self):
+        """Test that a forged request cannot use up a client's nonce"""
+        ts, nonce, sig = self.sign()
+
+        assert self.table.verify_signature(self.key, "GET", "/loans/all", "", ts, nonce, "0" * 64, b"") is False
+        assert self.table.verify_signature(self.key, "GET", "/loans/all", "", ts, nonce, sig, b"") is True
+
+    def test_missing_or_bad_headers(self):
+        """Test that missing or malformed signature headers fail"""
+        assert self.table.verify_signature(self.key, "GET", "/", "", None, "n", "x", b"") is False
+        assert self.table.verify_signature(self.key, "GET", "/", "", "abc", "n", "x", b"") is False
+        assert self.table.verify_signature(self.key, "GET", "/", "", "1", None, "x", b"") is False
+
+
+class TestNonceCache:
+    """Test suite for NonceCache"""
+
+    def test_nonce_expires_after_window(self):
+        """Test that nonces are forgotten once their timestamp can no longer verify"""
+        cache = NonceCache(window=60)
+
+        assert cache.add("k", "n", now=0) is True
+        assert cache.add("k", "n", now=100) is False
+        assert cache.add("k", "n", now=121) is True
+
+    def test_nonces_are_per_key(self):
+        """Test that two keys may use the same nonce"""
+        cache = NonceCache(window=60)
+
+        assert cache.add("k1", "n", now=0) is True
+        assert cache.add("k2", "n", now=0) is True
+
+    def test_full_cache_rejects(self):
+        """Test that a full cache fails closed instead of forgetting live nonces"""
+        cache = NonceCache(window=60, maxsize=2)
+
+        assert cache.add("k", "a", now=0) and cache.add("k", "b", now=0)
+        assert cache.add("k", "c", now=1) is False
+        assert cache.add("k", "c", now=121) is True
+
+
+class TestApiKeyEndpoints:
+    """Integration tests for API keys on loan endpoints"""
+
+    def setup_method(self):
+        self.plain, self.key = API_KEYS.issue("integration-job", "pengguna")
+        self.signed_plain, self.signed_key = API_KEYS.issue("signed-job", "pengguna", require_signature=True)
+
+    def teardown_method(self):
+        API_KEYS.revoke(self.key.key_id)
+        API_KEYS.revoke(self.signed_key.key_id)
+
+    def signed_headers(self, method, path, body=b"", query=""):
+        ts, nonce = str(int(time.time())), new_nonce()
+        return {
+            "X-API-Key": self.signed_plain,
+            "X-Timestamp": ts,
+            "X-Nonce": nonce,
+            "X-Signature": sign_request(self.signed_plain, method, path, ts, nonce, body, query),
+            "Content-Type": "application/json",
+        }
+
+    def test_api_key_grants_role(self):
+        """Test that a valid key can call a pengguna endpoint"""
+        response = client.get("/loans/all", headers={"X-API-Key": self.plain})
+
+        assert response.status_code == 200
+
+    def test_api_key_role_enforced(self):
+        """Test that the key's role is enforced"""
+        response = client.get("/loans/my", headers={"X-API-Key": self.plain})
+
+        assert response.status_code == 403
+
+    def test_invalid_api_key(self):
+        """Test that an unknown key is rejected"""
+        response = client.get("/loans/all", headers={"X-API-Key": "bw_nope.nope"})
+
+        assert response.status_code == 401
+        assert response.json()["detail"] == "Invalid API key"
+
+    def test_no_credentials(self):
+        """Test that requests without any credentials get 401"""
+        response = client.get("/loans/all")
+
+        assert response.status_code == 401
+        assert response.json()["detail"] == "Not authenticated"
+
+    def test_signed_key_requires_signature(self):
+        """Test that a signing key without a signature is rejected"""
+        response = client.get("/loans/all", headers={"X-API-Key": self.signed_plain})
+
+        assert response.status_code == 401
+        assert response.json()["detail"] == "Invalid request signature"
+
+    def test_signed_request_with_body(self):
+        """Test a signed POST; the signature covers the JSON body"""
+        body = json.dumps({"extra_days": 3}).encode()
+        path = "/loans/00000000-0000-0000-0000-000000000000/verify"
+        headers = self.signed_headers("POST", path, body)
+        response = client.post(path, content=body, headers=headers)
+
+        assert response.status_code == 404
+
+    def test_signed_request_with_query(self):
+        """Test that the raw query is signed and a changed query is rejected"""
+        headers = self.signed_headers("GET", "/loans/all", query="status=PENDING")
+
+        tampered = client.get("/loans/all?status=APPROVED", headers=headers)
+        response = client.get("/loans/all?status=PENDING", headers=headers)
+
+        assert tampered.status_code == 401
+        assert response.status_code == 200
+
+    def test_replayed_request_rejected(self):
+        """Test that resending a signed request is rejected"""
+        headers = self.signed_headers("GET", "/loans/all")
+
+        assert client.get("/loans/all", headers=headers).status_code == 200
+        replay = client.get("/loans/all", headers=headers)
+
+        assert replay.status_code == 401
+        assert replay.json()["detail"] == "Invalid request signature"
+
+    def test_bearer_still_works(self, pengguna_token):
+        """Test that bearer tokens keep working alongside API keys"""
+        response = client.get("/loans/all", headers={"Authorization": f"Bearer {pengguna_token}"})
+
+        assert response.status_code == 200
+
+
+class TestApiKeyCli:
+    """Test suite for the key issuing CLI"""
+
+    def test_cli_prints_key_and_env_entry(self, capsys):
+        """Test that the CLI prints both the client key and env entry"""
+        assert main(["job", "pengguna", "--signed"]) == 0
+        out = capsys.readouterr().out
+
+        assert "client key        : bw_" in out
+        assert ":pengguna:signed" in out
+
+    def test_cli_usage(self, capsys):
+        """Test usage message on missing arguments"""
+        assert main([]) == 1
+        assert "usage" in capsys.readouterr().out
@@ -0,0 +1,56 @@
+"""
+Unit tests for bcrypt cost calibration
+"""
+from auth.calibrate import (
+    MIN_ROUNDS,
+    MAX_ROUNDS,
+    calibrate_rounds,
+    measure_bcrypt,
+    pick_rounds,
+    main,
+)
+
+
+def fake_measure(rounds: int) -> float:
+    # tiap kenaikan cost menggandakan waktu: cost 4 = 1ms
+    return float(2 ** (rounds - MIN_ROUNDS))
+
+
+class TestCalibrateRounds:
+    """Test suite for calibrate_rounds / pick_rounds"""
+
+    def test_stops_one_past_budget(self):
+        """Test that measurement stops at the first cost over target"""
+        timings = calibrate_rounds(target_ms=100, measure=fake_measure)
+
+        assert max(timings) == 11  # 128ms
+        assert all(ms <= 100 for r, ms in timings.items() if r < 11)
+
+    def test_pick_largest_under_budget(self):
+        """Test that the largest cost within budget is chosen"""
+        timings = calibrate_rounds(target_ms=100, measure=fake_measure)
+
+        assert pick_rounds(timings, 100) == 10
+
+    def test_pick_minimum_when_nothing_fits(self):
+        """Test fallback to the minimum cost on very slow hosts"""
+        timings = calibrate_rounds(target_ms=0.5, measure=fake_measure)
+
+        assert timings == {MIN_ROUNDS: 1.0}
+        assert pick_rounds(timings, 0.5) == MIN_ROUNDS
+
+    def test_capped_at_max_rounds(self):
+        """Test that calibration never goes past MAX_ROUNDS"""
+        timings = calibrate_rounds(target_ms=1e9, measure=fake_measure)
+
+        assert max(timings) == MAX_ROUNDS
+
+    def test_measure_bcrypt_real(self):
+        """Test measuring a real (cheap) bcrypt cost"""
+        assert measure_bcrypt(MIN_ROUNDS, samples=1) > 0
+
+    def test_main_prints_setting(self, capsys):
+        """Test that the CLI prints a BCRYPT_ROUNDS line"""
+        main(["0.0001"])
+
+        assert f"BCRYPT_ROUNDS={MIN_ROUNDS}" in capsys.readouterr().out
@@ -267,4 +267,150 @@ class TestDepsIntegration:
         current_user2 = get_current_active_user(token2)
         
         result2 = checker(current_user2)
-        assert result2.role == "pengguna"
\ No newline at end of file
+        assert result2.role == "pengguna"
+
+class TestClaimsOnlyPrincipal:
+    """Test suite for get_current_principal with AUTH_TRUST_CLAIMS"""
+
+    def setup_method(self):
+        import auth.deps as deps
+        self.deps = deps
+        self.original = deps.AUTH_TRUST_CLAIMS
+        deps.AUTH_TRUST_CLAIMS = True
+
+    def teardown_method(self):
+        self.deps.AUTH_TRUST_CLAIMS = self.original
+
+    def test_principal_from_claims(self):
+        """Test that a valid token yields a TokenUser without user lookup"""
+        from unittest.mock import patch
+        user_id = uuid4()
+        token = create_access_token(str(user_id), "peminjam")
+
+        with patch("auth.deps.get_user_by_id") as lookup:
+            principal = self.deps.get_current_principal(token)
+
+        lookup.assert_not_called()
+        assert isinstance(principal, self.deps.TokenUser)
+        assert principal.user_id == user_id
+        assert principal.role == "peminjam"
+
+    def test_role_checker_accepts_token_user(self):
+        """Test that require_role works with a TokenUser"""
+        token = create_access_token(str(uuid4()), "pengguna")
+        principal = self.deps.get_current_principal(token)
+
+        assert require_role("pengguna")(principal) is principal
+
+    def test_invalid_token(self):
+        """Test that an invalid token is rejected"""
+        with pytest.raises(HTTPException) as exc_info:
+            self.deps.get_current_principal("invalid_token")
+
+        assert exc_info.value.status_code == 401
+
+    def test_missing_role_claim(self):
+        """Test that tokens without a role are rejected"""
+        token = create_access_token(str(uuid4()), "")
+
+        with pytest.raises(HTTPException) as exc_info:
+            self.deps.get_current_principal(token)
+
+        assert exc_info.value.status_code == 401
+
+    def test_non_uuid_subject(self):
+        """Test that a non-UUID subject is rejected"""
+        token = create_access_token("not-a-uuid", "peminjam")
+
+        with pytest.raises(HTTPException) as exc_info:
+            self.deps.get_current_principal(token)
+
+        assert exc_info.value.status_code == 401
+
+    def test_revoked_user_rejected(self):
+        """Test that a token issued before revocation is rejected"""
+        import time
+        from auth.revocation import revocation_epochs
+        user_id = uuid4()
+        token = create_access_token(str(user_id), "peminjam")
+        revocation_epochs.revoke(user_id, at=time.time())
+        try:
+            with pytest.raises(HTTPException) as exc_info:
+                self.deps.get_current_principal(token)
+        finally:
+            revocation_epochs.epochs.pop(str(user_id), None)
+
+        assert exc_info.value.detail == "Token revoked"
+
+    def test_default_mode_uses_user_record(self):
+        """Test that without AUTH_TRUST_CLAIMS the full user is returned"""
+        from auth.users import get_user_by_username
+        self.deps.AUTH_TRUST_CLAIMS = False
+        user = get_user_by_username("peminjam1")
+        token = create_access_token(str(user.user_id), user.role)
+
+        assert self.deps.get_current_principal(token) is user
+
+
+class TestExecutionLaneDeps:
+    """Test suite for lane selection in require_role/allow_roles"""
+
+    def test_no_lane_keeps_plain_checker(self):
+        """Test that without a lane the checker stays a plain function"""
+        import inspect
+
+        assert not inspect.isasyncgenfunction(require_role("peminjam"))
+        assert inspect.isasyncgenfunction(require_role("peminjam", lane="bulk"))
+        assert inspect.isasyncgenfunction(allow_roles("peminjam", lane="bulk"))
+
+    def test_unknown_lane_fails_at_definition(self):
+        """Test that a typo in the lane name fails when the route is defined"""
+        with pytest.raises(KeyError):
+            require_role("pengguna", lane="nope")
+
+    def test_bulk_route_runs_in_bulk_lane(self, test_client, pengguna_token):
+        """Test that /loans/all holds a bulk lane slot"""
+        from infrastructure.execution_lanes import get_lane
+        lane = get_lane("bulk")
+        before = lane.completed
+
+        response = test_client.get("/loans/all", headers={"Authorization": f"Bearer {pengguna_token}"})
+
+        assert response.status_code == 200
+        assert lane.completed == before + 1
+        assert lane.active == 0
+
+    def test_full_lane_returns_503(self, test_client, pengguna_token):
+        """Test that a full lane queue answers 503 with Retry-After"""
+        from infrastructure.execution_lanes import get_lane
+        lane = get_lane("bulk")
+        concurrency, max_queue = lane.concurrency, lane.max_queue
+        lane.concurrency, lane.max_queue = 0, 0
+        try:
+            response = test_client.get("/loans/all", headers={"Authorization": f"Bearer {pengguna_token}"})
+        finally:
+            lane.concurrency, lane.max_queue = concurrency, max_queue
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == str(lane.retry_after)
+
+    def test_role_lanes_mapping(self, test_client, peminjam_token, monkeypatch):
+        """Test that ROLE_LANES picks the lane from the caller's role"""
+        import auth.deps as deps
+        from infrastructure.execution_lanes import get_lane
+        monkeypatch.setattr(deps, "ROLE_LANES", {"peminjam": "bulk"})
+        checker = deps.allow_roles("peminjam", "pengguna")
+
+        from fastapi import Depends, FastAPI
+        from fastapi.testclient import TestClient
+        mini = FastAPI()
+
+        @mini.get("/x")
+        def x(user=Depends(checker)):
+            return {"role": user.role}
+
+        before = get_lane("bulk").completed
+        response = TestClient(mini).get("/x", headers={"Authorization": f"Bearer {peminjam_token}"})
+
+        assert response.json() == {"role": "peminjam"}
+        assert get_lane("bulk").completed == before + 1
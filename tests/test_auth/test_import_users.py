@@ -0,0 +1,96 @@
+"""
+Unit tests for the bulk user import CLI
+"""
+from uuid import uuid4
+
+from auth.import_users import import_users, main, read_rows
+from auth.users import verify_password
+from infrastructure.in_memory_user_repository import InMemoryUserRepository
+from infrastructure.sqlite_user_repository import SqliteUserRepository
+
+
+def write_csv(path, rows, header=True):
+    lines = ["username,password,role,user_id"] if header else []
+    lines += [",".join(r) for r in rows]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+class TestReadRows:
+    """Test suite for CSV parsing"""
+
+    def test_skips_header_and_blank_lines(self, tmp_path):
+        """Test that the header and blank lines are ignored"""
+        uid = str(uuid4())
+        path = tmp_path / "users.csv"
+        write_csv(path, [("alice", "pw1", "peminjam", uid), ("", "", "", ""), ("bob", "pw2", "pengguna", "")])
+
+        rows = list(read_rows(str(path)))
+
+        assert rows == [("alice", "pw1", "peminjam", uid), ("bob", "pw2", "pengguna", None)]
+
+    def test_skips_malformed_rows(self, tmp_path):
+        """Test that short rows and bad user_ids are reported instead of raising"""
+        path = tmp_path / "users.csv"
+        path.write_text("username,password,role\nalice,pw1,peminjam\nbob\ncarol,pw3\n"
+                        "dave,pw4,peminjam,not-a-uuid\nerin,pw5,pengguna\n", encoding="utf-8")
+        skipped = []
+
+        rows = list(read_rows(str(path), skipped))
+
+        assert [r[0] for r in rows] == ["alice", "erin"]
+        assert skipped == [3, 4, 5]
+
+
+class TestImportUsers:
+    """Test suite for import_users"""
+
+    def test_inline_import_hashes_passwords(self):
+        """Test that imported users verify with their passwords"""
+        repo = InMemoryUserRepository()
+        rows = [(f"u{i}", f"pw{i}", "peminjam", None) for i in range(3)]
+
+        assert import_users(rows, repo, workers=0, rounds=4, batch_size=2) == 3
+        user = repo.get_by_username("u1")
+        assert user.hashed_password.startswith("$2b$04$")
+        assert verify_password("pw1", user.hashed_password)
+
+    def test_keeps_given_user_id(self):
+        """Test that an explicit user_id is preserved"""
+        repo = InMemoryUserRepository()
+        uid = uuid4()
+        import_users([("alice", "pw", "peminjam", str(uid))], repo, rounds=4)
+
+        assert repo.get_by_id(uid).username == "alice"
+
+    def test_process_pool_import(self):
+        """Test import with a worker process pool"""
+        repo = SqliteUserRepository()
+        rows = [(f"u{i}", "pw", "peminjam", None) for i in range(6)]
+        seen = []
+
+        total = import_users(rows, repo, workers=1, rounds=4, batch_size=4, progress=seen.append)
+
+        assert total == 6
+        assert seen == [4, 6]
+        assert repo.count() == 6
+
+    def test_cli(self, tmp_path, capsys):
+        """Test the command line entry point end to end"""
+        csv_path = tmp_path / "users.csv"
+        db_path = tmp_path / "users.db"
+        write_csv(csv_path, [("alice", "pw", "peminjam", ""), ("bob", "pw", "pengguna", "")])
+
+        assert main([str(csv_path), "--db", str(db_path), "--workers", "0", "--rounds", "4"]) == 0
+        assert "imported 2 users" in capsys.readouterr().out
+        assert SqliteUserRepository(str(db_path)).count() == 2
+
+    def test_cli_reports_malformed_rows(self, tmp_path, capsys):
+        """Test that the CLI imports valid rows and reports skipped lines"""
+        csv_path = tmp_path / "users.csv"
+        db_path = tmp_path / "users.db"
+        csv_path.write_text("alice,pw,peminjam\nbob\n", encoding="utf-8")
+
+        assert main([str(csv_path), "--db", str(db_path), "--workers", "0", "--rounds", "4"]) == 0
+        captured = capsys.readouterr()
+        assert "imported 1 users" in captured.out
+        assert "skipped 1 malformed rows at lines 2" in captured.err
@@ -184,6 +184,20 @@ class TestDecodeAccessToken:
         
         assert payload is None
 
+    def test_decode_unhashable_kid(self):
+        """Test that a non-string kid header is rejected instead of raising"""
+        token = jwt.encode({"sub": str(uuid4()), "role": "peminjam"}, SECRET_KEY,
+                           algorithm=ALGORITHM, headers={"kid": ["x"]})
+
+        assert decode_access_token(token) is None
+
+    def test_decode_unknown_kid(self):
+        """Test that a kid missing from the keyring is rejected"""
+        token = jwt.encode({"sub": str(uuid4()), "role": "peminjam"}, SECRET_KEY,
+                           algorithm=ALGORITHM, headers={"kid": "missing"})
+
+        assert decode_access_token(token) is None
+
     def test_decode_empty_token(self):
         """Test decoding empty token"""
         payload = decode_access_token("")
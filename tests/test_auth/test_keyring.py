@@ -0,0 +1,153 @@
+"""
+Unit tests for the kid-indexed signing keyring
+"""
+import pytest
+from jose import jwt
+
+import auth.jwt_handler as jwt_handler
+from auth.jwt_handler import (
+    ALGORITHM,
+    DEFAULT_KID,
+    SECRET_KEY,
+    create_access_token,
+    decode_access_token,
+    revoke_signing_key,
+    rotate_signing_key,
+)
+from auth.keyring import Keyring, parse_keys
+from auth.token_cache import token_cache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestKeyring:
+    """Test suite for Keyring"""
+
+    def test_active_key(self):
+        """Test that the active key is returned for signing"""
+        ring = Keyring({"a": "s1"}, active_kid="a", grace_seconds=10)
+
+        assert ring.active_kid == "a"
+        assert ring.active_secret == "s1"
+        assert ring.get("a") == "s1"
+
+    def test_unknown_active_kid(self):
+        """Test that an unknown active kid is rejected"""
+        with pytest.raises(ValueError):
+            Keyring({"a": "s1"}, active_kid="b", grace_seconds=10)
+
+    def test_unknown_kid(self):
+        """Test that an unknown kid resolves to None"""
+        ring = Keyring({"a": "s1"}, active_kid="a", grace_seconds=10)
+
+        assert ring.get("zzz") is None
+
+    def test_rotate_keeps_old_key_during_grace(self):
+        """Test that a rotated-out key verifies until the grace window ends"""
+        clock = FakeClock()
+        ring = Keyring({"a": "s1"}, active_kid="a", grace_seconds=10, clock=clock)
+        ring.rotate("b", "s2")
+
+        assert ring.active_kid == "b"
+        clock.now += 10
+        assert ring.get("a") == "s1"
+        clock.now += 1
+        assert ring.get("a") is None
+
+    def test_rotate_prunes_expired_keys(self):
+        """Test that keys past their grace window are dropped on rotation"""
+        clock = FakeClock()
+        ring = Keyring({"a": "s1"}, active_kid="a", grace_seconds=10, clock=clock)
+        ring.rotate("b", "s2")
+        clock.now += 20
+        ring.rotate("c", "s3")
+
+        assert ring.kids() == ["b", "c"]
+
+    def test_rotate_generates_kid_and_secret(self):
+        """Test rotation without explicit kid/secret"""
+        ring = Keyring({"a": "s1"}, active_kid="a", grace_seconds=10)
+        kid = ring.rotate()
+
+        assert kid != "a"
+        assert ring.active_secret
+
+    def test_rotate_duplicate_kid(self):
+        """Test that reusing a kid is rejected"""
+        ring = Keyring({"a": "s1"}, active_kid="a", grace_seconds=10)
+
+        with pytest.raises(ValueError):
+            ring.rotate("a", "s2")
+
+    def test_remove(self):
+        """Test immediate removal of a non-active key"""
+        ring = Keyring({"a": "s1", "b": "s2"}, active_kid="b", grace_seconds=10)
+
+        assert ring.remove("a") is True
+        assert ring.get("a") is None
+        assert ring.remove("a") is False
+        with pytest.raises(ValueError):
+            ring.remove("b")
+
+    def test_parse_keys(self):
+        """Test parsing JWT_KEYS"""
+        assert parse_keys("k1:abc, k2:d:e,") == {"k1": "abc", "k2": "d:e"}
+        assert parse_keys("") == {}
+
+
+class TestJwtKeyRotation:
+    """Test suite for kid headers and rotation in jwt_handler"""
+
+    def setup_method(self):
+        self.original = jwt_handler.KEYRING
+        jwt_handler.KEYRING = Keyring({DEFAULT_KID: SECRET_KEY}, active_kid=DEFAULT_KID,
+                                      grace_seconds=3600)
+        token_cache.clear()
+
+    def teardown_method(self):
+        jwt_handler.KEYRING = self.original
+        token_cache.clear()
+
+    def test_token_carries_kid(self):
+        """Test that new tokens name their signing key"""
+        token = create_access_token("sub", "peminjam")
+
+        assert jwt.get_unverified_header(token)["kid"] == DEFAULT_KID
+
+    def test_old_tokens_valid_after_rotation(self):
+        """Test that rotation does not invalidate outstanding tokens"""
+        old_token = create_access_token("sub", "peminjam")
+        new_kid = rotate_signing_key("k1", "new-secret")
+        new_token = create_access_token("sub", "peminjam")
+
+        assert jwt.get_unverified_header(new_token)["kid"] == new_kid
+        assert decode_access_token(old_token)["sub"] == "sub"
+        assert decode_access_token(new_token)["sub"] == "sub"
+
+    def test_legacy_token_without_kid(self):
+        """Test that tokens without a kid fall back to the default key"""
+        token = jwt.encode({"sub": "sub", "role": "peminjam"}, SECRET_KEY, algorithm=ALGORITHM)
+
+        assert decode_access_token(token)["sub"] == "sub"
+
+    def test_revoked_key_rejects_tokens(self):
+        """Test that removing a key rejects its tokens and flushes the cache"""
+        old_token = create_access_token("sub", "peminjam")
+        rotate_signing_key("k1", "new-secret")
+        token_cache.put("cached", {"sub": "x", "exp": 2 ** 40})
+
+        assert revoke_signing_key(DEFAULT_KID) is True
+        assert decode_access_token(old_token) is None
+        assert len(token_cache) == 0
+
+    def test_forged_kid_rejected(self):
+        """Test that a token naming an unknown kid is rejected"""
+        token = jwt.encode({"sub": "sub"}, "other", algorithm=ALGORITHM, headers={"kid": "evil"})
+
+        assert decode_access_token(token) is None
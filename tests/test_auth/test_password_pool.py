@@ -0,0 +1,170 @@
+"""
+Unit tests for the bcrypt process pool
+"""
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from auth.password_pool import PasswordPool, PasswordPoolSaturated, _serverless, password_pool
+from auth.users import hash_password
+from main import app
+
+
+client = TestClient(app)
+
+
+class TestPasswordPoolInline:
+    """Test suite for PasswordPool with workers=0 (shared threadpool)"""
+
+    def test_verify_correct_password(self):
+        """Test verifying a correct password without a process pool"""
+        pool = PasswordPool(workers=0, max_pending=2)
+        hashed = hash_password("secret")
+
+        assert asyncio.run(pool.verify("secret", hashed)) is True
+
+    def test_verify_wrong_password(self):
+        """Test verifying a wrong password without a process pool"""
+        pool = PasswordPool(workers=0, max_pending=2)
+        hashed = hash_password("secret")
+
+        assert asyncio.run(pool.verify("wrong", hashed)) is False
+
+    def test_hash_roundtrip(self):
+        """Test that hash() output verifies"""
+        pool = PasswordPool(workers=0, max_pending=2)
+        hashed = asyncio.run(pool.hash("secret"))
+
+        assert asyncio.run(pool.verify("secret", hashed)) is True
+
+    def test_saturated_pool_rejects(self):
+        """Test that a full pool raises PasswordPoolSaturated"""
+        pool = PasswordPool(workers=0, max_pending=0, retry_after=3)
+
+        with pytest.raises(PasswordPoolSaturated) as exc_info:
+            asyncio.run(pool.verify("secret", "hash"))
+
+        assert exc_info.value.retry_after == 3
+        assert pool.stats()["rejected"] == 1
+
+    def test_pending_released_after_error(self):
+        """Test that the pending slot is freed when the job fails"""
+        pool = PasswordPool(workers=0, max_pending=1)
+
+        with pytest.raises(ValueError):
+            asyncio.run(pool.verify("secret", "not-a-bcrypt-hash"))
+
+        assert pool.pending == 0
+        assert pool.stats()["completed"] == 1
+
+    def test_stats_shape(self):
+        """Test that stats exposes queue-time metrics"""
+        pool = PasswordPool(workers=0, max_pending=2)
+        asyncio.run(pool.verify("secret", hash_password("secret")))
+        stats = pool.stats()
+
+        assert stats["submitted"] == 1
+        assert stats["completed"] == 1
+        assert stats["pending"] == 0
+        assert stats["queue_time_avg"] >= 0.0
+        assert stats["queue_time_max"] >= 0.0
+
+
+class TestPasswordPoolProcesses:
+    """Test suite for PasswordPool backed by a real process pool"""
+
+    def test_verify_in_worker_process(self):
+        """Test that verification works in a worker process"""
+        pool = PasswordPool(workers=1, max_pending=4)
+        hashed = hash_password("secret")
+
+        async def burst():
+            return await asyncio.gather(
+                pool.verify("secret", hashed),
+                pool.verify("wrong", hashed),
+            )
+
+        try:
+            assert asyncio.run(burst()) == [True, False]
+        finally:
+            pool.shutdown()
+
+        stats = pool.stats()
+        assert stats["completed"] == 2
+        assert stats["pending"] == 0
+
+    def test_workers_not_forked(self):
+        """Test that workers start from a forkserver, not a fork of this threaded process"""
+        pool = PasswordPool(workers=1, max_pending=1)
+        try:
+            assert pool._get_executor()._mp_context.get_start_method() == "forkserver"
+        finally:
+            pool.shutdown()
+
+    def test_shutdown_without_executor(self):
+        """Test that shutdown is safe before first use"""
+        pool = PasswordPool(workers=1, max_pending=1)
+        pool.shutdown()
+
+
+class TestServerlessDefault:
+    """Test suite for the serverless worker default"""
+
+    def test_detects_vercel_and_lambda(self, monkeypatch):
+        """Test that Vercel and Lambda are detected from their env variables"""
+        monkeypatch.delenv("VERCEL", raising=False)
+        monkeypatch.delenv("AWS_LAMBDA_FUNCTION_NAME", raising=False)
+        assert _serverless() is False
+
+        monkeypatch.setenv("VERCEL", "1")
+        assert _serverless() is True
+
+        monkeypatch.delenv("VERCEL")
+        monkeypatch.setenv("AWS_LAMBDA_FUNCTION_NAME", "bookwise")
+        assert _serverless() is True
+
+    def test_no_process_pool_on_serverless(self):
+        """Test that a fresh import on Vercel runs bcrypt in-thread"""
+        import os
+        import subprocess
+        import sys
+
+        env = dict(os.environ, VERCEL="1")
+        env.pop("PASSWORD_POOL_WORKERS", None)
+        out = subprocess.run(
+            [sys.executable, "-c", "import auth.password_pool as p; print(p.password_pool.workers)"],
+            env=env, capture_output=True, text=True, check=True,
+        ).stdout
+
+        assert out.strip() == "0"
+
+
+class TestLoginSaturation:
+    """Test suite for login behaviour when the pool is full"""
+
+    def test_login_returns_503_with_retry_after(self):
+        """Test that a saturated pool yields a fast 503 with Retry-After"""
+        original = password_pool.max_pending
+        password_pool.max_pending = 0
+        try:
+            response = client.post(
+                "/auth/login",
+                data={"username": "peminjam1", "password": "pinjam123"}
+            )
+        finally:
+            password_pool.max_pending = original
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == str(password_pool.retry_after)
+
+    def test_unknown_user_does_not_use_pool(self):
+        """Test that unknown usernames are rejected without a pool slot"""
+        before = password_pool.stats()["submitted"]
+        response = client.post(
+            "/auth/login",
+            data={"username": "nonexistent", "password": "x"}
+        )
+
+        assert response.status_code == 401
+        assert password_pool.stats()["submitted"] == before
@@ -0,0 +1,46 @@
+"""
+Unit tests for the user revocation epoch table
+"""
+from uuid import uuid4
+
+from auth.revocation import RevocationEpochs
+
+
+class TestRevocationEpochs:
+    """Test suite for RevocationEpochs"""
+
+    def test_unknown_user_not_revoked(self):
+        """Test that users without an entry are never revoked"""
+        epochs = RevocationEpochs()
+
+        assert epochs.is_revoked(str(uuid4()), 0) is False
+
+    def test_tokens_before_revocation_rejected(self):
+        """Test that tokens issued up to the revocation second are rejected"""
+        epochs = RevocationEpochs()
+        user_id = uuid4()
+        epochs.revoke(user_id, at=1000.5)
+
+        assert epochs.is_revoked(str(user_id), 999) is True
+        assert epochs.is_revoked(str(user_id), 1000) is True
+        assert epochs.is_revoked(str(user_id), 1001) is False
+
+    def test_missing_iat_rejected(self):
+        """Test that a revoked user's token without iat is rejected"""
+        epochs = RevocationEpochs()
+        user_id = uuid4()
+        epochs.revoke(user_id, at=1000)
+
+        assert epochs.is_revoked(str(user_id), None) is True
+
+    def test_purge_drops_entries_older_than_token_lifetime(self):
+        """Test that stale entries are purged"""
+        epochs = RevocationEpochs(max_token_age=60)
+        old_user, new_user = uuid4(), uuid4()
+        epochs.revoke(old_user, at=1000)
+        epochs.revoke(new_user, at=1100)
+
+        assert len(epochs) == 1
+        assert epochs.is_revoked(str(old_user), 0) is False
+        epochs.purge(now=1200)
+        assert len(epochs) == 0
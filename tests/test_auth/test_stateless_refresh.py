@@ -0,0 +1,175 @@
+"""
+Unit tests for stateless signed refresh tokens
+"""
+from datetime import timedelta
+from uuid import uuid4
+
+from auth.jwt_handler import (
+    create_access_token,
+    create_signed_refresh_token,
+    decode_access_token,
+    decode_signed_refresh_token,
+)
+from auth.stateless_refresh import RefreshGenerations
+from auth.user_repository import User
+from infrastructure.in_memory_user_repository import InMemoryUserRepository
+from infrastructure.sqlite_user_repository import SqliteUserRepository
+
+
+class TestSignedRefreshToken:
+    """Test suite for signed refresh token encoding"""
+
+    def test_roundtrip(self):
+        """Test that claims survive encode/decode"""
+        token = create_signed_refresh_token("peminjam1", generation=3, counter=7)
+        payload = decode_signed_refresh_token(token)
+
+        assert payload["sub"] == "peminjam1"
+        assert payload["gen"] == 3
+        assert payload["ctr"] == 7
+
+    def test_refresh_token_rejected_as_access_token(self):
+        """Test that a signed refresh token cannot authenticate requests"""
+        token = create_signed_refresh_token("peminjam1", generation=0)
+
+        assert decode_access_token(token) is None
+
+    def test_access_token_rejected_as_refresh_token(self):
+        """Test that an access token cannot be used to refresh"""
+        token = create_access_token("some-id", "peminjam")
+
+        assert decode_signed_refresh_token(token) is None
+
+    def test_expired_refresh_token(self):
+        """Test that expired refresh tokens are rejected"""
+        token = create_signed_refresh_token("peminjam1", 0, expires_delta=timedelta(seconds=-1))
+
+        assert decode_signed_refresh_token(token) is None
+
+    def test_garbage_token(self):
+        """Test that malformed tokens are rejected"""
+        assert decode_signed_refresh_token("not.a.jwt") is None
+
+
+def _repository(*usernames):
+    repo = InMemoryUserRepository()
+    for username in usernames:
+        repo.add(User(uuid4(), username, "hashed", "peminjam"))
+    return repo
+
+
+class TestRefreshGenerations:
+    """Test suite for RefreshGenerations"""
+
+    def test_issue_and_rotate(self):
+        """Test that an issued token rotates to its user"""
+        gens = RefreshGenerations(_repository("peminjam1"))
+        username, new_token = gens.rotate(gens.issue("peminjam1"))
+
+        assert username == "peminjam1"
+        assert decode_signed_refresh_token(new_token)["ctr"] == 2
+
+    def test_unknown_user(self):
+        """Test that no token is issued for a missing user"""
+        assert RefreshGenerations(_repository()).issue("ghost") is None
+
+    def test_rotated_token_cannot_be_replayed(self):
+        """Test that a token is accepted once; its old counter is rejected afterwards"""
+        gens = RefreshGenerations(_repository("peminjam1"))
+        token = gens.issue("peminjam1")
+        _, newer = gens.rotate(token)
+
+        assert gens.rotate(token) is None
+        assert gens.rotate(newer) is not None
+
+    def test_new_login_supersedes_older_tokens(self):
+        """Test that tokens issued before the latest login stop working"""
+        gens = RefreshGenerations(_repository("peminjam1"))
+        first = gens.issue("peminjam1")
+        second = gens.issue("peminjam1")
+
+        assert gens.rotate(first) is None
+        assert gens.rotate(second) is not None
+
+    def test_revoke_invalidates_current_token(self):
+        """Test that logout bumps the generation and blocks refresh"""
+        gens = RefreshGenerations(_repository("peminjam1"))
+        token = gens.issue("peminjam1")
+
+        assert gens.revoke(token) == 1
+        assert gens.rotate(token) is None
+        assert gens.rotate(gens.issue("peminjam1")) is not None
+
+    def test_stale_token_cannot_log_out(self):
+        """Test that an already rotated token does not revoke the live chain"""
+        gens = RefreshGenerations(_repository("peminjam1"))
+        token = gens.issue("peminjam1")
+        _, newer = gens.rotate(token)
+
+        assert gens.revoke(token) is None
+        assert gens.rotate(newer) is not None
+
+    def test_revoke_is_per_user(self):
+        """Test that revoking one user leaves other users' tokens valid"""
+        gens = RefreshGenerations(_repository("peminjam1", "pengguna1"))
+        other = gens.issue("pengguna1")
+        gens.revoke_user("peminjam1")
+
+        assert gens.rotate(other)[0] == "pengguna1"
+
+    def test_state_lives_in_user_record(self):
+        """Test that issuing tokens only advances the user's counter"""
+        repo = _repository("peminjam1")
+        gens = RefreshGenerations(repo)
+        for _ in range(10):
+            gens.issue("peminjam1")
+
+        user = repo.get_by_username("peminjam1")
+        assert (user.refresh_generation, user.refresh_counter) == (0, 10)
+
+    def test_invalid_token(self):
+        """Test that an invalid token does not resolve"""
+        gens = RefreshGenerations(_repository("peminjam1"))
+
+        assert gens.resolve("invalid") is None
+        assert gens.rotate("invalid") is None
+        assert gens.revoke("invalid") is None
+
+
+class TestRefreshGenerationsAcrossInstances:
+    """Test suite for stateless refresh with a shared SQLite user store"""
+
+    def setup_method(self):
+        self.repos = []
+
+    def teardown_method(self):
+        for repo in self.repos:
+            repo.close()
+
+    def _instance(self, path):
+        repo = SqliteUserRepository(str(path))
+        self.repos.append(repo)
+        return RefreshGenerations(repo)
+
+    def test_logout_on_one_instance_revokes_on_another(self, tmp_path):
+        """Test that the generation bump is seen by every process sharing the store"""
+        path = tmp_path / "users.db"
+        a = self._instance(path)
+        a.repository.add(User(uuid4(), "peminjam1", "hashed", "peminjam"))
+        b = self._instance(path)
+        b.repository.get_by_username("peminjam1")  # ikut ter-cache di instance b
+        token = a.issue("peminjam1")
+
+        assert a.revoke(token) == 1
+        assert b.rotate(token) is None
+
+    def test_replay_on_another_instance_rejected(self, tmp_path):
+        """Test that a token rotated on one instance cannot be reused on another"""
+        path = tmp_path / "users.db"
+        a = self._instance(path)
+        a.repository.add(User(uuid4(), "peminjam1", "hashed", "peminjam"))
+        b = self._instance(path)
+        token = a.issue("peminjam1")
+
+        assert a.rotate(token) is not None
+        assert b.rotate(token) is None
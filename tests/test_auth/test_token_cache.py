@@ -0,0 +1,180 @@
+"""
+Unit tests for the decoded JWT payload cache
+"""
+import threading
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+from auth.token_cache import TokenCache, token_cache
+from auth.deps import decode_token_cached, get_current_active_user
+from auth.jwt_handler import create_access_token, decode_access_token
+from auth.users import get_user_by_username
+
+
+def _payload(ttl: float = 60) -> dict:
+    return {"sub": "user", "role": "peminjam", "exp": int(time.time() + ttl)}
+
+
+class TestTokenCache:
+    """Test suite for TokenCache"""
+
+    def test_miss_then_hit(self):
+        """Test that a stored payload is returned on the next lookup"""
+        cache = TokenCache(maxsize=4)
+        payload = _payload()
+
+        assert cache.get("tok") is None
+        cache.put("tok", payload)
+
+        assert cache.get("tok") == payload
+        assert cache.hits == 1
+        assert cache.misses == 1
+
+    def test_peek_does_not_count(self):
+        """Test that peek returns cached payloads without touching the stats"""
+        cache = TokenCache(maxsize=4)
+        payload = _payload()
+        cache.put("tok", payload)
+
+        assert cache.peek("tok") == payload
+        assert cache.peek("other") is None
+        assert cache.hits == 0
+        assert cache.misses == 0
+
+    def test_entry_expires_at_exp(self):
+        """Test that entries are dropped once exp has passed"""
+        cache = TokenCache(maxsize=4)
+        payload = _payload(ttl=10)
+        cache.put("tok", payload)
+
+        with patch("auth.token_cache.time.time", return_value=payload["exp"] + 1):
+            assert cache.get("tok") is None
+        assert len(cache) == 0
+
+    def test_expired_payload_not_stored(self):
+        """Test that already expired payloads are never cached"""
+        cache = TokenCache(maxsize=4)
+        cache.put("tok", _payload(ttl=-5))
+
+        assert len(cache) == 0
+
+    def test_payload_without_exp_not_stored(self):
+        """Test that payloads without exp are never cached"""
+        cache = TokenCache(maxsize=4)
+        cache.put("tok", {"sub": "user"})
+
+        assert len(cache) == 0
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted at capacity"""
+        cache = TokenCache(maxsize=2)
+        cache.put("a", _payload())
+        cache.put("b", _payload())
+        cache.get("a")
+        cache.put("c", _payload())
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.evictions == 1
+
+    def test_disabled_cache(self):
+        """Test that maxsize=0 disables caching"""
+        cache = TokenCache(maxsize=0)
+        cache.put("tok", _payload())
+
+        assert cache.get("tok") is None
+        assert len(cache) == 0
+
+    def test_raw_token_not_used_as_key(self):
+        """Test that keys are digests, not raw tokens"""
+        cache = TokenCache(maxsize=4)
+        cache.put("secret-token", _payload())
+
+        assert "secret-token" not in cache._data
+        assert all(isinstance(k, bytes) and len(k) == 32 for k in cache._data)
+
+    def test_stats_hit_rate(self):
+        """Test stats reporting"""
+        cache = TokenCache(maxsize=4)
+        cache.put("tok", _payload())
+        cache.get("tok")
+        cache.get("tok")
+        cache.get("other")
+
+        stats = cache.stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 1
+        assert stats["size"] == 1
+        assert abs(stats["hit_rate"] - 2 / 3) < 1e-9
+
+    def test_clear_resets_counters(self):
+        """Test that clear empties the cache and resets counters"""
+        cache = TokenCache(maxsize=4)
+        cache.put("tok", _payload())
+        cache.get("tok")
+        cache.clear()
+
+        assert len(cache) == 0
+        assert cache.stats()["hit_rate"] == 0.0
+
+    def test_concurrent_access(self):
+        """Test that concurrent put/get keeps the size bounded"""
+        cache = TokenCache(maxsize=50)
+
+        def worker(n):
+            for i in range(200):
+                cache.put(f"{n}-{i}", _payload())
+                cache.get(f"{n}-{i}")
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(cache) == 50
+        assert cache.hits + cache.misses == 8 * 200
+
+
+class TestDecodeTokenCached:
+    """Test suite for cached decoding in auth.deps"""
+
+    def setup_method(self):
+        token_cache.clear()
+
+    def test_second_decode_skips_jwt_verification(self):
+        """Test that repeat tokens do not hit jwt.decode again"""
+        user = get_user_by_username("peminjam1")
+        token = create_access_token(str(user.user_id), user.role)
+
+        with patch("auth.deps.decode_access_token", wraps=decode_access_token) as spy:
+            first = decode_token_cached(token)
+            second = decode_token_cached(token)
+
+        assert first == second
+        assert spy.call_count == 1
+
+    def test_invalid_token_not_cached(self):
+        """Test that invalid tokens are not cached"""
+        assert decode_token_cached("invalid_token") is None
+        assert len(token_cache) == 0
+
+    def test_expired_token_not_cached(self):
+        """Test that expired tokens are rejected and not cached"""
+        user = get_user_by_username("peminjam1")
+        token = create_access_token(str(user.user_id), user.role, timedelta(seconds=-1))
+
+        assert decode_token_cached(token) is None
+        assert len(token_cache) == 0
+
+    def test_get_current_active_user_uses_cache(self):
+        """Test that repeated auth hits the cache"""
+        user = get_user_by_username("pengguna1")
+        token = create_access_token(str(user.user_id), user.role)
+
+        get_current_active_user(token)
+        result = get_current_active_user(token)
+
+        assert result.username == "pengguna1"
+        assert token_cache.hits == 1
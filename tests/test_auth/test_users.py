@@ -4,9 +4,13 @@ from auth.users import (
     User, 
     hash_password, 
     verify_password, 
+    verify_and_rehash,
     get_user_by_username, 
     get_user_by_id, 
-    USERS_DB
+    add_user,
+    disable_user,
+    USERS_DB,
+    USERS_BY_ID
 )
 
 
@@ -277,4 +281,165 @@ class TestUserIntegration:
         assert peminjam is not None
         assert pengguna is not None
         assert peminjam.role == "peminjam"
-        assert pengguna.role == "pengguna"
\ No newline at end of file
+        assert pengguna.role == "pengguna"
+
+
+class TestUserIndexes:
+    """Test suite for the username and user_id indexes"""
+
+    def setup_method(self):
+        self.user = User(uuid4(), "index_user", "hashed_pwd", "peminjam")
+
+    def teardown_method(self):
+        removed = USERS_DB.pop("index_user", None)
+        if removed is not None:
+            USERS_BY_ID.pop(removed.user_id, None)
+        USERS_BY_ID.pop(self.user.user_id, None)
+
+    def test_indexes_contain_default_users(self):
+        """Test that every user is indexed by username and by UUID"""
+        for user in list(USERS_DB.values()):
+            assert USERS_BY_ID[user.user_id] is user
+
+    def test_id_index_keyed_on_uuid(self):
+        """Test that the id index uses native UUID keys"""
+        known_user = get_user_by_username("peminjam1")
+        assert known_user.user_id in USERS_BY_ID
+        assert str(known_user.user_id) not in USERS_BY_ID
+
+    def test_add_user_updates_both_indexes(self):
+        """Test that add_user makes the user reachable both ways"""
+        add_user(self.user)
+
+        assert get_user_by_username("index_user") is self.user
+        assert get_user_by_id(self.user.user_id) is self.user
+        assert get_user_by_id(str(self.user.user_id)) is self.user
+
+    def test_add_user_replace_drops_old_id(self):
+        """Test that replacing a username removes the stale id entry"""
+        add_user(self.user)
+        replacement = User(uuid4(), "index_user", "other_pwd", "pengguna")
+        add_user(replacement)
+
+        assert get_user_by_id(self.user.user_id) is None
+        assert get_user_by_id(replacement.user_id) is replacement
+        USERS_BY_ID.pop(replacement.user_id, None)
+
+    def test_disable_user_visible_through_both_indexes(self):
+        """Test that disabling a user is seen by both lookups"""
+        add_user(self.user)
+        disable_user("index_user")
+
+        assert get_user_by_username("index_user").disabled is True
+        assert get_user_by_id(self.user.user_id).disabled is True
+
+    def test_disable_unknown_user(self):
+        """Test disabling a username that does not exist"""
+        assert disable_user("nonexistent") is None
+
+    def test_get_user_by_id_invalid_uuid(self):
+        """Test that malformed ids return None instead of raising"""
+        assert get_user_by_id("not-a-uuid") is None
+        assert get_user_by_id(None) is None
+
+
+class TestVerifyAndRehash:
+    """Test suite for transparent bcrypt cost upgrade"""
+
+    def test_rehash_when_cost_differs(self):
+        """Test that a hash with another cost is replaced on success"""
+        from passlib.hash import bcrypt
+        from auth.users import BCRYPT_ROUNDS
+        old_hash = bcrypt.using(rounds=4).hash("secret")
+
+        valid, new_hash = verify_and_rehash("secret", old_hash)
+
+        assert valid is True
+        assert new_hash is not None
+        assert new_hash.startswith(f"$2b${BCRYPT_ROUNDS:02d}$")
+        assert verify_password("secret", new_hash)
+
+    def test_no_rehash_when_cost_matches(self):
+        """Test that a hash at the configured cost is kept"""
+        hashed = hash_password("secret")
+
+        assert verify_and_rehash("secret", hashed) == (True, None)
+
+    def test_no_rehash_on_wrong_password(self):
+        """Test that a wrong password never produces a new hash"""
+        from passlib.hash import bcrypt
+        old_hash = bcrypt.using(rounds=4).hash("secret")
+
+        assert verify_and_rehash("wrong", old_hash) == (False, None)
+
+    def test_default_users_use_configured_cost(self):
+        """Test that the built-in users need no upgrade at the default cost"""
+        from auth.users import get_pwd_context
+        for user in (get_user_by_username("pengguna1"), get_user_by_username("peminjam1")):
+            assert get_pwd_context().needs_update(user.hashed_password) is False
+
+
+class TestUserRevocation:
+    """Test suite for revocation on disable / role change"""
+
+    def setup_method(self):
+        self.user = add_user(User(uuid4(), "revoke_user", "hashed_pwd", "peminjam"))
+
+    def teardown_method(self):
+        from auth.revocation import revocation_epochs
+        USERS_DB.pop("revoke_user", None)
+        USERS_BY_ID.pop(self.user.user_id, None)
+        revocation_epochs.epochs.pop(str(self.user.user_id), None)
+        revocation_epochs.disabled.discard(str(self.user.user_id))
+
+    def test_disable_user_records_epoch(self):
+        """Test that disabling a user revokes their tokens"""
+        from auth.revocation import revocation_epochs
+        disable_user("revoke_user")
+
+        assert str(self.user.user_id) in revocation_epochs.epochs
+
+    def test_disabled_user_stays_revoked_after_purge(self):
+        """Test that purging epochs does not un-revoke a disabled user"""
+        import time
+        from auth.revocation import revocation_epochs
+        disable_user("revoke_user")
+        revocation_epochs.purge(now=time.time() + revocation_epochs.max_token_age + 1)
+
+        assert revocation_epochs.is_revoked(str(self.user.user_id), int(time.time()) + 10)
+
+    def test_enable_user_accepts_new_tokens(self):
+        """Test that re-enabling lifts the disable but keeps old tokens revoked"""
+        import time
+        from auth.revocation import revocation_epochs
+        from auth.users import enable_user
+        disable_user("revoke_user")
+        enable_user("revoke_user")
+        user_id = str(self.user.user_id)
+
+        assert self.user.disabled is False
+        assert revocation_epochs.is_revoked(user_id, int(time.time()) - 10)
+        assert not revocation_epochs.is_revoked(user_id, int(time.time()) + 10)
+
+    def test_change_role_records_epoch(self):
+        """Test that changing role revokes tokens with the old role"""
+        from auth.revocation import revocation_epochs
+        from auth.users import change_role
+        change_role("revoke_user", "pengguna")
+
+        assert self.user.role == "pengguna"
+        assert str(self.user.user_id) in revocation_epochs.epochs
+
+    def test_change_role_same_role_is_noop(self):
+        """Test that setting the same role does not revoke"""
+        from auth.revocation import revocation_epochs
+        from auth.users import change_role
+        change_role("revoke_user", "peminjam")
+
+        assert str(self.user.user_id) not in revocation_epochs.epochs
+
+    def test_change_role_unknown_user(self):
+        """Test changing the role of a missing user"""
+        from auth.users import change_role
+
+        assert change_role("nonexistent", "pengguna") is None
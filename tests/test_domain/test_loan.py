@@ -162,4 +162,30 @@ class TestLoanWorkflow:
         # Return
         loan.initiate_return()
         loan.finalize_return()
-        assert loan.loanStatus == LoanStatus.RETURNED
\ No newline at end of file
+        assert loan.loanStatus == LoanStatus.RETURNED
+
+class TestLoanStage:
+    """Test suite for Loan.stage"""
+
+    def test_stage_follows_workflow(self):
+        """Test that stage distinguishes verified and return-initiated loans"""
+        loan = Loan(BookId(uuid4()), UserId(uuid4()))
+        stages = [loan.stage]
+
+        loan.verify()
+        stages.append(loan.stage)
+        loan.approve(DueDate(date.today() + timedelta(days=7)))
+        stages.append(loan.stage)
+        loan.initiate_return()
+        stages.append(loan.stage)
+        loan.finalize_return()
+        stages.append(loan.stage)
+
+        assert stages == ["requested", "verified", "borrowed", "return_initiated", "returned"]
+
+    def test_overdue_stage(self):
+        """Test that overdue loans report the overdue status"""
+        loan = Loan(BookId(uuid4()), UserId(uuid4()))
+        loan.mark_overdue()
+
+        assert loan.stage == "overdue"
@@ -0,0 +1,125 @@
+"""
+Unit tests for the batched audit writer
+"""
+import threading
+import time
+from datetime import datetime, timezone
+
+from domain.audit_log import AuditEntry
+from infrastructure.audit_trail import BatchAuditWriter
+from infrastructure.sqlite_audit_log import SqliteAuditLog
+
+
+def make_entry(loan_id="loan-1", actor="admin-1"):
+    return AuditEntry(loan_id, "verified", actor, "pengguna", "requested", "verified",
+                      datetime.now(timezone.utc))
+
+
+class RecordingStore(SqliteAuditLog):
+    def __init__(self):
+        super().__init__()
+        self.batch_sizes = []
+        self.fail = 0
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def append_many(self, entries):
+        self.gate.wait(5)
+        if self.fail:
+            self.fail -= 1
+            raise RuntimeError("disk full")
+        entries = list(entries)
+        self.batch_sizes.append(len(entries))
+        return super().append_many(entries)
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+class TestBatchAuditWriter:
+    """Test suite for BatchAuditWriter"""
+
+    def test_entries_written_within_max_delay(self):
+        """Test that a lone entry is written after about max_delay"""
+        store = RecordingStore()
+        writer = BatchAuditWriter(store, batch_size=100, max_delay=0.05)
+        try:
+            writer.record(make_entry())
+            assert store.count() == 0
+            assert wait_for(lambda: writer.written == 1)
+        finally:
+            writer.shutdown()
+
+        assert store.count() == 1
+        assert writer.stats()["max_latency_ms"] < 1000
+
+    def test_entries_batched(self):
+        """Test that entries recorded together go in one transaction"""
+        store = RecordingStore()
+        writer = BatchAuditWriter(store, batch_size=10, max_delay=0.2)
+        try:
+            for i in range(25):
+                writer.record(make_entry(f"loan-{i}"))
+            assert wait_for(lambda: writer.written == 25)
+        finally:
+            writer.shutdown()
+
+        assert sum(store.batch_sizes) == 25
+        assert max(store.batch_sizes) == 10
+        assert len(store.batch_sizes) <= 4
+
+    def test_query_sees_pending_entries(self):
+        """Test that queries flush first (read-your-writes)"""
+        writer = BatchAuditWriter(SqliteAuditLog(), batch_size=100, max_delay=60)
+        try:
+            writer.record(make_entry("loan-7", "admin-9"))
+
+            assert [e.loan_id for e in writer.by_actor("admin-9")] == ["loan-7"]
+            assert writer.by_loan("loan-7")[0].seq == 1
+        finally:
+            writer.shutdown()
+
+    def test_full_queue_writes_on_caller(self):
+        """Test that nothing is dropped when the writer falls behind"""
+        store = RecordingStore()
+        writer = BatchAuditWriter(store, batch_size=100, max_delay=60, max_queue=5)
+        try:
+            for i in range(12):
+                writer.record(make_entry(f"loan-{i}"))
+        finally:
+            writer.shutdown()
+
+        assert writer.stats()["sync_flushes"] == 2
+        assert store.count() == 12
+
+    def test_failed_batch_retried(self):
+        """Test that a batch the store rejects stays queued and is written later"""
+        store = RecordingStore()
+        store.fail = 1
+        writer = BatchAuditWriter(store, batch_size=100, max_delay=0.02)
+        try:
+            writer.record(make_entry())
+            assert wait_for(lambda: writer.written == 1)
+        finally:
+            writer.shutdown()
+
+        assert writer.stats()["failed_batches"] == 1
+        assert store.count() == 1
+
+    def test_record_restarts_after_shutdown(self):
+        """Test that recording after shutdown starts a new writer thread"""
+        writer = BatchAuditWriter(SqliteAuditLog(), batch_size=100, max_delay=0.02)
+        writer.record(make_entry())
+        writer.shutdown()
+
+        writer.record(make_entry())
+        try:
+            assert wait_for(lambda: writer.written == 2)
+        finally:
+            writer.shutdown()
@@ -0,0 +1,105 @@
+"""
+Unit tests for execution lanes
+"""
+import asyncio
+
+import pytest
+
+from infrastructure.execution_lanes import (
+    LANES,
+    ExecutionLane,
+    LaneFull,
+    get_lane,
+    lane_stats,
+    parse_lanes,
+)
+
+
+class TestExecutionLane:
+    """Test suite for ExecutionLane"""
+
+    def test_acquire_within_concurrency(self):
+        """Test that slots up to `concurrency` are granted immediately"""
+        async def scenario():
+            lane = ExecutionLane("t", concurrency=2, max_queue=0)
+            await lane.acquire()
+            await lane.acquire()
+            return lane.stats()
+
+        stats = asyncio.run(scenario())
+
+        assert stats["active"] == 2
+        assert stats["queued"] == 0
+
+    def test_full_queue_raises(self):
+        """Test that LaneFull is raised once the queue is full"""
+        async def scenario():
+            lane = ExecutionLane("t", concurrency=1, max_queue=0, retry_after=4)
+            await lane.acquire()
+            with pytest.raises(LaneFull) as exc_info:
+                await lane.acquire()
+            return lane, exc_info.value
+
+        lane, error = asyncio.run(scenario())
+
+        assert error.retry_after == 4
+        assert lane.rejected == 1
+
+    def test_waiter_gets_released_slot(self):
+        """Test that a queued request gets the slot in FIFO order"""
+        async def scenario():
+            lane = ExecutionLane("t", concurrency=1, max_queue=4)
+            order = []
+
+            async def worker(n):
+                async with lane.slot():
+                    order.append(n)
+                    await asyncio.sleep(0)
+
+            await asyncio.gather(*(worker(n) for n in range(3)))
+            return order, lane.stats()
+
+        order, stats = asyncio.run(scenario())
+
+        assert order == [0, 1, 2]
+        assert stats["completed"] == 3
+        assert stats["active"] == 0
+        assert stats["wait_max"] >= 0
+
+    def test_cancelled_waiter_removed(self):
+        """Test that a cancelled waiter leaves the queue without leaking a slot"""
+        async def scenario():
+            lane = ExecutionLane("t", concurrency=1, max_queue=4)
+            await lane.acquire()
+            waiting = asyncio.create_task(lane.acquire())
+            await asyncio.sleep(0)
+            waiting.cancel()
+            await asyncio.gather(waiting, return_exceptions=True)
+            queued = lane.stats()["queued"]
+            lane.release()
+            return queued, lane.stats()
+
+        queued, stats = asyncio.run(scenario())
+
+        assert queued == 0
+        assert stats["active"] == 0
+
+
+class TestLaneRegistry:
+    """Test suite for lane configuration"""
+
+    def test_parse_lanes(self):
+        """Test parsing name:concurrency:max_queue entries"""
+        lanes = parse_lanes("a:4:10, b:1:2,")
+
+        assert [(l.name, l.concurrency, l.max_queue) for l in lanes] == [("a", 4, 10), ("b", 1, 2)]
+
+    def test_default_lanes(self):
+        """Test that interactive and bulk lanes exist by default"""
+        assert {"interactive", "bulk"} <= set(LANES)
+        assert set(lane_stats()) == set(LANES)
+
+    def test_unknown_lane(self):
+        """Test that an unknown lane name raises KeyError"""
+        with pytest.raises(KeyError):
+            get_lane("nope")
@@ -0,0 +1,158 @@
+"""
+Unit tests for heap footprint and tracemalloc snapshots
+"""
+import tracemalloc
+from datetime import date
+from uuid import uuid4
+
+import pytest
+
+from domain.book_id import BookId
+from domain.due_date import DueDate
+from domain.loan import Loan
+from domain.user_id import UserId
+from infrastructure.heap_report import HeapTracer, TracingInUse, footprint, footprint_summary, main
+
+
+def make_loans(n: int) -> dict:
+    data = {}
+    for _ in range(n):
+        loan = Loan(BookId(uuid4()), UserId(uuid4()))
+        loan.verify()
+        loan.approve(DueDate(date(2030, 1, 1)))
+        data[str(loan.loanId)] = loan
+    return data
+
+
+@pytest.fixture
+def tracer():
+    heap = HeapTracer(max_snapshots=2)
+    yield heap
+    tracemalloc.stop()
+
+
+class TestFootprint:
+    """Test suite for footprint()"""
+
+    def test_counts_domain_types(self):
+        """Test that every domain object and str key is counted once"""
+        types = footprint(make_loans(50))
+
+        for name in ("Loan", "BookId", "UserId", "DueDate", "datetime"):
+            assert types[name]["count"] == 50
+        assert types["UUID"]["count"] == 150
+        assert types["str"]["count"] >= 50
+        assert types["dict"]["count"] == 1
+
+    def test_instance_dict_charged_to_instance(self):
+        """Test that a Loan's size includes its attribute dict"""
+        types = footprint(make_loans(1))
+
+        assert types["Loan"]["bytes"] > 200
+        assert types["dict"]["count"] == 1
+
+    def test_shared_objects_counted_once(self):
+        """Test that objects reachable twice are not double counted"""
+        book = BookId(uuid4())
+        types = footprint([book, book, (book,)])
+
+        assert types["BookId"]["count"] == 1
+
+    def test_summary_total(self):
+        """Test that the summary total is the sum over types"""
+        summary = footprint_summary(make_loans(5))
+
+        assert summary["total_bytes"] == sum(t["bytes"] for t in summary["types"].values())
+
+
+class TestHeapTracer:
+    """Test suite for HeapTracer"""
+
+    def test_snapshot_requires_tracing(self, tracer):
+        """Test that taking a snapshot without tracemalloc fails clearly"""
+        tracemalloc.stop()
+
+        with pytest.raises(RuntimeError):
+            tracer.take("before")
+
+    def test_frames_bounds(self, tracer):
+        """Test that the frame count is validated and applied"""
+        with pytest.raises(ValueError):
+            tracer.start(frames=0)
+
+        assert tracer.start(frames=3)["frames"] == 3
+        assert tracer.start(frames=1)["frames"] == 1
+
+    def test_diff_finds_growth_site(self, tracer):
+        """Test that the diff points at the line that kept allocating"""
+        tracer.start()
+        tracer.take("before")
+        kept = make_loans(300)
+        tracer.take("after")
+
+        result = tracer.diff("before", "after", limit=50)
+
+        assert result["size_diff_bytes"] > 0
+        assert any(site["site"].startswith("domain/") and site["size_diff_bytes"] > 0
+                   for site in result["sites"])
+        assert len(kept) == 300
+
+    def test_top_groups_by_project_file(self, tracer):
+        """Test that allocations are attributed to the innermost project file"""
+        tracer.start(frames=10)
+        kept = make_loans(200)
+        top = tracer.top(tracer.take("now"), limit=5)
+
+        assert len(top["sites"]) == 5
+        assert any(key.startswith("domain/") for key in top["by_project_file"])
+        assert len(kept) == 200
+
+    def test_stop_keeps_tracing_for_other_owner(self, tracer):
+        """Test that stopping the heap report leaves request accounting's tracing on"""
+        tracer.acquire("request_accounting")
+        tracer.start(frames=1)
+
+        assert tracer.stop()["tracing"] is True
+        with pytest.raises(TracingInUse):
+            tracer.start(frames=3)
+        tracer.release("request_accounting")
+        assert not tracemalloc.is_tracing()
+
+    def test_external_tracing_never_stopped(self, tracer):
+        """Test that tracing started outside HeapTracer is neither stopped nor restarted"""
+        tracemalloc.start(1)
+
+        with pytest.raises(TracingInUse):
+            tracer.stop()
+        with pytest.raises(TracingInUse):
+            tracer.start(frames=3)
+        tracer.start(frames=1)
+        tracer.stop()
+
+        assert tracemalloc.is_tracing()
+
+    def test_keeps_bounded_snapshots(self, tracer):
+        """Test that old snapshots are dropped beyond max_snapshots"""
+        tracer.start()
+        for name in ("a", "b", "c"):
+            tracer.take(name)
+
+        assert list(tracer.snapshots) == ["b", "c"]
+        with pytest.raises(KeyError):
+            tracer.get("a")
+
+
+class TestCli:
+    """Test suite for the heap_report CLI"""
+
+    def test_footprint_command(self, capsys):
+        """Test that the footprint command prints per-type bytes per loan"""
+        assert main(["footprint", "20"]) == 0
+
+        out = capsys.readouterr().out
+        assert "Loan" in out and "B/loan" in out
+
+    def test_usage(self, capsys):
+        """Test that unknown arguments print usage"""
+        assert main([]) == 1
+        assert "usage" in capsys.readouterr().out
@@ -1,8 +1,11 @@
 import pytest
+from datetime import date, timedelta
 from uuid import uuid4
 from domain.loan import Loan
 from domain.book_id import BookId
 from domain.user_id import UserId
+from domain.due_date import DueDate
+from domain.loan_status import LoanStatus
 from infrastructure.in_memory_loan_repository import InMemoryLoanRepository
 
 
@@ -253,6 +256,34 @@ class TestRepositoryListAll:
         assert isinstance(all_loans, list)
 
 
+class TestRepositoryStatusCounts:
+    """Test suite for the per-status loan counts"""
+
+    def test_counts_follow_saved_transitions(self):
+        """Test that re-saving a mutated loan moves it to its new status"""
+        repo = InMemoryLoanRepository()
+        loans = [Loan(BookId(uuid4()), UserId(uuid4())) for _ in range(3)]
+        for loan in loans:
+            repo.save(loan)
+
+        loans[0].verify()
+        loans[0].approve(DueDate(date.today() + timedelta(days=7)))
+        repo.save(loans[0])
+        repo.save(loans[1])
+
+        assert repo.count_by_status() == {LoanStatus.REQUESTED: 2, LoanStatus.BORROWED: 1}
+
+    def test_clear_resets_counts(self):
+        """Test that clear empties loans and counts together"""
+        repo = InMemoryLoanRepository()
+        repo.save(Loan(BookId(uuid4()), UserId(uuid4())))
+
+        repo.clear()
+
+        assert repo.list_all() == []
+        assert repo.count_by_status() == {}
+
+
 class TestRepositoryIsolation:
     """Test suite for repository isolation"""
 
@@ -0,0 +1,173 @@
+import asyncio
+import tracemalloc
+
+import pytest
+from infrastructure.in_memory_refresh_token_store import InMemoryRefreshTokenStore, run_expiry
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_store(**kwargs):
+    clock = FakeClock()
+    params = {"ttl_seconds": 10, "capacity": 100, "per_user": 5, "clock": clock}
+    params.update(kwargs)
+    return InMemoryRefreshTokenStore(**params), clock
+
+
+class TestRefreshTokenStoreBasics:
+    """Test suite for add/get/revoke"""
+
+    def test_add_and_get(self):
+        """Test that a stored token resolves to its username"""
+        store, _ = make_store()
+        store.add("rt1", "peminjam1")
+
+        assert store.get("rt1") == "peminjam1"
+        assert "rt1" in store
+        assert len(store) == 1
+
+    def test_get_unknown_token(self):
+        """Test that unknown tokens resolve to None"""
+        store, _ = make_store()
+
+        assert store.get("missing") is None
+        assert "missing" not in store
+
+    def test_revoke(self):
+        """Test that revoke removes the token exactly once"""
+        store, _ = make_store()
+        store.add("rt1", "peminjam1")
+
+        assert store.revoke("rt1") is True
+        assert store.revoke("rt1") is False
+        assert store.get("rt1") is None
+        assert store.by_user == {}
+
+    def test_re_add_same_token(self):
+        """Test that re-adding a token does not duplicate it"""
+        store, _ = make_store()
+        store.add("rt1", "peminjam1")
+        store.add("rt1", "peminjam1")
+
+        assert len(store) == 1
+        assert len(store.by_user["peminjam1"]) == 1
+
+
+class TestRefreshTokenStoreBounds:
+    """Test suite for TTL, capacity and per-user limits"""
+
+    def test_token_expires_after_ttl(self):
+        """Test that get() returns None once the TTL has passed"""
+        store, clock = make_store()
+        store.add("rt1", "peminjam1")
+        clock.now = 10
+
+        assert store.get("rt1") is None
+        assert len(store) == 0
+        assert store.stats()["expired"] == 1
+
+    def test_capacity_evicts_oldest(self):
+        """Test that the oldest token is evicted at capacity"""
+        store, _ = make_store(capacity=3, per_user=10)
+        for i in range(4):
+            store.add(f"rt{i}", f"user{i}")
+
+        assert len(store) == 3
+        assert store.get("rt0") is None
+        assert store.get("rt3") == "user3"
+        assert "user0" not in store.by_user
+        assert store.stats()["evicted"] == 1
+
+    def test_per_user_cap(self):
+        """Test that a user keeps at most per_user live tokens"""
+        store, _ = make_store(per_user=2)
+        for i in range(3):
+            store.add(f"rt{i}", "peminjam1")
+
+        assert store.get("rt0") is None
+        assert store.get("rt1") == "peminjam1"
+        assert store.get("rt2") == "peminjam1"
+        assert len(store.by_user["peminjam1"]) == 2
+
+    def test_per_user_cap_does_not_touch_others(self):
+        """Test that one user's cap never evicts another user's token"""
+        store, _ = make_store(per_user=1)
+        store.add("a1", "alice")
+        store.add("b1", "bob")
+        store.add("a2", "alice")
+
+        assert store.get("b1") == "bob"
+        assert store.get("a1") is None
+
+
+class TestPurgeExpired:
+    """Test suite for incremental expiry"""
+
+    def test_purge_stops_at_first_live_token(self):
+        """Test that purge only removes expired tokens from the front"""
+        store, clock = make_store()
+        store.add("old", "u1")
+        clock.now = 5
+        store.add("new", "u2")
+        clock.now = 12
+
+        assert store.purge_expired() == 1
+        assert store.get("new") == "u2"
+
+    def test_purge_respects_limit(self):
+        """Test that purge removes at most `limit` tokens per call"""
+        store, clock = make_store(per_user=100)
+        for i in range(50):
+            store.add(f"rt{i}", "u")
+        clock.now = 100
+
+        assert store.purge_expired(limit=20) == 20
+        assert len(store) == 30
+        assert store.purge_expired(limit=100) == 30
+        assert store.by_user == {}
+
+    def test_run_expiry_background_task(self):
+        """Test that run_expiry drains expired tokens in batches"""
+        store, clock = make_store(per_user=100)
+        for i in range(25):
+            store.add(f"rt{i}", "u")
+        clock.now = 100
+
+        async def drive():
+            task = asyncio.create_task(run_expiry(store, interval=0.01, batch=10))
+            await asyncio.sleep(0.05)
+            task.cancel()
+
+        asyncio.run(drive())
+        assert len(store) == 0
+
+
+class TestRefreshTokenStoreMemory:
+    """Memory stays flat under many simulated logins"""
+
+    @pytest.mark.slow
+    def test_memory_bounded_under_many_logins(self):
+        """Test that traced memory stops growing once capacity is reached"""
+        store, clock = make_store(ttl_seconds=3600, capacity=10_000, per_user=5)
+
+        def simulate(start, count):
+            for i in range(start, start + count):
+                clock.now += 0.001
+                store.add(f"token-{i:012d}", f"user{i % 50_000}")
+
+        tracemalloc.start()
+        simulate(0, 100_000)
+        warm, _ = tracemalloc.get_traced_memory()
+        simulate(100_000, 100_000)
+        after, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        assert len(store) == 10_000
+        assert len(store.by_user) <= 10_000
+        assert after < warm * 1.2
@@ -0,0 +1,50 @@
+from uuid import uuid4
+from auth.user_repository import User
+from infrastructure.in_memory_user_repository import InMemoryUserRepository
+
+
+class TestInMemoryUserRepository:
+    """Test suite for InMemoryUserRepository"""
+
+    def test_add_and_lookup(self):
+        """Test lookups by username and by UUID"""
+        repo = InMemoryUserRepository()
+        user = repo.add(User(uuid4(), "alice", "h", "peminjam"))
+
+        assert repo.get_by_username("alice") is user
+        assert repo.get_by_id(user.user_id) is user
+        assert repo.count() == 1
+
+    def test_replace_same_username(self):
+        """Test that replacing a username drops the old id entry"""
+        repo = InMemoryUserRepository()
+        old = repo.add(User(uuid4(), "alice", "h", "peminjam"))
+        new = repo.add(User(uuid4(), "alice", "h2", "pengguna"))
+
+        assert repo.get_by_id(old.user_id) is None
+        assert repo.get_by_id(new.user_id) is new
+        assert repo.count() == 1
+
+    def test_add_many(self):
+        """Test bulk insert"""
+        repo = InMemoryUserRepository()
+        count = repo.add_many(User(uuid4(), f"u{i}", "h", "peminjam") for i in range(5))
+
+        assert count == 5
+        assert repo.count() == 5
+
+    def test_update(self):
+        """Test that update keeps the user reachable both ways"""
+        repo = InMemoryUserRepository()
+        user = repo.add(User(uuid4(), "alice", "h", "peminjam"))
+        user.disabled = True
+        repo.update(user)
+
+        assert repo.get_by_id(user.user_id).disabled is True
+
+    def test_missing(self):
+        """Test lookups for unknown users"""
+        repo = InMemoryUserRepository()
+
+        assert repo.get_by_username("nobody") is None
+        assert repo.get_by_id(uuid4()) is None
@@ -0,0 +1,168 @@
+"""
+Unit tests for the metrics registry
+"""
+import threading
+
+import pytest
+
+from infrastructure.metrics import (
+    REPOSITORY_SECONDS,
+    CallbackMetric,
+    Counter,
+    Gauge,
+    Histogram,
+    Registry,
+    timed,
+)
+
+
+class TestCounter:
+    """Test suite for Counter"""
+
+    def test_inc_by_labels(self):
+        """Test that increments are kept per label tuple"""
+        counter = Counter("c", "help", ("route",))
+        counter.inc(("/a",))
+        counter.inc(("/a",), 2)
+        counter.inc(("/b",))
+
+        assert counter.collect() == {("/a",): 3, ("/b",): 1}
+
+    def test_threads_write_own_shards(self):
+        """Test that per-thread shards are summed on collect"""
+        counter = Counter("c", "help")
+
+        barrier = threading.Barrier(4)
+
+        def work():
+            barrier.wait()
+            for _ in range(1000):
+                counter.inc()
+            barrier.wait()
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert counter.collect() == {(): 4000}
+        assert len(counter._shards) == 4
+
+    def test_thread_churn_reuses_shards(self):
+        """Test that exited threads hand their shard to new threads"""
+        counter = Counter("c", "help")
+        histogram = Histogram("h", "help", buckets=(1.0,))
+
+        def work():
+            counter.inc()
+            histogram.observe(0.5)
+
+        for _ in range(200):
+            t = threading.Thread(target=work)
+            t.start()
+            t.join()
+
+        assert counter.collect() == {(): 200}
+        assert histogram.collect()[()][0] == 200
+        assert len(counter._shards) <= 2
+        assert len(histogram._shards) <= 2
+
+    def test_gauge_inc_dec(self):
+        """Test that a gauge goes up and down"""
+        gauge = Gauge("g", "help")
+        gauge.inc()
+        gauge.inc()
+        gauge.dec()
+
+        assert gauge.collect() == {(): 1}
+
+
+class TestHistogram:
+    """Test suite for Histogram"""
+
+    def test_bucket_placement(self):
+        """Test that values land in the first bucket >= value"""
+        histogram = Histogram("h", "help", buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 5.0):
+            histogram.observe(value)
+
+        counts = histogram.collect()[()]
+        assert counts[:3] == [2, 1, 1]
+        assert counts[-1] == pytest.approx(5.65)
+
+    def test_cumulative_samples(self):
+        """Test that exposed buckets are cumulative with +Inf = count"""
+        histogram = Histogram("h", "help", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value)
+
+        samples = {(name, labels): value for name, labels, value in histogram.samples()}
+        assert samples[("h_bucket", ("0.1",))] == 1
+        assert samples[("h_bucket", ("1.0",))] == 2
+        assert samples[("h_bucket", ("+Inf",))] == 3
+        assert samples[("h_count", ())] == 3
+
+    def test_timer(self):
+        """Test the time() context manager"""
+        histogram = Histogram("h", "help")
+        with histogram.time(("x",)):
+            pass
+
+        assert sum(histogram.collect()[("x",)][:-1]) == 1
+
+
+class TestRegistry:
+    """Test suite for Registry exposition"""
+
+    def test_expose_format(self):
+        """Test the Prometheus text format"""
+        registry = Registry()
+        counter = registry.register(Counter("req_total", "Requests", ("route",)))
+        counter.inc(('/a"b',))
+        registry.register(CallbackMetric("up", "Up", (), lambda: [((), 1)]))
+
+        text = registry.expose()
+
+        assert "# HELP req_total Requests\n# TYPE req_total counter\n" in text
+        assert 'req_total{route="/a\\"b"} 1\n' in text
+        assert "# TYPE up gauge\nup 1\n" in text
+
+    def test_histogram_le_label(self):
+        """Test that bucket samples carry the le label"""
+        registry = Registry()
+        registry.register(Histogram("lat", "Latency", ("route",), buckets=(0.5,))).observe(0.1, ("/a",))
+
+        text = registry.expose()
+
+        assert 'lat_bucket{route="/a",le="0.5"} 1' in text
+        assert 'lat_bucket{route="/a",le="+Inf"} 1' in text
+        assert 'lat_sum{route="/a"} 0.1' in text
+
+    def test_duplicate_name_rejected(self):
+        """Test that two metrics cannot share a name"""
+        registry = Registry()
+        registry.register(Counter("x", "help"))
+
+        with pytest.raises(ValueError):
+            registry.register(Counter("x", "help"))
+
+
+class TestTimed:
+    """Test suite for the timed repository decorator"""
+
+    def test_records_latency(self):
+        """Test that decorated calls are observed, including on error"""
+        @timed("test_repo", "op")
+        def op(fail=False):
+            if fail:
+                raise ValueError("boom")
+            return 42
+
+        before = sum(REPOSITORY_SECONDS.collect().get(("test_repo", "op"), [0, 0.0])[:-1])
+        assert op() == 42
+        with pytest.raises(ValueError):
+            op(fail=True)
+
+        after = sum(REPOSITORY_SECONDS.collect()[("test_repo", "op")][:-1])
+        assert after - before == 2
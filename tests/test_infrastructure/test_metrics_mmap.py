@@ -0,0 +1,171 @@
+"""
+Unit tests for multi-process metrics (mmap files per worker)
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from infrastructure import metrics
+from infrastructure.metrics import Counter, Gauge, Histogram, Registry
+from infrastructure.metrics_mmap import MmapValues, MultiProcessCollector, read_file
+
+ROOT = Path(__file__).resolve().parents[2]
+
+WORKER = """
+import sys
+sys.path.insert(0, {root!r})
+from infrastructure import metrics
+from infrastructure.metrics import Counter, Gauge
+metrics.enable_multiprocess({directory!r})
+requests = Counter("t_requests_total", "t", ("route",))
+in_flight = Gauge("t_in_flight", "t")
+for _ in range({n}):
+    requests.inc(("/a",))
+in_flight.inc()
+"""
+
+
+def _run_worker(directory, n: int) -> None:
+    code = WORKER.format(root=str(ROOT), directory=str(directory), n=n)
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+@pytest.fixture
+def multiprocess(tmp_path):
+    metrics.enable_multiprocess(str(tmp_path))
+    yield tmp_path
+    metrics.disable_multiprocess()
+
+
+class TestMmapValues:
+    """Test suite for MmapValues"""
+
+    def test_slot_and_write_roundtrip(self, tmp_path):
+        """Test that slots are readable from the file by another reader"""
+        store = MmapValues(str(tmp_path / "metrics_1.db"))
+        offset = store.slot("a", (1.0, 2.0))
+        store.write(offset + 8, 5.0)
+
+        assert dict(read_file(store.path)) == {"a": (1.0, 5.0)}
+
+    def test_slot_is_stable(self, tmp_path):
+        """Test that the same key maps to the same offset"""
+        store = MmapValues(str(tmp_path / "metrics_1.db"))
+
+        assert store.slot("a", (0.0,)) == store.slot("a", (9.0,))
+
+    def test_file_grows(self, tmp_path):
+        """Test that the file is enlarged when slots run out"""
+        store = MmapValues(str(tmp_path / "metrics_1.db"), initial_size=64)
+        offsets = [store.slot(f"key-{i}", (float(i),)) for i in range(50)]
+        store.write(offsets[0], 42.0)
+
+        values = dict(read_file(store.path))
+        assert len(values) == 50
+        assert values["key-0"] == (42.0,)
+        assert values["key-49"] == (49.0,)
+        assert store.size > 64
+
+
+class TestMultiProcessMetrics:
+    """Test suite for recording and collecting across workers"""
+
+    def test_local_writes_mirrored(self, multiprocess):
+        """Test that counter and histogram updates reach this worker's file"""
+        counter = Counter("m_total", "m", ("k",))
+        histogram = Histogram("m_seconds", "m", buckets=(0.1, 1.0))
+        counter.inc(("x",))
+        counter.inc(("x",), 2)
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+
+        totals = MultiProcessCollector(str(multiprocess)).collect()
+
+        assert totals["m_total"][("x",)] == [3]
+        assert totals["m_seconds"][()] == pytest.approx([1, 1, 0, 0.55])
+
+    def test_threads_get_separate_slots(self, multiprocess):
+        """Test that each thread writes its own slot and totals are summed"""
+        import threading
+        counter = Counter("th_total", "t")
+
+        def work():
+            for _ in range(500):
+                counter.inc()
+
+        threads = [threading.Thread(target=work) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert MultiProcessCollector(str(multiprocess)).collect()["th_total"][()] == [1500]
+
+    def test_thread_churn_reuses_slots(self, multiprocess):
+        """Test that new threads take over exited threads' slots instead of adding slots"""
+        import threading
+        counter = Counter("churn_total", "t", ("route",))
+
+        def work():
+            counter.inc(("/a",))
+
+        for _ in range(100):
+            t = threading.Thread(target=work)
+            t.start()
+            t.join()
+
+        path = multiprocess / f"metrics_{os.getpid()}.db"
+        keys = [key for key, _ in read_file(str(path)) if "churn_total" in key]
+        assert len(keys) <= 2
+        assert MultiProcessCollector(str(multiprocess)).collect()["churn_total"][("/a",)] == [100]
+
+    def test_dead_worker_archived(self, multiprocess):
+        """Test that dead workers' counters survive and their files are removed"""
+        _run_worker(multiprocess, 5)
+        _run_worker(multiprocess, 7)
+
+        totals = MultiProcessCollector(str(multiprocess)).collect()
+
+        assert totals["t_requests_total"][("/a",)] == [12]
+        assert "t_in_flight" not in totals  # gauge mati bersama prosesnya
+        files = sorted(p.name for p in multiprocess.iterdir() if p.name.startswith("metrics_"))
+        assert files == [f"metrics_{os.getpid()}.db"]
+        assert (multiprocess / "archive.json").exists()
+
+    def test_archive_not_double_counted(self, multiprocess):
+        """Test that repeated scrapes return the same totals"""
+        _run_worker(multiprocess, 4)
+        collector = MultiProcessCollector(str(multiprocess))
+
+        assert collector.collect()["t_requests_total"][("/a",)] == [4]
+        assert collector.collect()["t_requests_total"][("/a",)] == [4]
+
+    def test_registry_exposes_all_workers(self, multiprocess):
+        """Test that expose() aggregates this worker with dead ones"""
+        registry = Registry()
+        counter = registry.register(Counter("t_requests_total", "t", ("route",)))
+        registry.register(Gauge("t_in_flight", "t"))
+        counter.inc(("/a",))
+        _run_worker(multiprocess, 2)
+
+        text = registry.expose()
+
+        assert 't_requests_total{route="/a"} 3' in text
+
+    def test_stale_file_with_own_pid_archived(self, tmp_path):
+        """Test that a leftover file for a reused pid is archived at startup"""
+        stale = MmapValues(str(tmp_path / f"metrics_{os.getpid()}.db"))
+        stale.slot('["counter", "s_total", [], 0]', (5.0,))
+        stale.close()
+
+        metrics.enable_multiprocess(str(tmp_path))
+        try:
+            Counter("s_total", "s").inc()
+            totals = MultiProcessCollector(str(tmp_path)).collect()
+        finally:
+            metrics.disable_multiprocess()
+
+        assert totals["s_total"][()] == [6]
@@ -0,0 +1,83 @@
+"""
+Unit tests for per-request phase timers
+"""
+import threading
+import time
+
+from infrastructure.phase_timing import _NOOP, count, current_timer, phase, reset_timer, start_timer
+
+
+class TestPhase:
+    """Test suite for phase()"""
+
+    def test_noop_outside_request(self):
+        """Test that phase() is a shared no-op when no timer is active"""
+        assert current_timer() is None
+        assert phase("repo") is _NOOP
+        with phase("repo"):
+            pass
+
+    def test_records_duration(self):
+        """Test that a phase adds its duration to the timer"""
+        timer, token = start_timer()
+        try:
+            with phase("repo"):
+                time.sleep(0.01)
+        finally:
+            reset_timer(token)
+
+        assert timer.durations["repo"] >= 0.009
+        assert current_timer() is None
+
+    def test_nested_phases_are_exclusive(self):
+        """Test that nested time is only counted for the inner phase"""
+        timer, token = start_timer()
+        try:
+            with phase("user"):
+                with phase("repo"):
+                    time.sleep(0.02)
+        finally:
+            reset_timer(token)
+
+        assert timer.durations["repo"] >= 0.019
+        assert timer.durations["user"] < 0.005
+
+    def test_repeated_phases_accumulate(self):
+        """Test that the same phase name is summed"""
+        timer, token = start_timer()
+        try:
+            for _ in range(3):
+                with phase("serialize"):
+                    time.sleep(0.002)
+        finally:
+            reset_timer(token)
+
+        assert timer.durations["serialize"] >= 0.005
+        assert list(timer.durations) == ["serialize"]
+
+
+class TestCallCounts:
+    """Test suite for count() and PhaseTimer.current_thread"""
+
+    def test_count_on_active_timer(self):
+        """Test that calls are counted per key only while a timer is active"""
+        count("loan.save")
+        timer, token = start_timer()
+        try:
+            count("loan.save")
+            count("loan.save")
+            count("loan.findById")
+        finally:
+            reset_timer(token)
+
+        assert timer.calls == {"loan.save": 2, "loan.findById": 1}
+
+    def test_current_thread_follows_open_phase(self):
+        """Test that the innermost open phase reports its thread"""
+        timer, token = start_timer()
+        try:
+            assert timer.current_thread() is None
+            with phase("repo"):
+                assert timer.current_thread() == threading.get_ident()
+        finally:
+            reset_timer(token)
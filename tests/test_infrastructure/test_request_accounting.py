@@ -0,0 +1,161 @@
+"""
+Unit tests for per-request CPU / allocation accounting
+"""
+import asyncio
+import threading
+import tracemalloc
+
+import pytest
+
+from infrastructure.phase_timing import charge_cpu, phase, reset_timer, start_timer
+from infrastructure.request_accounting import (
+    REQUEST_CPU_SECONDS,
+    RequestUsage,
+    UsageStats,
+    metered,
+)
+
+
+def burn(n: int = 200_000) -> int:
+    return sum(i * i for i in range(n))
+
+
+class TestMetered:
+    """Test suite for metered()"""
+
+    def test_counts_cpu_of_coroutine_steps(self):
+        """Test that CPU spent between awaits is charged"""
+        usage = RequestUsage(threading.get_ident())
+
+        async def work():
+            burn()
+            await asyncio.sleep(0)
+            burn()
+            return "done"
+
+        assert asyncio.run(metered(work(), usage)) == "done"
+        assert usage.cpu > 0.005
+
+    def test_excludes_time_suspended(self):
+        """Test that other tasks running while suspended are not charged"""
+        usage = RequestUsage(threading.get_ident())
+
+        async def idle():
+            await asyncio.sleep(0.05)
+
+        async def scenario():
+            other = asyncio.create_task(asyncio.to_thread(burn, 500_000))
+            await metered(idle(), usage)
+            await other
+
+        asyncio.run(scenario())
+        assert usage.cpu < 0.01
+
+    def test_propagates_exceptions_and_cancellation(self):
+        """Test that errors and cancellation reach the caller"""
+        usage = RequestUsage(threading.get_ident())
+
+        async def fail():
+            await asyncio.sleep(0)
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            asyncio.run(metered(fail(), usage))
+
+        async def cancelled():
+            task = asyncio.create_task(metered(asyncio.sleep(10), usage))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancelled())
+
+
+class TestWorkerSegments:
+    """Test suite for phases charging worker-thread CPU"""
+
+    def test_phase_on_other_thread_is_charged_once(self):
+        """Test that a phase starting work off the loop thread charges its CPU once"""
+        usage = RequestUsage(loop_thread=-1)
+        timer, token = start_timer()
+        timer.usage = usage
+        try:
+            with phase("handler"):
+                with phase("repo"):
+                    burn()
+        finally:
+            reset_timer(token)
+
+        assert 0.005 < usage.cpu < 1.0
+
+    def test_loop_thread_phases_not_double_counted(self):
+        """Test that phases on the loop thread are left to metered()"""
+        usage = RequestUsage(loop_thread=threading.get_ident())
+        timer, token = start_timer()
+        timer.usage = usage
+        try:
+            with phase("validate"):
+                burn()
+        finally:
+            reset_timer(token)
+
+        assert usage.cpu == 0.0
+
+    def test_charge_cpu(self):
+        """Test that external CPU is added only inside an accounted request"""
+        charge_cpu(1.0)
+        usage = RequestUsage(threading.get_ident())
+        timer, token = start_timer()
+        timer.usage = usage
+        try:
+            charge_cpu(0.25)
+        finally:
+            reset_timer(token)
+
+        assert usage.cpu == 0.25
+
+    def test_tracks_allocations(self):
+        """Test that net traced bytes are recorded when tracemalloc is on"""
+        usage = RequestUsage(loop_thread=-1, track_alloc=True)
+        timer, token = start_timer()
+        timer.usage = usage
+        tracemalloc.start(1)
+        try:
+            with phase("handler"):
+                kept = [object() for _ in range(10_000)]
+        finally:
+            tracemalloc.stop()
+            reset_timer(token)
+
+        assert usage.alloc > 10_000 * 16
+        assert len(kept) == 10_000
+
+
+class TestUsageStats:
+    """Test suite for UsageStats"""
+
+    def test_report_by_route_and_role(self):
+        """Test totals, averages and CPU share per route/role"""
+        stats = UsageStats()
+        stats.record("/auth/login", "anonymous", 0.3, 1000)
+        stats.record("/auth/login", "anonymous", 0.1, 0)
+        stats.record("/loans/all", "pengguna", 0.1, 5000)
+
+        report = stats.report()
+
+        top = report["by_route_role"][0]
+        assert (top["route"], top["role"], top["requests"]) == ("/auth/login", "anonymous", 2)
+        assert top["cpu_avg_ms"] == 200.0
+        assert top["cpu_max_ms"] == 300.0
+        assert top["cpu_share_pct"] == 80.0
+        assert report["by_role"]["pengguna"]["alloc_total_bytes"] == 5000
+        assert report["by_route"]["/loans/all"]["requests"] == 1
+        assert stats.report(sort="alloc")["by_route_role"][0]["route"] == "/loans/all"
+
+    def test_exported_as_metrics(self):
+        """Test that CPU totals feed the Prometheus counter"""
+        labels = ("/test/route", "tester")
+        UsageStats().record(*labels, 0.5, 0)
+
+        assert REQUEST_CPU_SECONDS.collect()[labels] == pytest.approx(0.5)
@@ -0,0 +1,133 @@
+"""
+Unit tests for the event-loop lag and threadpool monitor
+"""
+import asyncio
+import logging
+import threading
+import time
+
+import anyio.to_thread
+from fastapi.testclient import TestClient
+
+from infrastructure.metrics import REGISTRY
+from infrastructure.runtime_monitor import (
+    LOOP_LAG_SECONDS,
+    RUNTIME_MONITOR,
+    THREADPOOL_WAIT_SECONDS,
+    RuntimeMonitor,
+)
+from main import app
+
+
+def _count(histogram) -> int:
+    values = histogram.collect().get(())
+    return sum(values[:-1]) if values else 0
+
+
+class TestRuntimeMonitor:
+    """Test suite for RuntimeMonitor"""
+
+    def test_sample_idle(self):
+        """Test that an idle loop and pool report near-zero lag and wait"""
+        monitor = RuntimeMonitor(interval=0.01)
+        lag_before, wait_before = _count(LOOP_LAG_SECONDS), _count(THREADPOOL_WAIT_SECONDS)
+
+        result = asyncio.run(monitor.sample())
+
+        assert result["lag"] < 0.05
+        assert result["wait"] < 0.05
+        assert result["capacity"] == 40
+        assert monitor.samples == 1
+        assert _count(LOOP_LAG_SECONDS) == lag_before + 1
+        assert _count(THREADPOOL_WAIT_SECONDS) == wait_before + 1
+
+    def test_detects_blocked_loop(self, caplog):
+        """Test that a blocking call on the loop shows up as lag and logs a warning"""
+        monitor = RuntimeMonitor(interval=0.01, lag_warn=0.05)
+
+        async def scenario():
+            task = asyncio.create_task(monitor.sample())
+            await asyncio.sleep(0)
+            time.sleep(0.1)  # memblokir event loop
+            return await task
+
+        with caplog.at_level(logging.WARNING, logger="infrastructure.runtime_monitor"):
+            result = asyncio.run(scenario())
+
+        assert result["lag"] >= 0.05
+        assert monitor.warnings["loop_lag"] == 1
+        assert "Event loop lag" in caplog.text
+
+    def test_detects_saturated_threadpool(self, caplog):
+        """Test that a full threadpool is reported as probe wait with queued tasks"""
+        monitor = RuntimeMonitor(interval=0.01, wait_warn=0.05)
+        release = threading.Event()
+
+        async def scenario():
+            limiter = anyio.to_thread.current_default_thread_limiter()
+            limiter.total_tokens = 2
+            blockers = [asyncio.create_task(anyio.to_thread.run_sync(release.wait)) for _ in range(3)]
+            await asyncio.sleep(0.01)
+            asyncio.get_running_loop().call_later(0.1, release.set)
+            result = await monitor.sample()
+            await asyncio.gather(*blockers)
+            return result
+
+        with caplog.at_level(logging.WARNING, logger="infrastructure.runtime_monitor"):
+            result = asyncio.run(scenario())
+
+        assert result["active"] == 2
+        assert result["queued"] == 1
+        assert result["wait"] >= 0.05
+        assert "Threadpool wait" in caplog.text
+
+    def test_warnings_rate_limited(self, caplog):
+        """Test that repeated crossings are counted but logged once per window"""
+        now = [0.0]
+        monitor = RuntimeMonitor(warn_every=30, clock=lambda: now[0])
+
+        with caplog.at_level(logging.WARNING, logger="infrastructure.runtime_monitor"):
+            monitor._warn("loop_lag", "lag")
+            now[0] = 10.0
+            monitor._warn("loop_lag", "lag")
+            now[0] = 31.0
+            monitor._warn("loop_lag", "lag")
+
+        assert monitor.warnings["loop_lag"] == 3
+        assert caplog.text.count("lag") == 2
+
+    def test_snapshot_before_start(self):
+        """Test that the snapshot works before the first sample"""
+        snapshot = RuntimeMonitor().snapshot()
+
+        assert snapshot["samples"] == 0
+        assert snapshot["threadpool"] == {"active": 0, "queued": 0, "capacity": 0}
+
+
+class TestRuntimeMetrics:
+    """Test suite for the registered runtime metrics"""
+
+    def test_histograms_registered(self):
+        """Test that lag and wait histograms are exposed"""
+        text = REGISTRY.expose()
+
+        assert "bookwise_event_loop_lag_seconds_bucket" in text
+        assert "bookwise_threadpool_wait_seconds_bucket" in text
+
+    def test_scrape_includes_pool_and_lanes(self):
+        """Test that /metrics reports threadpool and lane occupancy"""
+        text = TestClient(app).get("/metrics").text
+
+        assert 'bookwise_threadpool_tasks{state="capacity"}' in text
+        assert 'bookwise_lane_tasks{lane="bulk",state="queued"}' in text
+
+    def test_started_by_lifespan(self):
+        """Test that the app lifespan runs the monitor in the background"""
+        before = RUNTIME_MONITOR.samples
+        with TestClient(app):
+            deadline = time.time() + 3
+            while RUNTIME_MONITOR.samples == before and time.time() < deadline:
+                time.sleep(0.05)
+
+        assert RUNTIME_MONITOR.samples > before
+        assert RUNTIME_MONITOR.snapshot()["threadpool"]["capacity"] == 40
@@ -0,0 +1,97 @@
+"""
+Unit tests for the on-demand sampling profiler
+"""
+import sys
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+from infrastructure.sampling_profiler import Profile, ProfilerBusy, SamplingProfiler
+
+
+def busy_loop(stop, started=None):
+    if started is not None:
+        started.set()
+    while not stop.is_set():
+        sum(i * i for i in range(200))
+
+
+class TestSamplingProfiler:
+    """Test suite for SamplingProfiler"""
+
+    def test_samples_other_threads(self):
+        """Test that a busy worker thread shows up in the collapsed stacks"""
+        stop, started = threading.Event(), threading.Event()
+        worker = threading.Thread(target=busy_loop, args=(stop, started), name="busy-worker")
+        worker.start()
+        # thread bisa tersampel sebelum masuk busy_loop; tunggu sampai benar-benar di dalamnya
+        assert started.wait(1)
+        try:
+            profile = SamplingProfiler().run(0.2, interval=0.002)
+        finally:
+            stop.set()
+            worker.join()
+
+        assert profile.samples > 10
+        collapsed = profile.collapsed()
+        busy_lines = [line for line in collapsed.splitlines() if line.startswith("thread:busy-worker;")]
+        assert busy_lines
+        assert all("busy_loop (" in line for line in busy_lines)
+        assert all(line.rsplit(" ", 1)[1].isdigit() for line in collapsed.splitlines())
+
+    def test_excludes_sampler_thread(self):
+        """Test that the thread running the sampler is not profiled"""
+        profile = SamplingProfiler().run(0.05, interval=0.005)
+
+        assert "sampling_profiler.py" not in profile.collapsed(include_idle=True)
+
+    def test_top_functions_self_and_total(self):
+        """Test that top() counts leaf frames as self and every frame as total"""
+        stacks = Counter({
+            ("main", ("app.py", "handler", 1), ("repo.py", "find", 10)): 3,
+            ("main", ("app.py", "handler", 1)): 1,
+        })
+        rows = {row["function"]: row for row in Profile(stacks, 4, 1.0, 0.01).top()}
+
+        assert rows["find (repo.py:10)"]["self"] == 3
+        assert rows["find (repo.py:10)"]["total"] == 3
+        assert rows["handler (app.py:1)"]["self"] == 1
+        assert rows["handler (app.py:1)"]["total"] == 4
+        assert rows["handler (app.py:1)"]["total_pct"] == 100.0
+
+    def test_idle_stacks_filtered_by_default(self):
+        """Test that threads parked in threading.wait are dropped unless requested"""
+        stacks = Counter({
+            ("pool", ("queue.py", "get", 154), ("threading.py", "wait", 288)): 5,
+            ("main", ("app.py", "handler", 1)): 1,
+        })
+        profile = Profile(stacks, 6, 1.0, 0.01)
+
+        assert "wait" not in profile.collapsed()
+        assert "thread:pool;get (queue.py:154);wait (threading.py:288) 5" in profile.collapsed(include_idle=True)
+
+    def test_concurrent_run_rejected(self):
+        """Test that a second profile while one is running raises ProfilerBusy"""
+        profiler = SamplingProfiler()
+        runner = threading.Thread(target=profiler.run, args=(0.3,))
+        runner.start()
+        try:
+            deadline = time.time() + 1
+            while not profiler.running and time.time() < deadline:
+                time.sleep(0.001)
+            with pytest.raises(ProfilerBusy):
+                profiler.run(0.01)
+        finally:
+            runner.join()
+        assert not profiler.running
+
+    def test_no_hooks_installed(self):
+        """Test that profiling leaves the trace/profile hooks as they were"""
+        # pytest-cov (addopts --cov) memasang trace function sendiri
+        trace, profile = sys.gettrace(), sys.getprofile()
+        SamplingProfiler().run(0.02)
+
+        assert sys.getprofile() is profile
+        assert sys.gettrace() is trace
@@ -0,0 +1,99 @@
+"""
+Unit tests for the slow-request log and watchdog
+"""
+import sys
+import threading
+
+from infrastructure.phase_timing import PhaseTimer, phase, reset_timer, start_timer
+from infrastructure.slow_requests import SlowRequestLog, format_stack
+
+
+class TestSlowRequestLog:
+    """Test suite for SlowRequestLog"""
+
+    def test_ring_buffer_bounded(self):
+        """Test that the oldest records are dropped beyond capacity"""
+        log = SlowRequestLog(threshold=0.1, capacity=3, sample_stack=False)
+        for i in range(5):
+            log.add({"n": i})
+
+        snapshot = log.snapshot()
+        assert [r["n"] for r in snapshot["records"]] == [4, 3, 2]
+        assert snapshot["captured"] == 5
+        assert [r["n"] for r in log.snapshot(limit=1)["records"]] == [4]
+
+    def test_scan_samples_only_late_requests(self):
+        """Test that scan() takes a stack only for requests over the threshold"""
+        log = SlowRequestLog(threshold=1.0, capacity=3, sample_stack=False)
+        log.loop_thread = threading.get_ident()
+        late, fresh = PhaseTimer(), PhaseTimer()
+        log.begin(late, 0.0)
+        log.begin(fresh, 9.5)
+
+        assert log.scan(now=10.0) == 1
+        assert fresh not in log.stacks
+        assert log.scan(now=10.0) == 0
+
+        stack, at = log.end(late, slow=True)
+        assert at == 10.0
+        assert stack[-1].endswith(" scan")
+        assert log.end(fresh, slow=False) is None
+        assert log.snapshot()["in_flight"] == 0
+
+    def test_scan_drops_stacks_of_finished_requests(self):
+        """Test that a stack taken after its request finished is discarded"""
+        log = SlowRequestLog(threshold=1.0, capacity=3, sample_stack=False)
+        timer = PhaseTimer()
+        log.stacks[timer] = (["late"], 1.0)
+
+        log.scan(now=10.0)
+
+        assert log.stacks == {}
+
+    def test_scan_follows_innermost_phase_thread(self):
+        """Test that the stack comes from the thread running the open phase"""
+        log = SlowRequestLog(threshold=0.0, capacity=3, sample_stack=False)
+        entered, release = threading.Event(), threading.Event()
+        holder = {}
+
+        def worker():
+            timer, token = start_timer()
+            holder["timer"] = timer
+            try:
+                with phase("repo"):
+                    entered.set()
+                    release.wait(5)
+            finally:
+                reset_timer(token)
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        try:
+            entered.wait(5)
+            log.begin(holder["timer"], 0.0)
+            log.scan(now=1.0)
+        finally:
+            release.set()
+            thread.join()
+
+        stack, _ = log.stacks[holder["timer"]]
+        assert any(line.endswith(" worker") for line in stack)
+        assert stack[-1].startswith("threading.py:")
+
+    def test_watchdog_off_without_stack_sampling(self):
+        """Test that no thread is started when stack sampling is disabled"""
+        log = SlowRequestLog(threshold=0.1, sample_stack=False)
+        log.start_watchdog()
+
+        assert log._watchdog is None
+
+
+class TestFormatStack:
+    """Test suite for format_stack"""
+
+    def test_outermost_first(self):
+        """Test that the innermost frame is last"""
+        stack = format_stack(sys._getframe())
+
+        assert stack[-1].endswith(" test_outermost_first")
+        assert ":" in stack[-1]
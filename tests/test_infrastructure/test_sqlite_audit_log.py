@@ -0,0 +1,81 @@
+import sqlite3
+from datetime import datetime, timezone
+
+import pytest
+
+from domain.audit_log import AuditEntry
+from infrastructure.sqlite_audit_log import SqliteAuditLog
+
+
+def make_entry(loan_id="loan-1", actor="admin-1", action="verified"):
+    return AuditEntry(loan_id, action, actor, "pengguna", "requested", "verified",
+                      datetime.now(timezone.utc))
+
+
+class TestSqliteAuditLog:
+    """Test suite for SqliteAuditLog"""
+
+    def test_append_sets_seq_and_recorded_at(self):
+        """Test that persisted entries get increasing seq and a recorded time"""
+        store = SqliteAuditLog()
+        entries = [make_entry(), make_entry()]
+
+        assert store.append_many(entries) == 2
+        assert entries[0].seq < entries[1].seq
+        assert entries[0].recorded_at is not None
+        assert store.count() == 2
+
+    def test_query_by_loan_and_actor(self):
+        """Test both indexed lookups return matching entries oldest first"""
+        store = SqliteAuditLog()
+        store.append_many([
+            make_entry("loan-1", "admin-1", "verified"),
+            make_entry("loan-2", "admin-1", "verified"),
+            make_entry("loan-1", "admin-2", "approved"),
+        ])
+
+        assert [e.action for e in store.by_loan("loan-1")] == ["verified", "approved"]
+        assert [e.loan_id for e in store.by_actor("admin-1")] == ["loan-1", "loan-2"]
+        entry = store.by_loan("loan-1")[1]
+        assert (entry.actor, entry.role, entry.from_stage, entry.to_stage) == \
+            ("admin-2", "pengguna", "requested", "verified")
+
+    def test_paging_with_after(self):
+        """Test that `after` and `limit` page through a loan's history"""
+        store = SqliteAuditLog()
+        store.append_many([make_entry() for _ in range(5)])
+
+        first = store.by_loan("loan-1", limit=2)
+        rest = store.by_loan("loan-1", limit=10, after=first[-1].seq)
+
+        assert len(first) == 2
+        assert [e.seq for e in rest] == [3, 4, 5]
+
+    def test_lookups_use_indexes(self):
+        """Test that both lookups are index searches, not table scans"""
+        store = SqliteAuditLog()
+
+        assert "USING INDEX loan_audit_by_loan" in store.explain("loan_id")
+        assert "USING INDEX loan_audit_by_actor" in store.explain("actor")
+
+    def test_append_only(self):
+        """Test that UPDATE and DELETE are rejected"""
+        store = SqliteAuditLog()
+        store.append_many([make_entry()])
+
+        with pytest.raises(sqlite3.DatabaseError):
+            store._conn.execute("UPDATE loan_audit SET actor = 'someone-else'")
+        with pytest.raises(sqlite3.DatabaseError):
+            store._conn.execute("DELETE FROM loan_audit")
+        assert store.by_loan("loan-1")[0].actor == "admin-1"
+
+    def test_persists_across_connections(self, tmp_path):
+        """Test that the trail survives reopening the database"""
+        path = str(tmp_path / "audit.db")
+        store = SqliteAuditLog(path)
+        store.append_many([make_entry()])
+        store.close()
+
+        reopened = SqliteAuditLog(path)
+        assert reopened.by_actor("admin-1")[0].action == "verified"
+        reopened.close()
@@ -0,0 +1,153 @@
+from uuid import uuid4
+from auth.user_repository import User
+from infrastructure.sqlite_user_repository import SqliteUserRepository
+
+
+def make_user(name="alice", role="peminjam"):
+    return User(uuid4(), name, "hashed", role)
+
+
+class TestSqliteUserRepository:
+    """Test suite for SqliteUserRepository"""
+
+    def test_add_and_lookup(self):
+        """Test lookups by username and by UUID"""
+        repo = SqliteUserRepository()
+        user = repo.add(make_user())
+
+        assert repo.get_by_username("alice").user_id == user.user_id
+        assert repo.get_by_id(user.user_id).username == "alice"
+        assert repo.count() == 1
+
+    def test_persists_across_connections(self, tmp_path):
+        """Test that data survives reopening the database"""
+        path = str(tmp_path / "users.db")
+        repo = SqliteUserRepository(path)
+        user = repo.add(make_user())
+        repo.close()
+
+        reopened = SqliteUserRepository(path)
+        loaded = reopened.get_by_id(user.user_id)
+        assert loaded.username == "alice"
+        assert loaded.hashed_password == "hashed"
+        assert loaded.disabled is False
+        reopened.close()
+
+    def test_cached_reads(self):
+        """Test that repeat reads are served from cache"""
+        repo = SqliteUserRepository()
+        user = make_user()
+        repo.add_many([user])
+
+        first = repo.get_by_username("alice")
+        second = repo.get_by_id(user.user_id)
+
+        assert first is second
+        assert repo.cache_misses == 1
+        assert repo.cache_hits == 1
+
+    def test_cache_bounded(self):
+        """Test that the read cache never exceeds cache_size"""
+        repo = SqliteUserRepository(cache_size=3)
+        users = [make_user(f"u{i}") for i in range(10)]
+        repo.add_many(users)
+        for u in users:
+            repo.get_by_username(u.username)
+
+        assert len(repo._by_username) == 3
+        assert len(repo._by_id) == 3
+
+    def test_update_persists(self):
+        """Test that update writes through to the database"""
+        repo = SqliteUserRepository()
+        user = repo.add(make_user())
+        user.disabled = True
+        user.role = "pengguna"
+        repo.update(user)
+        repo._by_username.clear()
+        repo._by_id.clear()
+
+        loaded = repo.get_by_username("alice")
+        assert loaded.disabled is True
+        assert loaded.role == "pengguna"
+
+    def test_cache_expires_for_other_workers(self, tmp_path):
+        """Test that a change made through another connection is seen after the TTL"""
+        now = [0.0]
+        path = str(tmp_path / "users.db")
+        worker_a = SqliteUserRepository(path, cache_ttl=5, clock=lambda: now[0])
+        worker_b = SqliteUserRepository(path, cache_ttl=5, clock=lambda: now[0])
+        user = worker_a.add(make_user())
+        assert worker_a.get_by_id(user.user_id).disabled is False
+
+        changed = worker_b.get_by_username("alice")
+        changed.disabled = True
+        changed.role = "pengguna"
+        worker_b.update(changed)
+        stale = worker_a.get_by_id(user.user_id)
+        now[0] = 5.0
+        fresh = worker_a.get_by_id(user.user_id)
+
+        assert stale.disabled is False
+        assert fresh.disabled is True
+        assert fresh.role == "pengguna"
+        assert worker_a.get_by_username("alice") is fresh
+        worker_a.close()
+        worker_b.close()
+
+    def test_replace_same_username(self):
+        """Test that re-adding a username replaces the old row"""
+        repo = SqliteUserRepository()
+        old = repo.add(make_user())
+        new = repo.add(make_user())
+
+        assert repo.count() == 1
+        assert repo.get_by_id(old.user_id) is None
+        assert repo.get_by_username("alice").user_id == new.user_id
+
+    def test_missing(self):
+        """Test lookups for unknown users"""
+        repo = SqliteUserRepository()
+
+        assert repo.get_by_username("nobody") is None
+        assert repo.get_by_id(uuid4()) is None
+
+    def test_indexes_used(self):
+        """Test that both lookups use an index, not a table scan"""
+        repo = SqliteUserRepository()
+        for column in ("username", "user_id"):
+            plan = repo._conn.execute(
+                f"EXPLAIN QUERY PLAN SELECT * FROM users WHERE {column} = ?", ("x",)
+            ).fetchall()
+            assert "USING INDEX" in " ".join(str(row) for row in plan)
+
+    def test_refresh_counter_compare_and_set(self):
+        """Test that the refresh counter only advances from its current value"""
+        repo = SqliteUserRepository()
+        repo.add(make_user())
+
+        assert repo.advance_refresh_counter("alice") == (0, 1)
+        assert repo.advance_refresh_counter("alice", 0, 0) is None
+        assert repo.advance_refresh_counter("alice", 0, 1) == (0, 2)
+        assert repo.bump_refresh_generation("alice", 0, 1) is None
+        assert repo.bump_refresh_generation("alice", 0, 2) == 1
+        assert repo.get_by_username("alice").refresh_generation == 1
+        assert repo.advance_refresh_counter("nobody") is None
+
+    def test_adds_refresh_columns_to_old_database(self, tmp_path):
+        """Test that a database created before the refresh columns is migrated"""
+        import sqlite3
+        path = str(tmp_path / "old.db")
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE users (user_id TEXT PRIMARY KEY, username TEXT NOT NULL UNIQUE, "
+                     "hashed_password TEXT NOT NULL, role TEXT NOT NULL, disabled INTEGER NOT NULL DEFAULT 0)")
+        conn.execute("INSERT INTO users VALUES (?, 'alice', 'hashed', 'peminjam', 0)", (str(uuid4()),))
+        conn.commit()
+        conn.close()
+
+        repo = SqliteUserRepository(path)
+        user = repo.get_by_username("alice")
+
+        assert (user.refresh_generation, user.refresh_counter) == (0, 0)
+        assert repo.advance_refresh_counter("alice") == (0, 1)
+        repo.close()
@@ -0,0 +1,168 @@
+"""
+Unit tests for the queue-based structured logger
+"""
+import io
+import json
+import logging
+import threading
+
+from infrastructure.metrics import Registry
+from infrastructure.structured_logging import (
+    BatchLogWriter,
+    JsonFormatter,
+    QueueLogHandler,
+    configure_logging,
+    log_event,
+    register_logging_metrics,
+)
+
+
+def make_logger(name: str, writer: BatchLogWriter) -> logging.Logger:
+    logger = logging.getLogger(name)
+    logger.handlers = [QueueLogHandler(writer)]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logger
+
+
+class BlockingStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def write(self, text):
+        self.release.wait(5)
+        return super().write(text)
+
+
+class TestJsonFormatter:
+    """Test suite for JsonFormatter"""
+
+    def test_fields_merged(self):
+        """Test that structured fields become top-level JSON keys"""
+        record = logging.LogRecord("bookwise.test", logging.INFO, __file__, 1, "hello %s", ("you",), None)
+        record.fields = {"loan_id": "abc", "status": 200}
+
+        entry = json.loads(JsonFormatter().format(record))
+
+        assert entry["message"] == "hello you"
+        assert entry["level"] == "INFO"
+        assert entry["logger"] == "bookwise.test"
+        assert entry["loan_id"] == "abc" and entry["status"] == 200
+
+
+class TestBatchLogWriter:
+    """Test suite for BatchLogWriter"""
+
+    def test_records_written_on_flush(self):
+        """Test that nothing is written until the writer drains the queue"""
+        stream = io.StringIO()
+        writer = BatchLogWriter(stream=stream, interval=60)
+        logger = make_logger("bookwise.test.flush", writer)
+
+        log_event(logger, "loan.verified", loan_id="1", actor="u")
+        logger.warning("lag %d ms", 120)
+        assert stream.getvalue() == ""
+
+        assert writer.flush() == 2
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        assert lines[0]["message"] == "loan.verified" and lines[0]["actor"] == "u"
+        assert lines[1]["message"] == "lag 120 ms"
+
+    def test_overflow_dropped_and_counted(self):
+        """Test that a full queue drops records per level instead of blocking"""
+        writer = BatchLogWriter(stream=io.StringIO(), max_queue=3, interval=60)
+        logger = make_logger("bookwise.test.drop", writer)
+
+        for i in range(5):
+            logger.info("record %d", i)
+        logger.error("boom")
+
+        stats = writer.stats()
+        assert stats["queued"] == 3
+        assert stats["dropped"] == 3
+        assert stats["dropped_by_level"] == {"INFO": 2, "ERROR": 1}
+
+    def test_slow_output_does_not_block_logging(self):
+        """Test that logging returns while the writer thread is stuck on I/O"""
+        stream = BlockingStream()
+        writer = BatchLogWriter(stream=stream, batch_size=1, interval=0.01)
+        logger = make_logger("bookwise.test.blocking", writer)
+        writer.start()
+        try:
+            for i in range(100):
+                logger.info("record %d", i)
+            assert writer.written == 0
+        finally:
+            stream.release.set()
+            writer.shutdown()
+
+        assert writer.written == 100
+
+    def test_exception_rendered_early(self):
+        """Test that tracebacks are rendered on enqueue and not kept alive"""
+        stream = io.StringIO()
+        writer = BatchLogWriter(stream=stream, interval=60)
+        logger = make_logger("bookwise.test.exc", writer)
+
+        try:
+            raise ValueError("bad")
+        except ValueError:
+            logger.exception("failed")
+
+        assert writer.queue[0].exc_info is None
+        writer.flush()
+        assert "ValueError: bad" in json.loads(stream.getvalue())["exception"]
+
+    def test_file_output(self, tmp_path):
+        """Test that records are appended to LOG_FILE-style paths"""
+        path = tmp_path / "app.jsonl"
+        writer = BatchLogWriter(path=str(path), interval=60)
+        logger = make_logger("bookwise.test.file", writer)
+
+        logger.info("one")
+        writer.shutdown()
+
+        assert json.loads(path.read_text())["message"] == "one"
+
+
+class TestConfigureLogging:
+    """Test suite for configure_logging and helpers"""
+
+    def test_idempotent(self):
+        """Test that configuring twice does not add a second handler"""
+        logger = logging.getLogger("bookwise.test.configure")
+        logger.handlers = []
+        writer = BatchLogWriter(stream=io.StringIO(), interval=60)
+        try:
+            configure_logging(writer, "INFO", logger)
+            configure_logging(writer, "INFO", logger)
+            assert len(logger.handlers) == 1
+        finally:
+            writer.shutdown()
+            logger.handlers = []
+
+    def test_log_event_skipped_when_disabled(self):
+        """Test that disabled levels never reach the queue"""
+        writer = BatchLogWriter(stream=io.StringIO(), interval=60)
+        logger = make_logger("bookwise.test.level", writer)
+        logger.setLevel(logging.WARNING)
+
+        log_event(logger, "loan.created", loan_id="1")
+
+        assert len(writer.queue) == 0
+
+    def test_metrics(self):
+        """Test that written and dropped counts are exported"""
+        registry = Registry()
+        writer = BatchLogWriter(stream=io.StringIO(), max_queue=1, interval=60)
+        register_logging_metrics(writer, registry)
+        logger = make_logger("bookwise.test.metrics", writer)
+
+        logger.info("a")
+        logger.info("b")
+        writer.flush()
+
+        text = registry.expose()
+        assert 'bookwise_log_records_total{outcome="written"} 1' in text
+        assert 'bookwise_log_records_dropped_total{level="INFO"} 1' in text
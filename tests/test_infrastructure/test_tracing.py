@@ -0,0 +1,228 @@
+"""
+Unit tests for tracing: traceparent, sampling, batching and exporters
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from infrastructure.phase_timing import phase, reset_timer, start_timer
+from infrastructure.tracing import (
+    BatchSpanProcessor,
+    FileSpanExporter,
+    FinishedTrace,
+    OtlpHttpSpanExporter,
+    Sampler,
+    parse_traceparent,
+    to_otlp,
+)
+
+
+class MemoryExporter:
+    def __init__(self, fail: bool = False):
+        self.payloads = []
+        self.fail = fail
+
+    def export(self, payload):
+        if self.fail:
+            raise ConnectionError("collector down")
+        self.payloads.append(payload)
+
+
+def make_trace(phases=(), status=200) -> FinishedTrace:
+    return FinishedTrace("a" * 32, "b" * 16, None, "GET /loans/all", 1_000_000_000, 10.0, 10.5,
+                         {"http.response.status_code": status}, status, list(phases), "head")
+
+
+def spans_of(payload):
+    return payload["resourceSpans"][0]["scopeSpans"][0]["spans"]
+
+
+class TestTraceparent:
+    """Test suite for parse_traceparent"""
+
+    def test_valid_header(self):
+        """Test that trace id, parent id and sampled flag are parsed"""
+        parsed = parse_traceparent("00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01")
+
+        assert parsed == ("0af7651916cd43dd8448eb211c80319c", "b7ad6b7169203331", True)
+
+    def test_unsampled_flag(self):
+        """Test that flags 00 means not sampled"""
+        assert parse_traceparent("00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-00")[2] is False
+
+    def test_invalid_headers(self):
+        """Test that malformed or all-zero ids are ignored"""
+        assert parse_traceparent(None) is None
+        assert parse_traceparent("garbage") is None
+        assert parse_traceparent("00-" + "0" * 32 + "-b7ad6b7169203331-01") is None
+        assert parse_traceparent("00-0af7651916cd43dd8448eb211c80319c-xyz-01") is None
+
+
+class TestSampler:
+    """Test suite for Sampler"""
+
+    def test_head_ratio_bounds(self):
+        """Test that ratio 0 never and ratio 1 always samples"""
+        assert not Sampler(0.0, 0).head()
+        assert Sampler(1.0, 0).head()
+
+    def test_trusted_parent_decision_wins(self):
+        """Test that with a trusted traceparent the incoming flag overrides the ratio"""
+        assert Sampler(0.0, 0, parent_per_second=-1).head(parent_sampled=True)
+        assert not Sampler(1.0, 0, parent_per_second=-1).head(parent_sampled=False)
+
+    def test_untrusted_parent_uses_local_ratio(self):
+        """Test that by default a client's sampled flag cannot force sampling"""
+        sampler = Sampler(0.0, 0)
+
+        assert not any(sampler.head(parent_sampled=True) for _ in range(100))
+        assert Sampler(1.0, 0).head(parent_sampled=False)
+
+    def test_forced_sampling_is_capped(self):
+        """Test that sampled traceparents add at most parent_per_second traces"""
+        sampler = Sampler(0.0, 0, parent_per_second=5)
+
+        assert sum(sampler.head(parent_sampled=True) for _ in range(1000)) == 5
+
+    def test_tail_keeps_slow_and_errors(self):
+        """Test that unsampled requests are kept only when slow or 5xx"""
+        sampler = Sampler(0.0, 0.5)
+
+        assert sampler.keep(False, 0.6, 200)
+        assert sampler.keep(False, 0.01, 503)
+        assert not sampler.keep(False, 0.01, 404)
+        assert not Sampler(0.0, 0).keep(False, 10.0, 500)
+
+
+class TestFinishedTrace:
+    """Test suite for OTLP conversion"""
+
+    def test_phase_spans_nested_like_phases(self):
+        """Test that child spans get the enclosing phase as parent"""
+        timer, token = start_timer()
+        timer.spans = []
+        try:
+            with phase("user"):
+                with phase("repo", "user_memory.get_by_id"):
+                    pass
+        finally:
+            reset_timer(token)
+
+        spans = {s["name"]: s for s in make_trace(timer.spans).to_spans()}
+
+        root = spans["GET /loans/all"]
+        assert root["kind"] == 2 and "parentSpanId" not in root
+        assert spans["user"]["parentSpanId"] == root["spanId"]
+        assert spans["repo user_memory.get_by_id"]["parentSpanId"] == spans["user"]["spanId"]
+        assert {s["traceId"] for s in spans.values()} == {"a" * 32}
+        assert int(root["endTimeUnixNano"]) - int(root["startTimeUnixNano"]) == 500_000_000
+
+    def test_failed_phase_and_5xx_marked_error(self):
+        """Test that exceptions in a phase and 5xx responses set error status"""
+        timer, token = start_timer()
+        timer.spans = []
+        try:
+            with phase("repo"):
+                raise ValueError("boom")
+        except ValueError:
+            pass
+        finally:
+            reset_timer(token)
+
+        spans = make_trace(timer.spans, status=500).to_spans()
+
+        assert [s["status"]["code"] for s in spans] == [2, 2]
+
+    def test_resource_service_name(self):
+        """Test that the payload carries service.name"""
+        payload = to_otlp([make_trace()], "bookwise-test")
+
+        attribute = payload["resourceSpans"][0]["resource"]["attributes"][0]
+        assert attribute == {"key": "service.name", "value": {"stringValue": "bookwise-test"}}
+
+
+class TestBatchSpanProcessor:
+    """Test suite for BatchSpanProcessor"""
+
+    def test_flush_in_batches(self):
+        """Test that queued traces are exported batch_size at a time"""
+        exporter = MemoryExporter()
+        processor = BatchSpanProcessor(exporter, batch_size=2)
+        for _ in range(5):
+            processor.enqueue(make_trace())
+
+        assert processor.flush() == 5
+        assert [len(spans_of(p)) for p in exporter.payloads] == [2, 2, 1]
+        assert processor.stats() == {"queued": 0, "exported": 5, "dropped": 0, "failed": 0}
+
+    def test_drops_when_queue_full(self):
+        """Test that enqueue never blocks and counts drops"""
+        processor = BatchSpanProcessor(MemoryExporter(), max_queue=2)
+
+        results = [processor.enqueue(make_trace()) for _ in range(3)]
+
+        assert results == [True, True, False]
+        assert processor.dropped == 1
+
+    def test_export_failure_counted(self):
+        """Test that a failing exporter does not raise"""
+        processor = BatchSpanProcessor(MemoryExporter(fail=True))
+        processor.enqueue(make_trace())
+
+        assert processor.flush() == 0
+        assert processor.failed == 1
+
+    def test_background_thread_exports(self):
+        """Test that the export thread flushes on the interval and on shutdown"""
+        exporter = MemoryExporter()
+        processor = BatchSpanProcessor(exporter, interval=0.01)
+        processor.start()
+        processor.enqueue(make_trace())
+        processor.shutdown()
+
+        assert processor.exported == 1
+
+
+class TestExporters:
+    """Test suite for file and OTLP/HTTP exporters"""
+
+    def test_file_exporter_one_document_per_line(self, tmp_path):
+        """Test that each batch is appended as a JSON line"""
+        path = tmp_path / "traces.jsonl"
+        exporter = FileSpanExporter(str(path))
+        exporter.export(to_otlp([make_trace()], "svc"))
+        exporter.export(to_otlp([make_trace()], "svc"))
+
+        lines = path.read_text().splitlines()
+        assert len(lines) == 2
+        assert spans_of(json.loads(lines[0]))[0]["name"] == "GET /loans/all"
+
+    def test_otlp_http_exporter_posts_json(self):
+        """Test that batches are POSTed as application/json"""
+        received = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                received.append((self.path, self.headers["Content-Type"], json.loads(body)))
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        server = HTTPServer(("127.0.0.1", 0), Handler)
+        thread = threading.Thread(target=server.handle_request)
+        thread.start()
+        try:
+            OtlpHttpSpanExporter(f"http://127.0.0.1:{server.server_port}/v1/traces").export(
+                to_otlp([make_trace()], "svc"))
+        finally:
+            thread.join()
+            server.server_close()
+
+        path, content_type, payload = received[0]
+        assert path == "/v1/traces"
+        assert content_type == "application/json"
+        assert spans_of(payload)[0]["traceId"] == "a" * 32
@@ -0,0 +1,92 @@
+"""
+Tests for the structured access log middleware
+"""
+import io
+import json
+import logging
+
+from fastapi.testclient import TestClient
+
+from infrastructure.structured_logging import BatchLogWriter, QueueLogHandler
+from main import app
+from middleware.access_log import AccessLogMiddleware
+
+
+def logged_client(name: str):
+    stream = io.StringIO()
+    writer = BatchLogWriter(stream=stream, interval=60)
+    logger = logging.getLogger(name)
+    logger.handlers = [QueueLogHandler(writer)]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return TestClient(AccessLogMiddleware(app, logger)), writer, stream
+
+
+def lines(writer, stream):
+    writer.flush()
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+class TestAccessLogMiddleware:
+    """Test suite for AccessLogMiddleware"""
+
+    def test_access_record(self, pengguna_token):
+        """Test that route template, status, role and duration are logged"""
+        client, writer, stream = logged_client("bookwise.test.access")
+
+        response = client.get("/loans/all", headers={"Authorization": f"Bearer {pengguna_token}"})
+
+        entry = lines(writer, stream)[-1]
+        assert entry["message"] == "access"
+        assert entry["method"] == "GET"
+        assert entry["route"] == "/loans/all"
+        assert entry["status"] == 200
+        assert entry["role"] == "pengguna"
+        assert entry["principal"].startswith("user:")
+        assert entry["bytes"] == len(response.content)
+        assert entry["duration_ms"] >= 0
+
+    def test_unauthenticated_and_unmatched(self):
+        """Test that anonymous requests to unknown paths are still logged"""
+        client, writer, stream = logged_client("bookwise.test.access404")
+
+        client.get("/nope")
+
+        entry = lines(writer, stream)[-1]
+        assert entry["status"] == 404
+        assert entry["route"] is None
+        assert entry["role"] is None
+
+    def test_disabled_level_skips_logging(self):
+        """Test that nothing is queued when INFO is disabled"""
+        client, writer, _ = logged_client("bookwise.test.access_off")
+        logging.getLogger("bookwise.test.access_off").setLevel(logging.WARNING)
+
+        assert client.get("/health").status_code == 200
+        assert len(writer.queue) == 0
+
+    def test_loan_domain_events(self, pengguna_token, peminjam_token):
+        """Test that loan transitions emit bookwise.events records"""
+        stream = io.StringIO()
+        writer = BatchLogWriter(stream=stream, interval=60)
+        events = logging.getLogger("bookwise.events")
+        handler = QueueLogHandler(writer)
+        events.addHandler(handler)
+        level = events.level
+        events.setLevel(logging.INFO)
+        try:
+            client = TestClient(app)
+            created = client.post("/loans", json={
+                "bookId": "11111111-1111-1111-1111-111111111111",
+                "userId": "22222222-2222-2222-2222-222222222222",
+            }, headers={"Authorization": f"Bearer {peminjam_token}"}).json()
+            client.post(f"/loans/{created['loanId']}/verify",
+                        headers={"Authorization": f"Bearer {pengguna_token}"})
+        finally:
+            events.removeHandler(handler)
+            events.setLevel(level)
+
+        recorded = lines(writer, stream)
+        assert [entry["message"] for entry in recorded] == ["loan.created", "loan.verified"]
+        assert recorded[1]["loan_id"] == created["loanId"]
+        assert recorded[1]["role"] == "pengguna"
@@ -0,0 +1,264 @@
+"""
+Unit tests for the admission control middleware
+"""
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from main import app
+from middleware.admission import AdmissionControlMiddleware, AimdLimit, parse_exempt, parse_latency_classes
+
+
+class FakeClock:
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class SlowApp:
+    """ASGI app whose requests stay in flight until `gate` is set."""
+
+    def __init__(self):
+        self.gate = asyncio.Event()
+
+    async def __call__(self, scope, receive, send):
+        await self.gate.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+
+class SleepApp:
+    """ASGI app that takes `delay` seconds per request."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    async def __call__(self, scope, receive, send):
+        await asyncio.sleep(self.delay)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+
+def _scope(path: str = "/loans/my") -> dict:
+    return {"type": "http", "method": "GET", "path": path, "headers": []}
+
+
+async def _call(middleware, path: str = "/loans/my") -> int:
+    statuses = []
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    await middleware(_scope(path), None, send)
+    return statuses[0]
+
+
+class TestAimdLimit:
+    """Test suite for AimdLimit"""
+
+    def test_additive_increase(self):
+        """Test that fast samples grow the limit by ~1 per `limit` samples"""
+        limit = AimdLimit(initial=4, latency_target=0.1)
+        for _ in range(4):
+            limit.on_sample(0.01)
+
+        assert 4.9 < limit.value < 5.1
+
+    def test_multiplicative_decrease(self):
+        """Test that a slow sample cuts the limit by `backoff`"""
+        limit = AimdLimit(initial=10, latency_target=0.1, backoff=0.5, clock=FakeClock())
+        limit.on_sample(0.5)
+
+        assert int(limit) == 5
+
+    def test_one_decrease_per_target_interval(self):
+        """Test that a burst of slow samples decreases only once per interval"""
+        clock = FakeClock()
+        limit = AimdLimit(initial=16, latency_target=0.1, backoff=0.5, clock=clock)
+        for _ in range(5):
+            limit.on_sample(1.0)
+        assert int(limit) == 8
+
+        clock.now += 0.1
+        limit.on_sample(1.0)
+        assert int(limit) == 4
+
+    def test_bounds(self):
+        """Test that the limit stays within min/max"""
+        clock = FakeClock()
+        limit = AimdLimit(initial=3, min_limit=2, max_limit=4, latency_target=0.1,
+                          backoff=0.1, clock=clock)
+        limit.on_sample(1.0)
+        assert int(limit) == 2
+
+        for _ in range(50):
+            limit.on_sample(0.0)
+        assert int(limit) == 4
+
+    def test_sample_target_override(self):
+        """Test that a per-sample target replaces latency_target for the slow check"""
+        limit = AimdLimit(initial=10, latency_target=0.1, backoff=0.5, clock=FakeClock())
+        limit.on_sample(0.5, target=1.0)
+
+        assert limit.value > 10
+
+
+class TestParseExempt:
+    """Test suite for parse_exempt"""
+
+    def test_exact_and_prefix(self):
+        """Test that entries ending with * become prefixes"""
+        exact, prefixes = parse_exempt("/health, /admin/*,")
+
+        assert exact == {"/health"}
+        assert prefixes == ("/admin/",)
+
+
+class TestParseLatencyClasses:
+    """Test suite for parse_latency_classes"""
+
+    def test_exact_and_prefix_in_seconds(self):
+        """Test that targets are parsed from ms and * marks a prefix"""
+        exact, prefixes = parse_latency_classes("/auth/login=2000, /reports/*=500,")
+
+        assert exact == {"/auth/login": 2.0}
+        assert prefixes == (("/reports/", 0.5),)
+
+
+class TestAdmissionControlMiddleware:
+    """Test suite for AdmissionControlMiddleware"""
+
+    def test_rejects_over_limit_with_full_queue(self):
+        """Test that requests beyond limit + queue get 503 immediately"""
+        async def scenario():
+            slow = SlowApp()
+            middleware = AdmissionControlMiddleware(
+                slow, limit=AimdLimit(initial=2, min_limit=2), max_queue=1, max_queue_wait=5)
+            tasks = [asyncio.create_task(_call(middleware)) for _ in range(3)]
+            await asyncio.sleep(0)
+
+            rejected = await _call(middleware)
+            stats = middleware.stats()
+            slow.gate.set()
+            return rejected, stats, await asyncio.gather(*tasks), middleware.stats()
+
+        rejected, during, statuses, after = asyncio.run(scenario())
+
+        assert rejected == 503
+        assert during["in_flight"] == 2
+        assert during["queued"] == 1
+        assert statuses == [200, 200, 200]
+        assert after["in_flight"] == 0
+        assert after["rejected"] == 1
+
+    def test_queue_wait_timeout(self):
+        """Test that a queued request is shed after max_queue_wait"""
+        async def scenario():
+            slow = SlowApp()
+            middleware = AdmissionControlMiddleware(
+                slow, limit=AimdLimit(initial=1, min_limit=1), max_queue=5, max_queue_wait=0.01)
+            first = asyncio.create_task(_call(middleware))
+            await asyncio.sleep(0)
+
+            status = await _call(middleware)
+            slow.gate.set()
+            await first
+            return status, middleware.stats()
+
+        status, stats = asyncio.run(scenario())
+
+        assert status == 503
+        assert stats["queued"] == 0
+        assert stats["in_flight"] == 0
+
+    def test_queued_request_gets_slot(self):
+        """Test that a waiting request is admitted when a slot frees up"""
+        async def scenario():
+            slow = SlowApp()
+            middleware = AdmissionControlMiddleware(
+                slow, limit=AimdLimit(initial=1, min_limit=1), max_queue=5, max_queue_wait=5)
+            first = asyncio.create_task(_call(middleware))
+            second = asyncio.create_task(_call(middleware))
+            await asyncio.sleep(0)
+            slow.gate.set()
+            return await asyncio.gather(first, second), middleware.stats()
+
+        statuses, stats = asyncio.run(scenario())
+
+        assert statuses == [200, 200]
+        assert stats["admitted"] == 2
+        assert stats["queue_wait_max"] > 0
+
+    def test_cancelled_waiter_leaves_queue(self):
+        """Test that a client disconnect while queued does not leak a slot"""
+        async def scenario():
+            slow = SlowApp()
+            middleware = AdmissionControlMiddleware(
+                slow, limit=AimdLimit(initial=1, min_limit=1), max_queue=5, max_queue_wait=5)
+            first = asyncio.create_task(_call(middleware))
+            second = asyncio.create_task(_call(middleware))
+            await asyncio.sleep(0)
+            second.cancel()
+            await asyncio.gather(second, return_exceptions=True)
+            queued = middleware.stats()["queued"]
+            slow.gate.set()
+            await first
+            return queued, middleware.stats()
+
+        queued, stats = asyncio.run(scenario())
+
+        assert queued == 0
+        assert stats["in_flight"] == 0
+
+    def test_exempt_paths_bypass(self):
+        """Test that /health is let through even when the limit is exhausted"""
+        async def scenario():
+            slow = SlowApp()
+            middleware = AdmissionControlMiddleware(
+                slow, limit=AimdLimit(initial=1, min_limit=1), max_queue=0)
+            first = asyncio.create_task(_call(middleware))
+            await asyncio.sleep(0)
+            limited = await _call(middleware)
+            health = asyncio.create_task(_call(middleware, "/health"))
+            slow.gate.set()
+            return limited, await health, await first, middleware.stats()
+
+        limited, health, first, stats = asyncio.run(scenario())
+
+        assert limited == 503
+        assert health == 200
+        assert stats["admitted"] == 1
+
+    def test_rejection_response(self):
+        """Test the 503 body and Retry-After header on the real app"""
+        middleware = AdmissionControlMiddleware(app, limit=AimdLimit(initial=0, min_limit=0),
+                                                max_queue=0, retry_after=3)
+        client = TestClient(middleware)
+
+        response = client.get("/")
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "3"
+        assert client.get("/health").status_code == 200
+
+    def test_login_burst_does_not_shrink_limit(self):
+        """Test that slow requests in their own latency class keep the limit"""
+        async def scenario(latency_classes):
+            middleware = AdmissionControlMiddleware(
+                SleepApp(0.05), limit=AimdLimit(initial=8, latency_target=0.01),
+                max_queue=20, latency_classes=latency_classes)
+            await asyncio.gather(*(_call(middleware, "/auth/login") for _ in range(8)))
+            return middleware.stats()["limit"]
+
+        assert asyncio.run(scenario({"/auth/login": 1.0})) >= 8
+        assert asyncio.run(scenario({})) < 8
+
+    def test_default_latency_class_for_login(self):
+        """Test that /auth/login has its own latency class by default"""
+        middleware = AdmissionControlMiddleware(SleepApp(0))
+
+        assert middleware._latency_target("/auth/login") == 2.0
+        assert middleware._latency_target("/loans/my") is None
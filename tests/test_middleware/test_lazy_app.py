@@ -0,0 +1,178 @@
+"""
+Tests for the lazy-loading ASGI entry point
+"""
+from contextlib import asynccontextmanager
+
+import pytest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from middleware.lazy_app import LazyApp, json_response
+
+EVENTS = []
+
+
+@asynccontextmanager
+async def lifespan(app):
+    EVENTS.append("startup")
+    yield
+    EVENTS.append("shutdown")
+
+
+real_app = FastAPI(lifespan=lifespan)
+
+
+@real_app.get("/health")
+def health():
+    return {"status": "ok", "served_by": "real"}
+
+
+@real_app.get("/work")
+def work():
+    return {"events": list(EVENTS)}
+
+
+TARGET = f"{__name__}:real_app"
+
+
+@asynccontextmanager
+async def failing_lifespan(app):
+    raise RuntimeError("database unreachable")
+    yield
+
+
+failing_app = FastAPI(lifespan=failing_lifespan)
+
+
+def lazy(preload: bool = True) -> LazyApp:
+    return LazyApp(TARGET, instant={"/health": json_response({"status": "ok"})}, preload=preload)
+
+
+class TestLazyApp:
+    """Test suite for LazyApp"""
+
+    def test_instant_response_without_loading(self):
+        """Test that /health is answered before the real app is imported"""
+        app = lazy()
+        client = TestClient(app)
+
+        response = client.get("/health")
+
+        assert response.json() == {"status": "ok"}
+        assert response.headers["content-type"] == "application/json"
+        assert client.head("/health").content == b""
+        assert app.loaded is False
+
+    def test_other_request_loads_real_app(self):
+        """Test that the first other request imports and serves the real app"""
+        app = lazy()
+        client = TestClient(app)
+
+        assert client.get("/work").status_code == 200
+        assert app.loaded is True
+        assert client.get("/health").json()["served_by"] == "real"
+
+    def test_attribute_access_loads(self):
+        """Test that attributes are read from the real app"""
+        app = lazy()
+
+        assert any(route.path == "/work" for route in app.routes)
+        assert app.loaded is True
+
+    def test_lifespan_preloads_and_forwards(self):
+        """Test that the real app is loaded and its lifespan run from LazyApp's"""
+        EVENTS.clear()
+        app = lazy()
+
+        with TestClient(app) as client:
+            assert client.get("/work").json()["events"] == ["startup"]
+            assert app.loaded is True
+
+        assert EVENTS == ["startup", "shutdown"]
+
+    def test_lifespan_without_preload(self):
+        """Test that preload=False leaves the import and real startup to the first request"""
+        EVENTS.clear()
+        app = lazy(preload=False)
+
+        with TestClient(app) as client:
+            assert client.get("/health").json() == {"status": "ok"}
+            assert app.loaded is False
+            assert EVENTS == []
+            assert client.get("/work").json()["events"] == ["startup"]
+
+        assert EVENTS == ["startup", "shutdown"]
+
+    def test_failed_startup_stops_server(self):
+        """Test that a failing real startup is reported as lifespan.startup.failed"""
+        app = LazyApp(f"{__name__}:failing_app", instant={"/health": json_response({"status": "ok"})})
+
+        with pytest.raises(RuntimeError, match="database unreachable"):
+            with TestClient(app):
+                pass
+
+        assert app.failed is not None
+
+    def test_import_error_stops_server(self):
+        """Test that an import error of the real app fails lifespan startup"""
+        app = LazyApp("no_such_module_xyz:app", instant={"/health": json_response({"status": "ok"})})
+
+        with pytest.raises(ModuleNotFoundError):
+            with TestClient(app):
+                pass
+
+    def test_failed_startup_without_preload(self):
+        """Test that /health turns 503 and shutdown completes after a lazy startup failure"""
+        app = LazyApp(f"{__name__}:failing_app", instant={"/health": json_response({"status": "ok"})},
+                      preload=False)
+
+        with TestClient(app, raise_server_exceptions=False) as client:
+            assert client.get("/health").status_code == 200
+            assert client.get("/work").status_code == 500
+            health = client.get("/health")
+            assert client.get("/work").status_code == 500
+
+        assert health.status_code == 503
+        assert health.json() == {"status": "unavailable"}
+
+    def test_lifespan_never_loaded(self):
+        """Test that shutdown completes when the real app was never needed"""
+        EVENTS.clear()
+        app = lazy(preload=False)
+
+        with TestClient(app) as client:
+            client.get("/health")
+
+        assert app.loaded is False
+        assert EVENTS == []
+
+
+class TestMainEntryPoint:
+    """Test suite for main.py"""
+
+    def test_main_exports(self):
+        """Test that main serves a LazyApp and still exposes application names"""
+        import main
+        from main import custom_openapi
+
+        assert isinstance(main.app, LazyApp)
+        assert main.handler is main.app
+        assert custom_openapi()["components"]["securitySchemes"]["BearerAuth"]["scheme"] == "bearer"
+
+    def test_diagnostics_not_imported_at_startup(self):
+        """Test that disabled observability modules are not imported with the app"""
+        import os
+        import subprocess
+        import sys
+
+        env = dict(os.environ, REQUEST_ACCOUNTING_ENABLED="false", SLOW_REQUEST_ENABLED="false")
+        modules = ("infrastructure.heap_report", "infrastructure.sampling_profiler",
+                   "infrastructure.slow_requests", "infrastructure.request_accounting", "tracemalloc")
+        out = subprocess.run(
+            [sys.executable, "-c", "import sys, application; "
+             f"print([m for m in {modules!r} if m in sys.modules])"],
+            env=env, capture_output=True, text=True, check=True,
+        ).stdout
+
+        assert out.strip() == "[]"
@@ -0,0 +1,77 @@
+"""
+Tests for the /metrics endpoint and request metrics middleware
+"""
+from fastapi.testclient import TestClient
+
+from main import app
+from middleware.metrics import HTTP_IN_FLIGHT, HTTP_REQUESTS, route_template
+
+client = TestClient(app)
+
+
+class TestMetricsEndpoint:
+    """Test suite for GET /metrics"""
+
+    def test_prometheus_content_type(self):
+        """Test that /metrics serves the text exposition format"""
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+
+    def test_route_template_label(self, peminjam_token):
+        """Test that requests are labelled by route template, not raw path"""
+        headers = {"Authorization": f"Bearer {peminjam_token}"}
+        client.get("/loans/00000000-0000-0000-0000-000000000001", headers=headers)
+
+        text = client.get("/metrics").text
+
+        assert 'bookwise_http_requests_total{method="GET",route="/loans/{loan_id}",status="404"}' in text
+        assert "00000000-0000-0000-0000-000000000001" not in text
+
+    def test_unmatched_paths_share_label(self):
+        """Test that unknown paths don't create new label values"""
+        before = HTTP_REQUESTS.collect().get(("GET", "<unmatched>", "404"), 0)
+        client.get("/does-not-exist-1")
+        client.get("/does-not-exist-2")
+
+        assert HTTP_REQUESTS.collect()[("GET", "<unmatched>", "404")] == before + 2
+
+    def test_in_flight_back_to_zero(self):
+        """Test that the in-flight gauge is decremented after each request"""
+        client.get("/health")
+
+        assert HTTP_IN_FLIGHT.collect()[()] == 0
+
+    def test_app_metrics_present(self, test_client, pengguna_token):
+        """Test auth cache, loan status and repository metrics"""
+        text = client.get("/metrics").text
+
+        assert 'bookwise_auth_token_cache_total{result="hits"}' in text
+        assert "bookwise_auth_token_cache_hit_ratio" in text
+        assert 'bookwise_loans{status="requested"}' in text
+        assert 'bookwise_repository_operation_duration_seconds_count{repository="user_memory",operation="get_by_username"}' in text
+
+    def test_loan_counts_by_status(self, peminjam_token):
+        """Test that loan counts follow the repository"""
+        from uuid import uuid4
+        from api.loan_router import repo
+        from auth.jwt_handler import decode_access_token
+        user_id = decode_access_token(peminjam_token)["sub"]
+        repo.clear()
+        client.post("/loans", json={"bookId": str(uuid4()), "userId": user_id},
+                    headers={"Authorization": f"Bearer {peminjam_token}"})
+        try:
+            text = client.get("/metrics").text
+        finally:
+            repo.clear()
+
+        assert 'bookwise_loans{status="requested"} 1' in text
+
+
+class TestRouteTemplate:
+    """Test suite for route_template"""
+
+    def test_no_route(self):
+        """Test the fallback label"""
+        assert route_template({}) == "<unmatched>"
@@ -0,0 +1,229 @@
+"""
+Unit tests for the ASGI rate limiting middleware
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from middleware.rate_limit import (
+    RateLimitMiddleware,
+    RateLimitRule,
+    SlidingWindowLimiter,
+    TokenBucketLimiter,
+    default_key,
+)
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _scope(headers=(), client=("10.0.0.1", 1234)) -> dict:
+    return {"type": "http", "headers": list(headers), "client": client}
+
+
+class TestTokenBucketLimiter:
+    """Test suite for TokenBucketLimiter"""
+
+    def test_burst_then_reject(self):
+        """Test that a key gets `burst` requests then is limited"""
+        limiter = TokenBucketLimiter(rate=1, burst=3, clock=FakeClock())
+
+        assert [limiter.hit("a")[0] for _ in range(4)] == [True, True, True, False]
+
+    def test_refill_over_time(self):
+        """Test that tokens refill at `rate` per second"""
+        clock = FakeClock()
+        limiter = TokenBucketLimiter(rate=2, burst=1, clock=clock)
+        limiter.hit("a")
+
+        allowed, retry_after = limiter.hit("a")
+        assert not allowed
+        assert retry_after == 0.5
+
+        clock.now += 0.5
+        assert limiter.hit("a")[0]
+
+    def test_keys_are_independent(self):
+        """Test that each key has its own bucket"""
+        limiter = TokenBucketLimiter(rate=1, burst=1, clock=FakeClock())
+
+        assert limiter.hit("a")[0]
+        assert limiter.hit("b")[0]
+        assert not limiter.hit("a")[0]
+
+    def test_idle_keys_evicted(self):
+        """Test that keys idle longer than idle_seconds are dropped"""
+        clock = FakeClock()
+        limiter = TokenBucketLimiter(rate=1, burst=1, idle_seconds=10, clock=clock)
+        limiter.hit("a")
+        limiter.hit("b")
+
+        clock.now += 11
+        limiter.hit("c")
+
+        assert len(limiter) == 1
+        assert "c" in limiter.state
+
+    def test_max_keys_bound(self):
+        """Test that memory stays bounded by max_keys (LRU)"""
+        limiter = TokenBucketLimiter(rate=1, burst=1, max_keys=2, clock=FakeClock())
+        for key in ("a", "b", "c"):
+            limiter.hit(key)
+
+        assert list(limiter.state) == ["b", "c"]
+
+
+class TestSlidingWindowLimiter:
+    """Test suite for SlidingWindowLimiter"""
+
+    def test_limit_within_window(self):
+        """Test that at most `limit` requests pass in one window"""
+        limiter = SlidingWindowLimiter(limit=2, window=60, clock=FakeClock(960))
+
+        assert [limiter.hit("a")[0] for _ in range(3)] == [True, True, False]
+
+    def test_retry_after_is_window_end(self):
+        """Test that retry_after points at the end of the current window"""
+        limiter = SlidingWindowLimiter(limit=1, window=60, clock=FakeClock(970))
+        limiter.hit("a")
+
+        assert limiter.hit("a") == (False, 50)
+
+    def test_previous_window_weighted(self):
+        """Test that the previous window still counts while it overlaps"""
+        clock = FakeClock(960)
+        limiter = SlidingWindowLimiter(limit=2, window=60, clock=clock)
+        limiter.hit("a")
+        limiter.hit("a")
+
+        clock.now = 1020 + 15  # 75% jendela lama masih overlap -> 1.5 < 2
+        assert limiter.hit("a")[0]
+        assert not limiter.hit("a")[0]
+
+    def test_reset_after_two_windows(self):
+        """Test that counts reset once two windows have passed"""
+        clock = FakeClock(960)
+        limiter = SlidingWindowLimiter(limit=1, window=60, clock=clock)
+        limiter.hit("a")
+
+        clock.now += 120
+        assert limiter.hit("a")[0]
+
+
+class TestRateLimitRule:
+    """Test suite for RateLimitRule"""
+
+    def test_exact_and_method(self):
+        """Test exact path matching with a method filter"""
+        rule = RateLimitRule("/auth/login", None, methods=["post"])
+
+        assert rule.matches("POST", "/auth/login")
+        assert not rule.matches("GET", "/auth/login")
+        assert not rule.matches("POST", "/auth/login/x")
+
+    def test_prefix(self):
+        """Test prefix matching with a trailing *"""
+        rule = RateLimitRule("/loans*", None)
+
+        assert rule.matches("GET", "/loans/123")
+        assert not rule.matches("GET", "/auth/me")
+
+
+class TestKeyedLimiter:
+    """Test suite for the limiter base class"""
+
+    def test_hit_is_abstract(self):
+        """Test that a limiter without hit() cannot be created"""
+        from middleware.rate_limit import _KeyedLimiter
+
+        with pytest.raises(TypeError):
+            _KeyedLimiter(10, 60, FakeClock())
+
+
+class TestDefaultKey:
+    """Test suite for default_key"""
+
+    def test_client_ip(self):
+        """Test that anonymous requests are keyed by client IP"""
+        assert default_key(_scope()) == "ip:10.0.0.1"
+
+    def test_jwt_sub(self, peminjam_token):
+        """Test that a bearer token already verified by auth is keyed by its sub"""
+        from auth.deps import decode_token_cached
+
+        sub = decode_token_cached(peminjam_token)["sub"]
+        scope = _scope([(b"authorization", f"Bearer {peminjam_token}".encode())])
+
+        assert default_key(scope) == f"user:{sub}"
+
+    def test_invalid_token_falls_back_to_ip(self):
+        """Test that a forged token does not pick the key"""
+        scope = _scope([(b"authorization", b"Bearer not.a.jwt")])
+
+        assert default_key(scope) == "ip:10.0.0.1"
+
+    def test_tokens_never_decoded(self, monkeypatch, peminjam_token):
+        """Test that keying a request never verifies a JWT signature"""
+        import auth.deps
+        import auth.jwt_handler
+        from auth.token_cache import token_cache
+
+        def fail(token):
+            raise AssertionError("decoded on the rate-limit path")
+
+        monkeypatch.setattr(auth.jwt_handler, "decode_access_token", fail)
+        monkeypatch.setattr(auth.deps, "decode_access_token", fail)
+        token_cache.clear()
+        scope = _scope([(b"authorization", f"Bearer {peminjam_token}".encode())])
+
+        assert default_key(scope) == "ip:10.0.0.1"
+
+    def test_api_key_id(self):
+        """Test that API key requests are keyed by key id"""
+        scope = _scope([(b"x-api-key", b"bw_abc123.secret")])
+
+        assert default_key(scope) == "key:abc123"
+
+
+class TestRateLimitMiddleware:
+    """Test suite for RateLimitMiddleware on the real app"""
+
+    def test_login_budget_tighter(self):
+        """Test that /auth/login gets its own, tighter budget"""
+        rules = [
+            RateLimitRule("/auth/login", SlidingWindowLimiter(2, 60), methods=["POST"]),
+            RateLimitRule("*", TokenBucketLimiter(100, 100)),
+        ]
+        client = TestClient(RateLimitMiddleware(app, rules=rules))
+        form = {"username": "peminjam1", "password": "wrong"}
+
+        codes = [client.post("/auth/login", data=form).status_code for _ in range(3)]
+
+        assert codes == [401, 401, 429]
+        assert client.get("/health").status_code == 200
+
+    def test_rejection_response(self):
+        """Test the 429 body and Retry-After header"""
+        rules = [RateLimitRule("*", TokenBucketLimiter(rate=0.5, burst=1))]
+        client = TestClient(RateLimitMiddleware(app, rules=rules))
+        client.get("/health")
+
+        response = client.get("/health")
+
+        assert response.status_code == 429
+        assert response.json() == {"detail": "Too many requests"}
+        assert response.headers["retry-after"] == "2"
+
+    def test_unmatched_path_passes(self):
+        """Test that paths without a rule are not limited"""
+        rules = [RateLimitRule("/loans*", TokenBucketLimiter(rate=1, burst=1))]
+        middleware = RateLimitMiddleware(app, rules=rules)
+        client = TestClient(middleware)
+
+        assert all(client.get("/health").status_code == 200 for _ in range(5))
+        assert middleware.rejected == 0
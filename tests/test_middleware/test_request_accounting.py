@@ -0,0 +1,63 @@
+"""
+Tests for the request accounting middleware
+"""
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from infrastructure.phase_timing import phase
+from infrastructure.request_accounting import UsageStats
+from main import app
+from middleware.request_accounting import RequestAccountingMiddleware
+
+busy_app = FastAPI()
+
+
+@busy_app.get("/sync")
+def sync_endpoint():
+    with phase("handler"):
+        total = sum(i * i for i in range(300_000))
+    return {"total": total}
+
+
+@busy_app.get("/async")
+async def async_endpoint():
+    return {"total": sum(i * i for i in range(300_000))}
+
+
+class TestRequestAccountingMiddleware:
+    """Test suite for RequestAccountingMiddleware"""
+
+    def test_sync_handler_cpu_on_worker_thread(self):
+        """Test that CPU of a sync endpoint on the threadpool is charged"""
+        stats = UsageStats()
+        client = TestClient(RequestAccountingMiddleware(busy_app, stats, track_alloc=False))
+
+        client.get("/sync")
+
+        row = stats.report()["by_route"]["/sync"]
+        assert row["requests"] == 1
+        assert row["cpu_total_ms"] > 5
+
+    def test_async_handler_cpu_on_loop(self):
+        """Test that CPU of an async endpoint on the event loop is charged"""
+        stats = UsageStats()
+        client = TestClient(RequestAccountingMiddleware(busy_app, stats, track_alloc=False))
+
+        client.get("/async")
+
+        assert stats.report()["by_route"]["/async"]["cpu_total_ms"] > 5
+
+    def test_login_charged_with_bcrypt(self, pengguna_token):
+        """Test that login (bcrypt in the password pool) outweighs a loan read"""
+        stats = UsageStats()
+        client = TestClient(RequestAccountingMiddleware(app, stats, track_alloc=False))
+
+        client.post("/auth/login", data={"username": "peminjam1", "password": "password123"})
+        client.get("/loans/all", headers={"Authorization": f"Bearer {pengguna_token}"})
+
+        report = stats.report()
+        login = report["by_route"]["/auth/login"]["cpu_total_ms"]
+        assert login > report["by_route"]["/loans/all"]["cpu_total_ms"]
+        assert report["by_route_role"][0]["route"] == "/auth/login"
+        assert report["by_role"]["pengguna"]["requests"] == 1
+        assert report["by_role"]["anonymous"]["requests"] == 1
@@ -0,0 +1,61 @@
+"""
+Tests for the Server-Timing middleware
+"""
+from fastapi.testclient import TestClient
+
+from main import app
+from middleware.server_timing import PHASE_SECONDS, ServerTimingMiddleware, format_server_timing
+
+client = TestClient(ServerTimingMiddleware(app))
+
+
+def _phases(header: str) -> dict:
+    result = {}
+    for part in header.split(", "):
+        name, dur = part.split(";dur=")
+        result[name] = float(dur)
+    return result
+
+
+class TestServerTimingMiddleware:
+    """Test suite for ServerTimingMiddleware"""
+
+    def test_loans_all_breakdown(self, pengguna_token):
+        """Test that auth, repository, handler and validation phases are reported"""
+        response = client.get("/loans/all", headers={"Authorization": f"Bearer {pengguna_token}"})
+
+        phases = _phases(response.headers["server-timing"])
+        assert {"jwt", "user", "repo", "handler", "serialize", "validate", "app", "total"} <= set(phases)
+        parts = sum(v for k, v in phases.items() if k != "total")
+        assert abs(parts - phases["total"]) < 0.01
+
+    def test_phase_histogram_observed(self, pengguna_token):
+        """Test that phases are aggregated per route template"""
+        before = PHASE_SECONDS.collect().get(("/loans/all", "repo"))
+        count_before = sum(before[:-1]) if before else 0
+
+        client.get("/loans/all", headers={"Authorization": f"Bearer {pengguna_token}"})
+
+        after = PHASE_SECONDS.collect()[("/loans/all", "repo")]
+        assert sum(after[:-1]) == count_before + 1
+
+    def test_unauthenticated_request(self):
+        """Test that the header is set on error responses too"""
+        response = client.get("/loans/all")
+
+        assert response.status_code == 401
+        assert "total;dur=" in response.headers["server-timing"]
+
+    def test_disabled_by_default(self, test_client, pengguna_token):
+        """Test that the app without the middleware sends no header"""
+        response = test_client.get("/loans/all", headers={"Authorization": f"Bearer {pengguna_token}"})
+
+        assert "server-timing" not in response.headers
+
+
+class TestFormatServerTiming:
+    """Test suite for format_server_timing"""
+
+    def test_format(self):
+        """Test the header value format in milliseconds"""
+        assert format_server_timing({"jwt": 0.0012}, 0.002) == b"jwt;dur=1.200, total;dur=2.000"
@@ -0,0 +1,129 @@
+"""
+Tests for the slow-request capture middleware
+"""
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from infrastructure.phase_timing import phase
+from infrastructure.slow_requests import SlowRequestLog
+from main import app
+from middleware.slow_requests import SlowRequestMiddleware
+
+slow_app = FastAPI()
+
+
+@slow_app.get("/slow")
+def slow_endpoint():
+    with phase("repo"):
+        time.sleep(0.2)
+    return {"ok": True}
+
+
+@slow_app.get("/fast")
+def fast_endpoint():
+    return {"ok": True}
+
+
+class TestSlowRequestMiddleware:
+    """Test suite for SlowRequestMiddleware"""
+
+    def test_slow_request_captured_with_stack(self):
+        """Test that a request over the threshold is recorded with a stack taken while slow"""
+        log = SlowRequestLog(threshold=0.05, capacity=10, poll=0.01)
+        client = TestClient(SlowRequestMiddleware(slow_app, log=log))
+        try:
+            client.get("/fast")
+            response = client.get("/slow")
+        finally:
+            log.stop_watchdog()
+
+        assert response.status_code == 200
+        records = log.snapshot()["records"]
+        assert len(records) == 1
+        record = records[0]
+        assert record["route"] == "/slow"
+        assert record["status"] == 200
+        assert record["duration_ms"] >= 200
+        assert record["phases_ms"]["repo"] >= 190
+        assert 50 <= record["stack_at_ms"] < 200
+        assert any(line.endswith(" slow_endpoint") for line in record["stack"])
+
+    def test_role_phases_and_repository_calls(self, pengguna_token):
+        """Test that role, auth phases and repository call counts are recorded"""
+        log = SlowRequestLog(threshold=0.0, capacity=10, sample_stack=False)
+        client = TestClient(SlowRequestMiddleware(app, log=log))
+
+        client.get("/loans/all", headers={"Authorization": f"Bearer {pengguna_token}"})
+
+        record = log.snapshot()["records"][0]
+        assert record["route"] == "/loans/all"
+        assert record["role"] == "pengguna"
+        assert record["principal"].startswith("user:")
+        assert {"jwt", "user", "repo", "handler", "app"} <= set(record["phases_ms"])
+        assert record["calls"]["loan.list_all"] == 1
+        assert record["stack"] is None
+
+    def test_fast_requests_not_recorded(self):
+        """Test that requests under the threshold leave nothing behind"""
+        log = SlowRequestLog(threshold=10.0, capacity=10, sample_stack=False)
+        client = TestClient(SlowRequestMiddleware(slow_app, log=log))
+
+        client.get("/fast")
+
+        snapshot = log.snapshot()
+        assert snapshot["records"] == []
+        assert snapshot["in_flight"] == 0
+
+    def test_unauthenticated_request(self):
+        """Test that errors are captured with no role"""
+        log = SlowRequestLog(threshold=0.0, capacity=10, sample_stack=False)
+        client = TestClient(SlowRequestMiddleware(app, log=log))
+
+        client.get("/loans/all")
+
+        record = log.snapshot()["records"][0]
+        assert record["status"] == 401
+        assert record["role"] is None
+
+
+class TestRequestPrincipal:
+    """Test suite for request_principal"""
+
+    def test_uncached_token_never_decoded(self, monkeypatch, pengguna_token):
+        """Test that a token missing from the cache is not verified here"""
+        import auth.deps
+        import auth.jwt_handler
+        from auth.token_cache import token_cache
+        from middleware.slow_requests import request_principal
+
+        def fail(token):
+            raise AssertionError("decoded on the middleware path")
+
+        monkeypatch.setattr(auth.jwt_handler, "decode_access_token", fail)
+        monkeypatch.setattr(auth.deps, "decode_access_token", fail)
+        token_cache.clear()
+        scope = {"headers": [(b"authorization", f"Bearer {pengguna_token}".encode())]}
+
+        assert request_principal(scope) == (None, None)
+
+    def test_cached_once_per_request_without_stats(self, pengguna_token):
+        """Test that the principal comes from the cache and is reused via the scope"""
+        from auth.deps import decode_token_cached
+        from auth.token_cache import token_cache
+        from middleware.slow_requests import request_principal
+
+        decode_token_cached(pengguna_token)
+        before = token_cache.stats()
+        scope = {"headers": [(b"authorization", f"Bearer {pengguna_token}".encode())]}
+
+        role, principal = request_principal(scope)
+        after = token_cache.stats()
+        token_cache.clear()
+
+        assert role == "pengguna"
+        assert principal.startswith("user:")
+        assert (after["hits"], after["misses"]) == (before["hits"], before["misses"])
+        # dari scope: tidak butuh cache lagi
+        assert request_principal(scope) == (role, principal)
@@ -0,0 +1,108 @@
+"""
+Tests for the tracing middleware
+"""
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from infrastructure.tracing import BatchSpanProcessor, Sampler
+from main import app
+from middleware.tracing import TracingMiddleware
+
+TRACEPARENT = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+
+slow_app = FastAPI()
+
+
+@slow_app.get("/slow")
+def slow_endpoint():
+    time.sleep(0.06)
+    return {"ok": True}
+
+
+@slow_app.get("/fast")
+def fast_endpoint():
+    return {"ok": True}
+
+
+class MemoryExporter:
+    def __init__(self):
+        self.payloads = []
+
+    def export(self, payload):
+        self.payloads.append(payload)
+
+    def spans(self):
+        return [span for payload in self.payloads
+                for span in payload["resourceSpans"][0]["scopeSpans"][0]["spans"]]
+
+
+def traced_client(target, ratio: float, slow_seconds: float, parent_per_second: float = 0):
+    exporter = MemoryExporter()
+    processor = BatchSpanProcessor(exporter, interval=60)
+    sampler = Sampler(ratio, slow_seconds, parent_per_second)
+    return TestClient(TracingMiddleware(target, processor, sampler)), processor, exporter
+
+
+class TestTracingMiddleware:
+    """Test suite for TracingMiddleware"""
+
+    def test_loan_request_child_spans(self, pengguna_token):
+        """Test that jwt, user lookup, repository and serialize spans are exported"""
+        client, processor, exporter = traced_client(app, 1.0, 0)
+
+        client.get("/loans/all", headers={"Authorization": f"Bearer {pengguna_token}"})
+        processor.shutdown()
+
+        spans = {span["name"]: span for span in exporter.spans()}
+        root = spans["GET /loans/all"]
+        assert {"jwt", "user", "repo loan.list_all", "serialize", "handler", "validate"} <= set(spans)
+        assert spans["repo loan.list_all"]["parentSpanId"] == spans["handler"]["spanId"]
+        attributes = {a["key"]: a["value"] for a in root["attributes"]}
+        assert attributes["enduser.role"] == {"stringValue": "pengguna"}
+        assert attributes["http.route"] == {"stringValue": "/loans/all"}
+        assert attributes["bookwise.sampled_by"] == {"stringValue": "head"}
+
+    def test_continues_incoming_trace(self, pengguna_token):
+        """Test that a sampled traceparent is continued with its trace id and parent"""
+        client, processor, exporter = traced_client(app, 0.0, 0, parent_per_second=-1)
+
+        client.get("/loans/all", headers={"Authorization": f"Bearer {pengguna_token}", "traceparent": TRACEPARENT})
+        processor.shutdown()
+
+        root = next(span for span in exporter.spans() if span["kind"] == 2)
+        assert root["traceId"] == "0af7651916cd43dd8448eb211c80319c"
+        assert root["parentSpanId"] == "b7ad6b7169203331"
+
+    def test_tail_sampling_keeps_only_slow(self):
+        """Test that with ratio 0 only requests over the slow threshold are exported"""
+        client, processor, exporter = traced_client(slow_app, 0.0, 0.05)
+
+        client.get("/fast")
+        client.get("/slow")
+        processor.shutdown()
+
+        roots = [span for span in exporter.spans() if span["kind"] == 2]
+        assert [span["name"] for span in roots] == ["GET /slow"]
+        attributes = {a["key"]: a["value"] for a in roots[0]["attributes"]}
+        assert attributes["bookwise.sampled_by"] == {"stringValue": "slow"}
+
+    def test_unsampled_without_tail_exports_nothing(self):
+        """Test that head-only sampling at ratio 0 exports nothing"""
+        client, processor, exporter = traced_client(slow_app, 0.0, 0)
+
+        client.get("/slow")
+        processor.shutdown()
+
+        assert exporter.payloads == []
+
+    def test_client_cannot_force_sampling(self):
+        """Test that an untrusted sampled traceparent does not force export"""
+        client, processor, exporter = traced_client(slow_app, 0.0, 0)
+
+        for _ in range(5):
+            client.get("/fast", headers={"traceparent": TRACEPARENT})
+        processor.shutdown()
+
+        assert exporter.payloads == []